@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark: analysis over archived (compressed) history vs raw JSON
+
+Writes the same N ticks as a legacy ``observations.json`` and as an
+observation log, then times a full analysis load (ObservationFrame over
+ObservationFrame.FIELDS, as Analyzer and UserDNA read it) for:
+
+- legacy raw JSON: the single ``observations.json`` document
+- log raw: uncompressed JSON-lines segments
+- log gzip / log zstd: the same segments after archiving (zstd with a
+  trained dictionary; skipped when zstandard is not installed)
+
+and reports on-disk size, compression ratio and decompression throughput.
+
+Usage:
+    python benchmarks/bench_archive.py [--ticks 50000] [--apps 40] [--repeat 3]
+"""
+
+import argparse
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from bench_codec import best_of, observation_set
+
+from jarvisos.core import codec, compression
+from jarvisos.core.frame import ObservationFrame
+from jarvisos.core.observation_log import ObservationLog, open_observations
+
+
+def disk_bytes(path: Path) -> int:
+    return sum(p.stat().st_size for p in path.rglob('*') if p.is_file() and p.suffix != '.zdict')
+
+
+def load(data_dir: Path) -> ObservationFrame:
+    return ObservationFrame.from_observations(open_observations(data_dir, fields=ObservationFrame.FIELDS))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--ticks', type=int, default=50000)
+    parser.add_argument('--apps', type=int, default=40, help='Processes per tick')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    document = observation_set(args.ticks, args.apps)
+    root = Path(tempfile.mkdtemp(prefix="jarvis-bench-"))
+    try:
+        legacy = root / "legacy"
+        legacy.mkdir()
+        (legacy / "observations.json").write_bytes(codec.encode(document, pretty=False))
+
+        raw = root / "raw"
+        log = ObservationLog(raw / "observations")
+        for obs in document['observations']:
+            log.append(obs)
+        log.close()
+
+        cases = [('legacy raw JSON', legacy), ('log raw', raw)]
+        backends = ['gzip'] + (['zstd'] if compression.zstandard is not None else [])
+        for backend in backends:
+            target = root / backend
+            shutil.copytree(raw, target)
+            ObservationLog(target / "observations").archive(backend=backend)
+            cases.append((f'log {backend}', target))
+
+        print(f"{args.ticks} ticks x {args.apps} processes\n")
+        print(f"{'storage':<18} {'disk (MB)':>10} {'ratio':>7} {'decompress (MB/s)':>18} "
+              f"{'analysis load (s)':>18} {'ticks/s':>10}")
+        raw_bytes = disk_bytes(raw / "observations")
+        for name, data_dir in cases:
+            seconds, frame = best_of(args.repeat, load, data_dir)
+            assert frame.tick_count == args.ticks
+            size = disk_bytes(data_dir)
+            stats = ObservationLog(data_dir / "observations").archive_stats()
+            ratio = f"{stats['ratio']:.1f}x" if stats else '-'
+            throughput = f"{stats['decompress_mb_s']:.0f}" if stats else '-'
+            print(f"{name:<18} {size / 1e6:>10.1f} {ratio:>7} {throughput:>18} "
+                  f"{seconds:>18.2f} {args.ticks / seconds:>10,.0f}")
+        print(f"\nlog raw segments: {raw_bytes / 1e6:.1f} MB")
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
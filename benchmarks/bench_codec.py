@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark: the shared JSON codec vs stdlib `json.dump(..., indent=2)`
+
+Builds a realistic observation set (N ticks of ~40 processes with CPU,
+memory and user fields, system stats, tick and self-metrics blocks) and
+measures encode/decode throughput and size for:
+
+- before: the stdlib pretty-printed document, as `save_observations` and
+  the other persistence paths used to write it
+- stdlib compact: the codec's fallback when no fast library is installed
+- codec: compact output from the active backend (orjson or msgspec)
+- codec log lines: one compact line per tick, as the observation log stores
+  them (process lists delta-encoded)
+
+Usage:
+    python benchmarks/bench_codec.py [--ticks 50000] [--apps 40] [--repeat 3]
+"""
+
+import argparse
+import gc
+import json
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from jarvisos.core import codec
+from jarvisos.core.snapshot_codec import SnapshotEncoder, encode_observation
+
+NAMES = ['code', 'chrome', 'firefox', 'zsh', 'python3', 'slack', 'systemd', 'dockerd',
+         'terminal', 'spotify', 'docker', 'node', 'vim', 'ssh', 'git', 'htop']
+
+
+def observation_set(ticks: int, apps: int, seed: int = 1) -> dict:
+    """A legacy-format observations document with `ticks` samples"""
+    rng = random.Random(seed)
+    start = datetime(2025, 10, 1)
+    processes = [{'pid': 1000 + i, 'name': rng.choice(NAMES), 'username': 'user'}
+                 for i in range(apps)]
+    observations = []
+    for i in range(ticks):
+        if rng.random() < 0.05:  # occasional spawn/exit
+            processes[rng.randrange(apps)] = {'pid': 2000 + i, 'name': rng.choice(NAMES),
+                                              'username': 'user'}
+        observations.append({
+            'iteration': i,
+            'timestamp': (start + timedelta(seconds=5 * i)).isoformat(),
+            'apps': [{**p, 'cpu_percent': round(rng.random() * 5, 1),
+                      'memory_percent': round(rng.random() * 3, 2)} for p in processes],
+            'system': {'cpu_percent': round(rng.random() * 100, 1),
+                       'memory_percent': round(40 + rng.random() * 20, 1),
+                       'network_connections': rng.randint(50, 200)},
+            'tick': {'interval': 5, 'jitter_ms': round(rng.random(), 3), 'missed': 0},
+            'self': {'cpu_percent': round(rng.random(), 2), 'rss_mb': 38.5},
+        })
+    return {'observations': observations,
+            'metadata': {'total_observations': ticks, 'interval': 5}}
+
+
+def best_of(repeat: int, fn, *args):
+    """Fastest of `repeat` runs, in seconds, and the last result (GC off, like timeit)"""
+    best, result = float('inf'), None
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            result = None
+            start = time.perf_counter()
+            result = fn(*args)
+            best = min(best, time.perf_counter() - start)
+    finally:
+        gc.enable()
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--ticks', type=int, default=50000)
+    parser.add_argument('--apps', type=int, default=40, help='Processes per tick')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    document = observation_set(args.ticks, args.apps)
+    encoder = SnapshotEncoder()
+    lines = [encode_observation(encoder, obs) for obs in document['observations']]
+
+    cases = [
+        ('before: json indent=2',
+         lambda: json.dumps(document, indent=2).encode(), json.loads),
+        ('stdlib compact',
+         lambda: json.dumps(document, separators=(',', ':')).encode(), json.loads),
+        (f'codec ({codec.BACKEND})',
+         lambda: codec.encode(document, pretty=False), codec.decode),
+        (f'codec log lines ({codec.BACKEND})',
+         lambda: b''.join(codec.encode(line, pretty=False) + b'\n' for line in lines),
+         lambda raw: [codec.decode(line) for line in raw.splitlines()]),
+    ]
+
+    print(f"{args.ticks} ticks x {args.apps} processes\n")
+    print(f"{'format':<28} {'size (MB)':>10} {'encode (MB/s)':>14} {'decode (MB/s)':>14} "
+          f"{'encode (ticks/s)':>17} {'decode (ticks/s)':>17}")
+    baseline = None
+    for name, encode, decode in cases:
+        encode_s, raw = best_of(args.repeat, encode)
+        decode_s, _ = best_of(args.repeat, decode, raw)
+        mb = len(raw) / 1e6
+        baseline = baseline or len(raw)
+        print(f"{name:<28} {mb:>10.1f} {mb / encode_s:>14.0f} {mb / decode_s:>14.0f} "
+              f"{args.ticks / encode_s:>17,.0f} {args.ticks / decode_s:>17,.0f}"
+              f"   ({len(raw) / baseline:.0%} of before)")
+
+
+if __name__ == "__main__":
+    main()
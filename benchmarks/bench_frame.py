@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Benchmark: ObservationFrame vs the per-record loops it replaced
+
+Generates N synthetic ticks and times the analytics run by `jarvis analyze`,
+`jarvis summary` and `jarvis dna`: once as the previous dict loops (one pass
+per consumer, re-parsing timestamps and rebuilding Counters each time), and
+once as a single frame load followed by vectorized passes.
+
+Ticks are generated lazily on every pass, like re-reading the observation
+log, so 1M ticks fit in memory; generation time is included on both sides.
+
+Usage:
+    python benchmarks/bench_frame.py [--sizes 10000 100000 1000000] [--apps 40]
+"""
+
+import argparse
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from jarvisos.core.dna import UserDNA
+from jarvisos.core.frame import ObservationFrame
+
+NAMES = ['code', 'chrome', 'firefox', 'zsh', 'python3', 'slack', 'systemd', 'dockerd',
+         'terminal', 'spotify', 'docker', 'node', 'vim', 'ssh', 'git', 'htop']
+
+
+class SyntheticStream:
+    """Re-iterable stream of `count` ticks drawn from a few app lists"""
+
+    def __init__(self, count: int, apps: int, seed: int = 1):
+        rng = random.Random(seed)
+        self.count = count
+        self.app_lists = [
+            [{'name': rng.choice(NAMES), 'pid': pid} for pid in range(rng.randint(apps // 2, apps))]
+            for _ in range(32)
+        ]
+        self.start = datetime(2025, 10, 1)
+
+    def __iter__(self):
+        rng = random.Random(2)
+        for i in range(self.count):
+            yield {
+                'iteration': i,
+                'timestamp': (self.start + timedelta(seconds=5 * i)).isoformat(),
+                'apps': self.app_lists[rng.randrange(len(self.app_lists))],
+                'system': {'cpu_percent': rng.random() * 100, 'memory_percent': 40 + rng.random() * 20},
+                'tick': {'interval': 5},
+            }
+
+
+def legacy_passes(observations) -> None:
+    """The summary, preprocess and six DNA loops as they were before the frame"""
+    # Observer.get_summary
+    app_counts, cpu, weight = {}, 0.0, 0.0
+    for obs in observations:
+        w = obs.get('tick', {}).get('interval') or 1
+        weight += w
+        cpu += obs['system']['cpu_percent'] * w
+        for app in obs['apps']:
+            app_counts[app['name']] = app_counts.get(app['name'], 0) + 1
+    sorted(app_counts.items(), key=lambda x: x[1], reverse=True)[:10]
+
+    # Analyzer.preprocess_observations
+    counter = Counter()
+    for obs in observations:
+        for app in obs.get('apps', []):
+            counter[app['name']] += 1
+    counter.most_common(10)
+
+    # UserDNA chronotype, work patterns, tool preferences, workflows, rhythms
+    hour_activity = defaultdict(int)
+    for obs in observations:
+        hour_activity[datetime.fromisoformat(obs['timestamp']).hour] += len(obs.get('apps', []))
+    work_hours = [datetime.fromisoformat(obs['timestamp']).hour
+                  for obs in observations if len(obs.get('apps', [])) > 5]
+    Counter(app['name'] for obs in observations for app in obs.get('apps', [])).most_common(10)
+    periods = defaultdict(list)
+    for obs in observations:
+        hour = datetime.fromisoformat(obs['timestamp']).hour
+        if hour >= 6:
+            periods[hour // 6].extend(app['name'] for app in obs.get('apps', []))
+    for apps in periods.values():
+        Counter(apps).most_common(5)
+    hour_productivity = defaultdict(list)
+    for obs in observations:
+        hour_productivity[datetime.fromisoformat(obs['timestamp']).hour].append(len(obs.get('apps', [])))
+
+    # UserDNA traits
+    prev = None
+    for obs in observations:
+        current = set(a['name'] for a in obs.get('apps', []))
+        prev = current
+
+
+def frame_passes(frame: ObservationFrame) -> None:
+    """The same analytics, vectorized over a loaded frame"""
+    frame.weighted_mean(frame.cpu)
+    frame.top_apps(10)
+    dna = UserDNA.__new__(UserDNA)
+    dna.profile = {key: {} for key in ('chronotype', 'work_patterns', 'tool_preferences',
+                                      'workflow_signatures', 'productivity_rhythms', 'traits')}
+    for step in (dna._analyze_chronotype, dna._analyze_work_patterns, dna._analyze_tool_preferences,
+                 dna._analyze_workflow_signatures, dna._analyze_productivity_rhythms, dna._infer_traits):
+        step(frame)
+    frame.rolling_mean(frame.cpu, 12)
+
+
+def timed(fn, *args) -> float:
+    start = time.perf_counter()
+    fn(*args)
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--apps', type=int, default=40, help='Max processes per tick')
+    args = parser.parse_args()
+
+    print(f"{'ticks':>9} {'loops (ms)':>11} {'load (ms)':>10} {'analytics (ms)':>15} {'speedup':>8}")
+    for size in args.sizes:
+        stream = SyntheticStream(size, args.apps)
+        loops_ms = timed(legacy_passes, stream)
+
+        start = time.perf_counter()
+        frame = ObservationFrame.from_observations(stream)
+        load_ms = (time.perf_counter() - start) * 1000
+        analytics_ms = timed(frame_passes, frame)
+
+        print(f"{size:>9} {loops_ms:>11.0f} {load_ms:>10.0f} {analytics_ms:>15.1f} "
+              f"{loops_ms / (load_ms + analytics_ms):>7.1f}x")
+        del frame
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Ollama generation over HTTP vs `ollama run` subprocesses
+
+Times N short generations through OllamaAIBrain with each transport:
+
+- http: the pooled keep-alive client (one connection for every call)
+- cli: `ollama run <model>` per call, the prompt on stdin
+
+By default both run against a local stub of the Ollama API that answers
+instantly, so the numbers are pure per-call overhead; the CLI is a small
+stand-in script that posts to the stub like the real binary does. With
+--host both go to a real server (and the real `ollama` on PATH), where
+model inference adds the same time to each side.
+
+Usage:
+    python benchmarks/bench_ollama.py [--calls 50] [--host 127.0.0.1:11434] [--model llama3.2]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from jarvisos.core.ai_brain_ollama import OllamaAIBrain, OllamaConfig
+
+FAKE_CLI = '''#!{python} -IS
+import http.client, json, sys
+if sys.argv[1] == "--version":
+    print("ollama version stub")
+elif sys.argv[1] == "list":
+    print("{model}:latest")
+elif sys.argv[1] == "run":
+    conn = http.client.HTTPConnection("127.0.0.1", {port})
+    conn.request("POST", "/api/generate", json.dumps(
+        {{"model": sys.argv[2], "prompt": sys.stdin.read(), "stream": False}}))
+    print(json.loads(conn.getresponse().read())["response"])
+'''
+
+
+class Stub(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True  # Go's net/http, as Ollama uses, sets TCP_NODELAY
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, document):
+        body = json.dumps(document).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/api/tags':
+            self._send({'models': [{'name': f"{self.server.model}:latest"}]})
+        else:
+            self._send({'version': 'stub'})
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers['Content-Length']))
+        self._send({'response': 'Open the terminal.', 'done': True})
+
+
+def time_calls(brain: OllamaAIBrain, calls: int):
+    latencies = []
+    for i in range(calls):
+        start = time.perf_counter()
+        assert brain.generate(f"Predict the next action #{i}", system="Be brief.")
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--calls', type=int, default=50)
+    parser.add_argument('--host', help='Real Ollama server (default: a local stub)')
+    parser.add_argument('--model', default='llama3.2')
+    args = parser.parse_args()
+
+    tmp = Path(tempfile.mkdtemp(prefix="jarvis-bench-"))
+    httpd = None
+    try:
+        host = args.host
+        if host is None:
+            httpd = ThreadingHTTPServer(('127.0.0.1', 0), Stub)
+            httpd.daemon_threads = True
+            httpd.model = args.model
+            threading.Thread(target=httpd.serve_forever, daemon=True).start()
+            host = f"127.0.0.1:{httpd.server_address[1]}"
+            cli = tmp / "ollama"
+            cli.write_text(FAKE_CLI.format(python=sys.executable, model=args.model,
+                                           port=httpd.server_address[1]))
+            cli.chmod(0o755)
+            os.environ['PATH'] = f"{tmp}{os.pathsep}{os.environ['PATH']}"
+        os.environ['OLLAMA_HOST'] = host
+
+        brain = OllamaAIBrain(OllamaConfig(model=args.model, host=host))
+        if brain.transport != 'http':
+            sys.exit(f"No Ollama server at {host}")
+        brain.generate("warm up")  # load the model before timing
+
+        results = {'http': time_calls(brain, args.calls)}
+        brain.transport = 'cli'
+        results['cli'] = time_calls(brain, args.calls)
+
+        print(f"{args.calls} generations against {'stub' if httpd else host}\n")
+        print(f"{'transport':<10} {'median (ms)':>12} {'p95 (ms)':>10} {'calls/s':>10}")
+        for name, latencies in results.items():
+            latencies.sort()
+            p95 = latencies[int(len(latencies) * 0.95) - 1]
+            print(f"{name:<10} {statistics.median(latencies) * 1e3:>12.2f} {p95 * 1e3:>10.2f} "
+                  f"{len(latencies) / sum(latencies):>10,.0f}")
+        speedup = statistics.median(results['cli']) / statistics.median(results['http'])
+        print(f"\nhttp is {speedup:.0f}x faster per call")
+    finally:
+        if httpd is not None:
+            httpd.shutdown()
+            httpd.server_close()
+        shutil.rmtree(tmp)
+
+
+if __name__ == "__main__":
+    main()
@@ -153,6 +153,7 @@ pip install -r requirements.txt
 systemctl enable jarvisos-observer
 systemctl enable jarvisos-nightly.timer
 systemctl enable jarvisos-notifier.timer
+systemctl enable jarvisos-compactor.timer
 
 # Setup desktop autostart
 mkdir -p /home/jarvis/.config/autostart
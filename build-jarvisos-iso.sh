@@ -218,6 +218,7 @@ autoinstall:
     - curtin in-target --target=/target -- systemctl enable jarvisos-observer
     - curtin in-target --target=/target -- systemctl enable jarvisos-nightly.timer
     - curtin in-target --target=/target -- systemctl enable jarvisos-notifier.timer
+    - curtin in-target --target=/target -- systemctl enable jarvisos-compactor.timer
 EOF
 
 # Create boot configuration
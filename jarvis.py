@@ -6,11 +6,15 @@ Main CLI Interface
 
 import argparse
 import sys
+from contextlib import contextmanager
 from pathlib import Path
+from datetime import timedelta
 
 from rich.console import Console
+from rich.live import Live
 from rich.panel import Panel
 from rich.table import Table
+from rich.text import Text
 
 # Add jarvisos to path
 sys.path.insert(0, str(Path(__file__).parent))
@@ -27,6 +31,14 @@ from jarvisos.core.context import ContextAnalyzer, SmartInterruptionManager
 from jarvisos.core.feedback import FeedbackManager, FeedbackIntegration
 from jarvisos.voice.jarvis_voice import JarvisVoice
 from jarvisos.core.self_improver import SelfImprover
+from jarvisos.core.observation_log import WriterLockedError, open_observations, resolve_time
+from jarvisos.core.self_metrics import load_metrics
+from jarvisos.core.rollups import RESOLUTIONS, ROLLUP_DB, Compactor, RollupStore
+from jarvisos.core.json_files import read_json
+from jarvisos.core.streaming import TimedStream, TokenTimer
+from jarvisos.core.ai_brain_unified import get_ai_brain
+from jarvisos.core.llm_cache import LLM_CACHE_DB, LLMCache
+from jarvisos.core import codec, llm_cache
 
 # Predictive Engine V2 - TOP 0.1%
 try:
@@ -39,6 +51,38 @@ except ImportError:
 
 console = Console()
 
+STREAM_LINES = 8  # lines of a streaming response kept on screen
+
+
+@contextmanager
+def live_tokens(ai_brain):
+    """
+    Show an AI brain's response as it streams in, then its latency
+    
+    The last few lines are rendered live and cleared once the command has
+    its parsed result to display. Responses served from the LLM cache are
+    not streamed; they are reported next to the latency instead.
+    """
+    timer = TokenTimer()
+    hits = getattr(ai_brain, 'cache_hits', 0)
+    received = []
+    with Live(Text(""), console=console, refresh_per_second=12, transient=True) as live:
+        def on_token(chunk):
+            timer.on_token(chunk)
+            received.append(chunk)
+            tail = "".join(received).splitlines()[-STREAM_LINES:]
+            live.update(Text("\n".join(tail), style="dim"))
+        
+        ai_brain.token_listener = on_token
+        try:
+            yield timer
+        finally:
+            ai_brain.token_listener = None
+            timer.finish()
+    cached = getattr(ai_brain, 'cache_hits', 0) - hits
+    note = f" · {cached} answered from cache" if cached else ""
+    console.print(f"[dim]⏱  {timer.summary()}{note}[/dim]\n")
+
 
 def print_banner():
     """Print JarvisOS banner"""
@@ -59,17 +103,53 @@ def print_banner():
 
 def cmd_observe(args):
     """Observe user behavior"""
+    if args.adaptive or args.min_interval is not None or args.max_interval is not None:
+        args.min_interval = args.min_interval if args.min_interval is not None else 1.0
+        args.max_interval = args.max_interval if args.max_interval is not None else 60.0
+        if not 0 < args.min_interval <= args.max_interval:
+            console.print("[red]❌ --min-interval must be positive and <= --max-interval[/red]")
+            return
+    
+    if args.daemon:
+        from jarvisos.core.daemon import ObserverDaemon, DEFAULT_CONFIG_FILE
+        daemon = ObserverDaemon(
+            Observer(collector=args.collector, cpu_budget=args.cpu_budget,
+                     history=args.history),
+            interval=args.interval,
+            flush_interval=args.flush_interval,
+            min_interval=args.min_interval,
+            max_interval=args.max_interval,
+            config_file=args.config or DEFAULT_CONFIG_FILE
+        )
+        daemon.install_signal_handlers()
+        try:
+            daemon.run()
+        except WriterLockedError as e:
+            console.print(f"[red]❌ {e}[/red]")
+            sys.exit(1)
+        return
+    
     print_banner()
-    observer = Observer()
-    observer.observe(duration=args.duration, interval=args.interval)
+    observer = Observer(collector=args.collector, cpu_budget=args.cpu_budget,
+                        history=args.history)
+    try:
+        observer.observe(
+            duration=args.duration,
+            interval=args.interval,
+            min_interval=args.min_interval,
+            max_interval=args.max_interval
+        )
+    except WriterLockedError as e:
+        console.print(f"[red]❌ {e}[/red]")
 
 
 def cmd_analyze(args):
     """Analyze observations with AI"""
     print_banner()
     try:
+        since, until = time_window(args)
         analyzer = Analyzer()
-        analyzer.analyze()
+        analyzer.analyze(since=since, until=until, full=args.full)
     except Exception as e:
         console.print(f"\n[bold red]❌ Analysis failed: {e}[/bold red]\n")
         sys.exit(1)
@@ -80,7 +160,7 @@ def cmd_generate(args):
     print_banner()
     try:
         generator = Generator()
-        result = generator.generate(task_index=args.task_index)
+        result = generator.generate(task_index=args.task_index, all_tasks=args.all)
         
         if result:
             console.print(f"\n[bold green]✨ Next steps:[/bold green]")
@@ -93,6 +173,20 @@ def cmd_generate(args):
         sys.exit(1)
 
 
+def cmd_ask(args):
+    """Ask the AI brain, printing the answer as it is generated"""
+    brain = get_ai_brain()
+    if not brain.is_available():
+        console.print(f"[yellow]{brain.get_status_message()}[/yellow]")
+        return
+    
+    stream = TimedStream(brain.generate_stream(" ".join(args.prompt)))
+    for chunk in stream:
+        console.out(chunk, end="", highlight=False)
+    console.print()
+    console.print(f"[dim]⏱  {stream.timer.summary()}[/dim]")
+
+
 def cmd_list(args):
     """List available scripts"""
     print_banner()
@@ -117,8 +211,106 @@ def cmd_run(args):
 def cmd_summary(args):
     """Show observation summary"""
     print_banner()
+    since, until = time_window(args)
     observer = Observer()
-    observer.display_summary()
+    observer.display_summary(since, until)
+
+
+def cmd_compact(args):
+    """Roll raw observations up into minute/hour/day buckets and apply retention"""
+    retention = {}
+    if args.keep_raw is not None:
+        retention['raw'] = timedelta(days=args.keep_raw)
+    if args.keep_minutes is not None:
+        retention['1m'] = timedelta(days=args.keep_minutes)
+    
+    result = Compactor("data", retention, archive=not args.no_archive).run()
+    written = ", ".join(f"{n} {res}" for res, n in result['written'].items())
+    expired = ", ".join(f"{n} {res}" for res, n in result['expired'].items())
+    console.print(f"[green]✅ Rollups written: {written}[/green]")
+    console.print(f"[green]📦 Files archived: {result['archived']}[/green]")
+    console.print(f"[dim]Expired: {expired or 'nothing'}[/dim]")
+
+
+def cmd_query(args):
+    """Print observations in a time range as JSON lines"""
+    since, until = time_window(args)
+    stream = open_observations("data", since, until)
+    
+    if args.partitions:
+        table = Table(title="Observation Partitions")
+        table.add_column("Hour", style="cyan")
+        table.add_column("Count", justify="right")
+        table.add_column("Size", justify="right")
+        table.add_column("CPU min/max", justify="right")
+        table.add_column("Memory min/max", justify="right")
+        for part in stream.partitions():
+            if since and part['end_time'] and part['end_time'] < since.isoformat():
+                continue
+            if until and part['start_time'] and part['start_time'] >= until.isoformat():
+                continue
+            cpu = part['stats'].get('cpu_percent') or [None, None]
+            mem = part['stats'].get('memory_percent') or [None, None]
+            table.add_row(
+                part['partition'], str(part['count']), f"{part['bytes'] / 1024:.1f} KB",
+                f"{cpu[0]}/{cpu[1]}", f"{mem[0]}/{mem[1]}"
+            )
+        console.print(table)
+        return
+    
+    fields = [f.strip() for f in args.fields.split(',') if f.strip()] if args.fields else None
+    
+    shown = 0
+    # Projected records keep only the requested fields; process lists are
+    # only decoded when an 'apps' field is asked for
+    for obs in stream.iter_range(since, until, fields=fields):
+        if fields:
+            obs = {field: lookup(obs, field) for field in fields}
+        print(codec.dumps(obs, pretty=False, default=str))
+        shown += 1
+        if args.limit and shown >= args.limit:
+            break
+
+
+def lookup(record, path):
+    """Resolve a dotted field path such as 'system.cpu_percent'"""
+    value = record
+    for key in path.split('.'):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(key)
+    return value
+
+
+def time_window(args):
+    """Parse --since/--until into datetimes (None when not given)"""
+    try:
+        return (resolve_time(getattr(args, 'since', None)),
+                resolve_time(getattr(args, 'until', None)))
+    except ValueError as e:
+        console.print(f"[red]❌ Invalid time: {e}[/red]")
+        sys.exit(2)
+
+
+def add_time_window(parser):
+    """Add --since/--until to a subcommand"""
+    parser.add_argument(
+        '--since',
+        help="Start of the time range: ISO timestamp, 'today', 'yesterday' or relative (30m, 2h, 7d)"
+    )
+    parser.add_argument(
+        '--until',
+        help='End of the time range (exclusive), same formats as --since'
+    )
+
+
+def add_full_argument(parser):
+    """Add --full to a subcommand reading the shared observation stats"""
+    parser.add_argument(
+        '--full',
+        action='store_true',
+        help='Recompute statistics from all observations instead of the last checkpoint'
+    )
 
 
 def cmd_dna(args):
@@ -126,13 +318,10 @@ def cmd_dna(args):
     print_banner()
     dna = UserDNA()
     
-    # Load and analyze observations if available
-    obs_file = Path("data/observations.json")
-    if obs_file.exists():
-        import json
-        with open(obs_file) as f:
-            observations_data = json.load(f)
-        dna.analyze_observations(observations_data)
+    # Stream and analyze observations if available
+    # Reads hourly rollups where they exist, recent raw ticks otherwise
+    if open_observations("data").exists():
+        dna.analyze_history(full=args.full)
     
     dna.display_profile()
 
@@ -261,17 +450,13 @@ def cmd_context(args):
     
     analyzer = ContextAnalyzer()
     
-    # Load observations
-    obs_file = Path("data/observations.json")
-    if not obs_file.exists():
+    # Load the most recent observations
+    stream = open_observations("data")
+    if not stream.exists():
         console.print("[red]❌ No observations found. Run 'jarvis observe' first.[/red]\n")
         return
     
-    import json
-    with open(obs_file) as f:
-        data = json.load(f)
-    
-    observations = data.get('observations', [])
+    observations = stream.latest(12)
     
     if not observations:
         console.print("[red]❌ No observations to analyze.[/red]\n")
@@ -284,8 +469,7 @@ def cmd_context(args):
     console.print(f"\n[bold cyan]🧠 Current Context:[/bold cyan] [yellow]{context}[/yellow]\n")
     
     # Session analysis
-    recent = observations[-12:] if len(observations) >= 12 else observations
-    session = analyzer.analyze_session(recent)
+    session = analyzer.analyze_session(observations)
     
     console.print("[bold]📊 Recent Session:[/bold]")
     console.print(f"  Dominant: {session['dominant_context']}")
@@ -327,7 +511,6 @@ def cmd_status(args):
     data_dir = Path("data")
     scripts_dir = Path("generated_scripts")
     
-    observations_file = data_dir / "observations.json"
     insights_file = data_dir / "insights.json"
     
     table = Table(title="JarvisOS Status", show_header=True, header_style="bold magenta")
@@ -336,20 +519,73 @@ def cmd_status(args):
     table.add_column("Details", style="yellow")
     
     # Observer status
-    if observations_file.exists():
-        import json
-        with open(observations_file) as f:
-            data = json.load(f)
-        obs_count = data.get('metadata', {}).get('total_observations', 0)
+    observations = open_observations(data_dir)
+    if observations.exists():
+        obs_count = observations.count()
         table.add_row("Observer", "✅ Ready", f"{obs_count} observations collected")
     else:
         table.add_row("Observer", "⚠️  No data", "Run 'jarvis observe' to start")
     
+    # Observer self-overhead (rolling percentiles over recent ticks)
+    metrics = load_metrics(data_dir)
+    if metrics and metrics.get('ticks'):
+        def pct(values, unit=""):
+            return "/".join(f"{values.get(p, 0):g}" for p in ('p50', 'p95', 'p99')) + unit
+        
+        cpu = metrics['cpu_percent']
+        budget = metrics.get('cpu_budget')
+        state = "✅ Within budget" if not budget or cpu.get('p95', 0) <= budget else "⚠️  Over budget"
+        details = f"CPU p50/p95/p99 {pct(cpu, '%')}"
+        if budget:
+            details += f" (budget {budget:g}%, {metrics.get('throttled_ticks', 0)} throttled ticks)"
+        table.add_row("Observer overhead", state, details)
+        
+        for name, values in sorted(metrics['latency_ms'].items()):
+            table.add_row(f"  {name} latency", "", f"p50/p95/p99 {pct(values, ' ms')}")
+        table.add_row(
+            "  Footprint", "",
+            f"RSS p95 {metrics['rss_mb'].get('p95', 0):.1f} MB, "
+            f"{metrics['processes_scanned'].get('p50', 0):g} processes/tick, "
+            f"{metrics['bytes_written'] / 1024:.1f} KB written "
+            f"({metrics['bytes_per_tick'].get('p50', 0):g} B/tick)"
+        )
+    
+    # Rollups
+    if (data_dir / ROLLUP_DB).exists():
+        store = RollupStore(data_dir / ROLLUP_DB)
+        compacted = store.compacted_until()
+        buckets = ", ".join(f"{res}: {info['buckets']}" for res, info in sorted(
+            store.summary().items(), key=lambda item: RESOLUTIONS[item[0]]))
+        table.add_row("Rollups", "✅ Ready",
+                      f"{buckets or 'no buckets'} (up to {compacted.isoformat()[:16] if compacted else 'never'})")
+        store.close()
+    
+    # Compressed archive
+    archive = observations.log.archive_stats()
+    if archive:
+        table.add_row(
+            "Archive", f"✅ {archive['backend']}",
+            f"{archive['files']} files, {archive['raw_bytes'] / 1e6:.1f} MB → "
+            f"{archive['stored_bytes'] / 1e6:.1f} MB ({archive['ratio']:.1f}x), "
+            f"decompress {archive['decompress_mb_s']:.0f} MB/s"
+        )
+    
+    # AI response cache
+    if (data_dir / LLM_CACHE_DB).exists():
+        cache = LLMCache(data_dir)
+        stats = cache.stats()
+        cache.close()
+        rate = f"{stats['hit_rate']:.0%} hit rate" if stats['hit_rate'] is not None else "no lookups yet"
+        table.add_row(
+            "LLM cache", "⏸️  Bypassed" if llm_cache.BYPASS else "✅ Ready",
+            f"{stats['entries']} responses, {stats['bytes'] / 1e6:.1f}/{stats['max_bytes'] / 1e6:.0f} MB, {rate}"
+        )
+        for site, counts in stats['sites'].items():
+            table.add_row(f"  {site}", "", f"{counts['hits']} hits / {counts['misses']} misses")
+    
     # Analyzer status
-    if insights_file.exists():
-        import json
-        with open(insights_file) as f:
-            data = json.load(f)
+    data = read_json(insights_file)
+    if data is not None:
         analyzed_at = data.get('metadata', {}).get('analyzed_at', 'Unknown')
         table.add_row("Analyzer", "✅ Ready", f"Last analyzed: {analyzed_at[:19]}")
     else:
@@ -375,6 +611,7 @@ def cmd_status(args):
     else:
         table.add_row("Claude API", "❌ Missing", "Set ANTHROPIC_API_KEY env var")
     
+    console.print(table)
     console.print()
 
 
@@ -398,7 +635,8 @@ def cmd_predict(args):
     console.print(f"[dim]Analyzing: {action}[/dim]\n")
     
     # Process action
-    result = op_intel.process_user_action(action)
+    with live_tokens(ai_brain):
+        result = op_intel.process_user_action(action)
     
     # Show predictions
     predictions = result['predictions']
@@ -444,7 +682,8 @@ def cmd_plan(args):
     console.print("[dim]AI is creating your strategic plan...[/dim]\n")
     
     # Create plan
-    plan = tactical.plan_work_session(goal)
+    with live_tokens(ai_brain):
+        plan = tactical.plan_work_session(goal)
     
     # Display plan
     console.print(Panel(
@@ -594,6 +833,18 @@ def main():
         formatter_class=argparse.RawDescriptionHelpFormatter
     )
     
+    parser.add_argument(
+        '--pretty-json',
+        action='store_true',
+        help='Write indented JSON files for debugging (default: compact)'
+    )
+    
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Ask the AI backend every time instead of reusing cached responses'
+    )
+    
     subparsers = parser.add_subparsers(dest='command', help='Available commands')
     
     # Observe command
@@ -610,10 +861,63 @@ def main():
         default=5,
         help='Observation interval in seconds (default: 5)'
     )
+    observe_parser.add_argument(
+        '--collector',
+        choices=['auto', 'procfs', 'psutil'],
+        default='auto',
+        help='Process collector: direct /proc reads or psutil (default: auto)'
+    )
+    observe_parser.add_argument(
+        '--adaptive',
+        action='store_true',
+        help='Adapt the interval to activity between --min-interval and --max-interval'
+    )
+    observe_parser.add_argument(
+        '--min-interval',
+        type=float,
+        default=None,
+        help='Adaptive mode: fastest interval while busy (default: 1)'
+    )
+    observe_parser.add_argument(
+        '--max-interval',
+        type=float,
+        default=None,
+        help='Adaptive mode: slowest interval while idle (default: 60)'
+    )
+    observe_parser.add_argument(
+        '--cpu-budget',
+        type=float,
+        default=None,
+        help="Cap on the observer's own CPU%%; sampling slows down when exceeded"
+    )
+    observe_parser.add_argument(
+        '--history',
+        action='store_true',
+        help='Also record commands appended to ~/.bash_history / ~/.zsh_history '
+             '(space-prefixed, $HISTIGNORE and credential-like commands are skipped)'
+    )
+    observe_parser.add_argument(
+        '--daemon',
+        action='store_true',
+        help='Run continuously until SIGTERM (ignores --duration; SIGHUP reloads config)'
+    )
+    observe_parser.add_argument(
+        '--flush-interval',
+        type=int,
+        default=60,
+        help='Daemon mode: seconds between flushes to disk (default: 60)'
+    )
+    observe_parser.add_argument(
+        '--config',
+        help='Daemon mode: JSON config with interval/collector/flush_interval '
+             '(default: ~/.jarvisos/observer.json)'
+    )
     observe_parser.set_defaults(func=cmd_observe)
     
     # Analyze command
     analyze_parser = subparsers.add_parser('analyze', help='Analyze observations with AI')
+    add_time_window(analyze_parser)
+    add_full_argument(analyze_parser)
     analyze_parser.set_defaults(func=cmd_analyze)
     
     # Generate command
@@ -624,8 +928,18 @@ def main():
         default=0,
         help='Task index to generate (0 = first task, default: 0)'
     )
+    generate_parser.add_argument(
+        '--all',
+        action='store_true',
+        help='Generate every suggested task (concurrently)'
+    )
     generate_parser.set_defaults(func=cmd_generate)
     
+    # Ask command
+    ask_parser = subparsers.add_parser('ask', help='Ask the AI brain (streams the answer)')
+    ask_parser.add_argument('prompt', nargs='+', help='Your question')
+    ask_parser.set_defaults(func=cmd_ask)
+    
     # List command
     list_parser = subparsers.add_parser('list', help='List available scripts')
     list_parser.set_defaults(func=cmd_list)
@@ -655,10 +969,52 @@ def main():
     
     # Summary command
     summary_parser = subparsers.add_parser('summary', help='Show observation summary')
+    add_time_window(summary_parser)
     summary_parser.set_defaults(func=cmd_summary)
     
+    # Query command
+    query_parser = subparsers.add_parser('query', help='Print observations in a time range as JSON lines')
+    add_time_window(query_parser)
+    query_parser.add_argument(
+        '--fields',
+        help="Comma-separated dotted fields to print, e.g. 'timestamp,system.cpu_percent' "
+             "(default: whole records)"
+    )
+    query_parser.add_argument(
+        '--limit',
+        type=int,
+        default=0,
+        help='Stop after this many records'
+    )
+    query_parser.add_argument(
+        '--partitions',
+        action='store_true',
+        help='List the hourly partitions and their stats instead of records'
+    )
+    query_parser.set_defaults(func=cmd_query)
+    
+    # Compact command
+    compact_parser = subparsers.add_parser('compact', help='Roll observations up and apply retention')
+    compact_parser.add_argument(
+        '--keep-raw',
+        type=float,
+        help='Days of raw ticks to keep (default: 3)'
+    )
+    compact_parser.add_argument(
+        '--keep-minutes',
+        type=float,
+        help='Days of 1-minute rollups to keep (default: 30)'
+    )
+    compact_parser.add_argument(
+        '--no-archive',
+        action='store_true',
+        help='Keep sealed raw segments uncompressed'
+    )
+    compact_parser.set_defaults(func=cmd_compact)
+    
     # DNA command
     dna_parser = subparsers.add_parser('dna', help='Show user DNA profile')
+    add_full_argument(dna_parser)
     dna_parser.set_defaults(func=cmd_dna)
     
     # Evolve command
@@ -744,6 +1100,11 @@ def main():
         parser.print_help()
         return
     
+    if args.pretty_json:
+        codec.set_pretty(True)
+    if args.no_cache:
+        llm_cache.set_bypass(True)
+    
     # Execute command
     args.func(args)
 
@@ -0,0 +1,209 @@
+"""
+AI Async - asyncio façade over the AI brains with bounded concurrency
+
+Every AI call is a blocking HTTP request (or subprocess). AsyncAIBrain runs
+them on worker threads so independent calls can be awaited together
+instead of one after another:
+
+- each backend has its own thread pool, as wide as its limit
+  (CONCURRENCY): a local Ollama server only decodes a couple of requests
+  at once, the Claude API takes more. The workers are the slots, so the
+  limit holds for the whole process, across event loops and threads
+- every call has a timeout; on timeout or cancellation the awaiting task
+  is released at once, and a call still queued for a thread never starts.
+  A call already running finishes on its thread and keeps its slot until
+  then, so the limit holds
+- generate_many() sends a batch of prompts at once, each distinct prompt
+  once
+- run_sync() drives a coroutine from synchronous code, which is how the
+  existing blocking API Generator.generate keeps working while fanning
+  out internally
+
+Calls into one AIBrain must not run concurrently: think() shares its
+token_listener and conversation_history between calls.
+
+The UnifiedAIBrain methods are mirrored as coroutines; run() wraps any
+other blocking call (e.g. an AIBrain method) under a backend's limit.
+"""
+
+import asyncio
+import concurrent.futures
+import functools
+import threading
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+try:
+    from .ai_brain_unified import UnifiedAIBrain, get_ai_brain
+    from .streaming import aiter_in_thread
+except ImportError:
+    from jarvisos.core.ai_brain_unified import UnifiedAIBrain, get_ai_brain
+    from jarvisos.core.streaming import aiter_in_thread
+
+CONCURRENCY = {'ollama': 2, 'claude': 4, 'none': 1}
+DEFAULT_CONCURRENCY = 2
+DEFAULT_TIMEOUT = 120.0  # seconds per call
+
+
+class AsyncAIBrain:
+    """
+    Async, concurrency-limited access to an AI brain
+
+    Args:
+        brain: The brain to wrap; None uses the shared UnifiedAIBrain
+            (created on first use)
+        concurrency: Calls allowed in flight per backend, overriding
+            CONCURRENCY
+        timeout: Default per-call timeout in seconds (None waits forever)
+    """
+
+    def __init__(self, brain: Optional[UnifiedAIBrain] = None,
+                 concurrency: Optional[Dict[str, int]] = None,
+                 timeout: Optional[float] = DEFAULT_TIMEOUT):
+        self._brain = brain
+        self.concurrency = {**CONCURRENCY, **(concurrency or {})}
+        self.timeout = timeout
+        # Not asyncio semaphores: those belong to one event loop, and
+        # run_sync() starts a new loop for every call
+        self._pools: Dict[str, concurrent.futures.ThreadPoolExecutor] = {}
+        self._pools_lock = threading.Lock()
+
+    @property
+    def brain(self) -> UnifiedAIBrain:
+        if self._brain is None:
+            self._brain = get_ai_brain()
+        return self._brain
+
+    def _pool(self, backend: str) -> concurrent.futures.ThreadPoolExecutor:
+        """The backend's workers; calls beyond its limit wait in the pool's queue"""
+        with self._pools_lock:
+            if backend not in self._pools:
+                self._pools[backend] = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=self.concurrency.get(backend, DEFAULT_CONCURRENCY),
+                    thread_name_prefix=f"jarvis-ai-{backend}")
+            return self._pools[backend]
+
+    async def run(self, func: Callable[..., Any], *args, backend: Optional[str] = None,
+                  timeout: Optional[float] = ..., **kwargs) -> Any:
+        """
+        Run a blocking call on the pool under `backend`'s concurrency limit
+
+        Args:
+            func: The blocking call
+            backend: Whose limit applies; None means the wrapped brain's
+                active backend
+            timeout: Seconds to wait, None for no limit; defaults to the
+                instance timeout. Time spent waiting for a slot counts.
+
+        Raises:
+            asyncio.TimeoutError: If the call does not finish in time
+        """
+        timeout = self.timeout if timeout is ... else timeout
+        return await asyncio.wait_for(
+            self._run(func, args, kwargs, backend or self.brain.active), timeout)
+
+    async def _run(self, func, args, kwargs, backend):
+        future = self._pool(backend).submit(functools.partial(func, *args, **kwargs))
+        # Giving up cancels a call still queued; one already running cannot
+        # be cancelled and keeps its worker until it really ends
+        return await asyncio.wrap_future(future)
+
+    # ------------------------------------------------------------------
+    # UnifiedAIBrain, as coroutines
+    # ------------------------------------------------------------------
+
+    async def generate(self, prompt: str, **kwargs) -> Optional[str]:
+        """Generate text from prompt"""
+        return await self.run(self.brain.generate, prompt, **kwargs)
+
+    async def generate_many(self, prompts: List[str], **kwargs) -> List[Optional[str]]:
+        """
+        Generate a batch of prompts, results in order
+
+        Repeated prompts are sent once (and counted as coalesced); the
+        distinct ones go out together, up to the backend's concurrency
+        limit. Every prompt in a batch goes to the same backend, model and
+        options, so an Ollama server running with OLLAMA_NUM_PARALLEL
+        decodes them in one batch.
+        """
+        distinct = list(dict.fromkeys(prompts))
+        if len(distinct) < len(prompts) and hasattr(self.brain, 'flights'):
+            self.brain.flights.record_coalesced('generate', len(prompts) - len(distinct))
+        results = await asyncio.gather(*(self.generate(prompt, **kwargs) for prompt in distinct))
+        answers = dict(zip(distinct, results))
+        return [answers[prompt] for prompt in prompts]
+
+    async def predict_next_action(self, context: Dict[str, Any], **kwargs) -> Optional[str]:
+        """Predict user's next action"""
+        return await self.run(self.brain.predict_next_action, context, **kwargs)
+
+    async def generate_script(self, description: str, observations: list, **kwargs) -> Optional[str]:
+        """Generate a script based on description"""
+        return await self.run(self.brain.generate_script, description, observations, **kwargs)
+
+    async def plan_task(self, goal: str, context: Optional[Dict] = None, **kwargs) -> Optional[str]:
+        """Create a strategic plan"""
+        return await self.run(self.brain.plan_task, goal, context, **kwargs)
+
+    async def analyze_session(self, session_data: Dict[str, Any], **kwargs) -> Optional[str]:
+        """Analyze work session"""
+        return await self.run(self.brain.analyze_session, session_data, **kwargs)
+
+    async def generate_stream(self, prompt: str,
+                              timeout: Optional[float] = ...) -> AsyncIterator[str]:
+        """
+        Stream a generation under the backend's limit
+
+        The timeout bounds the wait for each chunk (and for a slot), not the
+        whole stream.
+        """
+        timeout = self.timeout if timeout is ... else timeout
+        chunks = aiter_in_thread(self.brain.generate_stream, prompt,
+                                 executor=self._pool(self.brain.active))
+        try:
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(chunks.__anext__(), timeout)
+                except StopAsyncIteration:
+                    return
+                yield chunk
+        finally:
+            await chunks.aclose()
+
+    async def gather(self, *calls: Awaitable, return_exceptions: bool = False) -> List[Any]:
+        """Await several calls concurrently, results in order"""
+        return list(await asyncio.gather(*calls, return_exceptions=return_exceptions))
+
+    def shutdown(self):
+        """Stop the worker threads once running calls finish"""
+        with self._pools_lock:
+            pools, self._pools = list(self._pools.values()), {}
+        for pool in pools:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+def run_sync(coro: Awaitable) -> Any:
+    """
+    Run a coroutine to completion from synchronous code
+
+    Raises:
+        RuntimeError: If called from a running event loop's thread (await
+            the coroutine there instead)
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    coro.close()
+    raise RuntimeError("run_sync() called from a running event loop; await the coroutine")
+
+
+# Singleton
+_async_brain: Optional[AsyncAIBrain] = None
+
+
+def get_async_brain() -> AsyncAIBrain:
+    """Get the shared async AI brain (one pool per backend; limits apply process-wide)"""
+    global _async_brain
+    if _async_brain is None:
+        _async_brain = AsyncAIBrain()
+    return _async_brain
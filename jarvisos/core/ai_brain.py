@@ -11,13 +11,19 @@ Not scripts. Real intelligence.
 import json
 import anthropic
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, AsyncIterator, Callable, Iterator
 from datetime import datetime
 import os
 
 from .context_v2 import MultiDimensionalContext, ContextAnalyzer
 from .personality import JarvisPersonality
+from .json_files import read_json, update_json
+from .llm_cache import LLMCache
+from .streaming import aiter_in_thread
+from . import codec
 
+MODEL = "claude-3-5-haiku-20241022"  # Fast and efficient
+OPTIONS = {"max_tokens": 4000, "temperature": 0.7}
 
 class AIBrain:
     """The intelligent core of JarvisOS - powered by Claude"""
@@ -33,6 +39,11 @@ class AIBrain:
         self.personality = JarvisPersonality()
         self.context_analyzer = ContextAnalyzer(data_dir)
         
+        # Called with each text chunk while think() streams a response
+        self.token_listener: Optional[Callable[[str], None]] = None
+        self._cache: Optional[LLMCache] = None
+        self.cache_hits = 0
+        
         # Memory
         self.conversation_history: List[Dict[str, str]] = []
         self.user_dna: Optional[Dict[str, Any]] = None
@@ -41,37 +52,62 @@ class AIBrain:
     def load_user_dna(self):
         """Load user DNA profile"""
         dna_file = self.data_dir / "user_dna.json"
-        if dna_file.exists():
-            with open(dna_file, 'r') as f:
-                self.user_dna = json.load(f)
+        self.user_dna = read_json(dna_file, mutable=True)
+    
+    @property
+    def cache(self) -> LLMCache:
+        """Response cache (opened on first use)"""
+        if self._cache is None:
+            self._cache = LLMCache(self.data_dir)
+        return self._cache
     
-    def think(self, situation: Dict[str, Any], question: str) -> Dict[str, Any]:
+    def think(self, situation: Dict[str, Any], question: str,
+              site: Optional[str] = None, cache: bool = True) -> Dict[str, Any]:
         """
         Use Claude to think about a situation and provide intelligent response
         
         This is the core intelligence - not pattern matching, real thinking
+        
+        Args:
+            situation: What is happening
+            question: What to think about
+            site: Call site name; sites with a TTL in llm_cache.TTLS reuse
+                a cached response for the same situation (less its
+                timestamp), question and user DNA. The live context
+                (CPU, memory, battery, clock) and the conversation history
+                change on every call and are left out of the key, so a
+                repeated action within the TTL is answered at once.
+            cache: False bypasses the cache for this call
+        
+        Cached responses are not passed to token_listener (they were not
+        streamed); they are counted in `cache_hits` instead.
         """
         
-        # Get current context
-        context = self.context_analyzer.get_current_context()
+        computed = []
         
-        # Build the prompt
-        prompt = self._build_thinking_prompt(situation, question, context)
+        def ask() -> str:
+            computed.append(True)
+            # Get current context (only on a cache miss: capturing it samples CPU)
+            context = self.context_analyzer.get_current_context()
+            
+            # Build the prompt
+            prompt = self._build_thinking_prompt(situation, question, context)
+            return self._complete(prompt)
+        
+        # Ask Claude (or the response cache)
         
-        # Ask Claude
         try:
-            response = self.client.messages.create(
-                model="claude-3-5-haiku-20241022",  # Fast and efficient
-                max_tokens=4000,
-                temperature=0.7,
-                messages=[{
-                    "role": "user",
-                    "content": prompt
-                }]
-            )
+            if site is None:
+                text = ask()
+            else:
+                text = self.cache.cached(site, "claude", MODEL,
+                                         self._cache_prompt(site, situation, question),
+                                         OPTIONS, ask, cache=cache)
+                if not computed:
+                    self.cache_hits += 1
             
             # Parse response
-            result = self._parse_ai_response(response.content[0].text)
+            result = self._parse_ai_response(text)
             
             # Store in conversation history
             self.conversation_history.append({
@@ -89,6 +125,58 @@ class AIBrain:
                 "fallback": "I apologize, but I'm having trouble thinking clearly right now."
             }
     
+    def _cache_prompt(self, site: str, situation: Dict[str, Any], question: str) -> str:
+        """The stable inputs of a think() call, which key its cached response"""
+        return codec.dumps({
+            "site": site,
+            "situation": {k: v for k, v in situation.items() if k != "timestamp"},
+            "question": question,
+            "user_dna": self.user_dna,
+        }, pretty=False, default=str)
+    
+    def _complete(self, prompt: str) -> str:
+        """One completion, streamed to the token listener if there is one"""
+        if self.token_listener is not None:
+            chunks = []
+            for chunk in self.generate_stream(prompt):
+                self.token_listener(chunk)
+                chunks.append(chunk)
+            return "".join(chunks)
+        
+        response = self.client.messages.create(
+            model=MODEL,
+            messages=[{
+                "role": "user",
+                "content": prompt
+            }],
+            **OPTIONS
+        )
+        return response.content[0].text
+    
+    def generate_stream(self, prompt: str, system: Optional[str] = None,
+                        model: str = MODEL, max_tokens: int = OPTIONS["max_tokens"],
+                        temperature: float = OPTIONS["temperature"]) -> Iterator[str]:
+        """
+        Stream a completion from Claude, yielding text as it arrives
+        
+        Raises:
+            anthropic.APIError: If the request fails
+        """
+        kwargs = {"system": system} if system else {}
+        with self.client.messages.stream(
+            model=model,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            messages=[{"role": "user", "content": prompt}],
+            **kwargs
+        ) as stream:
+            yield from stream.text_stream
+    
+    def agenerate_stream(self, prompt: str, system: Optional[str] = None,
+                         **kwargs) -> AsyncIterator[str]:
+        """Async generate_stream(): the stream runs on a worker thread"""
+        return aiter_in_thread(self.generate_stream, prompt, system, **kwargs)
+    
     def _build_thinking_prompt(self, situation: Dict[str, Any], 
                                question: str, 
                                context: MultiDimensionalContext) -> str:
@@ -275,7 +363,7 @@ Respond in JSON format:
         Provide semantic understanding, not just literal interpretation.
         """
         
-        result = self.think(situation, question)
+        result = self.think(situation, question, site="understand_intent")
         
         return result
     
@@ -382,20 +470,12 @@ Respond in JSON format:
         
         # Store learning
         learning_file = self.data_dir / "ai_learnings.json"
-        learnings = []
-        
-        if learning_file.exists():
-            with open(learning_file, 'r') as f:
-                learnings = json.load(f)
-        
-        learnings.append({
+        entry = {
             "timestamp": datetime.now().isoformat(),
             "feedback": situation,
             "learning": result
-        })
-        
-        with open(learning_file, 'w') as f:
-            json.dump(learnings, f, indent=2)
+        }
+        update_json(learning_file, lambda learnings: learnings + [entry], default=[])
         
         return result
     
@@ -2,13 +2,26 @@
 """
 JarvisOS - AI Brain with Ollama
 Local LLM integration for privacy and speed
+
+Talks to the Ollama server over HTTP (see ollama_client) and falls back to
+`ollama run` when the server cannot be reached but the CLI is installed.
 """
 
+import codecs
 import json
 import subprocess
-from typing import Optional, Dict, Any
+import tempfile
+import threading
+from typing import Optional, Dict, Any, List, Iterator, AsyncIterator
 from dataclasses import dataclass
 
+try:
+    from .ollama_client import OllamaClient, OllamaError
+    from .streaming import aiter_in_thread
+except ImportError:
+    from jarvisos.core.ollama_client import OllamaClient, OllamaError
+    from jarvisos.core.streaming import aiter_in_thread
+
 
 @dataclass
 class OllamaConfig:
@@ -16,6 +29,17 @@ class OllamaConfig:
     model: str = "llama3.2"  # Fast 3B model
     temperature: float = 0.7
     max_tokens: int = 2000
+    num_ctx: Optional[int] = None  # context window; None keeps the model's default
+    keep_alive: str = "30m"  # how long the server keeps the model loaded after a call
+    host: Optional[str] = None  # server address; None reads OLLAMA_HOST
+    timeout: float = 60.0
+    
+    def options(self) -> Dict[str, Any]:
+        """Sampling options for the HTTP API"""
+        options: Dict[str, Any] = {'temperature': self.temperature, 'num_predict': self.max_tokens}
+        if self.num_ctx:
+            options['num_ctx'] = self.num_ctx
+        return options
     
 
 class OllamaAIBrain:
@@ -32,27 +56,55 @@ class OllamaAIBrain:
     
     def __init__(self, config: Optional[OllamaConfig] = None):
         self.config = config or OllamaConfig()
+        self.client = OllamaClient(self.config.host, timeout=self.config.timeout)
+        self.transport = None  # "http" or "cli"
+        self._has_cli: Optional[bool] = None
         self.available = self._check_ollama()
         
         if self.available:
             self._ensure_model_installed()
     
     def _check_ollama(self) -> bool:
-        """Check if Ollama is installed"""
+        """Check if the Ollama server (or at least the CLI) is available"""
         try:
-            result = subprocess.run(
-                ["ollama", "--version"],
-                capture_output=True,
-                text=True,
-                timeout=5
-            )
-            return result.returncode == 0
-        except:
-            return False
+            self.client.version(timeout=2)
+            self.transport = "http"
+            return True
+        except (OSError, OllamaError):
+            pass
+        if self.has_cli:
+            self.transport = "cli"
+            return True
+        return False
+    
+    @property
+    def has_cli(self) -> bool:
+        """Whether the ollama CLI is installed (checked once)"""
+        if self._has_cli is None:
+            try:
+                result = subprocess.run(
+                    ["ollama", "--version"],
+                    capture_output=True,
+                    text=True,
+                    timeout=5
+                )
+                self._has_cli = result.returncode == 0
+            except (OSError, subprocess.SubprocessError):
+                self._has_cli = False
+        return self._has_cli
     
     def _ensure_model_installed(self):
         """Ensure the model is downloaded"""
+        model = self.config.model
         try:
+            if self.transport == "http":
+                models = self.client.models()
+                if model in models or f"{model}:latest" in models:
+                    return
+                print(f"📥 Downloading {model}...")
+                self.client.pull(model, timeout=300)  # 5 min timeout
+                return
+            
             # Check if model exists
             result = subprocess.run(
                 ["ollama", "list"],
@@ -61,22 +113,24 @@ class OllamaAIBrain:
                 timeout=10
             )
             
-            if self.config.model not in result.stdout:
-                print(f"📥 Downloading {self.config.model}...")
+            if model not in result.stdout:
+                print(f"📥 Downloading {model}...")
                 subprocess.run(
-                    ["ollama", "pull", self.config.model],
+                    ["ollama", "pull", model],
                     timeout=300  # 5 min timeout
                 )
         except Exception as e:
             print(f"⚠️  Warning: Could not check model: {e}")
     
-    def generate(self, prompt: str, system: Optional[str] = None) -> Optional[str]:
+    def generate(self, prompt: str, system: Optional[str] = None,
+                 options: Optional[Dict[str, Any]] = None) -> Optional[str]:
         """
         Generate text using Ollama
         
         Args:
             prompt: User prompt
             system: System message (context)
+            options: Overrides for the configured sampling options
         
         Returns:
             Generated text or None if error
@@ -85,20 +139,145 @@ class OllamaAIBrain:
         if not self.available:
             return None
         
+        if self.transport == "http":
+            try:
+                response = self.client.generate(
+                    self.config.model, prompt, system=system,
+                    options={**self.config.options(), **(options or {})},
+                    keep_alive=self.config.keep_alive
+                )
+                return response.get('response', '').strip()
+            except (OSError, OllamaError) as e:
+                if not self.has_cli:
+                    print(f"⚠️  Ollama API error: {e}")
+                    return None
+                print(f"⚠️  Ollama API error ({e}), falling back to ollama run")
+        
+        # Build full prompt
+        full_prompt = prompt
+        if system:
+            full_prompt = f"{system}\n\n{prompt}"
+        return self._run_cli(full_prompt)
+    
+    def chat(self, messages: List[Dict[str, str]],
+             options: Optional[Dict[str, Any]] = None) -> Optional[str]:
+        """
+        Reply to a conversation
+        
+        Args:
+            messages: [{'role': 'system'|'user'|'assistant', 'content': ...}]
+            options: Overrides for the configured sampling options
+        
+        Returns:
+            The assistant's reply or None if error
+        """
+        
+        if not self.available:
+            return None
+        
+        if self.transport == "http":
+            try:
+                response = self.client.chat(
+                    self.config.model, messages,
+                    options={**self.config.options(), **(options or {})},
+                    keep_alive=self.config.keep_alive
+                )
+                return response.get('message', {}).get('content', '').strip()
+            except (OSError, OllamaError) as e:
+                if not self.has_cli:
+                    print(f"⚠️  Ollama API error: {e}")
+                    return None
+                print(f"⚠️  Ollama API error ({e}), falling back to ollama run")
+        
+        return self._run_cli(self._flatten(messages))
+    
+    @staticmethod
+    def _flatten(messages: List[Dict[str, str]]) -> str:
+        """ollama run has no roles: the conversation as one prompt"""
+        return "\n\n".join(
+            m['content'] if m.get('role') == 'system' else f"{m.get('role', 'user')}: {m['content']}"
+            for m in messages
+        )
+    
+    def generate_stream(self, prompt: str, system: Optional[str] = None,
+                        options: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+        """
+        Generate text using Ollama, yielding it as it is produced
+        
+        Falls back to `ollama run` if the API fails before the first token;
+        a failure mid-stream ends the stream early.
+        
+        Yields:
+            Text chunks (nothing if unavailable)
+        """
+        
+        if not self.available:
+            return
+        
+        if self.transport == "http":
+            chunks = (doc.get('response', '') for doc in self.client.generate_stream(
+                self.config.model, prompt, system=system,
+                options={**self.config.options(), **(options or {})},
+                keep_alive=self.config.keep_alive
+            ))
+            if (yield from self._http_stream(chunks)):
+                return
+        
+        full_prompt = f"{system}\n\n{prompt}" if system else prompt
+        yield from self._stream_cli(full_prompt)
+    
+    def chat_stream(self, messages: List[Dict[str, str]],
+                    options: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+        """Reply to a conversation, yielding the reply as it is produced"""
+        
+        if not self.available:
+            return
+        
+        if self.transport == "http":
+            chunks = (doc.get('message', {}).get('content', '') for doc in self.client.chat_stream(
+                self.config.model, messages,
+                options={**self.config.options(), **(options or {})},
+                keep_alive=self.config.keep_alive
+            ))
+            if (yield from self._http_stream(chunks)):
+                return
+        
+        yield from self._stream_cli(self._flatten(messages))
+    
+    def agenerate_stream(self, prompt: str, system: Optional[str] = None,
+                         options: Optional[Dict[str, Any]] = None) -> AsyncIterator[str]:
+        """Async generate_stream(): the stream runs on a worker thread"""
+        return aiter_in_thread(self.generate_stream, prompt, system, options)
+    
+    def _http_stream(self, chunks: Iterator[str]):
+        """
+        Forward an API stream; returns False (after nothing was yielded)
+        if the caller should fall back to the CLI
+        """
+        started = False
         try:
-            # Build full prompt
-            full_prompt = prompt
-            if system:
-                full_prompt = f"{system}\n\n{prompt}"
-            
-            # Call Ollama via subprocess
-            # Note: ollama run doesn't support --temperature flag
-            # Temperature can be set via Modelfile or API
+            for chunk in chunks:
+                if chunk:
+                    started = True
+                    yield chunk
+            return True
+        except (OSError, OllamaError) as e:
+            if started or not self.has_cli:
+                print(f"⚠️  Ollama API error: {e}")
+                return True
+            print(f"⚠️  Ollama API error ({e}), falling back to ollama run")
+            return False
+    
+    def _run_cli(self, full_prompt: str) -> Optional[str]:
+        """Generate with `ollama run` (no sampling options)"""
+        try:
+            # The prompt goes through stdin: argv is capped by ARG_MAX
             result = subprocess.run(
-                ["ollama", "run", self.config.model, full_prompt],
+                ["ollama", "run", self.config.model],
+                input=full_prompt,
                 capture_output=True,
                 text=True,
-                timeout=60  # Increased timeout for longer responses
+                timeout=self.config.timeout
             )
             
             if result.returncode == 0:
@@ -109,12 +288,66 @@ class OllamaAIBrain:
                 return None
                 
         except subprocess.TimeoutExpired:
-            print("⚠️  Ollama timeout (>30s)")
+            print(f"⚠️  Ollama timeout (>{self.config.timeout:.0f}s)")
             return None
         except Exception as e:
             print(f"⚠️  Ollama exception: {e}")
             return None
     
+    def _stream_cli(self, full_prompt: str) -> Iterator[str]:
+        """Stream the output of `ollama run` as it is printed"""
+        # stderr (progress spinner, pull output) goes to a file: a pipe read
+        # only at the end could fill up and block the process
+        stderr = tempfile.TemporaryFile()
+        try:
+            proc = subprocess.Popen(
+                ["ollama", "run", self.config.model],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=stderr
+            )
+        except OSError as e:
+            stderr.close()
+            print(f"⚠️  Ollama exception: {e}")
+            return
+        
+        # Write the prompt from a thread so a long one cannot deadlock
+        # against output filling the stdout pipe
+        def feed():
+            try:
+                proc.stdin.write(full_prompt.encode('utf-8'))
+                proc.stdin.close()
+            except OSError:
+                pass
+        threading.Thread(target=feed, daemon=True).start()
+        
+        # Kill the process if it runs past the timeout
+        timer = threading.Timer(self.config.timeout, proc.kill)
+        timer.start()
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        try:
+            while True:
+                data = proc.stdout.read1(4096)
+                if not data:
+                    break
+                text = decoder.decode(data)
+                if text:
+                    yield text
+            tail = decoder.decode(b'', final=True)
+            if tail:
+                yield tail
+            if proc.wait() != 0:
+                stderr.seek(0)
+                print(f"⚠️  Ollama error (returncode {proc.returncode}):")
+                print(f"STDERR: {stderr.read().decode('utf-8', errors='replace')}")
+        finally:
+            timer.cancel()
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+            proc.stdout.close()
+            stderr.close()
+    
     def predict_next_action(self, context: Dict[str, Any]) -> Optional[str]:
         """
         Predict user's next action based on context
@@ -257,6 +490,7 @@ def test_ollama():
     
     print("✅ Ollama available!")
     print(f"   Model: {brain.config.model}")
+    print(f"   Transport: {brain.transport}")
     
     # Test prediction
     print("\n🔮 Testing prediction...")
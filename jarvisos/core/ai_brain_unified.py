@@ -9,9 +9,25 @@ Priority:
 """
 
 import os
-from typing import Optional, Dict, Any
+import threading
+from pathlib import Path
+from typing import Optional, Dict, Any, AsyncIterator, Iterator
 from dataclasses import dataclass
 
+try:
+    from . import codec
+    from .llm_cache import LLMCache, cache_key
+    from .single_flight import SingleFlight, coalesced
+    from .streaming import aiter_in_thread
+except ImportError:
+    from jarvisos.core import codec
+    from jarvisos.core.llm_cache import LLMCache, cache_key
+    from jarvisos.core.single_flight import SingleFlight, coalesced
+    from jarvisos.core.streaming import aiter_in_thread
+
+CLAUDE_MODEL = "claude-3-haiku-20240307"
+CLAUDE_MAX_TOKENS = 2048
+
 # Try importing both
 try:
     from .ai_brain_ollama import OllamaAIBrain, get_ollama_brain
@@ -42,12 +58,17 @@ class UnifiedAIBrain:
     - Prefer Ollama (local, free, privacy)
     - Fallback to Claude if Ollama unavailable
     - Graceful degradation if no AI available
+    - Identical requests made at the same time (from several threads)
+      share one backend call; see coalescing_stats()
     """
     
-    def __init__(self):
+    def __init__(self, data_dir: str = "data"):
         self.ollama_brain = None
         self.claude_brain = None
         self.active = None
+        self.data_dir = Path(data_dir)
+        self._cache: Optional[LLMCache] = None
+        self.flights = SingleFlight()
         
         # Try Ollama first
         if OLLAMA_AVAILABLE:
@@ -84,6 +105,7 @@ class UnifiedAIBrain:
         """Check if any AI is available"""
         return self.active != "none"
     
+    @coalesced
     def predict_next_action(self, context: Dict[str, Any]) -> Optional[str]:
         """Predict user's next action"""
         if self.active == "ollama" and self.ollama_brain:
@@ -93,6 +115,7 @@ class UnifiedAIBrain:
         else:
             return None
     
+    @coalesced
     def generate_script(self, description: str, observations: list) -> Optional[str]:
         """Generate a script based on description"""
         if self.active == "ollama" and self.ollama_brain:
@@ -103,6 +126,7 @@ class UnifiedAIBrain:
         else:
             return None
     
+    @coalesced
     def plan_task(self, goal: str, context: Optional[Dict] = None) -> Optional[str]:
         """Create a strategic plan"""
         if self.active == "ollama" and self.ollama_brain:
@@ -112,6 +136,7 @@ class UnifiedAIBrain:
         else:
             return None
     
+    @coalesced
     def analyze_session(self, session_data: Dict[str, Any]) -> Optional[str]:
         """Analyze work session"""
         if self.active == "ollama" and self.ollama_brain:
@@ -121,16 +146,66 @@ class UnifiedAIBrain:
         else:
             return None
     
-    def generate(self, prompt: str) -> Optional[str]:
-        """Generate text from prompt (generic method)"""
+    @property
+    def cache(self) -> LLMCache:
+        """Response cache (opened on first use)"""
+        if self._cache is None:
+            self._cache = LLMCache(self.data_dir)
+        return self._cache
+    
+    @cache.setter
+    def cache(self, cache: LLMCache):
+        self._cache = cache
+    
+    def model_and_options(self) -> tuple:
+        """(model, options) of the active backend, which together with the prompt determine a response"""
+        if self.active == "ollama" and self.ollama_brain:
+            return self.ollama_brain.config.model, self.ollama_brain.config.options()
+        elif self.active == "claude":
+            return CLAUDE_MODEL, {"max_tokens": CLAUDE_MAX_TOKENS}
+        return None, {}
+    
+    def request_key(self, name: str, args: tuple, kwargs: Dict[str, Any]) -> str:
+        """Identity of a request to the active backend, for coalescing"""
+        model, options = self.model_and_options()
+        request = codec.dumps([name, list(args), kwargs], pretty=False, default=str)
+        return cache_key(self.active, model or "", request, options)
+    
+    def coalescing_stats(self) -> Dict[str, Any]:
+        """
+        How many requests were coalesced with an identical one in flight
+        
+        Returns calls, executed (backend calls made), coalesced and
+        in_flight, in total and per request ('generate', 'plan_task', ...).
+        """
+        return self.flights.stats()
+    
+    def generate(self, prompt: str, site: Optional[str] = None, cache: bool = True) -> Optional[str]:
+        """
+        Generate text from prompt (generic method)
+        
+        Args:
+            prompt: The prompt
+            site: Call site name; sites with a TTL in llm_cache.TTLS are
+                answered from the response cache when possible
+            cache: False bypasses the cache for this call
+        """
+        if site is None or self.active == "none":
+            return self._generate(prompt)
+        model, options = self.model_and_options()
+        return self.cache.cached(site, self.active, model, prompt, options,
+                                 lambda: self._generate(prompt), cache=cache)
+    
+    @coalesced
+    def _generate(self, prompt: str) -> Optional[str]:
         if self.active == "ollama" and self.ollama_brain:
             return self.ollama_brain.generate(prompt)
         elif self.active == "claude" and self.claude_brain:
             # Use Claude's message API
             try:
                 message = self.claude_brain.client.messages.create(
-                    model="claude-3-haiku-20240307",
-                    max_tokens=2048,
+                    model=CLAUDE_MODEL,
+                    max_tokens=CLAUDE_MAX_TOKENS,
                     messages=[{"role": "user", "content": prompt}]
                 )
                 return message.content[0].text
@@ -139,6 +214,22 @@ class UnifiedAIBrain:
         else:
             return None
     
+    def generate_stream(self, prompt: str) -> Iterator[str]:
+        """Generate text from prompt, yielding it as it is produced"""
+        if self.active == "ollama" and self.ollama_brain:
+            yield from self.ollama_brain.generate_stream(prompt)
+        elif self.active == "claude" and self.claude_brain:
+            try:
+                yield from self.claude_brain.generate_stream(
+                    prompt, model=CLAUDE_MODEL, max_tokens=CLAUDE_MAX_TOKENS
+                )
+            except Exception:
+                return
+    
+    def agenerate_stream(self, prompt: str) -> AsyncIterator[str]:
+        """Async generate_stream(): the stream runs on a worker thread"""
+        return aiter_in_thread(self.generate_stream, prompt)
+    
     def get_status_message(self) -> str:
         """Get human-readable status"""
         if self.active == "ollama":
@@ -152,12 +243,14 @@ class UnifiedAIBrain:
 
 # Singleton
 _unified_brain: Optional[UnifiedAIBrain] = None
+_unified_brain_lock = threading.Lock()
 
 def get_ai_brain() -> UnifiedAIBrain:
-    """Get the unified AI brain (singleton)"""
+    """Get the unified AI brain (singleton, shared by every thread so their requests coalesce)"""
     global _unified_brain
-    if _unified_brain is None:
-        _unified_brain = UnifiedAIBrain()
+    with _unified_brain_lock:
+        if _unified_brain is None:
+            _unified_brain = UnifiedAIBrain()
     return _unified_brain
 
 # Alias for compatibility
@@ -4,10 +4,9 @@ Analyzer - Uses AI (Ollama or Claude) to analyze user behavior patterns
 
 import json
 import os
-from collections import Counter
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterable, List, Union
 
 from rich.console import Console
 from rich.panel import Panel
@@ -15,8 +14,16 @@ from rich.table import Table
 
 try:
     from .ai_brain_unified import get_unified_brain
+    from .frame import ObservationFrame
+    from .json_files import write_json
+    from .observation_log import ObservationStream, open_observations
+    from .stats import compute, shared_stats
 except ImportError:
     from jarvisos.core.ai_brain_unified import get_unified_brain
+    from jarvisos.core.frame import ObservationFrame
+    from jarvisos.core.json_files import write_json
+    from jarvisos.core.observation_log import ObservationStream, open_observations
+    from jarvisos.core.stats import compute, shared_stats
 
 console = Console()
 
@@ -33,41 +40,46 @@ class Analyzer:
         # Initialize unified AI brain (Ollama-first)
         self.ai = get_unified_brain()
 
-    def load_observations(self) -> Dict:
-        """Load observations from JSON file"""
-        if not self.observations_file.exists():
+    def iter_observations(self, since=None, until=None, fields=None) -> ObservationStream:
+        """Stream observations from the legacy file and the segmented log"""
+        stream = open_observations(self.data_dir, since, until, fields)
+        if not stream.exists():
             raise FileNotFoundError(
                 f"❌ Observations file not found: {self.observations_file}\n"
                 "Run 'jarvis observe' first to collect data."
             )
-        
-        with open(self.observations_file, 'r') as f:
-            return json.load(f)
+        return stream
 
-    def preprocess_observations(self, data: Dict) -> Dict:
-        """Preprocess observations for analysis"""
-        observations = data.get('observations', [])
-        
-        # Count app usage
-        app_counter = Counter()
-        for obs in observations:
-            for app in obs.get('apps', []):
-                app_counter[app['name']] += 1
-        
-        # Extract timestamps
-        timestamps = [obs['timestamp'] for obs in observations]
-        
-        # Calculate average system stats
-        cpu_avg = sum(obs['system']['cpu_percent'] for obs in observations) / len(observations)
-        mem_avg = sum(obs['system']['memory_percent'] for obs in observations) / len(observations)
+    def load_observations(self) -> Dict:
+        """Load all observations into a legacy-shaped dict"""
+        return {'observations': list(self.iter_observations())}
+
+    def preprocess_observations(self, data: Union[Dict, Iterable[Dict]]) -> Dict:
+        """
+        Preprocess observations for analysis
         
+        Args:
+            data: Legacy dict with an 'observations' list, any iterable of
+                observation records (e.g. an ObservationStream), or an
+                ObservationFrame already loaded by the caller
+        """
+        if isinstance(data, ObservationFrame):
+            frame = data
+        else:
+            observations = data.get('observations', []) if isinstance(data, dict) else data
+            frame = ObservationFrame.from_observations(observations)
+        return self.summarize_stats(compute(frame))
+
+    @staticmethod
+    def summarize_stats(stats: Dict) -> Dict:
+        """The analysis input, from shared observation stats (see stats.compute)"""
         return {
-            'total_observations': len(observations),
-            'most_used_apps': app_counter.most_common(10),
-            'timestamps': timestamps,
-            'avg_cpu': round(cpu_avg, 2),
-            'avg_memory': round(mem_avg, 2),
-            'unique_apps': len(app_counter)
+            'total_observations': stats['ticks'],
+            'most_used_apps': stats['top_apps'],
+            'timestamps': [stats['start_time'], stats['end_time']],
+            'avg_cpu': stats['cpu_mean'],
+            'avg_memory': stats['memory_mean'],
+            'unique_apps': stats['unique_apps']
         }
 
     def analyze_with_ai(self, preprocessed_data: Dict) -> Dict:
@@ -118,7 +130,7 @@ Respond in JSON format with these exact keys:
             console.print(f"[dim]Using: {self.ai.__class__.__name__}[/dim]")
             console.print(f"[dim]AI Status: {self.ai.get_status_message()}[/dim]")
             
-            response_text = self.ai.generate(prompt)
+            response_text = self.ai.generate(prompt, site="analyze")
             
             # Check if AI returned something
             if not response_text:
@@ -172,8 +184,7 @@ Respond in JSON format with these exact keys:
 
     def save_insights(self, insights: Dict) -> None:
         """Save insights to JSON file"""
-        with open(self.insights_file, 'w') as f:
-            json.dump(insights, f, indent=2)
+        write_json(self.insights_file, insights)
         
         console.print(f"[bold green]💾 Insights saved to: {self.insights_file}[/bold green]\n")
 
@@ -231,17 +242,27 @@ Respond in JSON format with these exact keys:
         
         console.print("\n" + "="*70 + "\n")
 
-    def analyze(self) -> Dict:
-        """Main analysis workflow"""
+    def analyze(self, since=None, until=None, full: bool = False) -> Dict:
+        """
+        Main analysis workflow
+        
+        Args:
+            since: Only analyze observations from this time on (datetime or ISO)
+            until: Only analyze observations before this time
+            full: Recompute the statistics from scratch instead of folding
+                new observations into the last checkpoint
+        """
         console.print("\n[bold cyan]🔬 Starting Analysis...[/bold cyan]")
         
-        # Load observations
+        # Load observations: the shared stats only fold in what is new since
+        # the last checkpoint and are cached per data version, so a DNA
+        # update right after this one does not read them again
         console.print("📂 Loading observations...")
-        data = self.load_observations()
+        self.iter_observations(since, until)  # fails early when nothing was observed
         
         # Preprocess
         console.print("⚙️  Preprocessing data...")
-        preprocessed = self.preprocess_observations(data)
+        preprocessed = self.summarize_stats(shared_stats(self.data_dir, since, until, full=full))
         
         # Analyze with AI (Ollama-first)
         insights = self.analyze_with_ai(preprocessed)
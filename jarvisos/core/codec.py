@@ -0,0 +1,108 @@
+"""
+Codec - One JSON encoder/decoder for every persistence path
+
+Uses orjson when it is installed, then msgspec, and falls back to the stdlib
+json module otherwise. Output is compact by default; pretty-printing (two
+space indent) is a debugging aid enabled with `jarvis --pretty-json`, the
+JARVIS_JSON_PRETTY=1 environment variable or set_pretty(True).
+
+Every backend reads what the others write. Documents the fast decoders
+reject (stdlib NaN/Infinity literals in old files, or plain invalid JSON)
+are retried with the stdlib, so callers always see json.JSONDecodeError on
+bad input whichever backend is active.
+"""
+
+import json
+import os
+from typing import IO, Any, Callable, Optional, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+BACKEND = 'orjson' if orjson is not None else 'msgspec' if msgspec is not None else 'json'
+
+PRETTY = os.environ.get('JARVIS_JSON_PRETTY', '').lower() in ('1', 'true', 'yes')
+
+
+def set_pretty(enabled: bool) -> None:
+    """Turn indented output on or off for the whole process"""
+    global PRETTY
+    PRETTY = enabled
+
+
+def _stdlib_encode(obj: Any, pretty: bool, default: Optional[Callable]) -> bytes:
+    if pretty:
+        text = json.dumps(obj, indent=2, ensure_ascii=False, default=default)
+    else:
+        text = json.dumps(obj, separators=(',', ':'), ensure_ascii=False, default=default)
+    return text.encode('utf-8')
+
+
+def encode(obj: Any, pretty: Optional[bool] = None, default: Optional[Callable] = None) -> bytes:
+    """
+    Serialize `obj` to UTF-8 JSON
+
+    Args:
+        obj: JSON-serializable document (non-string keys become strings)
+        pretty: Indent the output; None follows the process-wide debug flag
+        default: Called for objects the encoder cannot serialize
+
+    Returns:
+        The encoded document
+    """
+    if pretty is None:
+        pretty = PRETTY
+
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, default=default, option=option)
+        except orjson.JSONEncodeError:
+            pass  # e.g. integers beyond 64 bits; the stdlib decides
+    elif msgspec is not None:
+        try:
+            raw = msgspec.json.encode(obj, enc_hook=default)
+            return msgspec.json.format(raw, indent=2) if pretty else raw
+        except (TypeError, ValueError, msgspec.EncodeError):
+            pass
+
+    return _stdlib_encode(obj, pretty, default)
+
+
+def dumps(obj: Any, pretty: Optional[bool] = None, default: Optional[Callable] = None) -> str:
+    """Like encode(), returning text"""
+    return encode(obj, pretty, default).decode('utf-8')
+
+
+def decode(data: Union[bytes, str]) -> Any:
+    """
+    Parse a JSON document
+
+    Raises:
+        json.JSONDecodeError: If `data` is not valid JSON
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    elif msgspec is not None:
+        try:
+            return msgspec.json.decode(data)
+        except msgspec.DecodeError:
+            pass
+    return json.loads(data)
+
+
+def load(f: IO) -> Any:
+    """Parse the JSON document in an open (text or binary) file"""
+    return decode(f.read())
@@ -0,0 +1,276 @@
+"""
+Compression - Streaming zstd/gzip archive files for observation history
+
+Sealed observation segments (and the legacy ``observations.json``) are
+compressed next to where they were written, ``segment-000042.jsonl``
+becoming ``segment-000042.jsonl.zst`` (or ``.gz``), so readers find a file
+by trying its raw name then the compressed ones (resolve()).
+
+zstd is used when the ``zstandard`` package is installed, gzip otherwise.
+With zstd, a dictionary trained on recent lines (process names, users and
+field names repeat on every tick) is stored under ``dicts/`` and its id is
+recorded in each frame header, so old files keep decoding with the
+dictionary they were written with after a retrain. gzip has no dictionary
+support.
+
+Decompression is streamed in fixed-size chunks; nothing is inflated whole.
+"""
+
+import gzip
+import os
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+BACKEND = 'zstd' if zstandard is not None else 'gzip'
+
+SUFFIXES = {'zstd': '.zst', 'gzip': '.gz'}
+LEVELS = {'zstd': 12, 'gzip': 6}
+
+CHUNK_SIZE = 1 << 20  # decompressed bytes read at a time
+
+DICT_DIR = "dicts"
+DICT_SIZE = 112 * 1024
+DICT_MIN_SAMPLES = 1000  # lines needed before a dictionary is worth training
+DICT_SAMPLE_BYTES = 8 << 20  # most sample data fed to the trainer
+DICT_MAX_AGE = 7 * 86400  # seconds before the dictionary is retrained
+
+
+def compressed_suffix(path: Union[str, Path]) -> Optional[str]:
+    """The compression suffix of `path` ('.zst' or '.gz'), or None"""
+    suffix = Path(path).suffix
+    return suffix if suffix in SUFFIXES.values() else None
+
+
+def resolve(path: Union[str, Path]) -> Optional[Path]:
+    """The file holding `path`: itself, or its compressed archive (None if neither exists)"""
+    path = Path(path)
+    for candidate in (path, *(path.with_name(path.name + s) for s in SUFFIXES.values())):
+        if candidate.exists():
+            return candidate
+    return None
+
+
+# ----------------------------------------------------------------------
+# Dictionaries
+# ----------------------------------------------------------------------
+
+class Dictionaries:
+    """
+    zstd dictionaries stored as ``<dict_id>.zdict`` in one directory
+
+    Args:
+        directory: Where dictionaries are kept (created on first training)
+    """
+
+    def __init__(self, directory: Union[str, Path]):
+        self.directory = Path(directory)
+        self._cache: Dict[int, object] = {}
+
+    def get(self, dict_id: int):
+        """The dictionary with this id, or None if it is not stored here"""
+        if dict_id not in self._cache:
+            path = self.directory / f"{dict_id}.zdict"
+            if not path.exists():
+                return None
+            self._cache[dict_id] = zstandard.ZstdCompressionDict(path.read_bytes())
+        return self._cache[dict_id]
+
+    def latest(self, max_age: Optional[float] = DICT_MAX_AGE):
+        """The newest dictionary, or None if there is none (or it is older than `max_age`)"""
+        if zstandard is None or not self.directory.exists():
+            return None
+        paths = sorted(self.directory.glob("*.zdict"), key=lambda p: p.stat().st_mtime)
+        if not paths:
+            return None
+        if max_age is not None and time.time() - paths[-1].stat().st_mtime > max_age:
+            return None
+        return self.get(int(paths[-1].stem))
+
+    def train(self, samples: List[bytes]):
+        """
+        Train and store a dictionary from sample records
+
+        Returns:
+            The dictionary, or None without zstd or with too few samples
+        """
+        if zstandard is None or len(samples) < DICT_MIN_SAMPLES:
+            return None
+        try:
+            dictionary = zstandard.train_dictionary(DICT_SIZE, samples, level=LEVELS['zstd'])
+        except zstandard.ZstdError:
+            return None  # samples too uniform or too small to learn from
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"{dictionary.dict_id()}.zdict"
+        tmp = path.with_suffix('.tmp')
+        tmp.write_bytes(dictionary.as_bytes())
+        os.replace(tmp, path)
+        self._cache[dictionary.dict_id()] = dictionary
+        return dictionary
+
+
+def sample_lines(paths: Iterable[Path], limit: int = DICT_SAMPLE_BYTES) -> List[bytes]:
+    """Up to `limit` bytes of lines from raw JSON-lines files, for training"""
+    samples, total = [], 0
+    for path in paths:
+        try:
+            with open(path, 'rb') as f:
+                for line in f:
+                    samples.append(line)
+                    total += len(line)
+                    if total >= limit:
+                        return samples
+        except FileNotFoundError:
+            continue
+    return samples
+
+
+# ----------------------------------------------------------------------
+# Streams
+# ----------------------------------------------------------------------
+
+def _zstd_dictionary(f, dictionaries: Optional[Dictionaries]):
+    """Dictionary named in the frame header at the file's current position"""
+    header = f.read(18)  # the longest possible frame header
+    f.seek(0)
+    dict_id = zstandard.get_frame_parameters(header).dict_id if header else 0
+    if not dict_id:
+        return None
+    dictionary = dictionaries.get(dict_id) if dictionaries is not None else None
+    if dictionary is None:
+        raise OSError(f"zstd dictionary {dict_id} needed by {f.name} is missing")
+    return dictionary
+
+
+def open_stream(path: Union[str, Path], dictionaries: Optional[Dictionaries] = None):
+    """
+    Open a file for streaming binary reads, decompressing by suffix
+
+    Raises:
+        OSError: If the file is zstd-compressed and zstandard (or the
+            dictionary it was written with) is not available
+    """
+    path = Path(path)
+    suffix = compressed_suffix(path)
+    if suffix == SUFFIXES['gzip']:
+        return gzip.open(path, 'rb')
+    f = open(path, 'rb')
+    if suffix == SUFFIXES['zstd']:
+        if zstandard is None:
+            f.close()
+            raise OSError(f"{path} is zstd-compressed; install zstandard to read it")
+        try:
+            dictionary = _zstd_dictionary(f, dictionaries)
+        except BaseException:
+            f.close()
+            raise
+        dctx = zstandard.ZstdDecompressor(dict_data=dictionary)
+        return dctx.stream_reader(f, read_across_frames=True, closefd=True)
+    return f
+
+
+def stream_lines(path: Union[str, Path], offset: int = 0,
+                 dictionaries: Optional[Dictionaries] = None) -> Iterator[Tuple[bytes, int]]:
+    """
+    Yield each complete line of a (possibly compressed) JSON-lines file
+
+    Offsets count decompressed bytes, like map_lines() on the raw file, so a
+    saved position stays valid once its segment is archived.
+    """
+    with open_stream(path, dictionaries) as f:
+        pos = 0
+        while pos < offset:
+            skipped = len(f.read(min(CHUNK_SIZE, offset - pos)))
+            if not skipped:
+                return
+            pos += skipped
+        rest = b''
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                return  # a trailing partial line is never yielded
+            lines = (rest + chunk).split(b'\n')
+            rest = lines.pop()
+            for line in lines:
+                pos += len(line) + 1
+                yield line + b'\n', pos
+
+
+def read_chunks(path: Union[str, Path], dictionaries: Optional[Dictionaries] = None,
+                chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield the decompressed content of a file chunk by chunk"""
+    with open_stream(path, dictionaries) as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+# ----------------------------------------------------------------------
+# Archiving
+# ----------------------------------------------------------------------
+
+def compress_file(path: Union[str, Path], dictionary=None, backend: str = BACKEND,
+                  dictionaries: Optional[Dictionaries] = None) -> Dict:
+    """
+    Replace a file with its compressed archive
+
+    The archive is written to a temporary name, fsynced, renamed into place
+    and read back (checksum and length) before the original is removed, so
+    a crash or a bad write never loses data.
+
+    Args:
+        path: File to compress
+        dictionary: zstd dictionary to compress with (zstd only)
+        backend: 'zstd' or 'gzip'
+        dictionaries: Where `dictionary` is stored, for the read-back
+
+    Returns:
+        {'file': archive path, 'raw_bytes', 'stored_bytes',
+        'decompress_seconds'}
+    """
+    path = Path(path)
+    target = path.with_name(path.name + SUFFIXES[backend])
+    tmp = target.with_name(target.name + '.tmp')
+
+    crc, raw_bytes = 0, 0
+    with open(path, 'rb') as src, open(tmp, 'wb') as dst:
+        if backend == 'zstd':
+            cctx = zstandard.ZstdCompressor(level=LEVELS['zstd'], dict_data=dictionary,
+                                            write_checksum=True)
+            out = cctx.stream_writer(dst, closefd=False)
+        else:
+            out = gzip.GzipFile(filename=path.name, mode='wb', fileobj=dst,
+                                compresslevel=LEVELS['gzip'], mtime=0)
+        with out:
+            while True:
+                chunk = src.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                crc = zlib.crc32(chunk, crc)
+                raw_bytes += len(chunk)
+                out.write(chunk)
+        dst.flush()
+        os.fsync(dst.fileno())
+    os.replace(tmp, target)
+
+    start = time.perf_counter()
+    check, size = 0, 0
+    for chunk in read_chunks(target, dictionaries):
+        check = zlib.crc32(chunk, check)
+        size += len(chunk)
+    seconds = time.perf_counter() - start
+    if (check, size) != (crc, raw_bytes):
+        target.unlink()
+        raise OSError(f"Archive of {path} failed verification")
+
+    path.unlink()
+    return {'file': target, 'raw_bytes': raw_bytes, 'stored_bytes': target.stat().st_size,
+            'decompress_seconds': seconds}
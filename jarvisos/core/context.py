@@ -3,13 +3,14 @@ JarvisOS Context Awareness System
 Understands what the user is doing and adapts behavior
 """
 
-import json
 from pathlib import Path
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 from collections import Counter
 
 from ..utils.logger import get_logger
+from .json_files import read_json, write_json
+from .state_store import open_state
 
 logger = get_logger("jarvisos.context")
 
@@ -53,7 +54,7 @@ class ContextAnalyzer:
     def __init__(self, data_dir: str = "data"):
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(exist_ok=True)
-        self.context_file = self.data_dir / "context_history.json"
+        self.store = open_state(self.data_dir)
         self.current_context_file = self.data_dir / "current_context.json"
         
         logger.info("ContextAnalyzer initialized")
@@ -150,14 +151,7 @@ class ContextAnalyzer:
     
     def get_current_context(self) -> Optional[Dict]:
         """Get current context"""
-        if not self.current_context_file.exists():
-            return None
-        
-        try:
-            with open(self.current_context_file) as f:
-                return json.load(f)
-        except:
-            return None
+        return read_json(self.current_context_file, mutable=True)
     
     def save_current_context(self, context: str, metadata: Dict = None):
         """Save current context"""
@@ -167,8 +161,7 @@ class ContextAnalyzer:
             'metadata': metadata or {}
         }
         
-        with open(self.current_context_file, 'w') as f:
-            json.dump(data, f, indent=2)
+        write_json(self.current_context_file, data)
         
         logger.info(f"Current context saved: {context}")
     
@@ -228,42 +221,23 @@ class ContextAnalyzer:
     def get_best_notification_time(self) -> str:
         """Suggest best time for notifications based on patterns"""
         # Load context history
-        if not self.context_file.exists():
+        history = self.store.context_history()
+        if not history:
             return "09:00"  # Default morning
         
-        try:
-            with open(self.context_file) as f:
-                history = json.load(f)
-            
-            # Find times when user is typically in IDLE or BREAK
-            # This is simplified - real implementation would analyze patterns
-            return "09:00"  # Morning is usually good
-        except:
-            return "09:00"
+        # Find times when user is typically in IDLE or BREAK
+        # This is simplified - real implementation would analyze patterns
+        return "09:00"  # Morning is usually good
     
     def save_context_history(self, session_analysis: Dict):
         """Save context analysis to history"""
-        history = []
-        
-        if self.context_file.exists():
-            try:
-                with open(self.context_file) as f:
-                    history = json.load(f)
-            except:
-                history = []
-        
-        # Add new entry
         entry = {
             'timestamp': datetime.now().isoformat(),
             **session_analysis
         }
-        history.append(entry)
         
-        # Keep last 100 entries
-        history = history[-100:]
-        
-        with open(self.context_file, 'w') as f:
-            json.dump(history, f, indent=2)
+        # Append, keeping the last 100 entries
+        self.store.append_context(entry, keep=100)
         
         logger.info("Context history saved")
 
@@ -293,24 +267,9 @@ class SmartInterruptionManager:
             return True  # Send now
         
         # Queue for later
-        queue_file = Path("data/notification_queue.json")
-        queue = []
-        
-        if queue_file.exists():
-            try:
-                with open(queue_file) as f:
-                    queue = json.load(f)
-            except:
-                queue = []
-        
-        queue.append({
-            'message': message,
-            'priority': priority,
-            'queued_at': datetime.now().isoformat()
-        })
-        
-        with open(queue_file, 'w') as f:
-            json.dump(queue, f, indent=2)
+        self.context_analyzer.store.queue_notification(
+            message, priority, datetime.now().isoformat()
+        )
         
         logger.info(f"Notification queued: {message[:50]}...")
         return False  # Queued, not sent
@@ -319,20 +278,18 @@ class SmartInterruptionManager:
 # CLI function
 def analyze_current_context():
     """Analyze current context from latest observations"""
-    from .observer import Observer
+    from .observation_log import open_observations
     
     analyzer = ContextAnalyzer()
     
     # Load recent observations
-    obs_file = Path("data/observations.json")
-    if not obs_file.exists():
+    stream = open_observations("data")
+    if not stream.exists():
         print("No observations found. Run 'jarvis observe' first.")
         return
     
-    with open(obs_file) as f:
-        data = json.load(f)
-    
-    observations = data.get('observations', [])
+    # Last hour = 12 observations
+    observations = stream.latest(12)
     
     if not observations:
         print("No observations to analyze.")
@@ -344,9 +301,8 @@ def analyze_current_context():
     
     print(f"\n🧠 Current Context: {context}")
     
-    # Analyze recent session (last hour = 12 observations)
-    recent = observations[-12:] if len(observations) >= 12 else observations
-    session = analyzer.analyze_session(recent)
+    # Analyze recent session
+    session = analyzer.analyze_session(observations)
     
     print(f"\n📊 Session Analysis:")
     print(f"  Dominant: {session['dominant_context']}")
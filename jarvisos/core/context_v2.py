@@ -16,6 +16,8 @@ from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, asdict
 import subprocess
 
+from .json_files import read_json, write_json
+
 
 @dataclass
 class TemporalContext:
@@ -381,19 +383,16 @@ Current Context:
         
         data = [ctx.to_dict() for ctx in self.context_history]
         
-        with open(history_file, 'w') as f:
-            json.dump(data, f, indent=2)
+        write_json(history_file, data)
     
     def load_context_history(self):
         """Load context history from file"""
         history_file = self.data_dir / "context_history.json"
         
-        if not history_file.exists():
+        data = read_json(history_file, mutable=True)
+        if data is None:
             return
         
-        with open(history_file, 'r') as f:
-            data = json.load(f)
-        
         # TODO: Reconstruct MultiDimensionalContext objects
         # For now, just keep as dicts
         self.context_history = data
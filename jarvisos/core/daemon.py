@@ -0,0 +1,332 @@
+"""
+Observer Daemon - Long-running observer process for systemd
+
+Runs the continuous sampler in a single process instead of restarting
+`jarvis observe --duration N` in a loop. The daemon:
+
+- Speaks the sd_notify protocol (READY, RELOADING, STOPPING, STATUS and
+  WATCHDOG pings) when started with Type=notify
+- Flushes the observation log to disk every `flush_interval` seconds
+- Reloads its config file on SIGHUP
+- Seals the active segment and exits cleanly on SIGTERM / SIGINT
+"""
+
+import os
+import signal
+import socket
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from ..utils.logger import get_observer_logger
+from . import codec
+from .observer import Observer
+from .scheduler import TickScheduler
+
+logger = get_observer_logger()
+
+DEFAULT_CONFIG_FILE = Path.home() / ".jarvisos" / "observer.json"
+CONFIG_KEYS = ('interval', 'collector', 'flush_interval', 'min_interval', 'max_interval',
+               'cpu_budget')
+COLLECTORS = ('auto', 'procfs', 'psutil')
+
+
+class SystemdNotifier:
+    """
+    Minimal sd_notify client
+
+    Sends datagrams to $NOTIFY_SOCKET; every call is a no-op when the process
+    was not started by systemd with Type=notify.
+    """
+
+    def __init__(self, environ: Optional[Dict[str, str]] = None):
+        environ = os.environ if environ is None else environ
+        self.address = environ.get('NOTIFY_SOCKET') or None
+        if self.address and self.address.startswith('@'):
+            self.address = '\0' + self.address[1:]  # abstract namespace
+
+        # Ping at half the watchdog timeout, as sd_watchdog_enabled() advises
+        self.watchdog_interval: Optional[float] = None
+        usec = environ.get('WATCHDOG_USEC')
+        pid = environ.get('WATCHDOG_PID')
+        if usec and (not pid or pid == str(os.getpid())):
+            try:
+                self.watchdog_interval = int(usec) / 1_000_000 / 2
+            except ValueError:
+                logger.warning(f"Ignoring invalid WATCHDOG_USEC: {usec}")
+
+    @property
+    def enabled(self) -> bool:
+        return self.address is not None
+
+    def notify(self, state: str) -> bool:
+        """Send a raw state string such as 'READY=1'"""
+        if not self.address:
+            return False
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM | socket.SOCK_CLOEXEC) as sock:
+                sock.connect(self.address)
+                sock.sendall(state.encode('utf-8'))
+            return True
+        except OSError as e:
+            logger.warning(f"sd_notify failed: {e}")
+            return False
+
+    def ready(self, status: str = "") -> bool:
+        return self.notify("READY=1" + (f"\nSTATUS={status}" if status else ""))
+
+    def reloading(self) -> bool:
+        return self.notify("RELOADING=1")
+
+    def stopping(self) -> bool:
+        return self.notify("STOPPING=1")
+
+    def status(self, status: str) -> bool:
+        return self.notify(f"STATUS={status}")
+
+    def watchdog(self) -> bool:
+        return self.notify("WATCHDOG=1")
+
+
+class ObserverDaemon:
+    """
+    Continuous observer with periodic flushes and signal handling
+
+    Args:
+        observer: Observer to sample with
+        interval: Seconds between observations
+        flush_interval: Seconds between fsyncs of the observation log
+        min_interval: Adaptive sampling: fastest interval (None for a fixed rate)
+        max_interval: Adaptive sampling: slowest interval
+        config_file: Optional JSON file with any of interval, collector,
+            flush_interval, min_interval, max_interval and cpu_budget; read
+            at start-up and on every SIGHUP
+        notifier: sd_notify client (defaults to one built from the environment)
+    """
+
+    def __init__(self, observer: Observer, interval: float = 10,
+                 flush_interval: float = 60,
+                 min_interval: Optional[float] = None,
+                 max_interval: Optional[float] = None, config_file=None,
+                 notifier: Optional[SystemdNotifier] = None,
+                 clock=time.monotonic):
+        self.observer = observer
+        self.interval = interval
+        self.flush_interval = flush_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.config_file = Path(config_file) if config_file else None
+        self.notifier = notifier or SystemdNotifier()
+        self._clock = clock
+
+        self._stop = threading.Event()
+        self._reload_requested = False
+        self._last_flush = 0.0
+        self._last_watchdog = 0.0
+        self.scheduler: Optional[TickScheduler] = None
+
+        self.load_config()
+        self._apply_adaptive()
+
+    # ------------------------------------------------------------------
+    # Configuration
+    # ------------------------------------------------------------------
+
+    def load_config(self) -> Dict:
+        """
+        Apply settings from the config file, if any
+
+        Returns:
+            The settings that were applied
+        """
+        if self.config_file is None or not self.config_file.exists():
+            return {}
+
+        try:
+            with open(self.config_file) as f:
+                config = codec.load(f)
+        except (OSError, ValueError) as e:
+            logger.error(f"Failed to read observer config {self.config_file}: {e}")
+            return {}
+
+        applied = {}
+        interval = config.get('interval')
+        if interval is not None:
+            if isinstance(interval, (int, float)) and interval > 0:
+                self.interval = interval
+                if self.scheduler is not None:
+                    self.observer.set_interval(interval)
+                applied['interval'] = interval
+            else:
+                logger.warning(f"Ignoring invalid interval in config: {interval!r}")
+
+        flush_interval = config.get('flush_interval')
+        if flush_interval is not None:
+            if isinstance(flush_interval, (int, float)) and flush_interval > 0:
+                self.flush_interval = flush_interval
+                applied['flush_interval'] = flush_interval
+            else:
+                logger.warning(f"Ignoring invalid flush_interval in config: {flush_interval!r}")
+
+        if 'min_interval' in config or 'max_interval' in config:
+            low = config.get('min_interval', self.min_interval)
+            high = config.get('max_interval', self.max_interval)
+            if low is None and high is None:
+                self.min_interval = self.max_interval = None
+                applied.update(min_interval=None, max_interval=None)
+            elif (isinstance(low, (int, float)) and isinstance(high, (int, float))
+                  and 0 < low <= high):
+                self.min_interval, self.max_interval = low, high
+                applied.update(min_interval=low, max_interval=high)
+            else:
+                logger.warning(f"Ignoring invalid interval bounds in config: {low!r}..{high!r}")
+
+        if 'cpu_budget' in config:
+            budget = config['cpu_budget']
+            if budget is None or (isinstance(budget, (int, float)) and budget > 0):
+                self.observer.metrics.cpu_budget = budget
+                applied['cpu_budget'] = budget
+            else:
+                logger.warning(f"Ignoring invalid cpu_budget in config: {budget!r}")
+
+        collector = config.get('collector')
+        if collector is not None:
+            if collector in COLLECTORS:
+                if collector != self.observer.collector:
+                    self.observer.select_collector(collector)
+                applied['collector'] = collector
+            else:
+                logger.warning(f"Ignoring invalid collector in config: {collector!r}")
+
+        unknown = set(config) - set(CONFIG_KEYS)
+        if unknown:
+            logger.warning(f"Unknown observer config keys: {sorted(unknown)}")
+
+        logger.info(f"Loaded observer config {self.config_file}: {applied}")
+        return applied
+
+    # ------------------------------------------------------------------
+    # Signals
+    # ------------------------------------------------------------------
+
+    def _handle_stop(self, signum, frame) -> None:
+        # Keep handlers trivial; the run loop does the logging and flushing
+        self._stop.set()
+
+    def _handle_reload(self, signum, frame) -> None:
+        # Applied at the next tick so a reload never shifts the tick grid
+        self._reload_requested = True
+
+    def install_signal_handlers(self) -> None:
+        """Route SIGTERM/SIGINT to a graceful stop and SIGHUP to a reload"""
+        signal.signal(signal.SIGTERM, self._handle_stop)
+        signal.signal(signal.SIGINT, self._handle_stop)
+        signal.signal(signal.SIGHUP, self._handle_reload)
+
+    def stop(self) -> None:
+        """Ask the run loop to exit after the current tick"""
+        self._stop.set()
+
+    def reload(self) -> None:
+        """Ask the run loop to reload its config before the next tick"""
+        self._reload_requested = True
+
+    # ------------------------------------------------------------------
+    # Main loop
+    # ------------------------------------------------------------------
+
+    def _sleep(self, delay: float) -> None:
+        """Sleep until the next tick, waking early for signals and watchdog pings"""
+        deadline = self._clock() + delay
+        while not self._stop.is_set():
+            remaining = deadline - self._clock()
+            if remaining <= 0:
+                return
+            step = remaining
+            if self.notifier.watchdog_interval:
+                step = min(step, self.notifier.watchdog_interval)
+            if self._stop.wait(step):
+                return
+            self._ping_watchdog()
+
+    def _ping_watchdog(self, force: bool = False) -> None:
+        period = self.notifier.watchdog_interval
+        if not period:
+            return
+        now = self._clock()
+        if force or now - self._last_watchdog >= period:
+            self.notifier.watchdog()
+            self._last_watchdog = now
+
+    def _apply_reload(self) -> None:
+        self._reload_requested = False
+        self.notifier.reloading()
+        if self.load_config():
+            self._apply_adaptive()
+        self.notifier.ready(self._status())
+
+    def _apply_adaptive(self) -> None:
+        """(Re)build the adaptive policy from the current bounds"""
+        self.observer.set_adaptive(self.min_interval, self.max_interval,
+                                   initial=self.interval)
+        if self.observer.adaptive is not None:
+            self.interval = self.observer.adaptive.interval
+            if self.scheduler is not None:
+                self.observer.set_interval(self.interval)
+
+    def _maybe_flush(self) -> None:
+        now = self._clock()
+        if now - self._last_flush >= self.flush_interval:
+            self.observer.log.flush()
+            self.observer.metrics.save()
+            self._last_flush = now
+
+    def _status(self) -> str:
+        missed = self.scheduler.missed_total if self.scheduler else 0
+        interval = self.scheduler.interval if self.scheduler else self.interval
+        return (f"{self.observer.observation_count} observations, "
+                f"{missed} missed ticks, interval {interval}s")
+
+    def run(self) -> int:
+        """
+        Sample until stopped
+
+        Returns:
+            Number of observations collected
+        """
+        self.scheduler = self.observer.start_schedule(
+            self.interval, clock=self._clock, sleep=self._sleep)
+        self._last_flush = self._last_watchdog = self._clock()
+
+        logger.info(f"Observer daemon started: interval={self.interval}s, "
+                    f"flush_interval={self.flush_interval}s, pid={os.getpid()}")
+        self.notifier.ready(self._status())
+
+        try:
+            while True:
+                tick = self.scheduler.wait()
+                if self._stop.is_set():
+                    break
+                if self._reload_requested:
+                    self._apply_reload()
+
+                try:
+                    self.observer.collect(tick)
+                except Exception as e:
+                    # One bad tick must not take the daemon down
+                    logger.error(f"Observation failed: {e}", exc_info=True)
+
+                self._maybe_flush()
+                self._ping_watchdog(force=True)
+                if tick.missed:
+                    logger.warning(f"Observer fell behind: {tick.missed} ticks missed")
+                self.notifier.status(self._status())
+        finally:
+            self.notifier.stopping()
+            self.observer.log.close()
+            self.observer.metrics.save()
+            logger.info(f"Observer daemon stopped: {self._status()}")
+            logger.debug(f"Tick jitter: {self.scheduler.stats()}")
+
+        return self.observer.observation_count
@@ -3,13 +3,16 @@ JarvisOS User DNA Profiler
 Creates unique genetic profile for each user
 """
 
-import json
 from pathlib import Path
 from datetime import datetime, time
-from typing import Dict, List, Optional
-from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Union
+import numpy as np
 
 from ..utils.logger import get_logger
+from . import codec
+from .frame import ObservationFrame
+from .json_files import read_json, write_json
+from .stats import compute, shared_stats
 
 logger = get_logger("jarvisos.dna")
 
@@ -91,71 +94,91 @@ class UserDNA:
     
     def load_profile(self):
         """Load existing DNA profile"""
-        if self.dna_file.exists():
-            try:
-                with open(self.dna_file) as f:
-                    saved_profile = json.load(f)
-                    self.profile.update(saved_profile)
-                logger.info("DNA profile loaded")
-            except Exception as e:
-                logger.error(f"Failed to load DNA profile: {e}")
+        saved_profile = read_json(self.dna_file, mutable=True)
+        if isinstance(saved_profile, dict):
+            self.profile.update(saved_profile)
+            logger.info("DNA profile loaded")
     
     def save_profile(self):
         """Save DNA profile"""
         self.profile['last_updated'] = datetime.now().isoformat()
         
         try:
-            with open(self.dna_file, 'w') as f:
-                json.dump(self.profile, f, indent=2)
+            write_json(self.dna_file, self.profile)
             logger.info("DNA profile saved")
         except Exception as e:
             logger.error(f"Failed to save DNA profile: {e}")
     
-    def analyze_observations(self, observations_data: Dict):
-        """Analyze observations to build DNA profile"""
+    def analyze_history(self, since=None, until=None, full: bool = False):
+        """
+        Build the profile from stored observations
+
+        Reads the shared observation stats (hourly rollups where they cover
+        the range, raw ticks otherwise), which `jarvis analyze` may already
+        have computed for the same data; only observations after the last
+        checkpoint are folded in unless `full` is set.
+        """
+        self.apply_stats(shared_stats(self.data_dir, since, until, full=full))
+    
+    def analyze_observations(self, observations_data: Union[Dict, Iterable[Dict], ObservationFrame]):
+        """
+        Analyze observations to build DNA profile
+        
+        Args:
+            observations_data: Legacy dict with an 'observations' list, a
+                re-iterable stream such as an ObservationStream, or an
+                ObservationFrame
+        """
+        if isinstance(observations_data, ObservationFrame):
+            frame = observations_data
+        else:
+            if isinstance(observations_data, dict):
+                observations_data = observations_data.get('observations', [])
+            frame = ObservationFrame.from_observations(observations_data)
+        self.apply_stats(compute(frame))
+    
+    def apply_stats(self, stats: Dict):
+        """
+        Update the DNA profile from shared observation stats
+        
+        Args:
+            stats: Result of stats.compute() or stats.shared_stats()
+        """
         logger.info("Analyzing observations for DNA profiling...")
         
-        observations = observations_data.get('observations', [])
-        if not observations:
+        if not stats['ticks']:
             logger.warning("No observations to analyze")
             return
         
         # Analyze chronotype
-        self._analyze_chronotype(observations)
+        self._analyze_chronotype(stats)
         
         # Analyze work patterns
-        self._analyze_work_patterns(observations)
+        self._analyze_work_patterns(stats)
         
         # Analyze tool preferences
-        self._analyze_tool_preferences(observations)
+        self._analyze_tool_preferences(stats)
         
         # Analyze workflow signatures
-        self._analyze_workflow_signatures(observations)
+        self._analyze_workflow_signatures(stats)
         
         # Analyze productivity rhythms
-        self._analyze_productivity_rhythms(observations)
+        self._analyze_productivity_rhythms(stats)
         
         # Infer behavioral traits
-        self._infer_traits(observations)
+        self._infer_traits(stats)
         
         self.save_profile()
         logger.info("DNA profile updated")
     
-    def _analyze_chronotype(self, observations: List[Dict]):
+    def _analyze_chronotype(self, stats: Dict):
         """Determine user's chronotype (morning/night person)"""
-        hour_activity = defaultdict(int)
-        
-        for obs in observations:
-            timestamp = datetime.fromisoformat(obs['timestamp'])
-            hour = timestamp.hour
-            hour_activity[hour] += len(obs.get('apps', []))
-        
-        if not hour_activity:
+        hours, activity = np.array(stats['hours']), np.array(stats['hour_activity'])
+        if not len(hours):
             return
         
         # Find peak hours
-        sorted_hours = sorted(hour_activity.items(), key=lambda x: x[1], reverse=True)
-        peak_hours = [h for h, _ in sorted_hours[:4]]
+        peak_hours = [int(h) for h in hours[np.argsort(-activity, kind='stable')[:4]]]
         
         # Determine chronotype
         avg_peak_hour = sum(peak_hours) / len(peak_hours)
@@ -174,31 +197,20 @@ class UserDNA:
         
         logger.debug(f"Chronotype detected: {chronotype}")
     
-    def _analyze_work_patterns(self, observations: List[Dict]):
+    def _analyze_work_patterns(self, stats: Dict):
         """Analyze work patterns and schedule"""
-        work_hours = []
-        
-        for obs in observations:
-            timestamp = datetime.fromisoformat(obs['timestamp'])
-            if len(obs.get('apps', [])) > 5:  # Active work
-                work_hours.append(timestamp.hour)
-        
-        if work_hours:
-            self.profile['work_patterns']['typical_start'] = min(work_hours)
-            self.profile['work_patterns']['typical_end'] = max(work_hours)
+        # Hours with active work (more than stats.WORK_APPS apps running)
+        if stats['work_hours']:
+            start, end = stats['work_hours']
+            self.profile['work_patterns']['typical_start'] = start
+            self.profile['work_patterns']['typical_end'] = end
             
-            logger.debug(f"Work hours: {min(work_hours)}:00 - {max(work_hours)}:00")
+            logger.debug(f"Work hours: {start}:00 - {end}:00")
     
-    def _analyze_tool_preferences(self, observations: List[Dict]):
+    def _analyze_tool_preferences(self, stats: Dict):
         """Identify preferred tools and applications"""
-        app_counter = Counter()
-        
-        for obs in observations:
-            for app in obs.get('apps', []):
-                app_counter[app['name']] += 1
-        
         # Top 10 apps
-        top_apps = [app for app, _ in app_counter.most_common(10)]
+        top_apps = [app for app, _ in stats['top_apps']]
         self.profile['tool_preferences']['primary_apps'] = top_apps
         
         # Identify specific tools
@@ -213,94 +225,32 @@ class UserDNA:
         
         logger.debug(f"Primary apps: {top_apps[:5]}")
     
-    def _analyze_workflow_signatures(self, observations: List[Dict]):
+    def _analyze_workflow_signatures(self, stats: Dict):
         """Identify common workflow patterns"""
-        # Group observations by time of day
-        morning_apps = []
-        work_apps = []
-        evening_apps = []
-        
-        for obs in observations:
-            timestamp = datetime.fromisoformat(obs['timestamp'])
-            hour = timestamp.hour
-            apps = [app['name'] for app in obs.get('apps', [])]
-            
-            if 6 <= hour < 12:
-                morning_apps.extend(apps)
-            elif 12 <= hour < 18:
-                work_apps.extend(apps)
-            elif 18 <= hour < 24:
-                evening_apps.extend(apps)
-        
-        # Find most common apps per period
-        if morning_apps:
-            morning_counter = Counter(morning_apps)
-            self.profile['workflow_signatures']['morning_routine'] = [
-                app for app, _ in morning_counter.most_common(5)
-            ]
-        
-        if work_apps:
-            work_counter = Counter(work_apps)
-            self.profile['workflow_signatures']['work_routine'] = [
-                app for app, _ in work_counter.most_common(5)
-            ]
-        
-        if evening_apps:
-            evening_counter = Counter(evening_apps)
-            self.profile['workflow_signatures']['evening_routine'] = [
-                app for app, _ in evening_counter.most_common(5)
-            ]
+        # Most common apps per period of the day (see stats.PERIODS)
+        for key, apps in stats['period_apps'].items():
+            self.profile['workflow_signatures'][key] = apps
         
         logger.debug("Workflow signatures identified")
     
-    def _analyze_productivity_rhythms(self, observations: List[Dict]):
+    def _analyze_productivity_rhythms(self, stats: Dict):
         """Analyze productivity patterns"""
-        hour_productivity = defaultdict(list)
+        # Productivity proxy: number of active apps, averaged per hour
+        hours, hour_avg = np.array(stats['hours']), np.array(stats['hour_activity_mean'])
         
-        for obs in observations:
-            timestamp = datetime.fromisoformat(obs['timestamp'])
-            hour = timestamp.hour
+        if len(hours):
+            ranked = [int(h) for h in hours[np.argsort(-hour_avg, kind='stable')]]
             
-            # Productivity proxy: number of active apps
-            productivity = len(obs.get('apps', []))
-            hour_productivity[hour].append(productivity)
-        
-        # Calculate average productivity per hour
-        hour_avg = {
-            hour: sum(values) / len(values)
-            for hour, values in hour_productivity.items()
-        }
-        
-        if hour_avg:
-            sorted_hours = sorted(hour_avg.items(), key=lambda x: x[1], reverse=True)
-            
-            self.profile['productivity_rhythms']['best_hours'] = [
-                h for h, _ in sorted_hours[:3]
-            ]
-            self.profile['productivity_rhythms']['worst_hours'] = [
-                h for h, _ in sorted_hours[-3:]
-            ]
+            self.profile['productivity_rhythms']['best_hours'] = ranked[:3]
+            self.profile['productivity_rhythms']['worst_hours'] = ranked[-3:]
             
             logger.debug(f"Best hours: {self.profile['productivity_rhythms']['best_hours']}")
     
-    def _infer_traits(self, observations: List[Dict]):
+    def _infer_traits(self, stats: Dict):
         """Infer behavioral traits from patterns"""
-        total_apps = []
-        app_switches = 0
-        
-        for i, obs in enumerate(observations):
-            apps = obs.get('apps', [])
-            total_apps.append(len(apps))
-            
-            if i > 0:
-                prev_apps = set(a['name'] for a in observations[i-1].get('apps', []))
-                curr_apps = set(a['name'] for a in apps)
-                if prev_apps != curr_apps:
-                    app_switches += 1
-        
-        if total_apps:
-            avg_apps = sum(total_apps) / len(total_apps)
-            switch_rate = app_switches / len(observations) if observations else 0
+        if stats['ticks']:
+            avg_apps = stats['avg_apps']
+            switch_rate = stats['switch_rate']
             
             # Infer traits
             self.profile['traits']['multitasker'] = avg_apps > 10
@@ -368,7 +318,7 @@ if __name__ == "__main__":
     obs_file = Path("data/observations.json")
     if obs_file.exists():
         with open(obs_file) as f:
-            observations_data = json.load(f)
+            observations_data = codec.load(f)
         
         dna.analyze_observations(observations_data)
         dna.display_profile()
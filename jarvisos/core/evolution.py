@@ -11,6 +11,7 @@ from typing import List, Dict, Optional
 from dataclasses import dataclass, asdict
 
 from ..utils.logger import get_logger
+from .json_files import read_json, write_json
 
 logger = get_logger("jarvisos.evolution")
 
@@ -115,10 +116,11 @@ class GenePool:
             status_path = self.pool_dir / status_dir
             for gene_file in status_path.glob("*.json"):
                 try:
-                    with open(gene_file) as f:
-                        data = json.load(f)
-                        gene = Gene(**data)
-                        self.genes[gene.id] = gene
+                    data = read_json(gene_file, mutable=True)
+                    if data is None:
+                        continue  # moved to another status, or unreadable
+                    gene = Gene(**data)
+                    self.genes[gene.id] = gene
                 except Exception as e:
                     logger.error(f"Failed to load gene {gene_file}: {e}")
     
@@ -127,8 +129,7 @@ class GenePool:
         status_dir = self.pool_dir / gene.status
         gene_file = status_dir / f"{gene.id}.json"
         
-        with open(gene_file, 'w') as f:
-            json.dump(asdict(gene), f, indent=2)
+        write_json(gene_file, asdict(gene))
         
         logger.debug(f"Gene {gene.name} saved to {gene.status}/")
     
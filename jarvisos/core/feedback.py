@@ -3,7 +3,6 @@ JarvisOS User Feedback System
 Allows users to rate scripts and provide feedback
 """
 
-import json
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Optional
@@ -13,6 +12,7 @@ from rich.table import Table
 from rich.panel import Panel
 
 from ..utils.logger import get_logger
+from .state_store import open_state
 
 logger = get_logger("jarvisos.feedback")
 console = Console()
@@ -24,58 +24,25 @@ class FeedbackManager:
     def __init__(self, data_dir: str = "data"):
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(exist_ok=True)
-        self.feedback_file = self.data_dir / "feedback.json"
+        self.store = open_state(self.data_dir)
         
         logger.info("FeedbackManager initialized")
     
     def load_feedback(self) -> Dict:
-        """Load all feedback"""
-        if not self.feedback_file.exists():
-            return {}
-        
-        try:
-            with open(self.feedback_file) as f:
-                return json.load(f)
-        except:
-            return {}
-    
-    def save_feedback(self, feedback: Dict):
-        """Save feedback"""
-        with open(self.feedback_file, 'w') as f:
-            json.dump(feedback, f, indent=2)
-        
-        logger.info("Feedback saved")
+        """Load all feedback, keyed by script id"""
+        return self.store.all_feedback()
     
     def rate_script(self, script_id: str, rating: int, comment: str = ""):
         """Rate a script (1-5 stars)"""
         if not 1 <= rating <= 5:
             raise ValueError("Rating must be between 1 and 5")
         
-        feedback = self.load_feedback()
-        
-        if script_id not in feedback:
-            feedback[script_id] = {
-                'ratings': [],
-                'comments': [],
-                'average_rating': 0.0
-            }
-        
-        # Add rating
-        feedback[script_id]['ratings'].append({
-            'rating': rating,
-            'timestamp': datetime.now().isoformat(),
-            'comment': comment
-        })
-        
-        # Update average
-        ratings = [r['rating'] for r in feedback[script_id]['ratings']]
-        feedback[script_id]['average_rating'] = sum(ratings) / len(ratings)
-        
-        self.save_feedback(feedback)
+        # One row insert; the running average is updated in the same transaction
+        self.store.add_rating(script_id, rating, comment, datetime.now().isoformat())
         
         logger.info(f"Script {script_id} rated: {rating}/5")
         
-        return feedback[script_id]
+        return self.store.script_feedback(script_id)
     
     def thumbs_up(self, script_id: str, comment: str = ""):
         """Quick thumbs up (5 stars)"""
@@ -87,21 +54,16 @@ class FeedbackManager:
     
     def get_script_rating(self, script_id: str) -> Optional[float]:
         """Get average rating for script"""
-        feedback = self.load_feedback()
-        
-        if script_id not in feedback:
-            return None
-        
-        return feedback[script_id].get('average_rating', 0.0)
+        return self.store.script_rating(script_id)
     
     def get_top_rated_scripts(self, n: int = 5) -> List[Dict]:
         """Get top rated scripts"""
-        feedback = self.load_feedback()
+        averages = self.store.rating_averages()
         
         # Sort by average rating
         sorted_scripts = sorted(
-            feedback.items(),
-            key=lambda x: x[1].get('average_rating', 0),
+            averages.items(),
+            key=lambda x: x[1]['average_rating'],
             reverse=True
         )
         
@@ -109,17 +71,17 @@ class FeedbackManager:
             {
                 'script_id': script_id,
                 'rating': data['average_rating'],
-                'num_ratings': len(data['ratings'])
+                'num_ratings': data['num_ratings']
             }
             for script_id, data in sorted_scripts[:n]
         ]
     
     def get_feedback_summary(self) -> Dict:
         """Get feedback summary"""
-        feedback = self.load_feedback()
+        averages = self.store.rating_averages()
         
-        total_scripts = len(feedback)
-        total_ratings = sum(len(data['ratings']) for data in feedback.values())
+        total_scripts = len(averages)
+        total_ratings = sum(data['num_ratings'] for data in averages.values())
         
         if total_ratings == 0:
             return {
@@ -129,11 +91,9 @@ class FeedbackManager:
             }
         
         # Calculate overall average
-        all_ratings = []
-        for data in feedback.values():
-            all_ratings.extend([r['rating'] for r in data['ratings']])
-        
-        average = sum(all_ratings) / len(all_ratings)
+        average = sum(
+            data['average_rating'] * data['num_ratings'] for data in averages.values()
+        ) / total_ratings
         
         return {
             'total_scripts': total_scripts,
@@ -249,12 +209,11 @@ class FeedbackIntegration:
     
     def get_all_feedback_boosts(self) -> Dict[str, float]:
         """Get fitness boosts for all genes"""
-        feedback = self.feedback_manager.load_feedback()
+        averages = self.feedback_manager.store.rating_averages()
         
         boosts = {}
-        for gene_id, data in feedback.items():
-            rating = data.get('average_rating', 3.0)
-            boosts[gene_id] = (rating - 3) / 4
+        for gene_id, data in averages.items():
+            boosts[gene_id] = (data['average_rating'] - 3) / 4
         
         return boosts
 
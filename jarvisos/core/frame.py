@@ -0,0 +1,322 @@
+"""
+Observation Frame - Columnar in-memory view of observations
+
+Loads observations once into NumPy arrays so analytics run as vectorized
+operations instead of repeated loops over nested dicts:
+
+- timestamps: epoch seconds of the recorded wall-clock time (the naive
+  local timestamps are read as UTC, so hour-of-day is plain arithmetic)
+- cpu, memory: system CPU% and memory% per tick (NaN when missing)
+- weights: seconds each tick stands for (adaptive interval, else 1)
+- apps: CSR-style tick x app matrix (indptr/indices into app_names), one
+  entry per running process, so app frequencies count processes exactly
+  like the Counter-based code they replace
+
+A row can also stand for a bucket of ticks (see rollups.py): `counts` holds
+the ticks per row, CSR `data` the processes per app, and cpu/memory the
+bucket means. Raw frames leave these at one tick and one process per entry,
+so every aggregation below treats both alike.
+"""
+
+import warnings
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+HOURS_PER_DAY = 24
+SECONDS_PER_HOUR = 3600
+PRESENCE_CELLS = 1 << 22  # tick x app cells per block in app_set_changed
+
+
+def _parse_timestamps(values: List[str]) -> np.ndarray:
+    """Vectorized ISO parsing, falling back to datetime for offset-aware values"""
+    try:
+        with warnings.catch_warnings():
+            # NumPy converts offsets to UTC with only a warning; keep wall-clock time instead
+            warnings.simplefilter('error')
+            parsed = np.array(values, dtype='datetime64[us]')
+        return parsed.astype(np.int64) / 1e6
+    except (ValueError, UserWarning):
+        epochs = np.empty(len(values), dtype=np.float64)
+        for i, value in enumerate(values):
+            ts = datetime.fromisoformat(value).replace(tzinfo=None)
+            epochs[i] = (np.datetime64(ts, 'us').astype(np.int64)) / 1e6
+        return epochs
+
+
+class ObservationFrame:
+    """
+    Column arrays for a sequence of observations
+
+    Build one with ObservationFrame.from_observations(); the arrays are
+    read-only by convention and shared by every analysis pass.
+    """
+
+    # Every field from_observations reads, for open_observations(fields=...)
+    FIELDS = ('timestamp', 'system.cpu_percent', 'system.memory_percent',
+              'tick.interval', 'apps.name')
+
+    def __init__(self, timestamps: np.ndarray, cpu: np.ndarray, memory: np.ndarray,
+                 weights: np.ndarray, indptr: np.ndarray, indices: np.ndarray,
+                 app_names: List[str], start_time: Optional[str] = None,
+                 end_time: Optional[str] = None, counts: Optional[np.ndarray] = None,
+                 data: Optional[np.ndarray] = None, peak_apps: Optional[np.ndarray] = None,
+                 switches: Optional[np.ndarray] = None):
+        self.timestamps = timestamps
+        self.cpu = cpu
+        self.memory = memory
+        self.weights = weights
+        self.indptr = indptr
+        self.indices = indices
+        self.app_names = app_names
+        self.start_time = start_time
+        self.end_time = end_time
+        # Rollup rows only: ticks per row, processes per entry, busiest tick
+        # and app-set switches within the row
+        self.counts = counts
+        self.data = data
+        self.peak_apps = peak_apps
+        self.switches = switches
+
+    @classmethod
+    def from_observations(cls, observations: Iterable[Dict]) -> 'ObservationFrame':
+        """
+        Load observations in a single pass
+
+        Args:
+            observations: Any iterable of observation records, e.g. an
+                ObservationStream or a legacy 'observations' list
+        """
+        timestamps: List[str] = []
+        cpu: List[float] = []
+        memory: List[float] = []
+        weights: List[float] = []
+        indptr: List[int] = [0]
+        indices: List[int] = []
+        app_ids: Dict[str, int] = {}
+        nan = float('nan')
+
+        for obs in observations:
+            timestamps.append(obs['timestamp'])
+            system = obs.get('system') or {}
+            value = system.get('cpu_percent')
+            cpu.append(nan if value is None else value)
+            value = system.get('memory_percent')
+            memory.append(nan if value is None else value)
+            # Adaptive samples stand for their interval; legacy ones weigh 1
+            weights.append((obs.get('tick') or {}).get('interval') or 1)
+            for app in obs.get('apps', []):
+                name = app['name']
+                app_id = app_ids.get(name)
+                if app_id is None:
+                    app_id = app_ids[name] = len(app_ids)
+                indices.append(app_id)
+            indptr.append(len(indices))
+
+        return cls(
+            timestamps=_parse_timestamps(timestamps) if timestamps else np.empty(0),
+            cpu=np.array(cpu, dtype=np.float64),
+            memory=np.array(memory, dtype=np.float64),
+            weights=np.array(weights, dtype=np.float64),
+            indptr=np.array(indptr, dtype=np.int64),
+            indices=np.array(indices, dtype=np.int32),
+            app_names=list(app_ids),
+            start_time=timestamps[0] if timestamps else None,
+            end_time=timestamps[-1] if timestamps else None,
+        )
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @classmethod
+    def concat(cls, frames: List['ObservationFrame']) -> 'ObservationFrame':
+        """Stack frames in order (e.g. rollup rows followed by recent raw ticks)"""
+        frames = [frame for frame in frames if len(frame)]
+        if len(frames) == 1:
+            return frames[0]
+        if not frames:
+            return cls.from_observations([])
+
+        app_ids: Dict[str, int] = {}
+        indices, indptr, offset = [], [np.zeros(1, dtype=np.int64)], 0
+        for frame in frames:
+            remap = np.array([app_ids.setdefault(name, len(app_ids)) for name in frame.app_names],
+                             dtype=np.int32)
+            indices.append(remap[frame.indices] if len(frame.indices) else frame.indices)
+            indptr.append(frame.indptr[1:] + offset)
+            offset += frame.indptr[-1]
+
+        return cls(
+            timestamps=np.concatenate([f.timestamps for f in frames]),
+            cpu=np.concatenate([f.cpu for f in frames]),
+            memory=np.concatenate([f.memory for f in frames]),
+            weights=np.concatenate([f.weights for f in frames]),
+            indptr=np.concatenate(indptr),
+            indices=np.concatenate(indices).astype(np.int32),
+            app_names=list(app_ids),
+            start_time=next((f.start_time for f in frames if f.start_time), None),
+            end_time=next((f.end_time for f in reversed(frames) if f.end_time), None),
+            counts=np.concatenate([f.tick_counts for f in frames]),
+            data=np.concatenate([f.entry_counts for f in frames]),
+            peak_apps=np.concatenate([f.peak_app_counts for f in frames]),
+            switches=np.concatenate([f.switch_flags for f in frames]),
+        )
+
+    # ------------------------------------------------------------------
+    # Derived columns
+    # ------------------------------------------------------------------
+
+    @property
+    def hours(self) -> np.ndarray:
+        """Hour of day (0-23) of each tick"""
+        return (self.timestamps // SECONDS_PER_HOUR % HOURS_PER_DAY).astype(np.int64)
+
+    @property
+    def tick_counts(self) -> np.ndarray:
+        """Ticks each row stands for (all ones for raw ticks)"""
+        if self.counts is None:
+            return np.ones(len(self), dtype=np.int64)
+        return self.counts
+
+    @property
+    def tick_count(self) -> int:
+        """Total number of ticks covered"""
+        return len(self) if self.counts is None else int(self.counts.sum())
+
+    @property
+    def entry_counts(self) -> np.ndarray:
+        """Processes behind each app entry (all ones for raw ticks)"""
+        if self.data is None:
+            return np.ones(len(self.indices), dtype=np.int64)
+        return self.data
+
+    @property
+    def app_counts(self) -> np.ndarray:
+        """Number of running processes per tick (summed over a rollup row's ticks)"""
+        if self.data is None:
+            return np.diff(self.indptr)
+        rows = self._rows_between(0, len(self))
+        return np.bincount(rows, weights=self.data, minlength=len(self)).astype(np.int64)
+
+    @property
+    def peak_app_counts(self) -> np.ndarray:
+        """Largest process count of any tick in each row"""
+        return self.app_counts if self.peak_apps is None else self.peak_apps
+
+    @property
+    def switch_flags(self) -> np.ndarray:
+        """App-set switches per row (see app_set_changed)"""
+        if self.switches is None:
+            return self.app_set_changed().astype(np.int64)
+        return self.switches
+
+    # ------------------------------------------------------------------
+    # Aggregations
+    # ------------------------------------------------------------------
+
+    def mean(self, values: np.ndarray) -> float:
+        """Mean of a column over ticks, ignoring NaN"""
+        valid = ~np.isnan(values)
+        if not valid.any():
+            return 0.0
+        return float(np.average(values[valid], weights=self.tick_counts[valid]))
+
+    def weighted_mean(self, values: np.ndarray) -> float:
+        """Mean of a column weighted by tick interval, ignoring NaN"""
+        valid = ~np.isnan(values)
+        if not valid.any():
+            return 0.0
+        return float(np.average(values[valid], weights=self.weights[valid]))
+
+    def groupby_hour(self, values: np.ndarray, how: str = 'sum') -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Aggregate a per-tick column by hour of day
+
+        Args:
+            values: Array with one value per row (a rollup row's value is its
+                ticks' total, e.g. app_counts)
+            how: 'sum' or 'mean' (per tick)
+
+        Returns:
+            (hours, aggregates) for the hours that have at least one tick,
+            in ascending hour order
+        """
+        hours = self.hours
+        counts = np.bincount(hours, weights=self.tick_counts, minlength=HOURS_PER_DAY)
+        sums = np.bincount(hours, weights=values, minlength=HOURS_PER_DAY)
+        present = np.flatnonzero(counts)
+        if how == 'mean':
+            return present, sums[present] / counts[present]
+        if how == 'sum':
+            return present, sums[present]
+        raise ValueError(f"Unknown aggregation: {how}")
+
+    def rolling_mean(self, values: np.ndarray, window: int) -> np.ndarray:
+        """
+        Trailing mean over the last `window` ticks
+
+        The first window-1 ticks average whatever history they have, so the
+        result has one value per tick.
+        """
+        if window < 1:
+            raise ValueError("window must be >= 1")
+        if not len(values):
+            return np.empty(0)
+        csum = np.cumsum(np.insert(values.astype(np.float64), 0, 0.0))
+        ends = np.arange(1, len(values) + 1)
+        starts = np.maximum(ends - window, 0)
+        return (csum[ends] - csum[starts]) / (ends - starts)
+
+    def app_frequency(self, mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Process count per app id, optionally over the ticks selected by mask
+
+        Args:
+            mask: Boolean array with one value per tick
+        """
+        indices, data = self.indices, self.data
+        if mask is not None:
+            selected = np.repeat(mask, np.diff(self.indptr))
+            indices = indices[selected]
+            data = None if data is None else data[selected]
+        return np.bincount(indices, weights=data, minlength=len(self.app_names)).astype(np.int64)
+
+    def top_apps(self, n: int = 10, mask: Optional[np.ndarray] = None) -> List[Tuple[str, int]]:
+        """
+        Most frequent apps as (name, count), like Counter.most_common
+
+        Ties keep first-seen order.
+        """
+        frequency = self.app_frequency(mask)
+        order = np.argsort(-frequency, kind='stable')[:n]
+        return [(self.app_names[i], int(frequency[i])) for i in order if frequency[i]]
+
+    def app_set_changed(self) -> np.ndarray:
+        """
+        Whether each tick's set of app names differs from the previous tick's
+
+        The first tick is never a change.
+        """
+        n, width = len(self), max(len(self.app_names), 1)
+        changed = np.zeros(n, dtype=bool)
+        if n < 2:
+            return changed
+
+        # Dense tick x app presence, built a block of ticks at a time to bound memory
+        block = max(PRESENCE_CELLS // width, 2)
+        previous = None
+        for first in range(0, n, block):
+            last = min(first + block, n)
+            lo, hi = self.indptr[first], self.indptr[last]
+            presence = np.zeros((last - first, width), dtype=bool)
+            presence[self._rows_between(first, last), self.indices[lo:hi]] = True
+            changed[first + 1:last] = (presence[1:] != presence[:-1]).any(axis=1)
+            if previous is not None:
+                changed[first] = bool((presence[0] != previous).any())
+            previous = presence[-1]
+        return changed
+
+    def _rows_between(self, first: int, last: int) -> np.ndarray:
+        """Tick index, relative to `first`, of each entry of ticks [first, last)"""
+        return np.repeat(np.arange(last - first), np.diff(self.indptr[first:last + 1]))
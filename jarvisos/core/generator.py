@@ -7,16 +7,20 @@ import json
 import os
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 from rich.console import Console
 from rich.panel import Panel
 from rich.syntax import Syntax
 
 try:
+    from .ai_async import get_async_brain, run_sync
     from .ai_brain_unified import get_unified_brain
+    from .json_files import read_json, write_json
 except ImportError:
+    from jarvisos.core.ai_async import get_async_brain, run_sync
     from jarvisos.core.ai_brain_unified import get_unified_brain
+    from jarvisos.core.json_files import read_json, write_json
 
 console = Console()
 
@@ -44,8 +48,10 @@ class Generator:
                 "Run 'jarvis analyze' first to generate insights."
             )
         
-        with open(self.insights_file, 'r') as f:
-            return json.load(f)
+        insights = read_json(self.insights_file, mutable=True)
+        if insights is None:
+            raise ValueError(f"❌ Insights file is not valid JSON: {self.insights_file}")
+        return insights
 
     def suggest_tasks(self, insights: Dict) -> List[Dict]:
         """Ask Claude to suggest automation tasks"""
@@ -83,7 +89,7 @@ Respond in JSON format:
         try:
             # Use unified AI brain (Ollama or Claude)
             console.print(f"[dim]Using: {self.ai.__class__.__name__}[/dim]")
-            response_text = self.ai.generate(prompt)
+            response_text = self.ai.generate(prompt, site="suggest_tasks")
             
             if not response_text:
                 raise ValueError("AI returned no response")
@@ -131,7 +137,7 @@ Respond with ONLY the Python code, no explanations or markdown formatting.
         try:
             # Use unified AI brain (Ollama or Claude)
             console.print(f"[dim]Using: {self.ai.__class__.__name__}[/dim]")
-            script_code = self.ai.generate(prompt)
+            script_code = self.ai.generate(prompt, site="generate_script")
             
             if not script_code:
                 raise ValueError("AI returned no response")
@@ -152,6 +158,23 @@ Respond with ONLY the Python code, no explanations or markdown formatting.
             console.print(f"[bold red]❌ Error generating script: {e}[/bold red]")
             raise
 
+    async def agenerate_scripts(self, tasks: List[Dict]) -> List[Optional[str]]:
+        """
+        Generate the scripts for several tasks at once
+        
+        The scripts do not depend on each other, so the AI calls run
+        concurrently (within the backend's concurrency limit).
+        
+        Returns:
+            One script per task, None where generation failed
+        """
+        ai = get_async_brain()
+        results = await ai.gather(
+            *(ai.run(self.generate_script, task, backend=self.ai.active) for task in tasks),
+            return_exceptions=True
+        )
+        return [None if isinstance(r, BaseException) else r for r in results]
+
     def validate_syntax(self, code: str) -> bool:
         """Validate Python syntax using AST"""
         try:
@@ -203,15 +226,15 @@ Complexity: {task['complexity']}
             'generated_scripts': generated_scripts
         }
         
-        with open(self.generated_tasks_file, 'w') as f:
-            json.dump(metadata, f, indent=2)
+        write_json(self.generated_tasks_file, metadata)
 
-    def generate(self, task_index: int = 0) -> Dict:
+    def generate(self, task_index: int = 0, all_tasks: bool = False) -> Dict:
         """
         Main generation workflow
         
         Args:
             task_index: Index of task to generate (0 = first task)
+            all_tasks: Generate every suggested task (concurrently) instead
         """
         console.print("\n[bold cyan]🚀 Starting Script Generation...[/bold cyan]")
         
@@ -233,6 +256,9 @@ Complexity: {task['complexity']}
             console.print(f"   Description: {task['description']}")
             console.print(f"   Complexity: {task['complexity']}")
         
+        if all_tasks:
+            return self._generate_all(tasks)
+        
         # Generate script for specified task
         if task_index >= len(tasks):
             console.print(f"[bold red]❌ Invalid task index: {task_index}[/bold red]")
@@ -271,6 +297,33 @@ Complexity: {task['complexity']}
             'all_tasks': tasks
         }
 
+    def _generate_all(self, tasks: List[Dict]) -> Dict:
+        """Generate, validate and save a script for every task"""
+        console.print(f"\n[bold green]✨ Generating scripts for {len(tasks)} tasks[/bold green]")
+        codes = run_sync(self.agenerate_scripts(tasks))
+        
+        generated_scripts = []
+        for task, code in zip(tasks, codes):
+            if not code or not self.validate_syntax(code):
+                console.print(f"[bold red]❌ Skipping {task['name']}: no valid script[/bold red]")
+                continue
+            self.preview_script(code, task['name'])
+            generated_scripts.append({
+                'task': task,
+                'script_path': str(self.save_script(task, code)),
+                'generated_at': datetime.now().isoformat()
+            })
+        
+        if not generated_scripts:
+            return {}
+        self.save_task_metadata(tasks, generated_scripts)
+        
+        console.print(f"\n[bold green]✅ Generated {len(generated_scripts)} scripts![/bold green]\n")
+        
+        return {
+            'scripts': generated_scripts,
+            'all_tasks': tasks
+        }
 
 if __name__ == "__main__":
     # Quick test
@@ -0,0 +1,188 @@
+"""
+JSON Files - Atomic writes and cached reads for the shared data directory
+
+The observer, analyzer, generator, notifier and the timer services all read
+and write `data/*.json` concurrently. Writing in place lets a reader catch a
+half-written file; these helpers make that impossible:
+
+- write_json() writes a unique temporary file in the same directory, fsyncs
+  it and renames it over the target, so readers see the old or the new
+  document, never a torn one
+- writers serialize on an flock'd `.<name>.lock` sidecar that also holds the
+  file's generation counter, bumped on every write; readers never lock
+- update_json() is a read-modify-write under that lock, so concurrent
+  updates are never lost
+- read_json() caches parsed documents per process, keyed by the file's
+  (inode, mtime_ns, size); every write renames in a new inode, so an
+  unchanged key means unchanged content and the parse is skipped
+
+Documents are encoded with the shared codec (compact unless the pretty
+debug flag is set).
+"""
+
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+try:
+    import fcntl
+    HAS_FCNTL = True
+except ImportError:  # non-POSIX: writers are still atomic, just not serialized
+    HAS_FCNTL = False
+
+from ..utils.logger import get_logger
+from . import codec
+
+logger = get_logger("jarvisos.json_files")
+
+GENERATION_WIDTH = 20  # fixed width so the counter is rewritten in place
+
+_cache: Dict[str, Tuple[Tuple[int, int, int], bytes, Any]] = {}
+_cache_lock = threading.Lock()
+
+
+def _lock_path(path: Path) -> Path:
+    return path.with_name(f".{path.name}.lock")
+
+
+@contextmanager
+def _locked(path: Path) -> Iterator[int]:
+    """Hold the writer lock for `path`; yields the lock file descriptor"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(_lock_path(path), os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if HAS_FCNTL:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+        yield fd
+    finally:
+        os.close(fd)  # closing releases the flock
+
+
+def _read_generation(fd: int) -> int:
+    raw = os.pread(fd, GENERATION_WIDTH, 0).strip()
+    return int(raw) if raw.isdigit() else 0
+
+
+def generation(path) -> int:
+    """Number of writes made to `path` through this module (0 if none)"""
+    try:
+        fd = os.open(_lock_path(Path(path)), os.O_RDONLY)
+    except FileNotFoundError:
+        return 0
+    try:
+        return _read_generation(fd)
+    finally:
+        os.close(fd)
+
+
+def _replace(path: Path, data: Any, fd: int, pretty: Optional[bool]) -> int:
+    """Write `data` beside `path`, rename it into place and bump the generation"""
+    encoded = codec.encode(data, pretty)
+    tmp_fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(tmp_fd, 'wb') as f:
+            f.write(encoded)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+    gen = _read_generation(fd) + 1
+    os.pwrite(fd, f"{gen:0{GENERATION_WIDTH}d}".encode(), 0)
+    return gen
+
+
+def write_json(path, data: Any, pretty: Optional[bool] = None) -> int:
+    """
+    Atomically replace `path` with `data` serialized as JSON
+
+    Args:
+        path: Target file
+        data: JSON-serializable document
+        pretty: Indent the file; None follows the codec's debug flag
+
+    Returns:
+        The file's new generation
+    """
+    path = Path(path)
+    with _locked(path) as fd:
+        return _replace(path, data, fd, pretty)
+
+
+def update_json(path, update: Callable[[Any], Any], default: Any = None,
+                pretty: Optional[bool] = None) -> Any:
+    """
+    Read-modify-write `path` under the writer lock
+
+    Args:
+        path: Target file
+        update: Called with the current document (or `default` when the file
+            is missing or unreadable); returns the new document
+        default: Starting document
+        pretty: Indent the file; None follows the codec's debug flag
+
+    Returns:
+        The document written
+    """
+    path = Path(path)
+    with _locked(path) as fd:
+        current = read_json(path, default, mutable=True)
+        data = update(current)
+        _replace(path, data, fd, pretty)
+        return data
+
+
+def read_json(path, default: Any = None, mutable: bool = False) -> Any:
+    """
+    Read a JSON file, reusing the parsed document while the file is unchanged
+
+    Args:
+        path: File to read
+        default: Returned when the file is missing or not valid JSON
+        mutable: Return a private copy the caller may modify; by default the
+            cached document is shared and must be treated as read-only
+
+    Returns:
+        The parsed document, or `default`
+    """
+    key = str(path)
+    try:
+        with open(path, 'rb') as f:
+            st = os.fstat(f.fileno())
+            stamp = (st.st_ino, st.st_mtime_ns, st.st_size)
+            cached = _cache.get(key)
+            if cached is not None and cached[0] == stamp:
+                raw, data = cached[1], cached[2]
+            else:
+                raw = f.read()
+                data = None
+    except FileNotFoundError:
+        return default
+    except OSError as e:
+        logger.warning(f"Failed to read {path}: {e}")
+        return default
+
+    if data is None:
+        try:
+            data = codec.decode(raw)
+        except ValueError as e:
+            logger.warning(f"Ignoring invalid JSON in {path}: {e}")
+            return default
+        with _cache_lock:
+            _cache[key] = (stamp, raw, data)
+
+    return codec.decode(raw) if mutable else data
+
+
+def clear_cache() -> None:
+    """Forget every cached document"""
+    with _cache_lock:
+        _cache.clear()
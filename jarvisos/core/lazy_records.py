@@ -0,0 +1,271 @@
+"""
+Lazy Records - Memory-mapped, field-projected iteration over observation files
+
+Readers yield one record at a time straight from a memory map, so peak
+memory tracks the largest record rather than the file:
+
+- map_lines() walks a JSON-lines segment and yields each complete line
+- iter_array() streams the elements of a large JSON array (the legacy
+  ``{"observations": [...]}`` document) by decoding it chunk by chunk
+- project() keeps only the dotted fields a consumer asked for, e.g.
+  ``('timestamp', 'system.cpu_percent', 'apps.name')``, so whatever the
+  consumer retains per record stays small
+
+Pages already consumed are handed back to the kernel as the readers move
+on, so the mapped file does not accumulate in resident memory either.
+Archived (``.zst``/``.gz``) files cannot be mapped; they are decompressed
+as a stream instead (see compression).
+"""
+
+import codecs
+import json
+import mmap
+import os
+import re
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional, Tuple, Union
+
+from . import codec
+from .compression import Dictionaries, compressed_suffix, open_stream, stream_lines
+
+CHUNK_SIZE = 1 << 20  # bytes decoded at a time by iter_array
+RELEASE_SIZE = 8 << 20  # consumed bytes handed back to the kernel at once
+
+FieldSpec = Dict[str, Optional['FieldSpec']]
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+# ----------------------------------------------------------------------
+# Field projection
+# ----------------------------------------------------------------------
+
+def compile_fields(fields: Iterable[str]) -> FieldSpec:
+    """
+    Turn dotted field paths into a projection tree
+
+    ``['timestamp', 'system.cpu_percent', 'system.memory_percent']`` becomes
+    ``{'timestamp': None, 'system': {'cpu_percent': None, 'memory_percent': None}}``
+    where None keeps the whole value. A whole field wins over its subfields.
+    """
+    spec: FieldSpec = {}
+    for field in fields:
+        node = spec
+        parts = field.split('.')
+        for part in parts[:-1]:
+            if part in node and node[part] is None:
+                break
+            node = node.setdefault(part, {})
+        else:
+            node[parts[-1]] = None
+    return spec
+
+
+def project(value, spec: Optional[FieldSpec]):
+    """
+    Keep only the fields in `spec` (from compile_fields)
+
+    Lists are projected element-wise, so ``apps.name`` keeps a list of
+    ``{'name': ...}`` dicts. Missing fields are left out.
+    """
+    if spec is None:
+        return value
+    if isinstance(value, dict):
+        return {key: project(value[key], sub) for key, sub in spec.items() if key in value}
+    if isinstance(value, list):
+        return [project(item, spec) for item in value]
+    return value
+
+
+# ----------------------------------------------------------------------
+# Memory-mapped readers
+# ----------------------------------------------------------------------
+
+class _Mapping:
+    """Read-only map of a file that releases pages behind the reader"""
+
+    def __init__(self, f):
+        self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.released = 0
+        if hasattr(self.mm, 'madvise'):
+            self.mm.madvise(mmap.MADV_SEQUENTIAL)
+
+    def release(self, upto: int) -> None:
+        """Drop resident pages before byte `upto` (they are re-read if touched again)"""
+        upto -= upto % mmap.PAGESIZE
+        if upto - self.released >= RELEASE_SIZE and hasattr(mmap, 'MADV_DONTNEED'):
+            self.mm.madvise(mmap.MADV_DONTNEED, self.released, upto - self.released)
+            self.released = upto
+
+    def close(self) -> None:
+        self.mm.close()
+
+
+def map_lines(path: Union[str, Path], offset: int = 0,
+              dictionaries: Optional[Dictionaries] = None) -> Iterator[Tuple[bytes, int]]:
+    """
+    Yield each complete line of a JSON-lines file
+
+    Args:
+        path: File to read (compressed files are streamed instead)
+        offset: Byte offset to start from (a previous line end)
+        dictionaries: zstd dictionaries for compressed files
+
+    Yields:
+        (line including its newline, byte offset just after it); a trailing
+        line without newline (a write in progress) is not yielded
+    """
+    if compressed_suffix(path):
+        yield from stream_lines(path, offset, dictionaries)
+        return
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size <= offset:
+            return
+        mapping = _Mapping(f)
+        try:
+            mm = mapping.mm
+            pos = offset
+            while True:
+                end = mm.find(b'\n', pos)
+                if end < 0:
+                    return
+                yield mm[pos:end + 1], end + 1
+                pos = end + 1
+                mapping.release(pos)
+        finally:
+            mapping.close()
+
+
+class _ChunkedText:
+    """Text window sliding over a byte source, refilled on demand"""
+
+    def __init__(self, read, chunk_size: int, release=None):
+        self.read = read
+        self.release = release
+        self.chunk_size = chunk_size
+        self.utf8 = codecs.getincrementaldecoder('utf-8')()
+        self.decoder = json.JSONDecoder()
+        self.buf = ''
+        self.idx = 0
+        self.pos = 0
+
+    def more(self) -> bool:
+        """Append the next chunk, dropping text already consumed"""
+        chunk = self.read(self.chunk_size)
+        if not chunk:
+            self.utf8.decode(b'', final=True)  # raises on a truncated character
+            return False
+        self.pos += len(chunk)
+        self.buf = self.buf[self.idx:] + self.utf8.decode(chunk)
+        self.idx = 0
+        if self.release is not None:
+            self.release(self.pos)
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character ('' at end of file)"""
+        while True:
+            self.idx = _WHITESPACE.match(self.buf, self.idx).end()
+            if self.idx < len(self.buf):
+                return self.buf[self.idx]
+            if not self.more():
+                return ''
+
+    def value(self):
+        """Decode the JSON value at the cursor, reading further chunks as needed"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.idx)
+            except json.JSONDecodeError:
+                if not self.more():
+                    raise
+                continue
+            # A number cut by the window edge ("12" of "12.5") parses short:
+            # only accept a value once the character after it is in view
+            after = _WHITESPACE.match(self.buf, end).end()
+            if after == len(self.buf) or (isinstance(value, (int, float))
+                                          and self.buf[after] not in ',]}'):
+                if self.more():
+                    continue
+            self.idx = end
+            return value
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise json.JSONDecodeError(f"Expecting '{char}'", self.buf, self.idx)
+        self.idx += 1
+
+    def elements(self) -> Iterator:
+        """Yield the elements of the array at the cursor"""
+        self.expect('[')
+        while True:
+            c = self.peek()
+            if c == ']':
+                self.idx += 1
+                return
+            if c == ',':
+                self.idx += 1
+                continue
+            if c == '':
+                raise json.JSONDecodeError("Unterminated array", self.buf, self.idx)
+            yield self.value()
+
+
+def iter_array(path: Union[str, Path], key: Optional[str] = 'observations',
+               chunk_size: int = CHUNK_SIZE,
+               dictionaries: Optional[Dictionaries] = None) -> Iterator:
+    """
+    Stream the elements of a JSON array without loading the document
+
+    Args:
+        path: File holding either a top-level array or an object whose
+            `key` member is an array (other members are skipped)
+        key: Member to stream when the document is an object
+        chunk_size: Bytes decoded at a time
+        dictionaries: zstd dictionaries for a compressed file
+
+    Raises:
+        json.JSONDecodeError: If the document is malformed
+    """
+    if compressed_suffix(path):
+        with open_stream(path, dictionaries) as f:
+            yield from _document_elements(_ChunkedText(f.read, chunk_size), key)
+        return
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            raise json.JSONDecodeError("Empty document", '', 0)
+        mapping = _Mapping(f)
+        try:
+            yield from _document_elements(_ChunkedText(mapping.mm.read, chunk_size, mapping.release), key)
+        finally:
+            mapping.close()
+
+
+def _document_elements(text: _ChunkedText, key: Optional[str]) -> Iterator:
+    """Elements of the top-level array, or of the array under `key`"""
+    c = text.peek()
+    if c == '[':
+        yield from text.elements()
+        return
+    text.expect('{')
+    while True:
+        c = text.peek()
+        if c in ('}', ''):
+            return
+        if c == ',':
+            text.idx += 1
+            continue
+        name = text.value()
+        text.expect(':')
+        if name == key and text.peek() == '[':
+            yield from text.elements()
+            return
+        text.value()
+
+
+def iter_lines(path: Union[str, Path], offset: int = 0,
+               dictionaries: Optional[Dictionaries] = None) -> Iterator[Tuple[Dict, int]]:
+    """Decode each complete line of a JSON-lines file; yields (record, end offset)"""
+    for raw, end in map_lines(path, offset, dictionaries):
+        yield codec.decode(raw), end
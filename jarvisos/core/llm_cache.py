@@ -0,0 +1,204 @@
+"""
+LLM Cache - Content-addressed cache of AI responses in SQLite
+
+The same prompts are sent again and again: `jarvis analyze` on unchanged
+statistics, task suggestions from the same insights, the intent behind
+"opened VSCode". Responses are cached under a digest of
+(backend, model, normalized prompt, options), so any change to what is
+asked, or how, is a different entry.
+
+- Each call site opts in with a TTL (TTLS); sites without one are never
+  cached, since their prompts are not meant to repeat
+- The cache is bounded by bytes and evicts the least recently used
+  entries; expired entries are dropped first
+- Hits and misses are counted per call site and kept in the database, so
+  `jarvis status` shows them across the short-lived CLI processes
+- `jarvis --no-cache`, JARVIS_LLM_CACHE=off or set_bypass(True) skip the
+  cache entirely (no reads, no writes); callers can also pass cache=False
+
+Failed generations (None or an exception) are never stored.
+"""
+
+import hashlib
+import os
+import re
+import time
+from typing import Any, Callable, Dict, Optional
+
+from ..utils.logger import get_logger
+from . import codec
+from .state_store import SQLiteStore
+
+logger = get_logger("jarvisos.llm_cache")
+
+LLM_CACHE_DB = "llm_cache.db"
+MAX_BYTES = 64 << 20
+
+# Seconds a response stays valid, per call site
+TTLS = {
+    'analyze': 7 * 86400,  # the prompt is the statistics; new data is a new key
+    'suggest_tasks': 86400,
+    'generate_script': 86400,
+    'understand_intent': 3600,
+}
+
+BYPASS = os.environ.get('JARVIS_LLM_CACHE', '').lower() in ('0', 'off', 'false', 'no')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key      TEXT PRIMARY KEY,
+    site     TEXT NOT NULL,
+    response TEXT NOT NULL,
+    bytes    INTEGER NOT NULL,
+    created  REAL NOT NULL,
+    expires  REAL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+
+CREATE TABLE IF NOT EXISTS counters (
+    site   TEXT PRIMARY KEY,
+    hits   INTEGER NOT NULL DEFAULT 0,
+    misses INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+_SPACES = re.compile(r'[ \t]+')
+_BLANK_LINES = re.compile(r'\n{3,}')
+
+
+def set_bypass(enabled: bool) -> None:
+    """Turn cache bypass on or off for the whole process"""
+    global BYPASS
+    BYPASS = enabled
+
+
+def normalize_prompt(prompt: str) -> str:
+    """
+    The prompt with insignificant whitespace removed
+
+    Line endings become LF, runs of spaces and tabs one space, lines lose
+    their surrounding whitespace, blank-line runs collapse to one, and the
+    whole is stripped, so re-indented template strings share entries.
+    """
+    text = prompt.replace('\r\n', '\n').replace('\r', '\n')
+    text = '\n'.join(_SPACES.sub(' ', line).strip() for line in text.split('\n'))
+    return _BLANK_LINES.sub('\n\n', text).strip()
+
+
+def cache_key(backend: str, model: str, prompt: str,
+              options: Optional[Dict[str, Any]] = None) -> str:
+    """Digest of everything that determines a response"""
+    document = [backend, model, normalize_prompt(prompt),
+                sorted((options or {}).items())]
+    return hashlib.sha256(codec.encode(document, pretty=False)).hexdigest()
+
+
+class LLMCache(SQLiteStore):
+    """
+    Response cache in one SQLite database
+
+    Args:
+        path: Database file, or a directory to hold llm_cache.db
+        max_bytes: Size bound on the stored responses
+    """
+
+    def __init__(self, path="data", max_bytes: int = MAX_BYTES):
+        super().__init__(path, LLM_CACHE_DB, SCHEMA)
+        self.max_bytes = max_bytes
+
+    # ------------------------------------------------------------------
+    # Entries
+    # ------------------------------------------------------------------
+
+    def get(self, key: str, site: str) -> Optional[str]:
+        """The cached response for `key`, counting a hit or miss for `site`"""
+        now = time.time()
+        with self.transaction() as db:
+            row = db.execute("SELECT response, expires FROM entries WHERE key = ?",
+                             (key,)).fetchone()
+            if row is not None and row['expires'] is not None and row['expires'] <= now:
+                db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                row = None
+            if row is not None:
+                db.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+            column = 'hits' if row is not None else 'misses'
+            db.execute(f"INSERT INTO counters (site, {column}) VALUES (?, 1) "
+                       f"ON CONFLICT (site) DO UPDATE SET {column} = {column} + 1", (site,))
+        return row['response'] if row is not None else None
+
+    def put(self, key: str, site: str, response: str, ttl: Optional[float] = None) -> None:
+        """Store a response, then evict least recently used entries over the bound"""
+        now = time.time()
+        size = len(response.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+        with self.transaction() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, site, response, size, now, now + ttl if ttl is not None else None, now)
+            )
+            self._evict(db, now)
+
+    def _evict(self, db, now: float) -> None:
+        db.execute("DELETE FROM entries WHERE expires IS NOT NULL AND expires <= ?", (now,))
+        total = db.execute("SELECT COALESCE(SUM(bytes), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        victims = []
+        for row in db.execute("SELECT key, bytes FROM entries ORDER BY accessed"):
+            if total <= self.max_bytes:
+                break
+            victims.append((row['key'],))
+            total -= row['bytes']
+        db.executemany("DELETE FROM entries WHERE key = ?", victims)
+        logger.debug(f"Evicted {len(victims)} cached responses")
+
+    def cached(self, site: str, backend: str, model: str, prompt: str,
+               options: Optional[Dict[str, Any]], compute: Callable[[], Optional[str]],
+               cache: bool = True) -> Optional[str]:
+        """
+        The response for this request: cached, or computed and stored
+
+        Args:
+            site: Call site, which picks the TTL; sites without one in
+                TTLS are computed every time
+            backend, model, prompt, options: What determines the response
+            compute: Produces the response on a miss
+            cache: False bypasses the cache for this call
+        """
+        if BYPASS or not cache or site not in TTLS:
+            return compute()
+        key = cache_key(backend, model, prompt, options)
+        response = self.get(key, site)
+        if response is not None:
+            return response
+        response = compute()
+        if response is not None:
+            self.put(key, site, response, TTLS[site])
+        return response
+
+    def clear(self) -> None:
+        """Drop every entry and counter"""
+        with self.transaction() as db:
+            db.execute("DELETE FROM entries")
+            db.execute("DELETE FROM counters")
+
+    def stats(self) -> Dict[str, Any]:
+        """Entry count, bytes and per-site hit/miss counters"""
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM entries").fetchone()
+            sites = {row['site']: {'hits': row['hits'], 'misses': row['misses']}
+                     for row in self._conn.execute("SELECT * FROM counters ORDER BY site")}
+        hits = sum(s['hits'] for s in sites.values())
+        lookups = hits + sum(s['misses'] for s in sites.values())
+        return {
+            'entries': entries,
+            'bytes': size,
+            'max_bytes': self.max_bytes,
+            'hits': hits,
+            'misses': lookups - hits,
+            'hit_rate': hits / lookups if lookups else None,
+            'sites': sites,
+        }
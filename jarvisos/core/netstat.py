@@ -0,0 +1,200 @@
+"""
+Network Collector - Cheap socket counts and interface rates
+
+psutil.net_connections() walks every socket and maps it to a pid by
+scanning /proc/*/fd, only for the observer to take len() of the result.
+This collector reads the kernel's own counters instead:
+
+- /proc/net/sockstat{,6} for per-protocol sockets in use
+- /proc/net/{tcp,tcp6,udp,udp6} for connection counts by TCP state
+- /proc/net/snmp for TCP opens, reported per second
+- psutil.net_io_counters() for interface byte and packet rates
+
+Where /proc is unavailable it falls back to psutil for everything.
+"""
+
+import os
+import sys
+import time
+from typing import Dict, Optional
+
+import psutil
+
+from ..utils.logger import get_observer_logger
+
+logger = get_observer_logger()
+
+CONNECTION_TABLES = ('tcp', 'tcp6', 'udp', 'udp6')
+
+# Hex state codes used in /proc/net/tcp (include/net/tcp_states.h)
+TCP_ESTABLISHED = b'01'
+TCP_TIME_WAIT = b'06'
+TCP_LISTEN = b'0A'
+
+PSUTIL_STATES = {
+    psutil.CONN_ESTABLISHED: 'tcp_established',
+    psutil.CONN_LISTEN: 'tcp_listen',
+    psutil.CONN_TIME_WAIT: 'tcp_time_wait',
+}
+
+
+class NetworkCollector:
+    """
+    Network activity sampler for Observer.get_system_stats
+
+    Args:
+        proc_root: procfs mount point (overridable for tests)
+        use_procfs: Force (True) or disable (False) the /proc path; None
+            picks it automatically
+    """
+
+    def __init__(self, proc_root: str = "/proc", use_procfs: Optional[bool] = None,
+                 clock=time.monotonic):
+        self.proc_root = proc_root
+        if use_procfs is None:
+            use_procfs = self.available(proc_root)
+        self.use_procfs = use_procfs
+        self._clock = clock
+
+        self._last_io = None      # (timestamp, net_io_counters)
+        self._last_opens = None   # (timestamp, active + passive opens)
+
+    @staticmethod
+    def available(proc_root: str = "/proc") -> bool:
+        """Check whether /proc/net exposes the socket tables"""
+        return (sys.platform.startswith('linux')
+                and os.path.exists(os.path.join(proc_root, 'net', 'sockstat')))
+
+    def _read(self, *parts: str) -> bytes:
+        with open(os.path.join(self.proc_root, 'net', *parts), 'rb') as f:
+            return f.read()
+
+    # ------------------------------------------------------------------
+    # /proc readers
+    # ------------------------------------------------------------------
+
+    def _sockstat(self) -> Dict[str, int]:
+        """Sockets in use per protocol from sockstat and sockstat6"""
+        counts = {}
+        for name in ('sockstat', 'sockstat6'):
+            try:
+                data = self._read(name)
+            except OSError:
+                continue
+            for line in data.splitlines():
+                proto, _, rest = line.partition(b':')
+                fields = rest.split()
+                values = dict(zip(fields[::2], fields[1::2]))
+                proto = proto.decode().lower()
+                if proto == 'sockets':
+                    counts['sockets_used'] = int(values.get(b'used', 0))
+                elif proto in ('tcp', 'tcp6', 'udp', 'udp6'):
+                    counts[f'{proto}_inuse'] = int(values.get(b'inuse', 0))
+                    if b'tw' in values:
+                        counts['tcp_tw'] = int(values[b'tw'])
+        return counts
+
+    def _connections(self) -> Dict[str, int]:
+        """Connection counts per table, plus TCP states"""
+        counts = {'connections': 0, 'tcp_established': 0, 'tcp_listen': 0,
+                  'tcp_time_wait': 0}
+        for table in CONNECTION_TABLES:
+            try:
+                data = self._read(table)
+            except OSError:
+                continue
+            lines = data.splitlines()[1:]  # skip the header
+            counts['connections'] += len(lines)
+            if table.startswith('tcp'):
+                for line in lines:
+                    state = line.split(None, 4)[3]
+                    if state == TCP_ESTABLISHED:
+                        counts['tcp_established'] += 1
+                    elif state == TCP_LISTEN:
+                        counts['tcp_listen'] += 1
+                    elif state == TCP_TIME_WAIT:
+                        counts['tcp_time_wait'] += 1
+        return counts
+
+    def _tcp_opens(self) -> Optional[int]:
+        """Cumulative TCP active + passive opens from /proc/net/snmp"""
+        try:
+            data = self._read('snmp')
+        except OSError:
+            return None
+        header = values = None
+        for line in data.splitlines():
+            if line.startswith(b'Tcp:'):
+                if header is None:
+                    header = line.split()
+                else:
+                    values = line.split()
+                    break
+        if values is None:
+            return None
+        fields = dict(zip(header, values))
+        return int(fields[b'ActiveOpens']) + int(fields[b'PassiveOpens'])
+
+    # ------------------------------------------------------------------
+    # psutil fallback
+    # ------------------------------------------------------------------
+
+    def _psutil_connections(self) -> Dict[str, int]:
+        counts = {'connections': 0, 'tcp_established': 0, 'tcp_listen': 0,
+                  'tcp_time_wait': 0}
+        try:
+            connections = psutil.net_connections(kind='inet')
+        except (psutil.AccessDenied, PermissionError):
+            return counts
+        counts['connections'] = len(connections)
+        for conn in connections:
+            key = PSUTIL_STATES.get(conn.status)
+            if key:
+                counts[key] += 1
+        return counts
+
+    # ------------------------------------------------------------------
+    # Sampling
+    # ------------------------------------------------------------------
+
+    def _rate(self, previous, current: float, now: float) -> Optional[float]:
+        if previous is None:
+            return None
+        elapsed = now - previous[0]
+        if elapsed <= 0:
+            return 0.0
+        return round(max(current - previous[1], 0) / elapsed, 2)
+
+    def sample(self) -> Dict:
+        """
+        Sample network activity
+
+        Returns:
+            Socket counts plus per-second rates since the previous call.
+            Rates are None on the first call.
+        """
+        now = self._clock()
+        stats: Dict = {}
+
+        if self.use_procfs:
+            stats.update(self._sockstat())
+            stats.update(self._connections())
+            opens = self._tcp_opens()
+            if opens is not None:
+                stats['tcp_opens_per_s'] = self._rate(self._last_opens, opens, now)
+                self._last_opens = (now, opens)
+        else:
+            stats.update(self._psutil_connections())
+
+        try:
+            io = psutil.net_io_counters()
+        except (OSError, RuntimeError):
+            io = None
+        if io is not None:
+            last = self._last_io
+            for field in ('bytes_sent', 'bytes_recv', 'packets_sent', 'packets_recv'):
+                previous = (last[0], getattr(last[1], field)) if last else None
+                stats[f'{field}_per_s'] = self._rate(previous, getattr(io, field), now)
+            self._last_io = (now, io)
+
+        return stats
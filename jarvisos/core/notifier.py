@@ -3,7 +3,6 @@ JarvisOS Proactive Notification System
 Makes Jarvis speak when he has something to say
 """
 
-import json
 from pathlib import Path
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
@@ -14,6 +13,8 @@ from ..voice.jarvis_voice import JarvisVoice
 from ..utils.logger import get_logger
 from .personality import JarvisPersonality
 from .context import ContextAnalyzer
+from .json_files import read_json
+from .state_store import open_state
 
 # Native notifications
 try:
@@ -21,7 +22,8 @@ try:
     NATIVE_NOTIFICATIONS = True
 except ImportError:
     NATIVE_NOTIFICATIONS = False
-    logger = get_logger("jarvisos.notifier")
+
+logger = get_logger("jarvisos.notifier")
 console = Console()
 
 
@@ -34,7 +36,7 @@ class ProactiveNotifier:
         
         self.insights_file = self.data_dir / "insights.json"
         self.notifications_file = self.data_dir / "notifications.json"
-        self.last_notify_file = self.data_dir / "last_notification.json"
+        self.store = open_state(self.data_dir)
         
         self.use_voice = use_voice
         self.jarvis = JarvisVoice() if use_voice else None
@@ -43,14 +45,12 @@ class ProactiveNotifier:
     
     def should_notify(self) -> bool:
         """Check if we should notify user (not too frequent)"""
-        if not self.last_notify_file.exists():
+        last_notified = self.store.get_value('last_notification')
+        if not last_notified:
             return True
         
         try:
-            with open(self.last_notify_file) as f:
-                data = json.load(f)
-            
-            last_time = datetime.fromisoformat(data['timestamp'])
+            last_time = datetime.fromisoformat(last_notified)
             
             # Don't notify more than once per hour
             if datetime.now() - last_time < timedelta(hours=1):
@@ -62,31 +62,24 @@ class ProactiveNotifier:
     
     def mark_notified(self):
         """Mark that we just notified"""
-        data = {
-            'timestamp': datetime.now().isoformat()
-        }
-        
-        with open(self.last_notify_file, 'w') as f:
-            json.dump(data, f, indent=2)
+        self.store.set_value('last_notification', datetime.now().isoformat())
     
     def check_for_insights(self) -> bool:
         """Check if there are new insights to share"""
-        if not self.insights_file.exists():
+        insights = read_json(self.insights_file)
+        if not isinstance(insights, dict):
             return False
         
-        try:
-            with open(self.insights_file) as f:
-                insights = json.load(f)
-            
-            # Check if insights are recent (within last 24h)
-            if 'timestamp' in insights:
+        # Check if insights are recent (within last 24h)
+        if 'timestamp' in insights:
+            try:
                 insight_time = datetime.fromisoformat(insights['timestamp'])
-                if datetime.now() - insight_time < timedelta(hours=24):
-                    return True
-            
-            return False
-        except:
-            return False
+            except (TypeError, ValueError):
+                return False
+            if datetime.now() - insight_time < timedelta(hours=24):
+                return True
+        
+        return False
     
     def notify_insights_ready(self):
         """Notify user that insights are ready"""
@@ -0,0 +1,830 @@
+"""
+Observation Log - Append-only, time-partitioned storage for observer ticks
+
+Each tick is written as one compact JSON line to the active segment.
+Segments live under a day/hour partition (``YYYY-MM-DD/HH/``) and rotate
+when the hour changes or they grow too large. A small manifest lists every
+segment with its time range, record count and min/max stats, so readers
+can answer counts without touching data and range queries only open the
+partitions that overlap.
+
+Readers memory-map files and yield one record at a time; pass `fields`
+(dotted paths) to keep only what a consumer needs from each record.
+
+Sealed segments are later compressed in place by archive() (zstd with a
+trained dictionary, or gzip); readers resolve each manifest entry to
+whichever file exists and stream archived ones transparently.
+
+One process appends at a time: the writer holds an exclusive flock on
+``writer.lock`` from its first append until close(), and a second writer
+fails with WriterLockedError instead of sealing the first one's active
+segment as crashed.
+"""
+
+import os
+import tempfile
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+try:
+    import fcntl
+    HAS_FCNTL = True
+except ImportError:  # non-POSIX: writers are not serialized
+    HAS_FCNTL = False
+
+from ..utils.logger import get_observer_logger
+from . import codec
+from . import compression
+from .compression import Dictionaries, resolve
+from .json_files import read_json, update_json
+from .lazy_records import compile_fields, iter_array, iter_lines, project
+from .snapshot_codec import (SnapshotDecoder, SnapshotEncoder,
+                             decode_observation, encode_observation)
+
+logger = get_observer_logger()
+
+MANIFEST_NAME = "manifest.json"
+WRITER_LOCK_NAME = "writer.lock"
+ARCHIVE_STATS_NAME = "archive.json"
+LEGACY_COUNTS_NAME = "legacy.json"
+SEGMENT_PREFIX = "segment-"
+SEGMENT_SUFFIX = ".jsonl"
+MANIFEST_VERSION = 2
+MANIFEST_SAVE_INTERVAL = 60  # seconds between manifest refreshes while writing
+
+# Per-segment min/max stats kept in the manifest
+STAT_FIELDS = ('cpu_percent', 'memory_percent')
+
+TimeLike = Union[str, datetime, None]
+
+
+def parse_time(value: TimeLike) -> Optional[datetime]:
+    """Accept a datetime or an ISO string (as stored in 'timestamp')"""
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value)
+
+
+def resolve_time(value: Optional[str], now: Optional[datetime] = None) -> Optional[datetime]:
+    """
+    Parse a command-line time bound
+
+    Accepts ISO timestamps ('2025-10-17', '2025-10-17T09:30'), 'today',
+    'yesterday', and relative offsets such as '90s', '15m', '2h' or '7d'.
+    """
+    if value is None:
+        return None
+    now = now or datetime.now()
+    text = value.strip().lower()
+    midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    if text == 'now':
+        return now
+    if text == 'today':
+        return midnight
+    if text == 'yesterday':
+        return midnight - timedelta(days=1)
+    units = {'s': 'seconds', 'm': 'minutes', 'h': 'hours', 'd': 'days', 'w': 'weeks'}
+    if text[-1:] in units and text[:-1].replace('.', '', 1).isdigit():
+        return now - timedelta(**{units[text[-1]]: float(text[:-1])})
+    return datetime.fromisoformat(value)
+
+
+def _file_token(path: Path) -> str:
+    """Name, size and modification time of a file ('-' if it is missing)"""
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return f"{path.name}:-"
+    return f"{path.name}:{st.st_size}:{st.st_mtime_ns}"
+
+
+def partition_of(timestamp: Optional[str]) -> str:
+    """Hour partition key ('YYYY-MM-DDTHH') for an ISO timestamp"""
+    if not timestamp or len(timestamp) < 13:
+        timestamp = datetime.now().isoformat()
+    return timestamp[:13]
+
+
+def empty_stats() -> Dict:
+    return {field: None for field in STAT_FIELDS + ('apps',)}
+
+
+def update_stats(stats: Dict, record: Dict) -> None:
+    """Fold one observation into a segment's [min, max] stats"""
+    system = record.get('system') or {}
+    values = {field: system.get(field) for field in STAT_FIELDS}
+    if 'apps' in record:
+        values['apps'] = len(record['apps'])
+    for field, value in values.items():
+        if value is None:
+            continue
+        current = stats.get(field)
+        if current is None:
+            stats[field] = [value, value]
+        elif value < current[0]:
+            current[0] = value
+        elif value > current[1]:
+            current[1] = value
+
+
+def merge_stats(target: Dict, stats: Dict) -> None:
+    """Merge one [min, max] stats dict into another"""
+    for field, bounds in (stats or {}).items():
+        if bounds is None:
+            continue
+        current = target.get(field)
+        if current is None:
+            target[field] = list(bounds)
+        else:
+            current[0] = min(current[0], bounds[0])
+            current[1] = max(current[1], bounds[1])
+
+
+class WriterLockedError(RuntimeError):
+    """Another process is already appending to the observation log"""
+
+
+class ObservationLog:
+    """
+    Append-only, segmented observation log
+
+    Writes cost one line per tick regardless of run length. The manifest is
+    only rewritten when a segment is opened, rotated or flushed, and a torn
+    trailing line left by a crash is dropped on the next open.
+
+    Process lists are delta-encoded (see snapshot_codec); every segment
+    starts with a keyframe so each one decodes on its own.
+
+    While writing, the manifest is also refreshed every
+    ``manifest_interval`` seconds so other processes can read counts from
+    it alone.
+    """
+
+    def __init__(self, log_dir, max_segment_bytes: int = 16 * 1024 * 1024,
+                 max_segment_age: int = 3600,
+                 encoder: Optional[SnapshotEncoder] = None,
+                 manifest_interval: float = MANIFEST_SAVE_INTERVAL):
+        self.log_dir = Path(log_dir)
+        self.manifest_file = self.log_dir / MANIFEST_NAME
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segment_age = max_segment_age
+        self.manifest_interval = manifest_interval
+        self.encoder = encoder or SnapshotEncoder()
+        self.dictionaries = Dictionaries(self.log_dir / compression.DICT_DIR)
+
+        self.manifest = self._load_manifest()
+        self._writer_fd: Optional[int] = None
+        self._fh = None
+        self._active: Optional[Dict] = None
+        self._opened_at = 0.0
+        self._manifest_saved_at = 0.0
+
+    # ------------------------------------------------------------------
+    # Manifest
+    # ------------------------------------------------------------------
+
+    def _load_manifest(self) -> Dict:
+        """Load the manifest, or start an empty one"""
+        if self.manifest_file.exists():
+            try:
+                with open(self.manifest_file, 'rb') as f:
+                    return codec.load(f)
+            except (OSError, ValueError) as e:
+                logger.error(f"Failed to read manifest {self.manifest_file}: {e}")
+        return {'version': MANIFEST_VERSION, 'segments': []}
+
+    def _save_manifest(self) -> None:
+        """Atomically rewrite the manifest"""
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        self.manifest['version'] = MANIFEST_VERSION
+        # Forget sealed segments another process expired (see drop_before)
+        self.manifest['segments'] = [
+            entry for entry in self.segments
+            if not entry['closed'] or self.segment_path(entry) is not None
+        ]
+        # A private temp name: maintenance (archive, retention) may save
+        # the manifest from another process while the writer does
+        fd, tmp_name = tempfile.mkstemp(dir=self.log_dir, prefix='.manifest-', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(codec.encode(self.manifest))
+            os.replace(tmp_name, self.manifest_file)
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
+        self._manifest_saved_at = time.monotonic()
+
+    @property
+    def segments(self) -> List[Dict]:
+        """Manifest entries for every segment, oldest first"""
+        return self.manifest['segments']
+
+    def segment_path(self, entry: Dict) -> Optional[Path]:
+        """The file holding a segment, raw or archived (None once expired)"""
+        return resolve(self.log_dir / entry['file'])
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def append(self, record: Dict) -> int:
+        """
+        Append one record to the active segment
+
+        Args:
+            record: Observation dict (must carry an ISO 'timestamp')
+
+        Returns:
+            Number of bytes written
+        """
+        timestamp = record.get('timestamp')
+        partition = partition_of(timestamp)
+        if self._fh is None:
+            self.lock_writer()
+            self._open_segment(partition)
+        elif self._active['partition'] != partition or self._should_rotate():
+            self.rotate()
+            self._open_segment(partition)
+
+        # Always one record per line, whatever the pretty-print flag says
+        line = codec.encode(encode_observation(self.encoder, record), pretty=False) + b'\n'
+        size = len(line)
+
+        self._fh.write(line)
+        self._fh.flush()
+
+        entry = self._active
+        entry['count'] += 1
+        entry['bytes'] += size
+        if entry['start_time'] is None:
+            entry['start_time'] = timestamp
+        entry['end_time'] = timestamp
+        update_stats(entry['stats'], record)
+
+        if time.monotonic() - self._manifest_saved_at >= self.manifest_interval:
+            self._save_manifest()
+        return size
+
+    def lock_writer(self) -> None:
+        """
+        Become the log's only writer (held until close())
+
+        Called by the first append; call it earlier to fail before work starts.
+
+        Raises:
+            WriterLockedError: If another process (e.g. the observer
+                daemon) is already writing to this log
+        """
+        if self._writer_fd is not None or not HAS_FCNTL:
+            return
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.log_dir / WRITER_LOCK_NAME, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            raise WriterLockedError(
+                f"{self.log_dir} is being written by another process "
+                f"(is the observer daemon running?)") from None
+        self._writer_fd = fd
+
+    def _should_rotate(self) -> bool:
+        """Check whether the active segment is full or too old"""
+        if self._active['count'] == 0:
+            return False
+        if self._active['bytes'] >= self.max_segment_bytes:
+            return True
+        return time.monotonic() - self._opened_at >= self.max_segment_age
+
+    def _open_segment(self, partition: str) -> None:
+        """Close any crashed segment, then open a fresh one for appending"""
+        self._recover()
+
+        seq = 1
+        if self.segments:
+            seq = self.segments[-1]['seq'] + 1
+
+        day, hour = partition.split('T')
+        name = f"{day}/{hour}/{SEGMENT_PREFIX}{seq:06d}{SEGMENT_SUFFIX}"
+        self._active = {
+            'seq': seq,
+            'file': name,
+            'partition': partition,
+            'start_time': None,
+            'end_time': None,
+            'count': 0,
+            'bytes': 0,
+            'stats': empty_stats(),
+            'closed': False,
+        }
+        self.segments.append(self._active)
+        # Register the segment before writing so a crash never orphans data
+        self._save_manifest()
+
+        (self.log_dir / name).parent.mkdir(parents=True, exist_ok=True)
+        self._fh = open(self.log_dir / name, 'ab')
+        self._opened_at = time.monotonic()
+        self.encoder.reset()
+        logger.debug(f"Opened observation segment {name}")
+
+    def _recover(self) -> None:
+        """Seal segments left open by a previous process"""
+        changed = False
+        for entry in self.segments:
+            if entry['closed']:
+                continue
+            path = self.log_dir / entry['file']
+            count, size, start, end = 0, 0, None, None
+            stats = empty_stats()
+            decoder = SnapshotDecoder()
+            if path.exists():
+                with open(path, 'rb') as f:
+                    for raw in f:
+                        if not raw.endswith(b'\n'):
+                            break  # torn write from a crash
+                        record = decode_observation(decoder, codec.decode(raw)) or {}
+                        count += 1
+                        size += len(raw)
+                        start = start or record.get('timestamp')
+                        end = record.get('timestamp')
+                        update_stats(stats, record)
+                if path.stat().st_size != size:
+                    os.truncate(path, size)
+            entry.update(count=count, bytes=size, start_time=start,
+                         end_time=end, stats=stats, closed=True)
+            entry.setdefault('partition', partition_of(start))
+            changed = True
+            logger.info(f"Recovered segment {entry['file']} ({count} records)")
+        if changed:
+            self._save_manifest()
+
+    def rotate(self) -> None:
+        """Seal the active segment; the next append opens a new one"""
+        if self._fh is None:
+            return
+        self._fh.close()
+        self._fh = None
+        self._active['closed'] = True
+        self._active = None
+        self._save_manifest()
+
+    def flush(self) -> None:
+        """Persist the active segment's counters to the manifest"""
+        if self._fh is not None:
+            self._fh.flush()
+            os.fsync(self._fh.fileno())
+        if self.segments:
+            self._save_manifest()
+
+    def close(self) -> None:
+        """Seal the active segment and release the file handle and writer lock"""
+        self.rotate()
+        if self._writer_fd is not None:
+            os.close(self._writer_fd)  # closing releases the flock
+            self._writer_fd = None
+
+    def drop_before(self, cutoff: TimeLike) -> int:
+        """
+        Delete sealed segments whose records all precede `cutoff`
+
+        Used by retention once the ticks have been rolled up; empty
+        partition directories are removed too.
+
+        Returns:
+            Number of segments deleted
+        """
+        self._refresh()
+        cutoff = parse_time(cutoff)
+        dropped = 0
+        for entry in list(self.segments):
+            end = parse_time(entry.get('end_time'))
+            if not entry['closed'] or end is None or end >= cutoff:
+                continue
+            path = self.segment_path(entry) or self.log_dir / entry['file']
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            for directory in (path.parent, path.parent.parent):
+                try:
+                    directory.rmdir()
+                except OSError:
+                    break  # not empty
+            self.segments.remove(entry)
+            dropped += 1
+        if dropped:
+            self._save_manifest()
+            logger.info(f"Expired {dropped} observation segments before {cutoff.isoformat()}")
+        return dropped
+
+    def archive(self, backend: str = compression.BACKEND, retrain: bool = False) -> List[Dict]:
+        """
+        Compress every sealed segment that is still raw
+
+        With zstd, a dictionary is trained from the segments being archived
+        when none exists yet, when it is older than DICT_MAX_AGE, or when
+        `retrain` is set. Readers pick archived segments up on their next
+        open; the manifest is unchanged.
+
+        Returns:
+            compress_file() results, one per archived segment
+        """
+        self._refresh()
+        paths = []
+        for entry in self.segments:
+            path = self.segment_path(entry)
+            if entry['closed'] and path is not None and not compression.compressed_suffix(path):
+                paths.append(path)
+        if not paths:
+            return []
+
+        dictionary = None
+        if backend == 'zstd':
+            dictionary = None if retrain else self.dictionaries.latest()
+            if dictionary is None:
+                dictionary = self.dictionaries.train(compression.sample_lines(reversed(paths)))
+
+        results = []
+        for path in paths:
+            try:
+                results.append(compression.compress_file(path, dictionary, backend, self.dictionaries))
+            except FileNotFoundError:
+                continue  # expired meanwhile
+            except OSError as e:
+                logger.error(f"Failed to archive {path}: {e}")
+        self.record_archive(results, backend)
+        logger.info(f"Archived {len(results)} observation segments ({backend})")
+        return results
+
+    def record_archive(self, results: List[Dict], backend: str = compression.BACKEND) -> Dict:
+        """Add archived files to the running totals shown by `jarvis status`"""
+        def add(stats):
+            stats['backend'] = backend
+            for result in results:
+                stats['files'] += 1
+                for key in ('raw_bytes', 'stored_bytes', 'decompress_seconds'):
+                    stats[key] += result[key]
+            return stats
+        default = {'files': 0, 'raw_bytes': 0, 'stored_bytes': 0, 'decompress_seconds': 0.0}
+        return update_json(self.log_dir / ARCHIVE_STATS_NAME, add, default)
+
+    def archive_stats(self) -> Optional[Dict]:
+        """
+        Archive totals: files, raw and stored bytes, compression ratio and
+        decompression throughput (MB/s, measured when each file was verified)
+        """
+        stats = read_json(self.log_dir / ARCHIVE_STATS_NAME)
+        if not stats or not stats['files']:
+            return None
+        return {
+            **stats,
+            'ratio': stats['raw_bytes'] / max(stats['stored_bytes'], 1),
+            'decompress_mb_s': stats['raw_bytes'] / 1e6 / max(stats['decompress_seconds'], 1e-9),
+        }
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def __iter__(self) -> Iterator[Dict]:
+        return self.iter_records()
+
+    def iter_records(self) -> Iterator[Dict]:
+        """Stream every record, oldest first, one line at a time"""
+        return self.iter_range()
+
+    def _refresh(self) -> None:
+        """Pick up segments written by another process"""
+        if self._fh is None:
+            self.manifest = self._load_manifest()
+
+    @staticmethod
+    def _overlaps(entry: Dict, since: Optional[datetime], until: Optional[datetime]) -> bool:
+        """Check whether a segment's time range intersects [since, until)"""
+        start, end = entry.get('start_time'), entry.get('end_time')
+        if start is None:
+            return not entry['closed']  # still being written by someone else
+        if since is not None and parse_time(end) < since:
+            return not entry['closed']
+        if until is not None and parse_time(start) >= until:
+            return False
+        return True
+
+    def _read_segment(self, entry: Dict, apps: bool = True) -> Iterator[Dict]:
+        """Decode every complete record of one segment"""
+        decoder = SnapshotDecoder()
+        for record, _ in self._segment_lines(entry):
+            if apps:
+                record = decode_observation(decoder, record)
+                if record is None:
+                    continue
+            else:
+                record.pop('ps', None)
+            yield record
+
+    def _segment_lines(self, entry: Dict, offset: int = 0) -> Iterator[Tuple[Dict, int]]:
+        """Raw records of one segment after `offset`, whether archived or not"""
+        for _ in range(2):
+            path = self.segment_path(entry)
+            if path is None:
+                return
+            try:
+                # Once open, the file stays readable even if it is archived
+                # or expired; only the open itself can race with archive()
+                lines = iter_lines(path, offset, self.dictionaries)
+                first = next(lines, None)
+            except FileNotFoundError:
+                continue
+            if first is not None:
+                yield first
+                yield from lines
+            return
+
+    def iter_range(self, since: TimeLike = None, until: TimeLike = None,
+                   apps: bool = True, fields: Optional[Iterable[str]] = None) -> Iterator[Dict]:
+        """
+        Stream records with since <= timestamp < until, oldest first
+
+        Only segments whose manifest time range overlaps are opened.
+
+        Args:
+            since: Inclusive lower bound (datetime or ISO string), or None
+            until: Exclusive upper bound, or None
+            apps: Decode process lists; pass False when they are not needed
+            fields: Dotted paths to keep from each record (e.g.
+                'system.cpu_percent' or 'apps.name'); process lists are only
+                decoded when an 'apps' field is among them
+        """
+        self._refresh()
+        since, until = parse_time(since), parse_time(until)
+        spec = compile_fields(fields) if fields is not None else None
+        if spec is not None:
+            apps = apps and 'apps' in spec
+
+        for entry in list(self.segments):
+            if not self._overlaps(entry, since, until):
+                continue
+            inside = (entry['closed'] and entry.get('start_time') is not None
+                      and (since is None or parse_time(entry['start_time']) >= since)
+                      and (until is None or parse_time(entry['end_time']) < until))
+            for record in self._read_segment(entry, apps):
+                if not inside:
+                    timestamp = parse_time(record.get('timestamp'))
+                    if timestamp is None:
+                        continue
+                    if since is not None and timestamp < since:
+                        continue
+                    if until is not None and timestamp >= until:
+                        break
+                yield project(record, spec)
+
+    def latest(self, n: int) -> List[Dict]:
+        """The most recent n records, reading segments newest first"""
+        self._refresh()
+        records: deque = deque(maxlen=n)
+        for entry in reversed(list(self.segments)):
+            if len(records) >= n:
+                break
+            for record in reversed(list(self._read_segment(entry))):
+                if len(records) >= n:
+                    break
+                records.appendleft(record)
+        return list(records)
+
+    def partitions(self) -> List[Dict]:
+        """Per-hour partitions from the manifest: time range, count and stats"""
+        self._refresh()
+        result: Dict[str, Dict] = {}
+        for entry in self.segments:
+            key = entry.get('partition') or partition_of(entry.get('start_time'))
+            part = result.get(key)
+            if part is None:
+                part = result[key] = {
+                    'partition': key, 'start_time': None, 'end_time': None,
+                    'count': 0, 'bytes': 0, 'segments': 0, 'stats': empty_stats()
+                }
+            part['segments'] += 1
+            part['count'] += entry['count']
+            part['bytes'] += entry['bytes']
+            if entry.get('start_time'):
+                part['start_time'] = part['start_time'] or entry['start_time']
+                part['end_time'] = entry['end_time']
+            merge_stats(part['stats'], entry.get('stats'))
+        return list(result.values())
+
+    def tail(self, position: Optional[Tuple[int, int]] = None) -> Iterator[Tuple[Dict, Tuple[int, int]]]:
+        """
+        Stream raw records written after a saved position
+
+        Records are yielded as stored (process lists stay delta-encoded
+        under 'ps'), so readers that only need other fields can resume
+        anywhere without replaying keyframes.
+
+        Args:
+            position: (segment seq, byte offset) returned by a previous call,
+                or None to start from the oldest segment
+
+        Yields:
+            (record, position just after that record)
+        """
+        self._refresh()
+
+        start_seq, start_offset = position or (0, 0)
+        for entry in list(self.segments):
+            if entry['seq'] < start_seq:
+                continue
+            offset = start_offset if entry['seq'] == start_seq else 0
+            for record, offset in self._segment_lines(entry, offset):
+                yield record, (entry['seq'], offset)
+
+    def count(self) -> int:
+        """
+        Total number of records, from the manifest alone
+
+        A segment another process is still writing is counted as of that
+        writer's last manifest refresh (at most ``manifest_interval`` old).
+        """
+        self._refresh()
+        return sum(entry['count'] for entry in self.segments)
+
+    def exists(self) -> bool:
+        """Check whether any segment has been written"""
+        return self.manifest_file.exists()
+
+    def version(self) -> str:
+        """
+        Token that changes whenever the log's content does
+
+        Built from the manifest file's metadata plus the current size of
+        every segment still being written (whose counts the manifest only
+        catches up with periodically); no data is read.
+        """
+        self._refresh()
+        parts = [_file_token(self.manifest_file)]
+        for entry in self.segments:
+            if not entry['closed']:
+                parts.append(_file_token(self.log_dir / entry['file']))
+        return ';'.join(parts)
+
+
+class ObservationStream:
+    """
+    Re-iterable view over stored observations
+
+    Yields records from the legacy single-file ``observations.json`` first,
+    then from the segmented log, so consumers can stream old and new data
+    alike without materializing it. An optional [since, until) window limits
+    iteration to the partitions that overlap it, and optional `fields`
+    (dotted paths) project every record down to what the consumer reads.
+    """
+
+    def __init__(self, data_dir="data", since: TimeLike = None, until: TimeLike = None,
+                 fields: Optional[Iterable[str]] = None):
+        self.data_dir = Path(data_dir)
+        self.legacy_file = self.data_dir / "observations.json"
+        self.log = ObservationLog(self.data_dir / "observations")
+        self.since = parse_time(since)
+        self.until = parse_time(until)
+        self.fields = tuple(fields) if fields is not None else None
+
+    def __iter__(self) -> Iterator[Dict]:
+        return self.iter_range(self.since, self.until, fields=self.fields)
+
+    def _legacy(self) -> Iterator[Dict]:
+        """Stream the legacy file's records without loading the document"""
+        for path in self._legacy_files():
+            try:
+                yield from iter_array(path, 'observations', dictionaries=self.log.dictionaries)
+            except (OSError, ValueError) as e:
+                logger.error(f"Failed to read {path}: {e}")
+
+    def _legacy_files(self) -> List[Path]:
+        """The archived legacy file, then a raw one written after it"""
+        archived = [self.legacy_file.with_name(self.legacy_file.name + suffix)
+                    for suffix in compression.SUFFIXES.values()]
+        return [path for path in (*archived, self.legacy_file) if path.exists()]
+
+    def iter_range(self, since: TimeLike = None, until: TimeLike = None,
+                   apps: bool = True, fields: Optional[Iterable[str]] = None) -> Iterator[Dict]:
+        """
+        Stream observations with since <= timestamp < until, oldest first
+
+        Only log partitions overlapping the range are opened; see
+        ObservationLog.iter_range for `apps` and `fields`.
+        """
+        since, until = parse_time(since), parse_time(until)
+        spec = compile_fields(fields) if fields is not None else None
+        for obs in self._legacy():
+            if since is not None or until is not None:
+                timestamp = parse_time(obs.get('timestamp'))
+                if timestamp is None:
+                    continue
+                if (since is not None and timestamp < since) or (until is not None and timestamp >= until):
+                    continue
+            yield project(obs, spec)
+        yield from self.log.iter_range(since, until, apps, fields)
+
+    def latest(self, n: int) -> List[Dict]:
+        """The most recent n observations"""
+        records = self.log.latest(n)
+        if len(records) < n:
+            older = deque(self._legacy(), maxlen=n - len(records))
+            records = list(older) + records
+        return records
+
+    def __bool__(self) -> bool:
+        return next(iter(self), None) is not None
+
+    def exists(self) -> bool:
+        """Check whether any observation storage exists"""
+        return bool(self._legacy_files()) or self.log.exists()
+
+    def version(self) -> str:
+        """Token that changes whenever the legacy files or the log do (see ObservationLog.version)"""
+        return ';'.join([*(_file_token(path) for path in self._legacy_files()), self.log.version()])
+
+    def archive(self, backend: str = compression.BACKEND, retrain: bool = False) -> List[Dict]:
+        """
+        Compress sealed log segments and the legacy file
+
+        The legacy file is only archived once: if an archive of it already
+        exists, a newer raw ``observations.json`` is left alone.
+        """
+        results = self.log.archive(backend, retrain)
+        if self._legacy_files() == [self.legacy_file]:
+            count = self._legacy_count()
+            legacy = compression.compress_file(self.legacy_file, self.log.dictionaries.latest(None),
+                                               backend, self.log.dictionaries)
+            self.log.record_archive([legacy], backend)
+            self._record_legacy_counts({legacy['file']: count})
+            results.append(legacy)
+        return results
+
+    def partitions(self) -> List[Dict]:
+        """Per-hour partitions of the log, from the manifest"""
+        return self.log.partitions()
+
+    def _legacy_count(self) -> int:
+        """
+        Records in the legacy files
+
+        Each file is counted once and the count kept in the log directory,
+        keyed by the file's name, size and mtime, so later calls read no data.
+        """
+        counts_file = self.log.log_dir / LEGACY_COUNTS_NAME
+        counts = read_json(counts_file, {})
+        total, fresh = 0, {}
+        for path in self._legacy_files():
+            entry = counts.get(path.name)
+            if entry is None or entry['token'] != _file_token(path):
+                try:
+                    fresh[path] = sum(1 for _ in iter_array(path, 'observations',
+                                                            dictionaries=self.log.dictionaries))
+                except (OSError, ValueError) as e:
+                    logger.error(f"Failed to read {path}: {e}")
+                    continue
+                total += fresh[path]
+            else:
+                total += entry['count']
+        if fresh:
+            self._record_legacy_counts(fresh)
+        return total
+
+    def _record_legacy_counts(self, counts: Dict[Path, int]) -> None:
+        """Remember the record counts of legacy files as they are now"""
+        def add(recorded):
+            for path, count in counts.items():
+                recorded[path.name] = {'token': _file_token(path), 'count': count}
+            return recorded
+        update_json(self.log.log_dir / LEGACY_COUNTS_NAME, add, {})
+
+    def count(self) -> int:
+        """
+        Total number of stored observations
+
+        Log counts come from the manifest and legacy counts from the record
+        kept by _legacy_count, so this reads no observations once warm.
+        """
+        return self._legacy_count() + self.log.count()
+
+    def metadata(self) -> Dict:
+        """Legacy-style metadata block computed in a single streaming pass"""
+        total, start, end = 0, None, None
+        for obs in self:
+            total += 1
+            start = start or obs.get('timestamp')
+            end = obs.get('timestamp')
+        return {
+            'total_observations': total,
+            'start_time': start,
+            'end_time': end,
+        }
+
+
+def open_observations(data_dir="data", since: TimeLike = None, until: TimeLike = None,
+                      fields: Optional[Iterable[str]] = None) -> ObservationStream:
+    """Open a streaming view over the observations in ``data_dir``"""
+    return ObservationStream(data_dir, since, until, fields)
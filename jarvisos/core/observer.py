@@ -2,64 +2,161 @@
 Observer - Monitors user behavior and system activity
 """
 
-import json
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 import psutil
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn
 
 from ..utils.logger import get_observer_logger
+from .stats import shared_stats
+from .netstat import NetworkCollector
+from .observation_log import ObservationLog, open_observations
+from .process_table import ProcessTable
+from .procfs import ProcfsCollector, disk_usage
+from .scheduler import AdaptiveInterval, Tick, TickScheduler
+from .self_metrics import SelfMetrics
+from .shell_history import ShellHistoryCollector
 
 console = Console()
 logger = get_observer_logger()
 
+METRICS_SAVE_TICKS = 12       # Write the self-metrics summary every N ticks
+BUDGET_WINDOW_TICKS = 12      # Ticks averaged before each CPU budget decision
+BUDGET_MAX_INTERVAL = 600.0   # Never throttle beyond this interval (seconds)
+
 
 class Observer:
     """Observes user behavior and logs system activity"""
 
-    def __init__(self, output_dir: str = "data"):
+    def __init__(self, output_dir: str = "data", collector: str = "auto",
+                 cpu_budget: Optional[float] = None, history: bool = False):
+        """
+        Args:
+            output_dir: Directory for observation data
+            collector: 'auto' (procfs on Linux, else psutil), 'procfs' or 'psutil'
+            cpu_budget: Optional cap on the observer's own CPU%; when exceeded
+                the sampling interval is stretched until it fits
+            history: Record shell commands typed since the previous tick
+                (off by default: commands can contain secrets; see
+                shell_history.is_private for what is still skipped)
+        """
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
-        self.observations_file = self.output_dir / "observations.json"
-        self.observations: List[Dict] = []
+        self.log = ObservationLog(self.output_dir / "observations")
+        self.observation_count = 0
+        self.scheduler: Optional[TickScheduler] = None
+        self.adaptive: Optional[AdaptiveInterval] = None
+        self.base_interval: Optional[float] = None
+        self.budget_floor = 0.0
+        self._budget_checked_at = 0
+        self.metrics = SelfMetrics(self.output_dir, cpu_budget=cpu_budget)
+        self.shell_history: Optional[ShellHistoryCollector] = None
+        if history:
+            self.shell_history = ShellHistoryCollector(self.output_dir / "shell_history_state.json")
+            self.shell_history.poll()  # start from the current end of history
+        self.process_table = ProcessTable()
+        self.procfs: Optional[ProcfsCollector] = None
+        self.network: Optional[NetworkCollector] = None
+        self.collector = collector
+        self.select_collector(collector)
+        
+        # Prime the CPU counters so every later call reports the delta since
+        # the previous tick instead of blocking for a sampling interval
+        psutil.cpu_percent(interval=None)
+        self.boot_time = datetime.fromtimestamp(psutil.boot_time()).isoformat()
         logger.info(f"Observer initialized with output_dir: {output_dir}")
 
+    def select_collector(self, collector: str = "auto") -> None:
+        """
+        Choose the process collector backend
+        
+        Args:
+            collector: 'auto' (procfs on Linux, else psutil), 'procfs' or 'psutil'
+        """
+        self.collector = collector
+        self.procfs = None
+        if collector != "psutil" and ProcfsCollector.available():
+            try:
+                self.procfs = ProcfsCollector()
+            except (OSError, ValueError) as e:
+                logger.warning(f"procfs collector unavailable, using psutil: {e}")
+        elif collector == "procfs":
+            logger.warning("procfs collector requested but /proc is not available, using psutil")
+        
+        self.network = NetworkCollector(use_procfs=False if collector == "psutil" else None)
+        self.network.sample()  # prime the counters so the first tick has rates
+
+    def start_schedule(self, interval: float, **kwargs) -> TickScheduler:
+        """
+        Create the tick scheduler used by collect()
+        
+        Takes the observation log's writer lock first, so a second observer
+        on the same data directory stops here.
+        
+        Args:
+            interval: Requested interval in seconds
+            **kwargs: Passed to TickScheduler (clock, sleep)
+        
+        Raises:
+            WriterLockedError: If another process is writing observations
+        """
+        self.log.lock_writer()
+        self.base_interval = interval
+        self.scheduler = TickScheduler(max(interval, self.budget_floor), **kwargs)
+        return self.scheduler
+
+    def set_interval(self, interval: float) -> None:
+        """Change the requested interval of a running schedule"""
+        self.base_interval = interval
+        if self.scheduler is not None:
+            self.scheduler.set_interval(max(interval, self.budget_floor))
+
+    def set_adaptive(self, min_interval: Optional[float] = None,
+                     max_interval: Optional[float] = None, **kwargs) -> None:
+        """
+        Enable activity-driven sampling between two bounds, or disable it
+        
+        Args:
+            min_interval: Fastest interval in seconds (None disables adaptation)
+            max_interval: Slowest interval in seconds
+            **kwargs: Extra AdaptiveInterval tuning (stable_ticks, cpu_threshold, backoff)
+        """
+        if min_interval is None or max_interval is None:
+            self.adaptive = None
+            return
+        self.adaptive = AdaptiveInterval(min_interval, max_interval, **kwargs)
+
     def get_running_apps(self) -> List[Dict[str, str]]:
         """Get list of currently running applications with resource usage"""
-        apps = []
-        for proc in psutil.process_iter(['pid', 'name', 'username', 'cpu_percent', 'memory_percent']):
+        if self.procfs is not None:
             try:
-                info = proc.info
-                # Filter out system processes
-                if info['username'] and info['name']:
-                    apps.append({
-                        'name': info['name'],
-                        'pid': info['pid'],
-                        'username': info['username'],
-                        'cpu_percent': info.get('cpu_percent') or 0,
-                        'memory_percent': round(info.get('memory_percent') or 0, 2)
-                    })
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                pass
-        return apps
+                return self.procfs.running_apps()
+            except (OSError, ValueError) as e:
+                logger.warning(f"procfs collector failed, falling back to psutil: {e}")
+                self.procfs = None
+        return self.process_table.snapshot()
 
     def get_system_stats(self) -> Dict:
         """Get current system statistics with extended metrics"""
-        vm = psutil.virtual_memory()
-        disk = psutil.disk_usage('/')
+        if self.procfs is not None:
+            cpu_percent = self.procfs.cpu_percent()
+            vm = self.procfs.virtual_memory()
+            disk = disk_usage('/')
+        else:
+            cpu_percent = psutil.cpu_percent(interval=None)
+            vm = psutil.virtual_memory()
+            disk = psutil.disk_usage('/')
         
-        # Try to get network connections, fallback if permission denied
-        try:
-            net_conn = len(psutil.net_connections())
-        except (psutil.AccessDenied, PermissionError):
-            net_conn = 0
+        started = time.perf_counter()
+        network = self.network.sample()
+        self.metrics.timed('network', started)
         
         return {
-            'cpu_percent': psutil.cpu_percent(interval=1),
+            'cpu_percent': cpu_percent,
             'cpu_count': psutil.cpu_count(),
             'memory_percent': vm.percent,
             'memory_used_gb': round(vm.used / (1024**3), 2),
@@ -67,126 +164,219 @@ class Observer:
             'disk_percent': disk.percent,
             'disk_used_gb': round(disk.used / (1024**3), 2),
             'disk_total_gb': round(disk.total / (1024**3), 2),
-            'network_connections': net_conn,
-            'boot_time': datetime.fromtimestamp(psutil.boot_time()).isoformat(),
+            'network_connections': network.get('connections', 0),
+            'network': network,
+            'boot_time': self.boot_time,
             'timestamp': datetime.now().isoformat()
         }
 
-    def observe(self, duration: int = 60, interval: int = 5) -> None:
+    def collect(self, tick: Tick) -> Dict:
+        """
+        Take one observation and append it to the log
+        
+        Args:
+            tick: The scheduler tick this observation belongs to
+            
+        Returns:
+            The observation that was written
+        """
+        metrics = self.metrics
+        timestamp = datetime.now().isoformat()
+        
+        started = time.perf_counter()
+        apps = self.get_running_apps()
+        apps_ms = metrics.timed('procfs' if self.procfs is not None else 'psutil', started)
+        
+        started = time.perf_counter()
+        system = self.get_system_stats()
+        system_ms = metrics.timed('system', started)
+        
+        commands = []
+        if self.shell_history is not None:
+            started = time.perf_counter()
+            commands = self.shell_history.poll()
+            metrics.timed('history', started)
+        
+        own = metrics.record_tick(len(apps))
+        observation = {
+            'iteration': tick.index + 1,
+            'timestamp': timestamp,
+            'apps': apps,
+            'system': system,
+            'tick': self._tick_info(tick),
+            'self': {
+                'apps_ms': round(apps_ms, 3),
+                'system_ms': round(system_ms, 3),
+                'scanned': len(apps),
+                **own
+            }
+        }
+        if commands:
+            observation['commands'] = commands
+        
+        # Append as we go: memory stays flat and a crash keeps the run
+        started = time.perf_counter()
+        metrics.record_write(self.log.append(observation))
+        metrics.timed('write', started)
+        self.observation_count += 1
+        
+        if self.scheduler is not None:
+            self._reschedule(observation)
+        if self.observation_count % METRICS_SAVE_TICKS == 0:
+            metrics.save()
+        return observation
+
+    def _reschedule(self, observation: Dict) -> None:
+        """Pick the next interval from the adaptive policy and the CPU budget"""
+        if self.adaptive is not None:
+            target = self.adaptive.update(observation)
+        else:
+            target = self.base_interval or self.scheduler.interval
+        
+        ratio = self.metrics.over_budget(BUDGET_WINDOW_TICKS)
+        if ratio is not None and self.metrics.ticks - self._budget_checked_at >= BUDGET_WINDOW_TICKS:
+            self._budget_checked_at = self.metrics.ticks
+            current = self.scheduler.interval
+            if ratio > 1:
+                self.budget_floor = min(current * ratio, BUDGET_MAX_INTERVAL)
+                logger.warning(f"Observer over its CPU budget ({ratio:.1f}x), "
+                               f"slowing to {self.budget_floor:.1f}s")
+            elif ratio < 0.5 and self.budget_floor:
+                self.budget_floor /= 2
+                if self.budget_floor <= target:
+                    self.budget_floor = 0.0
+        
+        interval = max(target, self.budget_floor)
+        if self.budget_floor > target:
+            self.metrics.throttled_ticks += 1
+        if interval != self.scheduler.interval:
+            logger.debug(f"Sampling interval {self.scheduler.interval}s -> {interval}s")
+            self.scheduler.set_interval(interval)
+
+    def _tick_info(self, tick: Tick) -> Dict:
+        """Scheduling details stored with each sample"""
+        interval = self.scheduler.interval if self.scheduler else None
+        if self.adaptive is not None:
+            bounds = (self.adaptive.min_interval, self.adaptive.max_interval)
+        else:
+            bounds = (interval, interval)
+        # 'interval' is the time this sample stands for; consumers weight by it
+        return {
+            'jitter_ms': round(tick.jitter * 1000, 3),
+            'missed': tick.missed,
+            'interval': interval,
+            'min_interval': bounds[0],
+            'max_interval': bounds[1]
+        }
+
+    def observe(self, duration: int = 60, interval: int = 5,
+                min_interval: Optional[float] = None,
+                max_interval: Optional[float] = None) -> None:
         """
         Observe user behavior for a specified duration
         
         Args:
             duration: Total observation time in seconds (default: 60)
             interval: Time between observations in seconds (default: 5)
+            min_interval: Adaptive mode: fastest interval while the machine is busy
+            max_interval: Adaptive mode: slowest interval while it is idle
         """
-        logger.info(f"Starting observation: duration={duration}s, interval={interval}s")
+        self.set_adaptive(min_interval, max_interval, initial=interval)
+        if self.adaptive is not None:
+            interval = self.adaptive.interval
+            mode = f"Interval: {interval}s (adaptive {min_interval}-{max_interval}s)"
+        else:
+            mode = f"Interval: {interval}s"
+        
+        logger.info(f"Starting observation: duration={duration}s, {mode}")
         console.print(f"\n[bold cyan]🔍 JarvisOS Observer Starting...[/bold cyan]")
-        console.print(f"Duration: {duration}s | Interval: {interval}s\n")
-
-        iterations = duration // interval
-        logger.debug(f"Will perform {iterations} observations")
+        console.print(f"Duration: {duration}s | {mode}\n")
         
         with Progress(
             SpinnerColumn(),
             TextColumn("[progress.description]{task.description}"),
             console=console
         ) as progress:
-            task = progress.add_task("Observing...", total=iterations)
+            task = progress.add_task("Observing...", total=duration)
             
-            for i in range(iterations):
-                # Collect observation data
-                observation = {
-                    'iteration': i + 1,
-                    'timestamp': datetime.now().isoformat(),
-                    'apps': self.get_running_apps(),
-                    'system': self.get_system_stats()
-                }
-                
-                self.observations.append(observation)
+            self.start_schedule(interval)
+            start = None
+            
+            while True:
+                tick = self.scheduler.wait()
+                if start is None:
+                    start = tick.scheduled
+                if tick.scheduled - start >= duration:
+                    break
                 
-                progress.update(task, advance=1)
+                self.collect(tick)
                 
-                if i < iterations - 1:  # Don't sleep on last iteration
-                    time.sleep(interval)
+                # Don't sleep past the end of the run
+                next_due = tick.scheduled + self.scheduler.interval - start
+                progress.update(task, completed=min(next_due, duration))
+                if next_due >= duration:
+                    break
 
-        # Save observations
-        self.save_observations()
+        self.log.close()
+        self.metrics.save()
         
-        logger.info(f"Observation complete: {len(self.observations)} observations collected")
+        logger.info(f"Observation complete: {self.observation_count} observations collected")
+        logger.debug(f"Tick jitter: {self.scheduler.stats()}")
         console.print(f"\n[bold green]✅ Observation complete![/bold green]")
-        console.print(f"📊 Collected {len(self.observations)} observations")
-        console.print(f"💾 Saved to: {self.observations_file}\n")
+        console.print(f"📊 Collected {self.observation_count} observations")
+        console.print(f"💾 Saved to: {self.log.log_dir}\n")
 
-    def save_observations(self) -> None:
-        """Save observations to JSON file"""
-        data = {
-            'metadata': {
-                'total_observations': len(self.observations),
-                'start_time': self.observations[0]['timestamp'] if self.observations else None,
-                'end_time': self.observations[-1]['timestamp'] if self.observations else None,
-            },
-            'observations': self.observations
-        }
-        
-        try:
-            with open(self.observations_file, 'w') as f:
-                json.dump(data, f, indent=2)
-            logger.debug(f"Saved {len(self.observations)} observations to {self.observations_file}")
-        except Exception as e:
-            logger.error(f"Failed to save observations: {e}", exc_info=True)
-            raise
+    def stream(self, since=None, until=None, fields=None):
+        """Streaming view over legacy and segmented observations"""
+        return open_observations(self.output_dir, since, until, fields)
 
     def load_observations(self) -> Dict:
-        """Load observations from JSON file"""
-        if not self.observations_file.exists():
+        """Load all observations into a legacy-shaped dict"""
+        stream = self.stream()
+        if not stream.exists():
             console.print("[yellow]⚠️  No observations file found[/yellow]")
             return {}
         
-        with open(self.observations_file, 'r') as f:
-            return json.load(f)
+        observations = list(stream)
+        return {
+            'metadata': {
+                'total_observations': len(observations),
+                'start_time': observations[0]['timestamp'] if observations else None,
+                'end_time': observations[-1]['timestamp'] if observations else None,
+            },
+            'observations': observations
+        }
 
-    def get_summary(self) -> Dict:
-        """Get summary statistics from observations"""
-        data = self.load_observations()
-        if not data or 'observations' not in data:
-            return {}
-        
-        observations = data['observations']
-        
-        # Calculate averages
-        avg_cpu = sum(obs['system']['cpu_percent'] for obs in observations) / len(observations)
-        avg_memory = sum(obs['system']['memory_percent'] for obs in observations) / len(observations)
-        
-        # Count unique apps
-        all_apps = set()
-        for obs in observations:
-            for app in obs['apps']:
-                all_apps.add(app['name'])
-        
-        # Find top apps by frequency
-        app_counts = {}
-        for obs in observations:
-            for app in obs['apps']:
-                app_counts[app['name']] = app_counts.get(app['name'], 0) + 1
+    def get_summary(self, since=None, until=None) -> Dict:
+        """
+        Get summary statistics from observations
         
-        top_apps = sorted(app_counts.items(), key=lambda x: x[1], reverse=True)[:10]
+        Args:
+            since: Only summarize observations from this time on
+            until: Only summarize observations before this time
+        """
+        if not self.stream().exists():
+            return {}
+        stats = shared_stats(self.output_dir, since, until)
+        if not stats['ticks']:
+            return {}
         
         return {
-            'total_observations': len(observations),
-            'unique_apps': len(all_apps),
-            'avg_cpu_percent': round(avg_cpu, 2),
-            'avg_memory_percent': round(avg_memory, 2),
-            'top_apps': top_apps,
-            'start_time': data['metadata']['start_time'],
-            'end_time': data['metadata']['end_time']
+            'total_observations': stats['ticks'],
+            'unique_apps': stats['unique_apps'],
+            # Adaptive samples stand for their interval; legacy ones weigh 1
+            'avg_cpu_percent': stats['cpu_weighted_mean'],
+            'avg_memory_percent': stats['memory_weighted_mean'],
+            'top_apps': stats['top_apps'],
+            'start_time': stats['start_time'],
+            'end_time': stats['end_time']
         }
 
-    def display_summary(self) -> None:
+    def display_summary(self, since=None, until=None) -> None:
         """Display observation summary in console"""
         from rich.table import Table
         
-        summary = self.get_summary()
+        summary = self.get_summary(since, until)
         if not summary:
             console.print("[yellow]⚠️  No observations to summarize[/yellow]")
             return
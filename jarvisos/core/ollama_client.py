@@ -0,0 +1,298 @@
+"""
+Ollama Client - HTTP client for the local Ollama API
+
+`ollama run <model> <prompt>` starts a new process per call, passes the
+prompt through argv and cannot set sampling options. The server behind it
+exposes the same models over HTTP (`/api/generate`, `/api/chat`), so this
+client talks to it directly:
+
+- connections are HTTP/1.1 keep-alive and pooled, so a call costs one
+  request/response on an open socket instead of a process start-up and a
+  TCP handshake; a pooled connection the server has since closed is
+  replaced and the request retried once
+- `keep_alive` asks the server to keep the model loaded between calls
+  (Ollama unloads it after 5 minutes by default)
+- `options` carries temperature, num_predict and num_ctx
+
+The server address is OLLAMA_HOST (as the ollama CLI reads it), defaulting
+to http://127.0.0.1:11434. Only the standard library is used.
+"""
+
+import http.client
+import json
+import os
+import threading
+from typing import Any, Dict, Iterator, List, Optional
+from urllib.parse import urlsplit
+
+DEFAULT_HOST = "http://127.0.0.1:11434"
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+OLLAMA_PORT = 11434
+POOL_SIZE = 4  # idle connections kept open
+
+
+class OllamaError(Exception):
+    """The server answered with an error, or with something that is not the API"""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+def parse_host(host: Optional[str] = None):
+    """
+    (scheme, hostname, port) of an Ollama server address
+
+    Accepts the forms OLLAMA_HOST does: ``host``, ``host:port`` or a URL.
+    Without a scheme the port defaults to 11434; with one, to the scheme's.
+    """
+    host = host or os.environ.get('OLLAMA_HOST') or DEFAULT_HOST
+    if '://' in host:
+        parts = urlsplit(host)
+        default_port = DEFAULT_PORTS.get(parts.scheme, OLLAMA_PORT)
+    else:
+        parts = urlsplit(f"http://{host}")
+        default_port = OLLAMA_PORT
+    return parts.scheme, parts.hostname or '127.0.0.1', parts.port or default_port
+
+
+class OllamaClient:
+    """
+    Pooled keep-alive client for the Ollama HTTP API
+
+    Thread-safe: each request takes an idle connection (or opens one) and
+    returns it to the pool once the response has been read.
+
+    Args:
+        host: Server address; None reads OLLAMA_HOST
+        timeout: Socket timeout in seconds for each request
+        pool_size: Most idle connections kept open
+    """
+
+    def __init__(self, host: Optional[str] = None, timeout: float = 60.0,
+                 pool_size: int = POOL_SIZE):
+        self.scheme, self.hostname, self.port = parse_host(host)
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self._idle: List[http.client.HTTPConnection] = []
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+
+    @property
+    def base_url(self) -> str:
+        return f"{self.scheme}://{self.hostname}:{self.port}"
+
+    # ------------------------------------------------------------------
+    # Connections
+    # ------------------------------------------------------------------
+
+    def _connect(self, timeout: float) -> http.client.HTTPConnection:
+        cls = http.client.HTTPSConnection if self.scheme == 'https' else http.client.HTTPConnection
+        self.connections_opened += 1
+        return cls(self.hostname, self.port, timeout=timeout)
+
+    def _acquire(self, timeout: float):
+        """An idle connection (reused=True) or a new one"""
+        with self._lock:
+            conn = self._idle.pop() if self._idle else None
+        if conn is None:
+            return self._connect(timeout), False
+        conn.timeout = timeout
+        if conn.sock is not None:
+            conn.sock.settimeout(timeout)
+        return conn, True
+
+    def _release(self, conn: http.client.HTTPConnection, response: http.client.HTTPResponse):
+        """Pool the connection if the server left it open"""
+        if response.will_close:
+            conn.close()
+            return
+        with self._lock:
+            if len(self._idle) < self.pool_size:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def close(self):
+        """Close every idle connection"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+    # ------------------------------------------------------------------
+    # Requests
+    # ------------------------------------------------------------------
+
+    def _send(self, method: str, path: str, body: Optional[Dict[str, Any]], timeout: float):
+        """Send a request; (connection, response) once the status line is in"""
+        payload = json.dumps(body).encode('utf-8') if body is not None else None
+        headers = {'Content-Type': 'application/json'} if payload is not None else {}
+        while True:
+            conn, reused = self._acquire(timeout)
+            try:
+                conn.request(method, path, body=payload, headers=headers)
+                return conn, conn.getresponse()
+            except (ConnectionError, http.client.RemoteDisconnected,
+                    http.client.BadStatusLine) as e:
+                conn.close()
+                if reused:
+                    continue  # the server closed an idle connection; retry on a new one
+                if isinstance(e, http.client.HTTPException):
+                    raise OllamaError(f"Bad response from {self.base_url}: {e!r}") from e
+                raise
+            except http.client.HTTPException as e:
+                conn.close()
+                raise OllamaError(f"Bad response from {self.base_url}: {e!r}") from e
+            except BaseException:
+                conn.close()
+                raise
+
+    @staticmethod
+    def _check(method: str, path: str, status: int, data: bytes) -> Dict[str, Any]:
+        """Decode a response body, raising OllamaError for errors"""
+        try:
+            document = json.loads(data) if data else {}
+        except ValueError as e:
+            raise OllamaError(f"{method} {path} returned invalid JSON", status) from e
+        if status >= 400:
+            message = document.get('error') if isinstance(document, dict) else None
+            raise OllamaError(message or f"{method} {path} failed with HTTP {status}", status)
+        return document
+
+    def request(self, method: str, path: str, body: Optional[Dict[str, Any]] = None,
+                timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Send one request and return the decoded JSON response
+
+        Raises:
+            OllamaError: On an HTTP error status or a malformed response
+            OSError: If the server cannot be reached or times out
+        """
+        conn, response = self._send(method, path, body,
+                                    self.timeout if timeout is None else timeout)
+        try:
+            data = response.read()
+        except http.client.HTTPException as e:
+            conn.close()
+            raise OllamaError(f"Bad response from {self.base_url}: {e!r}") from e
+        except BaseException:
+            conn.close()
+            raise
+        self._release(conn, response)
+        return self._check(method, path, response.status, data)
+
+    def stream(self, method: str, path: str, body: Dict[str, Any],
+               timeout: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Send a streaming request and yield each JSON line of the response
+
+        The timeout applies to the wait for each line, not to the whole
+        stream. Closing the iterator early closes the connection (it cannot
+        be reused mid-response).
+
+        Raises:
+            OllamaError: On an HTTP error status, or an error reported mid-stream
+            OSError: If the server cannot be reached or times out
+        """
+        conn, response = self._send(method, path, body,
+                                    self.timeout if timeout is None else timeout)
+        finished = False
+        try:
+            if response.status >= 400:
+                self._check(method, path, response.status, response.read())
+            while True:
+                line = response.readline()
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                document = self._check(method, path, response.status, line)
+                if 'error' in document:
+                    raise OllamaError(document['error'], response.status)
+                yield document
+            finished = True
+        except http.client.HTTPException as e:
+            raise OllamaError(f"Bad response from {self.base_url}: {e!r}") from e
+        finally:
+            if finished:
+                self._release(conn, response)
+            else:
+                conn.close()
+
+    def version(self, timeout: Optional[float] = None) -> str:
+        """Server version (also a cheap reachability check)"""
+        return self.request('GET', '/api/version', timeout=timeout).get('version', '')
+
+    def models(self) -> List[str]:
+        """Names of the locally installed models (``name:tag``)"""
+        return [m.get('name', '') for m in self.request('GET', '/api/tags').get('models', [])]
+
+    def pull(self, model: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Download a model, returning when it is complete"""
+        return self.request('POST', '/api/pull', {'model': model, 'stream': False},
+                            timeout=timeout)
+
+    @staticmethod
+    def _body(model: str, options: Optional[Dict[str, Any]], keep_alive: Optional[str],
+              stream: bool, **fields) -> Dict[str, Any]:
+        body: Dict[str, Any] = {'model': model, **fields, 'stream': stream}
+        if options:
+            body['options'] = options
+        if keep_alive is not None:
+            body['keep_alive'] = keep_alive
+        return body
+
+    def generate(self, model: str, prompt: str, system: Optional[str] = None,
+                 options: Optional[Dict[str, Any]] = None,
+                 keep_alive: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Single completion from /api/generate
+
+        Returns:
+            The response document; the text is under 'response'
+        """
+        fields = {'prompt': prompt, **({'system': system} if system else {})}
+        return self.request('POST', '/api/generate',
+                            self._body(model, options, keep_alive, False, **fields))
+
+    def generate_stream(self, model: str, prompt: str, system: Optional[str] = None,
+                        options: Optional[Dict[str, Any]] = None,
+                        keep_alive: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Streamed completion from /api/generate
+
+        Yields:
+            One document per chunk; the text is under 'response', and the
+            last one has 'done': True with the timing fields
+        """
+        fields = {'prompt': prompt, **({'system': system} if system else {})}
+        return self.stream('POST', '/api/generate',
+                           self._body(model, options, keep_alive, True, **fields))
+
+    def chat(self, model: str, messages: List[Dict[str, str]],
+             options: Optional[Dict[str, Any]] = None,
+             keep_alive: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Single reply from /api/chat
+
+        Args:
+            messages: [{'role': 'system'|'user'|'assistant', 'content': ...}]
+
+        Returns:
+            The response document; the text is under ['message']['content']
+        """
+        return self.request('POST', '/api/chat',
+                            self._body(model, options, keep_alive, False, messages=messages))
+
+    def chat_stream(self, model: str, messages: List[Dict[str, str]],
+                    options: Optional[Dict[str, Any]] = None,
+                    keep_alive: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Streamed reply from /api/chat
+
+        Yields:
+            One document per chunk; the text is under ['message']['content']
+        """
+        return self.stream('POST', '/api/chat',
+                           self._body(model, options, keep_alive, True, messages=messages))
@@ -3,7 +3,6 @@ JarvisOS Onboarding System
 First boot interactive experience
 """
 
-import json
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, Optional
@@ -13,6 +12,7 @@ from rich.prompt import Prompt, Confirm
 
 from ..voice.jarvis_voice import JarvisVoice
 from ..utils.logger import get_logger
+from .json_files import read_json, write_json
 
 logger = get_logger("jarvisos.onboarding")
 console = Console()
@@ -44,8 +44,7 @@ class OnboardingManager:
             "version": "0.2.0"
         }
         
-        with open(self.onboarding_file, 'w') as f:
-            json.dump(data, f, indent=2)
+        write_json(self.onboarding_file, data)
         
         logger.info("Onboarding marked as complete")
     
@@ -261,18 +260,13 @@ class OnboardingManager:
         profile['created_at'] = datetime.now().isoformat()
         profile['onboarding_version'] = '0.2.0'
         
-        with open(self.profile_file, 'w') as f:
-            json.dump(profile, f, indent=2)
+        write_json(self.profile_file, profile)
         
         logger.info(f"User profile saved: {profile['name']}")
     
     def load_profile(self) -> Optional[Dict]:
         """Load user profile"""
-        if not self.profile_file.exists():
-            return None
-        
-        with open(self.profile_file) as f:
-            return json.load(f)
+        return read_json(self.profile_file, mutable=True)
     
     def get_user_name(self) -> str:
         """Get user name from profile"""
@@ -6,7 +6,6 @@ Top 0.1% - Real-time prediction and proactive action
 Not just observing - UNDERSTANDING and ANTICIPATING
 """
 
-import json
 import time
 from pathlib import Path
 from typing import Dict, List, Optional, Any
@@ -15,6 +14,7 @@ from dataclasses import dataclass, asdict
 
 from .ai_brain import AIBrain
 from .context_v2 import ContextAnalyzer
+from .json_files import read_json, write_json
 
 
 @dataclass
@@ -386,19 +386,16 @@ class OperationalIntelligence:
         }
         
         state_file = self.data_dir / "operational_intelligence.json"
-        with open(state_file, 'w') as f:
-            json.dump(state, f, indent=2)
+        write_json(state_file, state)
     
     def load_state(self):
         """Load operational intelligence state"""
         state_file = self.data_dir / "operational_intelligence.json"
         
-        if not state_file.exists():
+        state = read_json(state_file)
+        if state is None:
             return
         
-        with open(state_file, 'r') as f:
-            state = json.load(f)
-        
         # TODO: Reconstruct objects from state
         pass
 
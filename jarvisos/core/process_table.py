@@ -0,0 +1,172 @@
+"""
+Process Table - Long-lived psutil handles for accurate per-app CPU
+
+psutil.process_iter() builds fresh Process objects, and the first
+cpu_percent() call on a fresh object always returns 0. This table keeps one
+handle per (pid, create_time) across ticks, caches the attributes that never
+change, and derives CPU% from cumulative cpu_times deltas.
+"""
+
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+import psutil
+
+from ..utils.logger import get_observer_logger
+
+logger = get_observer_logger()
+
+ProcessKey = Tuple[int, float]
+
+
+class ProcessEntry:
+    """Cached state for one live process"""
+
+    __slots__ = ('proc', 'pid', 'create_time', 'name', 'username', 'exe',
+                 'cpu_total', 'sampled_at')
+
+    def __init__(self, proc: psutil.Process, create_time: float, name: str,
+                 username: Optional[str], exe: Optional[str]):
+        self.proc = proc
+        self.pid = proc.pid
+        self.create_time = create_time
+        self.name = name
+        self.username = username
+        self.exe = exe
+        self.cpu_total: Optional[float] = None
+        self.sampled_at: Optional[float] = None
+
+    @property
+    def key(self) -> ProcessKey:
+        return (self.pid, self.create_time)
+
+
+class ProcessTable:
+    """
+    Persistent process table keyed by (pid, create_time)
+
+    - Static attributes (name, username, exe) are read once per process
+    - CPU% is the cpu_times delta over the wall-clock delta since the last
+      tick; a process seen for the first time reports its lifetime average
+    - Pids that raise AccessDenied are remembered and skipped until they exit
+    - Entries for pids that disappeared are evicted every tick
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._entries: Dict[ProcessKey, ProcessEntry] = {}
+        self._by_pid: Dict[int, ProcessKey] = {}
+        self._denied: Set[int] = set()
+        self._memory_total = psutil.virtual_memory().total
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def denied(self) -> Set[int]:
+        """Pids skipped because they raised AccessDenied"""
+        return set(self._denied)
+
+    def _add(self, pid: int) -> Optional[ProcessEntry]:
+        """Create an entry for a newly seen pid"""
+        try:
+            proc = psutil.Process(pid)
+            with proc.oneshot():
+                create_time = proc.create_time()
+                name = proc.name()
+                try:
+                    username = proc.username()
+                except KeyError:
+                    username = None  # uid without a passwd entry
+                try:
+                    exe = proc.exe()
+                except (psutil.AccessDenied, psutil.ZombieProcess):
+                    exe = None
+        except psutil.NoSuchProcess:
+            return None
+        except psutil.AccessDenied:
+            self._denied.add(pid)
+            return None
+
+        entry = ProcessEntry(proc, create_time, name, username, exe)
+        self._entries[entry.key] = entry
+        self._by_pid[pid] = entry.key
+        return entry
+
+    def _drop(self, pid: int) -> None:
+        """Forget everything about a pid"""
+        key = self._by_pid.pop(pid, None)
+        if key is not None:
+            self._entries.pop(key, None)
+        self._denied.discard(pid)
+
+    def _lookup(self, pid: int) -> Optional[ProcessEntry]:
+        """Return the live entry for a pid, replacing it if the pid was reused"""
+        key = self._by_pid.get(pid)
+        if key is not None:
+            entry = self._entries[key]
+            if entry.proc.is_running():
+                return entry
+            self._drop(pid)
+        return self._add(pid)
+
+    def _evict(self, alive: Set[int]) -> None:
+        """Drop entries and denied markers for pids that exited"""
+        for pid in [pid for pid in self._by_pid if pid not in alive]:
+            self._drop(pid)
+        self._denied &= alive
+
+    def snapshot(self) -> List[Dict]:
+        """
+        Sample every visible process
+
+        Returns:
+            Entries shaped like Observer.get_running_apps, ordered by pid
+        """
+        pids = psutil.pids()
+        self._evict(set(pids))
+
+        apps = []
+        for pid in pids:
+            if pid in self._denied:
+                continue
+            entry = self._lookup(pid)
+            if entry is None:
+                continue
+
+            try:
+                with entry.proc.oneshot():
+                    times = entry.proc.cpu_times()
+                    rss = entry.proc.memory_info().rss
+            except psutil.NoSuchProcess:
+                self._drop(pid)
+                continue
+            except psutil.AccessDenied:
+                self._denied.add(pid)
+                continue
+
+            now = self._clock()
+            cpu_total = times.user + times.system
+            if entry.sampled_at is None:
+                elapsed = time.time() - entry.create_time
+                used = cpu_total
+            else:
+                elapsed = now - entry.sampled_at
+                used = cpu_total - entry.cpu_total
+            entry.cpu_total = cpu_total
+            entry.sampled_at = now
+
+            # Filter out system processes
+            if not (entry.username and entry.name):
+                continue
+
+            cpu_percent = round(max(used, 0.0) / elapsed * 100, 1) if elapsed > 0 else 0.0
+            apps.append({
+                'name': entry.name,
+                'pid': pid,
+                'username': entry.username,
+                'cpu_percent': cpu_percent,
+                'memory_percent': round(rss / self._memory_total * 100, 2)
+            })
+
+        return apps
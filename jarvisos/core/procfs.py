@@ -0,0 +1,226 @@
+"""
+Procfs Collector - Direct /proc fast path for the observer (Linux only)
+
+psutil issues several syscalls per process and per attribute. This
+collector reads /proc/<pid>/stat once per process per tick, reads
+/proc/<pid>/status only the first time a process is seen (to filter by uid
+before anything else is parsed), and caches names and usernames per
+(pid, starttime). Its output matches ProcessTable.snapshot and the psutil
+figures used by Observer.get_system_stats.
+"""
+
+import os
+import pwd
+import sys
+import time
+from collections import namedtuple
+from typing import Dict, Iterable, List, Optional, Set
+
+from ..utils.logger import get_observer_logger
+
+logger = get_observer_logger()
+
+CLK_TCK = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+# Field offsets in /proc/<pid>/stat, counted after the ") " that ends comm
+STAT_UTIME = 11
+STAT_STIME = 12
+STAT_STARTTIME = 19
+STAT_RSS = 21
+
+VirtualMemory = namedtuple('VirtualMemory', ['total', 'available', 'percent', 'used'])
+DiskUsage = namedtuple('DiskUsage', ['total', 'used', 'free', 'percent'])
+
+
+class ProcfsCollector:
+    """
+    Bulk /proc reader producing get_running_apps / get_system_stats data
+
+    Args:
+        proc_root: procfs mount point (overridable for tests and benchmarks)
+        uids: Only report processes whose real uid is in this set
+    """
+
+    def __init__(self, proc_root: str = "/proc", uids: Optional[Iterable[int]] = None,
+                 clock=time.monotonic):
+        self.proc_root = proc_root
+        self.uids: Optional[Set[int]] = set(uids) if uids is not None else None
+        self._clock = clock
+
+        # (pid, starttime) -> [name, username, cpu_ticks, sampled_at]
+        self._cache: Dict[tuple, list] = {}
+        self._by_pid: Dict[int, tuple] = {}
+        self._skipped: Dict[int, int] = {}  # pid -> starttime filtered out by uid
+        self._users: Dict[int, str] = {}
+
+        self.boot_time = self._read_boot_time()
+        self._memory_total = self.virtual_memory().total
+        self._cpu_last = self._read_cpu_times()
+
+    @staticmethod
+    def available(proc_root: str = "/proc") -> bool:
+        """Check whether a usable procfs is mounted"""
+        return sys.platform.startswith('linux') and os.path.exists(os.path.join(proc_root, 'stat'))
+
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+
+    def _read(self, *parts: str) -> bytes:
+        with open(os.path.join(self.proc_root, *parts), 'rb') as f:
+            return f.read()
+
+    def _read_boot_time(self) -> float:
+        for line in self._read('stat').splitlines():
+            if line.startswith(b'btime'):
+                return float(line.split()[1])
+        raise OSError("btime missing from /proc/stat")
+
+    def _read_cpu_times(self) -> List[int]:
+        data = self._read('stat')
+        return [int(v) for v in data[:data.index(b'\n')].split()[1:]]
+
+    def _username(self, uid: int) -> str:
+        name = self._users.get(uid)
+        if name is None:
+            try:
+                name = pwd.getpwuid(uid).pw_name
+            except KeyError:
+                name = str(uid)  # same fallback as psutil
+            self._users[uid] = name
+        return name
+
+    def _real_uid(self, pid: str) -> int:
+        data = self._read(pid, 'status')
+        start = data.index(b'\nUid:') + 5
+        return int(data[start:data.index(b'\n', start)].split()[0])
+
+    def _name(self, pid: str, comm: bytes) -> str:
+        """Process name, extended from cmdline when comm was truncated"""
+        name = comm.decode('utf-8', 'surrogateescape')
+        if len(name) >= 15:
+            try:
+                cmdline = self._read(pid, 'cmdline')
+            except OSError:
+                return name
+            if cmdline:
+                first = cmdline.split(b'\0', 1)[0].decode('utf-8', 'surrogateescape')
+                extended = os.path.basename(first)
+                if extended.startswith(name):
+                    name = extended
+        return name
+
+    # ------------------------------------------------------------------
+    # Collectors
+    # ------------------------------------------------------------------
+
+    def running_apps(self) -> List[Dict]:
+        """Sample every visible process, ordered by pid"""
+        pids = sorted(int(p) for p in os.listdir(self.proc_root) if p.isdigit())
+        alive = set(pids)
+        for pid in [pid for pid in self._by_pid if pid not in alive]:
+            self._cache.pop(self._by_pid.pop(pid), None)
+        for pid in [pid for pid in self._skipped if pid not in alive]:
+            del self._skipped[pid]
+
+        wall = time.time()
+        memory_total = self._memory_total
+        apps = []
+        for pid in pids:
+            spid = str(pid)
+            try:
+                stat = self._read(spid, 'stat')
+            except OSError:
+                continue  # exited or hidden
+
+            close = stat.rindex(b')')
+            fields = stat[close + 2:].split()
+            starttime = int(fields[STAT_STARTTIME])
+            if self._skipped.get(pid) == starttime:
+                continue
+
+            key = (pid, starttime)
+            entry = self._cache.get(key)
+            if entry is None:
+                old = self._by_pid.pop(pid, None)
+                if old is not None:
+                    self._cache.pop(old, None)
+                try:
+                    uid = self._real_uid(spid)
+                except (OSError, ValueError):
+                    continue
+                if self.uids is not None and uid not in self.uids:
+                    self._skipped[pid] = starttime
+                    continue
+                name = self._name(spid, stat[stat.index(b'(') + 1:close])
+                entry = [name, self._username(uid), None, None]
+                self._cache[key] = entry
+                self._by_pid[pid] = key
+
+            now = self._clock()
+            cpu_ticks = int(fields[STAT_UTIME]) + int(fields[STAT_STIME])
+            if entry[3] is None:
+                elapsed = wall - (self.boot_time + starttime / CLK_TCK)
+                used = cpu_ticks
+            else:
+                elapsed = now - entry[3]
+                used = cpu_ticks - entry[2]
+            entry[2], entry[3] = cpu_ticks, now
+
+            if not (entry[0] and entry[1]):
+                continue
+
+            cpu_percent = round(max(used, 0) / CLK_TCK / elapsed * 100, 1) if elapsed > 0 else 0.0
+            rss = int(fields[STAT_RSS]) * PAGE_SIZE
+            apps.append({
+                'name': entry[0],
+                'pid': pid,
+                'username': entry[1],
+                'cpu_percent': cpu_percent,
+                'memory_percent': round(rss / memory_total * 100, 2)
+            })
+
+        return apps
+
+    def cpu_percent(self) -> float:
+        """System-wide CPU% since the previous call (psutil semantics)"""
+        times = self._read_cpu_times()
+        last, self._cpu_last = self._cpu_last, times
+
+        def total(t):
+            # guest and guest_nice are already included in user and nice
+            return sum(t) - sum(t[8:10])
+
+        def busy(t):
+            return total(t) - t[3] - t[4]  # minus idle and iowait
+
+        all_delta = total(times) - total(last)
+        busy_delta = busy(times) - busy(last)
+        if all_delta <= 0:
+            return 0.0
+        return round(min(max(busy_delta / all_delta * 100, 0.0), 100.0), 1)
+
+    def virtual_memory(self) -> VirtualMemory:
+        """Memory figures from /proc/meminfo (psutil semantics)"""
+        info = {}
+        for line in self._read('meminfo').splitlines():
+            key, _, value = line.partition(b':')
+            info[key] = int(value.split()[0]) * 1024
+
+        total = info[b'MemTotal']
+        free = info.get(b'MemFree', 0)
+        available = info.get(b'MemAvailable', free)
+        used = total - available
+        percent = round(used / total * 100, 1) if total else 0.0
+        return VirtualMemory(total, available, percent, used)
+
+
+def disk_usage(path: str = '/') -> DiskUsage:
+    """Disk usage via one statvfs call (psutil semantics)"""
+    st = os.statvfs(path)
+    total = st.f_blocks * st.f_frsize
+    free = st.f_bavail * st.f_frsize
+    used = (st.f_blocks - st.f_bfree) * st.f_frsize
+    percent = round(used / (used + free) * 100, 1) if used + free else 0.0
+    return DiskUsage(total, used, free, percent)
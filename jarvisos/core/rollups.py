@@ -0,0 +1,411 @@
+"""
+Rollups - Multi-resolution summaries of the observation log with retention
+
+Raw ticks arrive every few seconds and were kept forever, so long-horizon
+analysis and disk usage grew with uptime. The compactor summarizes them
+into 1-minute, 1-hour and 1-day buckets in ``rollups.db`` (SQLite):
+
+- tick count and seconds covered (adaptive tick weights)
+- min/mean/max/p95 of system CPU% and memory%
+- per-app presence (ticks the app was running in) and process counts
+- the busiest tick's process count and app-set switches between ticks
+
+and then archives sealed raw segments (see compression) and applies
+retention per resolution (by default raw ticks for 3 days, minute buckets
+for 30 days, hour and day buckets forever). Compaction is
+incremental and idempotent: each run re-reads raw ticks from the start of
+the day it last reached and only writes buckets that have closed.
+
+load_frame() answers a time range at the coarsest resolution a consumer
+allows: buckets tile the aligned middle of the range, finer resolutions the
+edges, and raw ticks whatever has not been compacted yet. The result is an
+ObservationFrame whose rows stand for whole buckets.
+"""
+
+import math
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..utils.logger import get_logger
+from . import codec
+from .frame import ObservationFrame
+from .observation_log import ObservationLog, TimeLike, open_observations, parse_time
+from .state_store import SQLiteStore
+
+logger = get_logger("jarvisos.rollups")
+
+ROLLUP_DB = "rollups.db"
+
+# Bucket sizes in seconds, finest first
+RESOLUTIONS = {'1m': 60, '1h': 3600, '1d': 86400}
+
+# How long each resolution is kept (None: forever)
+DEFAULT_RETENTION: Dict[str, Optional[timedelta]] = {
+    'raw': timedelta(days=3),
+    '1m': timedelta(days=30),
+    '1h': None,
+    '1d': None,
+}
+
+EPOCH = datetime(1970, 1, 1)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+
+CREATE TABLE IF NOT EXISTS rollups (
+    resolution  TEXT NOT NULL,
+    bucket      TEXT NOT NULL,
+    first_time  TEXT NOT NULL,
+    last_time   TEXT NOT NULL,
+    ticks       INTEGER NOT NULL,
+    seconds     REAL NOT NULL,
+    cpu_min     REAL,
+    cpu_mean    REAL,
+    cpu_max     REAL,
+    cpu_p95     REAL,
+    memory_min  REAL,
+    memory_mean REAL,
+    memory_max  REAL,
+    memory_p95  REAL,
+    peak_apps   INTEGER NOT NULL,
+    switches    INTEGER NOT NULL,
+    apps        TEXT NOT NULL,
+    PRIMARY KEY (resolution, bucket)
+);
+"""
+
+COLUMNS = ('resolution', 'bucket', 'first_time', 'last_time', 'ticks', 'seconds',
+           'cpu_min', 'cpu_mean', 'cpu_max', 'cpu_p95',
+           'memory_min', 'memory_mean', 'memory_max', 'memory_p95',
+           'peak_apps', 'switches', 'apps')
+
+
+def to_epoch(value: datetime) -> float:
+    """Seconds since 1970 of a wall-clock time (offsets are dropped, as in frames)"""
+    return (value.replace(tzinfo=None) - EPOCH).total_seconds()
+
+
+def from_epoch(seconds: float) -> datetime:
+    return EPOCH + timedelta(seconds=float(seconds))
+
+
+class RollupStore(SQLiteStore):
+    """
+    Rollup buckets in one SQLite database
+
+    Args:
+        path: Database file, or a directory to hold rollups.db
+    """
+
+    def __init__(self, path):
+        super().__init__(path, ROLLUP_DB, SCHEMA)
+
+    def compacted_until(self) -> Optional[datetime]:
+        """Every bucket ending at or before this time is final (None before the first run)"""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = 'compacted_until'").fetchone()
+        return datetime.fromisoformat(row['value']) if row else None
+
+    def set_compacted_until(self, value: datetime) -> None:
+        with self.transaction() as db:
+            db.execute("INSERT OR REPLACE INTO meta VALUES ('compacted_until', ?)", (value.isoformat(),))
+
+    def upsert(self, rows: List[Dict]) -> None:
+        """Insert or replace buckets"""
+        if not rows:
+            return
+        sql = (f"INSERT OR REPLACE INTO rollups ({', '.join(COLUMNS)}) "
+               f"VALUES ({', '.join(':' + c for c in COLUMNS)})")
+        with self.transaction() as db:
+            db.executemany(sql, rows)
+
+    def rows(self, resolution: str, since: Optional[datetime] = None,
+             until: Optional[datetime] = None) -> List[Dict]:
+        """Buckets starting in [since, until), oldest first; apps are decoded"""
+        sql, params = "SELECT * FROM rollups WHERE resolution = ?", [resolution]
+        if since is not None:
+            sql += " AND bucket >= ?"
+            params.append(since.isoformat())
+        if until is not None:
+            sql += " AND bucket < ?"
+            params.append(until.isoformat())
+        with self._lock:
+            rows = self._conn.execute(sql + " ORDER BY bucket", params).fetchall()
+        return [{**row, 'apps': codec.decode(row['apps'])} for row in map(dict, rows)]
+
+    def delete_before(self, resolution: str, cutoff: datetime) -> int:
+        """Drop buckets of one resolution that start before `cutoff`"""
+        with self.transaction() as db:
+            return db.execute("DELETE FROM rollups WHERE resolution = ? AND bucket < ?",
+                              (resolution, cutoff.isoformat())).rowcount
+
+    def summary(self) -> Dict[str, Dict]:
+        """Bucket count and time range per resolution"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT resolution, COUNT(*) AS buckets, MIN(bucket) AS first, MAX(bucket) AS last "
+                "FROM rollups GROUP BY resolution"
+            ).fetchall()
+        return {row['resolution']: dict(row) for row in rows}
+
+
+# ----------------------------------------------------------------------
+# Compaction
+# ----------------------------------------------------------------------
+
+def _stats(values: np.ndarray) -> Tuple[Optional[float], ...]:
+    """min, mean, max and p95 ignoring NaN (all None when nothing is valid)"""
+    values = values[~np.isnan(values)]
+    if not len(values):
+        return None, None, None, None
+    return (round(float(values.min()), 3), round(float(values.mean()), 3),
+            round(float(values.max()), 3), round(float(np.percentile(values, 95)), 3))
+
+
+def summarize(frame: ObservationFrame, times: List[str], resolution: str,
+              closed_before: float, changed: Optional[np.ndarray] = None) -> List[Dict]:
+    """
+    Bucket a raw frame at one resolution
+
+    Args:
+        frame: Raw ticks (one row per tick)
+        times: ISO timestamp of each tick
+        resolution: Key of RESOLUTIONS
+        closed_before: Epoch seconds; only buckets ending by then are returned
+        changed: frame.app_set_changed(), if already computed
+
+    Returns:
+        Rows for RollupStore.upsert, oldest first
+    """
+    size = RESOLUTIONS[resolution]
+    starts = frame.timestamps // size * size
+    closed = np.flatnonzero(starts + size <= closed_before)
+    if not len(closed):
+        return []
+    if changed is None:
+        changed = frame.app_set_changed()
+
+    keys, inverse = np.unique(starts[closed], return_inverse=True)
+    order = np.argsort(inverse, kind='stable')
+    groups = np.split(closed[order], np.flatnonzero(np.diff(inverse[order])) + 1)
+
+    lengths = np.diff(frame.indptr)
+    width = max(len(frame.app_names), 1)
+    rows = []
+    for key, ticks in zip(keys, groups):
+        # Entries (tick, app) of this bucket's ticks
+        counts = lengths[ticks]
+        entry = np.repeat(frame.indptr[ticks] - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        app_ids = frame.indices[entry]
+        processes = np.bincount(app_ids, minlength=width)
+        pairs = np.unique(np.repeat(np.arange(len(ticks)), counts) * width + app_ids)
+        presence = np.bincount(pairs % width, minlength=width)
+
+        cpu_min, cpu_mean, cpu_max, cpu_p95 = _stats(frame.cpu[ticks])
+        mem_min, mem_mean, mem_max, mem_p95 = _stats(frame.memory[ticks])
+        rows.append({
+            'resolution': resolution,
+            'bucket': from_epoch(key).isoformat(),
+            'first_time': times[ticks[0]],
+            'last_time': times[ticks[-1]],
+            'ticks': len(ticks),
+            'seconds': float(frame.weights[ticks].sum()),
+            'cpu_min': cpu_min, 'cpu_mean': cpu_mean, 'cpu_max': cpu_max, 'cpu_p95': cpu_p95,
+            'memory_min': mem_min, 'memory_mean': mem_mean,
+            'memory_max': mem_max, 'memory_p95': mem_p95,
+            'peak_apps': int(counts.max()) if len(counts) else 0,
+            'switches': int(changed[ticks].sum()),
+            'apps': codec.dumps({frame.app_names[i]: [int(presence[i]), int(processes[i])]
+                                 for i in np.flatnonzero(processes)}, pretty=False),
+        })
+    return rows
+
+
+class Compactor:
+    """
+    Incremental rollup job for one data directory
+
+    Args:
+        data_dir: Directory holding the observation log
+        retention: Overrides for DEFAULT_RETENTION ('raw', '1m', '1h', '1d'
+            mapped to a timedelta, or None to keep forever)
+        archive: Compress sealed raw segments after rolling them up
+    """
+
+    def __init__(self, data_dir="data", retention: Optional[Dict[str, Optional[timedelta]]] = None,
+                 archive: bool = True):
+        self.data_dir = Path(data_dir)
+        self.retention = {**DEFAULT_RETENTION, **(retention or {})}
+        self.archive = archive
+        self.store = RollupStore(self.data_dir / ROLLUP_DB)
+
+    def run(self, now: Optional[datetime] = None) -> Dict[str, Dict[str, int]]:
+        """
+        Roll up every closed bucket since the last run, archive sealed raw
+        segments, then apply retention
+
+        Returns:
+            {'written': buckets per resolution, 'archived': files compressed,
+            'expired': raw segments and buckets removed per resolution}
+        """
+        now = now or datetime.now()
+        closed_before = now.replace(second=0, microsecond=0)
+        closed_epoch = to_epoch(closed_before)
+
+        # Day buckets still open at the last run are rebuilt from the day's start
+        previous = self.store.compacted_until()
+        since = previous.replace(hour=0, minute=0, second=0, microsecond=0) if previous else None
+
+        written = dict.fromkeys(RESOLUTIONS, 0)
+        day, records = None, []
+        stream = open_observations(self.data_dir)
+        for obs in stream.iter_range(since, closed_before, fields=ObservationFrame.FIELDS):
+            key = obs['timestamp'][:10]
+            if key != day and records:
+                self._compact(records, closed_epoch, written)
+                records = []
+            day = key
+            records.append(obs)
+        if records:
+            self._compact(records, closed_epoch, written)
+
+        self.store.set_compacted_until(closed_before)
+        archived = len(stream.archive()) if self.archive else 0
+        expired = self.apply_retention(now)
+        logger.info(f"Compacted observations up to {closed_before.isoformat()}: "
+                    f"written {written}, archived {archived}, expired {expired}")
+        return {'written': written, 'archived': archived, 'expired': expired}
+
+    def _compact(self, records: List[Dict], closed_epoch: float, written: Dict[str, int]) -> None:
+        """Roll up one day of raw ticks at every resolution"""
+        frame = ObservationFrame.from_observations(records)
+        times = [obs['timestamp'] for obs in records]
+        changed = frame.app_set_changed()
+        rows = []
+        for resolution in RESOLUTIONS:
+            buckets = summarize(frame, times, resolution, closed_epoch, changed)
+            written[resolution] += len(buckets)
+            rows.extend(buckets)
+        self.store.upsert(rows)
+
+    def apply_retention(self, now: datetime) -> Dict[str, int]:
+        """Drop raw segments and buckets older than their retention"""
+        expired = {}
+        compacted = self.store.compacted_until()
+        keep_raw = self.retention.get('raw')
+        if keep_raw is not None and compacted is not None:
+            # Never drop ticks a still-open day bucket will be rebuilt from
+            cutoff = min(now - keep_raw, compacted.replace(hour=0, minute=0, second=0, microsecond=0))
+            expired['raw'] = ObservationLog(self.data_dir / "observations").drop_before(cutoff)
+        for resolution in RESOLUTIONS:
+            keep = self.retention.get(resolution)
+            if keep is not None:
+                expired[resolution] = self.store.delete_before(resolution, now - keep)
+        return expired
+
+
+# ----------------------------------------------------------------------
+# Reading
+# ----------------------------------------------------------------------
+
+def _rows_frame(rows: List[Dict]) -> ObservationFrame:
+    """Frame with one row per bucket"""
+    nan = float('nan')
+    app_ids: Dict[str, int] = {}
+    indptr, indices, data = [0], [], []
+    for row in rows:
+        for name, (_, processes) in row['apps'].items():
+            indices.append(app_ids.setdefault(name, len(app_ids)))
+            data.append(processes)
+        indptr.append(len(indices))
+
+    def column(name):
+        return np.array([nan if row[name] is None else row[name] for row in rows], dtype=np.float64)
+
+    return ObservationFrame(
+        timestamps=np.array([to_epoch(datetime.fromisoformat(row['bucket'])) for row in rows],
+                            dtype=np.float64),
+        cpu=column('cpu_mean'),
+        memory=column('memory_mean'),
+        weights=np.array([row['seconds'] for row in rows], dtype=np.float64),
+        indptr=np.array(indptr, dtype=np.int64),
+        indices=np.array(indices, dtype=np.int32),
+        app_names=list(app_ids),
+        start_time=rows[0]['first_time'] if rows else None,
+        end_time=rows[-1]['last_time'] if rows else None,
+        counts=np.array([row['ticks'] for row in rows], dtype=np.int64),
+        data=np.array(data, dtype=np.int64),
+        peak_apps=np.array([row['peak_apps'] for row in rows], dtype=np.int64),
+        switches=np.array([row['switches'] for row in rows], dtype=np.int64),
+    )
+
+
+def _raw_frame(data_dir: Path, since: Optional[datetime], until: Optional[datetime]) -> ObservationFrame:
+    stream = open_observations(data_dir, since, until, ObservationFrame.FIELDS)
+    return ObservationFrame.from_observations(stream)
+
+
+def _tile(lo: Optional[float], hi: float, levels: List[str]) -> List[Tuple[Optional[str], Optional[float], float]]:
+    """
+    Cover [lo, hi) with the coarsest aligned buckets, finer ones at the edges
+
+    Returns:
+        (resolution or None for raw ticks, start, end) pieces in time order
+    """
+    if not levels:
+        return [(None, lo, hi)]
+    size = RESOLUTIONS[levels[0]]
+    first = None if lo is None else math.ceil(lo / size) * size
+    last = math.floor(hi / size) * size
+    if first is not None and first >= last:
+        return _tile(lo, hi, levels[1:])
+
+    pieces = []
+    if lo is not None and lo < first:
+        pieces += _tile(lo, first, levels[1:])
+    pieces.append((levels[0], first, last))
+    if last < hi:
+        pieces += _tile(last, hi, levels[1:])
+    return pieces
+
+
+def load_frame(data_dir="data", since: TimeLike = None, until: TimeLike = None,
+               resolution: str = '1h') -> ObservationFrame:
+    """
+    Load [since, until) at the coarsest resolution no coarser than `resolution`
+
+    Consumers that only need hourly detail (UserDNA) pass '1h'; whole-range
+    totals and means (Analyzer) can pass '1d'. Ranges before the first
+    compaction, or after the last, come from raw ticks.
+    """
+    data_dir = Path(data_dir)
+    since, until = parse_time(since), parse_time(until)
+    compacted = None
+    if (data_dir / ROLLUP_DB).exists():
+        store = RollupStore(data_dir / ROLLUP_DB)
+        compacted = store.compacted_until()
+        if compacted is None:
+            store.close()
+    if compacted is None:
+        return _raw_frame(data_dir, since, until)
+
+    levels = [r for r in reversed(list(RESOLUTIONS)) if RESOLUTIONS[r] <= RESOLUTIONS[resolution]]
+    end = compacted if until is None else min(until, compacted)
+    frames = []
+    if since is None or since < end:
+        for level, lo, hi in _tile(None if since is None else to_epoch(since), to_epoch(end), levels):
+            lo_time = None if lo is None else from_epoch(lo)
+            if level is None:
+                frames.append(_raw_frame(data_dir, lo_time, from_epoch(hi)))
+            else:
+                frames.append(_rows_frame(store.rows(level, lo_time, from_epoch(hi))))
+    if until is None or until > compacted:
+        frames.append(_raw_frame(data_dir, compacted if since is None else max(since, compacted), until))
+    store.close()
+    return ObservationFrame.concat(frames)
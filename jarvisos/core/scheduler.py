@@ -0,0 +1,166 @@
+"""
+Scheduler - Monotonic, drift-corrected tick scheduling for the observer
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Set
+
+
+@dataclass
+class Tick:
+    """A single scheduled tick"""
+    index: int        # Tick number since the scheduler started
+    scheduled: float  # Monotonic deadline the tick was due at
+    jitter: float     # Seconds between deadline and actual wake-up
+    missed: int       # Ticks skipped because we fell a full interval behind
+
+
+class TickScheduler:
+    """
+    Schedules ticks on a fixed monotonic grid
+
+    Deadlines are computed from the start time rather than from the end of
+    the previous tick, so collection time never accumulates as drift. When a
+    tick overruns by one or more whole intervals those ticks are skipped and
+    counted instead of being fired back-to-back.
+    """
+
+    def __init__(self, interval: float,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.interval = interval
+        self._clock = clock
+        self._sleep = sleep
+        self._next: Optional[float] = None
+        self._last: Optional[float] = None
+        self._index = 0
+
+        # Jitter metrics
+        self.ticks = 0
+        self.missed_total = 0
+        self.jitter_last = 0.0
+        self.jitter_max = 0.0
+        self._jitter_sum = 0.0
+
+    def wait(self) -> Tick:
+        """Sleep until the next deadline and describe the tick that fired"""
+        now = self._clock()
+        if self._next is None:
+            self._next = now
+
+        delay = self._next - now
+        if delay > 0:
+            self._sleep(delay)
+            now = self._clock()
+
+        missed = 0
+        late = now - self._next
+        if late >= self.interval:
+            missed = int(late // self.interval)
+            self._next += missed * self.interval
+            self._index += missed
+
+        tick = Tick(
+            index=self._index,
+            scheduled=self._next,
+            jitter=now - self._next,
+            missed=missed
+        )
+        self._record(tick)
+
+        self._index += 1
+        self._last = self._next
+        self._next += self.interval
+        return tick
+
+    def set_interval(self, interval: float) -> None:
+        """Change the interval, re-anchoring the next deadline on the last tick"""
+        self.interval = interval
+        if self._last is not None:
+            self._next = self._last + interval
+
+    def _record(self, tick: Tick) -> None:
+        """Update jitter metrics"""
+        self.ticks += 1
+        self.missed_total += tick.missed
+        self.jitter_last = tick.jitter
+        self.jitter_max = max(self.jitter_max, tick.jitter)
+        self._jitter_sum += tick.jitter
+
+    def stats(self) -> Dict:
+        """Tick jitter metrics in milliseconds"""
+        avg = self._jitter_sum / self.ticks if self.ticks else 0.0
+        return {
+            'ticks': self.ticks,
+            'missed_ticks': self.missed_total,
+            'jitter_last_ms': round(self.jitter_last * 1000, 3),
+            'jitter_avg_ms': round(avg * 1000, 3),
+            'jitter_max_ms': round(self.jitter_max * 1000, 3),
+        }
+
+
+class AdaptiveInterval:
+    """
+    Activity-driven sampling interval
+
+    Bursts to ``min_interval`` as soon as a new kind of process appears or
+    system CPU moves by ``cpu_threshold`` points between ticks, and doubles
+    the interval (up to ``max_interval``) each time the machine has stayed
+    stable for ``stable_ticks`` consecutive ticks.
+
+    Args:
+        min_interval: Fastest interval in seconds, used while active
+        max_interval: Slowest interval in seconds, used while idle
+        stable_ticks: Quiet ticks required before each back-off step
+        cpu_threshold: CPU% change between ticks that counts as activity
+        backoff: Multiplier applied to the interval on each back-off step
+        initial: Starting interval (default: min_interval), clamped to the bounds
+    """
+
+    def __init__(self, min_interval: float, max_interval: float,
+                 stable_ticks: int = 6, cpu_threshold: float = 15.0,
+                 backoff: float = 2.0, initial: Optional[float] = None):
+        if not 0 < min_interval <= max_interval:
+            raise ValueError(f"Invalid interval bounds: {min_interval}..{max_interval}")
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.stable_ticks = stable_ticks
+        self.cpu_threshold = cpu_threshold
+        self.backoff = backoff
+
+        if initial is None:
+            initial = min_interval
+        self.interval = min(max(initial, min_interval), max_interval)
+        self._stable = 0
+        self._cpu: Optional[float] = None
+        self._names: Optional[Set[str]] = None
+
+    def update(self, observation: Dict) -> float:
+        """
+        Fold one observation into the activity estimate
+
+        Args:
+            observation: A tick with 'system' and 'apps' entries
+
+        Returns:
+            The interval to wait before the next tick
+        """
+        cpu = observation['system']['cpu_percent']
+        names = {app['name'] for app in observation.get('apps', ())}
+
+        active = False
+        if self._cpu is not None:
+            active = (abs(cpu - self._cpu) >= self.cpu_threshold
+                      or not names <= self._names)
+        self._cpu, self._names = cpu, names
+
+        if active:
+            self.interval = self.min_interval
+            self._stable = 0
+        else:
+            self._stable += 1
+            if self._stable >= self.stable_ticks:
+                self.interval = min(self.interval * self.backoff, self.max_interval)
+                self._stable = 0
+        return self.interval
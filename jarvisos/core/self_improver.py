@@ -12,11 +12,17 @@ Tourne en background et:
 """
 
 import time
-import json
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Iterator, List, Dict, Optional
 from datetime import datetime
 
+from . import codec
+from .json_files import write_json
+from .observation_log import ObservationLog
+from .state_store import open_state
+
+MAX_CONTEXTS = 5  # Observations kept per command as pattern context
+
 class SelfImprover:
     """
     Moteur d'auto-amélioration de JarvisOS
@@ -28,13 +34,16 @@ class SelfImprover:
     - Apprentissage continu
     """
     
-    def __init__(self):
+    def __init__(self, observations_dir: str = "data"):
         self.data_dir = Path.home() / ".jarvisos"
         self.data_dir.mkdir(exist_ok=True)
         
         self.observations_file = self.data_dir / "observations.json"
-        self.improvements_file = self.data_dir / "improvements.json"
-        self.patterns_file = self.data_dir / "patterns.json"
+        # Améliorations et patterns traités (importe improvements.json / patterns.json)
+        self.store = open_state(self.data_dir)
+        # Compteurs cumulés + position de lecture, pour ne lire que le nouveau
+        self.pattern_state_file = self.data_dir / "pattern_state.json"
+        self.log = ObservationLog(Path(observations_dir) / "observations")
         
         self.threshold = 5  # Nombre de répétitions avant action
         self.ai = None  # Lazy load
@@ -45,7 +54,7 @@ class SelfImprover:
         Tourne en background comme service
         """
         print("🧬 JarvisOS Self-Improvement Engine started")
-        print(f"   Monitoring: {self.observations_file}")
+        print(f"   Monitoring: {self.log.log_dir}")
         print(f"   Threshold: {self.threshold} repetitions")
         print()
         
@@ -87,20 +96,12 @@ class SelfImprover:
         Returns:
             Liste de patterns trouvés
         """
-        if not self.observations_file.exists():
-            return []
-        
-        try:
-            with open(self.observations_file) as f:
-                observations = json.load(f)
-        except:
-            return []
-        
-        # Analyse des commandes
-        command_counts = {}
-        command_contexts = {}
+        state = self._load_pattern_state()
+        command_counts = state['counts']
+        command_contexts = state['contexts']
         
-        for obs in observations:
+        # Analyse incrémentale: seules les nouvelles commandes sont lues
+        for obs in self._new_command_events(state):
             cmd = obs.get('command', '').strip()
             if not cmd:
                 continue
@@ -111,7 +112,9 @@ class SelfImprover:
                 command_contexts[cmd] = []
             
             command_counts[cmd] += 1
-            command_contexts[cmd].append(obs)
+            command_contexts[cmd] = (command_contexts[cmd] + [obs])[-MAX_CONTEXTS:]
+        
+        self._save_pattern_state(state)
         
         # Identifie les patterns (répétitions > threshold)
         patterns = []
@@ -131,6 +134,47 @@ class SelfImprover:
         
         return patterns
     
+    def _load_pattern_state(self) -> Dict:
+        """Charge les compteurs et la position de lecture"""
+        state = {'position': None, 'legacy_seen': 0, 'counts': {}, 'contexts': {}}
+        if self.pattern_state_file.exists():
+            try:
+                with open(self.pattern_state_file) as f:
+                    state.update(codec.load(f))
+            except (OSError, ValueError):
+                pass
+        return state
+    
+    def _save_pattern_state(self, state: Dict):
+        """Sauvegarde atomique des compteurs"""
+        write_json(self.pattern_state_file, state)
+    
+    def _new_command_events(self, state: Dict) -> Iterator[Dict]:
+        """
+        Commandes apparues depuis le dernier passage
+        
+        Lit la suite de l'ancien fichier observations.json (liste), puis les
+        événements 'commands' du journal d'observations à partir de la
+        position sauvegardée. La position avance au fil de la lecture.
+        """
+        if self.observations_file.exists():
+            try:
+                with open(self.observations_file) as f:
+                    observations = codec.load(f)
+            except (OSError, ValueError):
+                observations = []
+            if len(observations) < state['legacy_seen']:
+                state['legacy_seen'] = 0  # fichier remplacé
+            yield from observations[state['legacy_seen']:]
+            state['legacy_seen'] = len(observations)
+        
+        position = tuple(state['position']) if state['position'] else None
+        for record, position in self.log.tail(position):
+            if 'command' in record:
+                yield record
+            yield from record.get('commands', ())
+            state['position'] = list(position)
+    
     def _classify_pattern(self, command: str) -> str:
         """Classifie le type de pattern"""
         cmd_lower = command.lower()
@@ -150,21 +194,7 @@ class SelfImprover:
     
     def _is_pattern_processed(self, pattern: Dict) -> bool:
         """Vérifie si un pattern a déjà été traité"""
-        if not self.patterns_file.exists():
-            return False
-        
-        try:
-            with open(self.patterns_file) as f:
-                processed = json.load(f)
-            
-            # Check si commande déjà vue
-            for p in processed:
-                if p['command'] == pattern['command']:
-                    return True
-            
-            return False
-        except:
-            return False
+        return self.store.is_pattern_processed(pattern['command'])
     
     def improve_from_pattern(self, pattern: Dict):
         """
@@ -241,36 +271,11 @@ class SelfImprover:
     
     def _save_improvement(self, improvement: Dict):
         """Sauvegarde une amélioration"""
-        improvements = []
-        if self.improvements_file.exists():
-            try:
-                with open(self.improvements_file) as f:
-                    improvements = json.load(f)
-            except:
-                improvements = []
-        
-        improvements.append(improvement)
-        
-        with open(self.improvements_file, 'w') as f:
-            json.dump(improvements, f, indent=2)
+        self.store.add_improvement(improvement)
     
     def _mark_pattern_processed(self, pattern: Dict):
         """Marque un pattern comme traité"""
-        processed = []
-        if self.patterns_file.exists():
-            try:
-                with open(self.patterns_file) as f:
-                    processed = json.load(f)
-            except:
-                processed = []
-        
-        processed.append({
-            'command': pattern['command'],
-            'processed_at': datetime.now().isoformat()
-        })
-        
-        with open(self.patterns_file, 'w') as f:
-            json.dump(processed, f, indent=2)
+        self.store.mark_pattern_processed(pattern['command'], datetime.now().isoformat())
     
     def get_improvements(self, status: Optional[str] = None) -> List[Dict]:
         """
@@ -279,19 +284,7 @@ class SelfImprover:
         Args:
             status: Filtrer par statut (pending, approved, rejected)
         """
-        if not self.improvements_file.exists():
-            return []
-        
-        try:
-            with open(self.improvements_file) as f:
-                improvements = json.load(f)
-            
-            if status:
-                improvements = [i for i in improvements if i['status'] == status]
-            
-            return improvements
-        except:
-            return []
+        return self.store.improvements(status)
 
 
 def run_as_service():
@@ -0,0 +1,175 @@
+"""
+Self Metrics - Observer self-overhead accounting
+
+Measures what observing costs: collection latency per collector, processes
+scanned, bytes written, and the observer's own CPU% and RSS. Recent ticks
+are kept in fixed-size windows so rolling percentiles are cheap, and a
+small summary file is written for `jarvis status` to display.
+"""
+
+import os
+import time
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+import psutil
+
+from ..utils.logger import get_observer_logger
+from .json_files import read_json, write_json
+
+logger = get_observer_logger()
+
+METRICS_FILE = "observer_metrics.json"
+PERCENTILES = (50, 95, 99)
+
+
+class RollingWindow:
+    """Last N values of a metric with nearest-rank percentiles"""
+
+    def __init__(self, size: int = 720):  # one hour at the default 5 s interval
+        self.values = deque(maxlen=size)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def add(self, value: float) -> None:
+        self.values.append(value)
+
+    def mean(self, last: Optional[int] = None) -> float:
+        values = list(self.values)[-last:] if last else self.values
+        return sum(values) / len(values) if values else 0.0
+
+    def percentiles(self, points: Iterable[int] = PERCENTILES) -> Dict[str, float]:
+        ordered = sorted(self.values)
+        if not ordered:
+            return {}
+        result = {}
+        for p in points:
+            rank = max(1, -(-p * len(ordered) // 100))  # ceil(p/100 * n)
+            result[f"p{p}"] = round(ordered[rank - 1], 3)
+        return result
+
+
+class SelfMetrics:
+    """
+    Per-tick overhead accounting for the observer
+
+    Args:
+        output_dir: Directory the summary file is written to
+        window: Number of recent ticks kept for percentiles
+        cpu_budget: Optional cap on the observer's own CPU%; see over_budget()
+    """
+
+    def __init__(self, output_dir="data", window: int = 720,
+                 cpu_budget: Optional[float] = None, clock=time.monotonic):
+        self.metrics_file = Path(output_dir) / METRICS_FILE
+        self.window = window
+        self.cpu_budget = cpu_budget
+        self._clock = clock
+        self._process = psutil.Process()
+
+        self.latency: Dict[str, RollingWindow] = {}
+        self.cpu = RollingWindow(window)
+        self.rss = RollingWindow(window)
+        self.scanned = RollingWindow(window)
+        self.tick_bytes = RollingWindow(window)
+
+        self.ticks = 0
+        self.bytes_written = 0
+        self.throttled_ticks = 0
+        self._cpu_mark: Optional[float] = None
+        self._wall_mark: Optional[float] = None
+
+    def timed(self, collector: str, started: float) -> float:
+        """
+        Record the latency of one collector call
+
+        Args:
+            collector: Collector name, e.g. 'apps' or 'system'
+            started: time.perf_counter() taken before the call
+
+        Returns:
+            Latency in milliseconds
+        """
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        window = self.latency.get(collector)
+        if window is None:
+            window = self.latency[collector] = RollingWindow(self.window)
+        window.add(elapsed_ms)
+        return elapsed_ms
+
+    def record_tick(self, scanned: int) -> Dict:
+        """
+        Close out the collection phase of one tick
+
+        Args:
+            scanned: Number of processes the collector returned
+
+        Returns:
+            The observer's own CPU% since the previous tick and its RSS in MB
+        """
+        cpu_now, wall_now = time.process_time(), self._clock()
+        cpu_percent = 0.0
+        if self._wall_mark is not None:
+            # Own CPU over the whole tick period, sleep included
+            wall = wall_now - self._wall_mark
+            cpu_percent = (cpu_now - self._cpu_mark) / wall * 100 if wall > 0 else 0.0
+            self.cpu.add(cpu_percent)
+        self._cpu_mark, self._wall_mark = cpu_now, wall_now
+
+        try:
+            rss_mb = self._process.memory_info().rss / (1024 ** 2)
+        except psutil.Error:
+            rss_mb = 0.0
+
+        self.ticks += 1
+        self.rss.add(rss_mb)
+        self.scanned.add(scanned)
+        return {'cpu_percent': round(cpu_percent, 3), 'rss_mb': round(rss_mb, 1)}
+
+    def record_write(self, nbytes: int) -> None:
+        """Account for bytes appended to the observation log"""
+        self.bytes_written += nbytes
+        self.tick_bytes.add(nbytes)
+
+    def over_budget(self, last: int = 12) -> Optional[float]:
+        """
+        Compare recent own CPU% with the budget
+
+        Returns:
+            The ratio of recent CPU% to the budget (>1 means over), or None
+            when no budget is set
+        """
+        if not self.cpu_budget or not len(self.cpu):
+            return None
+        return self.cpu.mean(last) / self.cpu_budget
+
+    def summary(self) -> Dict:
+        """Rolling percentiles and totals for display"""
+        return {
+            'updated_at': time.time(),
+            'pid': os.getpid(),
+            'ticks': self.ticks,
+            'window': self.window,
+            'latency_ms': {name: window.percentiles() for name, window in self.latency.items()},
+            'cpu_percent': self.cpu.percentiles(),
+            'rss_mb': self.rss.percentiles(),
+            'processes_scanned': self.scanned.percentiles(),
+            'bytes_per_tick': self.tick_bytes.percentiles(),
+            'bytes_written': self.bytes_written,
+            'cpu_budget': self.cpu_budget,
+            'throttled_ticks': self.throttled_ticks,
+        }
+
+    def save(self) -> None:
+        """Atomically write the summary file"""
+        try:
+            write_json(self.metrics_file, self.summary())
+        except OSError as e:
+            logger.warning(f"Failed to write observer metrics: {e}")
+
+
+def load_metrics(data_dir="data") -> Optional[Dict]:
+    """Read the summary written by a running or finished observer"""
+    return read_json(Path(data_dir) / METRICS_FILE)
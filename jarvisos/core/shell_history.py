@@ -0,0 +1,278 @@
+"""
+Shell History Collector - Incremental tail of bash and zsh history files
+
+Each poll reads only the bytes appended since the previous one, using a
+byte offset persisted per file together with the last bytes read before
+it. If those bytes are no longer at the offset, the file was rotated,
+truncated or rewritten: reading resumes just after them when they can still
+be found (bash trimming old lines to HISTFILESIZE, or rewriting the file
+through a rename), and from the start otherwise (`history -c`, logrotate).
+Only complete lines are consumed, so a command the shell is still writing
+is picked up on the next poll.
+
+Supported formats:
+    bash:  plain lines, optionally preceded by '#<epoch>' (HISTTIMEFORMAT)
+    zsh:   plain lines or ': <epoch>:<duration>;<command>' (EXTENDED_HISTORY),
+           with backslash-continued multi-line commands and metafied bytes
+
+Some commands are never recorded (is_private): those typed with a leading
+space (bash ignorespace, zsh HIST_IGNORE_SPACE), those matching a
+HISTIGNORE-style glob, and those that look like they carry a credential
+(SECRET).
+"""
+
+import fnmatch
+import json
+import os
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+from ..utils.logger import get_observer_logger
+from . import codec
+from .json_files import write_json
+
+logger = get_observer_logger()
+
+ZSH_META = 0x83
+FINGERPRINT_BYTES = 64
+
+# Commands that look like they put a credential on the command line
+SECRET = re.compile(
+    r"(?i)(?:^|[\s;&|])(?:export\s+\w+="
+    r"|\w*(?:pass(?:word|wd)?|secret|token|api[_-]?key|credential)\w*="
+    r"|--?(?:password|passwd|token|secret|api[_-]?key)\b"
+    r"|(?:mysql|mysqldump|mariadb)\b.*\s-p\S"
+    r"|authorization:|bearer\s)"
+)
+
+
+def history_ignore_patterns() -> List[str]:
+    """Glob patterns from $HISTIGNORE (colon separated; bash's '&' is dropped)"""
+    return [p for p in os.environ.get("HISTIGNORE", "").split(":") if p and p != "&"]
+
+
+def is_private(line: str, patterns: Iterable[str] = ()) -> bool:
+    """
+    Whether a history line must not be recorded
+
+    Args:
+        line: The command as stored, before surrounding whitespace is removed
+        patterns: HISTIGNORE-style globs matched against the whole command
+    """
+    if line[:1].isspace():
+        return True
+    command = line.strip()
+    return (any(fnmatch.fnmatchcase(command, pattern) for pattern in patterns)
+            or SECRET.search(command) is not None)
+
+
+def default_sources() -> List[Path]:
+    """History files for the current user: $HISTFILE, bash and zsh"""
+    home = Path.home()
+    sources = [home / ".bash_history", home / ".zsh_history"]
+    histfile = os.environ.get("HISTFILE")
+    if histfile and Path(histfile) not in sources:
+        sources.insert(0, Path(histfile))
+    return sources
+
+
+def unmetafy(data: bytes) -> bytes:
+    """Undo zsh's history metafication (0x83 followed by byte ^ 32)"""
+    if ZSH_META not in data:
+        return data
+    out = bytearray()
+    meta = False
+    for byte in data:
+        if meta:
+            out.append(byte ^ 32)
+            meta = False
+        elif byte == ZSH_META:
+            meta = True
+        else:
+            out.append(byte)
+    return bytes(out)
+
+
+def parse_history(data: bytes, shell: str,
+                  skip: Optional[Callable[[str], bool]] = None) -> List[Dict]:
+    """
+    Parse complete history lines into command events
+
+    Args:
+        data: Raw bytes ending on a line boundary
+        shell: 'bash' or 'zsh'
+        skip: Drops commands for which it returns True (given the command
+            as stored, e.g. is_private)
+
+    Returns:
+        Events with 'command', 'shell' and 'timestamp' (ISO, or None when
+        the history carries no timestamps)
+    """
+    if shell == 'zsh':
+        data = unmetafy(data)
+    text = data.decode('utf-8', 'replace')
+
+    events = []
+    pending_time: Optional[float] = None
+    lines = text.split('\n')
+    if lines and lines[-1] == '':
+        lines.pop()
+
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        i += 1
+
+        if shell == 'bash' and line.startswith('#') and line[1:].isdigit():
+            pending_time = float(line[1:])
+            continue
+
+        if shell == 'zsh':
+            # Multi-line commands are stored with a trailing backslash
+            while line.endswith('\\') and i < len(lines):
+                line = line[:-1] + '\n' + lines[i]
+                i += 1
+            if line.startswith(': ') and ';' in line:
+                header, command = line[2:].split(';', 1)
+                epoch = header.split(':', 1)[0]
+                if epoch.isdigit():
+                    pending_time = float(epoch)
+                    line = command
+
+        command = line.strip()
+        if command and not (skip and skip(line)):
+            events.append({
+                'command': command,
+                'shell': shell,
+                'timestamp': (datetime.fromtimestamp(pending_time).isoformat()
+                              if pending_time is not None else None)
+            })
+        pending_time = None
+
+    return events
+
+
+class ShellHistoryCollector:
+    """
+    Emits new shell commands since the previous poll
+
+    Args:
+        state_file: JSON file holding the per-file offsets
+        sources: History files to follow (default: $HISTFILE, bash, zsh)
+        backfill: Read existing history the first time a file is seen;
+            by default only commands run after the first poll are emitted
+        ignore: Globs of commands not to record (default: $HISTIGNORE);
+            space-prefixed and credential-like commands are always skipped
+    """
+
+    def __init__(self, state_file, sources: Optional[Iterable] = None,
+                 backfill: bool = False, ignore: Optional[Iterable[str]] = None):
+        self.state_file = Path(state_file)
+        self.sources = [Path(s) for s in (sources if sources is not None else default_sources())]
+        self.backfill = backfill
+        self.ignore = list(ignore) if ignore is not None else history_ignore_patterns()
+        self.state: Dict[str, Dict] = self._load_state()
+
+    def _load_state(self) -> Dict[str, Dict]:
+        if self.state_file.exists():
+            try:
+                with open(self.state_file) as f:
+                    return codec.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Resetting shell history offsets: {e}")
+        return {}
+
+    def _save_state(self) -> None:
+        try:
+            write_json(self.state_file, self.state)
+        except OSError as e:
+            logger.warning(f"Failed to save shell history offsets: {e}")
+
+    def _is_private(self, line: str) -> bool:
+        return is_private(line, self.ignore)
+
+    @staticmethod
+    def _shell_for(path: Path) -> str:
+        return 'zsh' if 'zsh' in path.name or path.name == '.histfile' else 'bash'
+
+    def _poll_file(self, path: Path) -> List[Dict]:
+        try:
+            st = path.stat()
+            return self._read_new(path, st)
+        except OSError as e:
+            if path.exists():
+                logger.warning(f"Failed to read {path}: {e}")
+            return []
+
+    def _read_new(self, path: Path, st: os.stat_result) -> List[Dict]:
+        """Parse complete lines past the saved offset and advance it"""
+        key = str(path)
+        saved = self.state.get(key)
+        events = []
+        with open(path, 'rb') as f:
+            if saved is None:
+                offset = 0 if self.backfill else st.st_size
+            else:
+                offset = self._resume_offset(f, st, saved, path)
+
+            if st.st_size > offset:
+                f.seek(offset)
+                data = f.read(st.st_size - offset)
+                end = data.rfind(b'\n') + 1  # leave a partial last line for later
+                if end:
+                    events = parse_history(data[:end], self._shell_for(path), self._is_private)
+                    offset += end
+
+            if saved is not None and offset == saved['offset'] and not events:
+                tail = saved.get('tail', '')
+            else:
+                f.seek(max(offset - FINGERPRINT_BYTES, 0))
+                tail = f.read(offset - f.tell()).hex()
+
+        self.state[key] = {'inode': st.st_ino, 'offset': offset, 'tail': tail}
+        return events
+
+    @staticmethod
+    def _resume_offset(f, st, saved: Dict, path: Path) -> int:
+        """Where to continue reading, given what was read last time"""
+        offset, tail = saved['offset'], bytes.fromhex(saved.get('tail', ''))
+        if not tail:
+            return offset if st.st_ino == saved['inode'] and st.st_size >= offset else 0
+
+        if st.st_size >= offset:
+            f.seek(offset - len(tail))
+            if f.read(len(tail)) == tail:
+                return offset
+
+        # Rewritten or trimmed: resume after the last thing we read, if present
+        f.seek(0)
+        found = f.read().rfind(tail)
+        if found >= 0:
+            logger.info(f"{path} was rewritten, resuming after the last command read")
+            return found + len(tail)
+        logger.info(f"{path} was rotated or truncated, reading it from the start")
+        return 0
+
+    def poll(self) -> List[Dict]:
+        """
+        Read commands appended since the previous poll
+
+        Returns:
+            Command events in file order; events without a timestamp in the
+            history get the poll time
+        """
+        before = json.dumps(self.state, sort_keys=True)
+        events = []
+        for path in self.sources:
+            events.extend(self._poll_file(path))
+
+        now = datetime.now().isoformat()
+        for event in events:
+            if event['timestamp'] is None:
+                event['timestamp'] = now
+
+        if json.dumps(self.state, sort_keys=True) != before:
+            self._save_state()
+        return events
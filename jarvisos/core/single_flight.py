@@ -0,0 +1,126 @@
+"""
+Single Flight - Share one execution among identical concurrent calls
+
+In a long-running process the voice loop, the notifier and a CLI command
+can ask the AI brain the same thing at the same moment. SingleFlight runs
+the first call for a key (the leader) and makes every identical call that
+arrives while it is running wait for that result instead of starting its
+own; once the call finishes the key is free again, so nothing is cached
+here (see llm_cache for that).
+
+- the result, or the exception, is handed to every waiter
+- calls, executions and coalesced calls are counted per request name
+- coalesced() wraps a method so its calls are keyed by the owner's
+  request_key(name, args, kwargs); a leading underscore is dropped from
+  the request name
+"""
+
+import functools
+import threading
+from typing import Any, Callable, Dict, Hashable
+
+from ..utils.logger import get_logger
+
+logger = get_logger("jarvisos.single_flight")
+
+
+class _Call:
+    """One in-flight execution and the callers waiting on it"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesces concurrent calls that share a key"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._counts: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, name: str, field: str, n: int = 1) -> None:
+        counts = self._counts.setdefault(name, {'calls': 0, 'executed': 0, 'coalesced': 0})
+        counts[field] += n
+
+    def record_coalesced(self, name: str, n: int) -> None:
+        """Count `n` calls that were merged before reaching do() (e.g. batch duplicates)"""
+        with self._lock:
+            self._count(name, 'calls', n)
+            self._count(name, 'coalesced', n)
+
+    def do(self, key: Hashable, func: Callable[[], Any], name: str = 'call') -> Any:
+        """
+        func(), or the result of an identical call already running
+
+        Args:
+            key: Identifies the request; equal keys share one execution
+            func: Produces the result; run only by the leader
+            name: Request name the metrics are counted under
+        """
+        with self._lock:
+            self._count(name, 'calls')
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._count(name, 'executed')
+            else:
+                call.waiters += 1
+                self._count(name, 'coalesced')
+
+        if not leader:
+            logger.debug(f"Coalesced {name} with an identical call in flight")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def in_flight(self) -> int:
+        """Executions currently running"""
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self) -> Dict[str, Any]:
+        """Call, execution and coalesced counts, in total and per request name"""
+        with self._lock:
+            names = {name: dict(counts) for name, counts in sorted(self._counts.items())}
+            in_flight = len(self._calls)
+        totals = {field: sum(counts[field] for counts in names.values())
+                  for field in ('calls', 'executed', 'coalesced')}
+        return {**totals, 'in_flight': in_flight, 'requests': names}
+
+    def reset(self) -> None:
+        """Zero the counters"""
+        with self._lock:
+            self._counts.clear()
+
+
+def coalesced(method: Callable) -> Callable:
+    """
+    Coalesce identical concurrent calls of a method
+
+    The owner needs a `flights` SingleFlight and a
+    request_key(name, args, kwargs) returning the key for a call.
+    """
+    name = method.__name__.lstrip('_')
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        key = self.request_key(name, args, kwargs)
+        return self.flights.do(key, lambda: method(self, *args, **kwargs), name=name)
+    return wrapper
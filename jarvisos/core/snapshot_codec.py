@@ -0,0 +1,180 @@
+"""
+Snapshot Codec - Delta encoding for per-tick process snapshots
+
+Instead of storing the full process list on every tick, the encoder emits
+spawn/exit events plus the metrics that changed, with process and user
+names interned into a string table. Keyframes carry the complete process
+set and string table, so decoding can start at any keyframe.
+
+Encoded form (stored under the 'ps' key in place of 'apps'):
+    {'k': 1, 'strings': [...], 'spawn': [[pid, name_id, user_id, cpu, mem], ...]}
+    {'strings': [...new only...], 'spawn': [...], 'exit': [pid, ...],
+     'upd': [[pid, cpu, mem], ...]}
+"""
+
+from typing import Dict, List, Optional
+
+
+class SnapshotEncoder:
+    """
+    Encodes consecutive process snapshots as keyframes and deltas
+
+    Args:
+        keyframe_interval: Emit a full keyframe every N snapshots
+        cpu_threshold: Minimum absolute cpu_percent change to record
+        memory_threshold: Minimum absolute memory_percent change to record
+
+    With both thresholds at 0 (the default) replay is exact. Non-zero
+    thresholds trade precision for size: replayed metrics then stay within
+    the threshold of the true value.
+    """
+
+    def __init__(self, keyframe_interval: int = 120, cpu_threshold: float = 0.0,
+                 memory_threshold: float = 0.0):
+        self.keyframe_interval = keyframe_interval
+        self.cpu_threshold = cpu_threshold
+        self.memory_threshold = memory_threshold
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget all state; the next snapshot is encoded as a keyframe"""
+        self._strings: List[str] = []
+        self._string_ids: Dict[str, int] = {}
+        self._state: Dict[int, List] = {}  # pid -> [name_id, user_id, cpu, mem]
+        self._since_keyframe = 0
+        self._force_keyframe = True
+
+    def _intern(self, value: str, new_strings: List[str]) -> int:
+        """Return the id for a string, registering it if needed"""
+        string_id = self._string_ids.get(value)
+        if string_id is None:
+            string_id = len(self._strings)
+            self._strings.append(value)
+            self._string_ids[value] = string_id
+            new_strings.append(value)
+        return string_id
+
+    def encode(self, apps: List[Dict]) -> Dict:
+        """Encode one snapshot (the output of Observer.get_running_apps)"""
+        if self._force_keyframe or self._since_keyframe >= self.keyframe_interval:
+            return self._keyframe(apps)
+
+        self._since_keyframe += 1
+        new_strings: List[str] = []
+        spawn, upd = [], []
+        seen = set()
+
+        for app in apps:
+            pid = app['pid']
+            seen.add(pid)
+            name_id = self._intern(app['name'], new_strings)
+            user_id = self._intern(app['username'], new_strings)
+            cpu, mem = app['cpu_percent'], app['memory_percent']
+            prev = self._state.get(pid)
+
+            if prev is None or prev[0] != name_id or prev[1] != user_id:
+                # New process, or pid reused by a different one
+                spawn.append([pid, name_id, user_id, cpu, mem])
+                self._state[pid] = [name_id, user_id, cpu, mem]
+            elif (abs(cpu - prev[2]) > self.cpu_threshold
+                  or abs(mem - prev[3]) > self.memory_threshold):
+                upd.append([pid, cpu, mem])
+                prev[2], prev[3] = cpu, mem
+
+        exited = [pid for pid in self._state if pid not in seen]
+        for pid in exited:
+            del self._state[pid]
+
+        delta: Dict = {}
+        if new_strings:
+            delta['strings'] = new_strings
+        if spawn:
+            delta['spawn'] = spawn
+        if exited:
+            delta['exit'] = exited
+        if upd:
+            delta['upd'] = upd
+        return delta
+
+    def _keyframe(self, apps: List[Dict]) -> Dict:
+        """Encode a self-contained keyframe, pruning the string table"""
+        self._strings, self._string_ids, self._state = [], {}, {}
+        self._since_keyframe = 0
+        self._force_keyframe = False
+
+        strings: List[str] = []
+        spawn = []
+        for app in apps:
+            name_id = self._intern(app['name'], strings)
+            user_id = self._intern(app['username'], strings)
+            row = [app['pid'], name_id, user_id, app['cpu_percent'], app['memory_percent']]
+            spawn.append(row)
+            self._state[app['pid']] = row[1:]
+
+        return {'k': 1, 'strings': strings, 'spawn': spawn}
+
+
+class SnapshotDecoder:
+    """Replays encoded snapshots back into full process lists"""
+
+    def __init__(self):
+        self._strings: List[str] = []
+        self._state: Dict[int, List] = {}
+        self._synced = False
+
+    def decode(self, encoded: Dict) -> Optional[List[Dict]]:
+        """
+        Decode one snapshot
+
+        Returns:
+            Full process list sorted by pid, or None while waiting for the
+            first keyframe
+        """
+        if encoded.get('k'):
+            self._strings = []
+            self._state = {}
+            self._synced = True
+        elif not self._synced:
+            return None
+
+        self._strings.extend(encoded.get('strings', ()))
+        for pid in encoded.get('exit', ()):
+            self._state.pop(pid, None)
+        for pid, name_id, user_id, cpu, mem in encoded.get('spawn', ()):
+            self._state[pid] = [name_id, user_id, cpu, mem]
+        for pid, cpu, mem in encoded.get('upd', ()):
+            row = self._state[pid]
+            row[2], row[3] = cpu, mem
+
+        strings = self._strings
+        return [
+            {
+                'name': strings[row[0]],
+                'pid': pid,
+                'username': strings[row[1]],
+                'cpu_percent': row[2],
+                'memory_percent': row[3]
+            }
+            for pid, row in sorted(self._state.items())
+        ]
+
+
+def encode_observation(encoder: SnapshotEncoder, observation: Dict) -> Dict:
+    """Return a copy of an observation with 'apps' replaced by its delta"""
+    if 'apps' not in observation:
+        return observation
+    encoded = {key: value for key, value in observation.items() if key != 'apps'}
+    encoded['ps'] = encoder.encode(observation['apps'])
+    return encoded
+
+
+def decode_observation(decoder: SnapshotDecoder, record: Dict) -> Optional[Dict]:
+    """Restore the 'apps' list of an encoded observation"""
+    if 'ps' not in record:
+        return record
+    apps = decoder.decode(record['ps'])
+    if apps is None:
+        return None
+    observation = {key: value for key, value in record.items() if key != 'ps'}
+    observation['apps'] = apps
+    return observation
@@ -0,0 +1,375 @@
+"""
+State Store - Transactional small-state storage in SQLite
+
+Feedback ratings, self-improvements, processed patterns, the notification
+queue, context history and the last-notification time used to live in JSON
+files that were read whole, modified and rewritten on every update. That is
+O(n) per update and loses writes when two timer services overlap.
+
+This store keeps them in one SQLite database in WAL mode: appends are
+single-row inserts, lookups go through indexes, and every update runs in
+its own IMMEDIATE transaction so concurrent writers queue on the lock
+instead of overwriting each other. Readers never block writers.
+
+Legacy JSON files found next to the database are imported once, recorded
+in the meta table, and renamed to `<name>.migrated`.
+"""
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from ..utils.logger import get_logger
+from . import codec
+
+logger = get_logger("jarvisos.state")
+
+STATE_DB = "state.db"
+SCHEMA_VERSION = 1
+BUSY_TIMEOUT_MS = 10000
+CONTEXT_HISTORY_LIMIT = 100
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+
+CREATE TABLE IF NOT EXISTS ratings (
+    id        INTEGER PRIMARY KEY,
+    script_id TEXT NOT NULL,
+    rating    INTEGER NOT NULL CHECK (rating BETWEEN 1 AND 5),
+    comment   TEXT NOT NULL DEFAULT '',
+    timestamp TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ratings_script ON ratings (script_id);
+
+-- Running totals so averages never rescan the ratings
+CREATE TABLE IF NOT EXISTS scripts (
+    script_id TEXT PRIMARY KEY,
+    ratings   INTEGER NOT NULL,
+    total     INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS improvements (
+    seq        INTEGER PRIMARY KEY,
+    id         TEXT NOT NULL,
+    status     TEXT NOT NULL,
+    risk_level TEXT,
+    command    TEXT,
+    created_at TEXT,
+    data       TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS improvements_status ON improvements (status);
+CREATE INDEX IF NOT EXISTS improvements_id ON improvements (id);
+
+CREATE TABLE IF NOT EXISTS processed_patterns (
+    command      TEXT PRIMARY KEY,
+    processed_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS notification_queue (
+    id        INTEGER PRIMARY KEY,
+    message   TEXT NOT NULL,
+    priority  TEXT NOT NULL,
+    queued_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS context_history (
+    id        INTEGER PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    data      TEXT NOT NULL
+);
+"""
+
+
+def connect(path: Path) -> sqlite3.Connection:
+    """Open a WAL-mode connection in autocommit mode, shared across threads"""
+    conn = sqlite3.connect(
+        str(path), timeout=BUSY_TIMEOUT_MS / 1000,
+        isolation_level=None, check_same_thread=False
+    )
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    return conn
+
+
+class SQLiteStore:
+    """
+    One SQLite database: a shared WAL connection and IMMEDIATE transactions
+
+    Base of the stores that keep their own database (state, rollups, the
+    LLM response cache); subclasses add the typed queries.
+
+    Args:
+        path: Database file, or a directory to hold `default_name`
+        default_name: File name used when `path` is a directory
+        schema: SQL script creating the tables (IF NOT EXISTS)
+    """
+
+    def __init__(self, path, default_name: str, schema: str):
+        path = Path(path)
+        if path.suffix != '.db':
+            path = path / default_name
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._conn = connect(self.path)
+        self._conn.executescript(schema)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run statements in one IMMEDIATE (write-locked) transaction"""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def _query(self, sql: str, params=()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+
+class StateStore(SQLiteStore):
+    """
+    Typed tables over one SQLite database
+
+    Args:
+        path: Database file, or a directory to hold state.db
+        migrate: Import legacy JSON files from the database's directory
+    """
+
+    def __init__(self, path, migrate: bool = True):
+        super().__init__(path, STATE_DB, SCHEMA)
+        with self.transaction() as db:
+            db.execute("INSERT OR IGNORE INTO meta VALUES ('schema_version', ?)",
+                       (str(SCHEMA_VERSION),))
+
+        if migrate:
+            self.migrate_legacy(self.path.parent)
+
+    # ------------------------------------------------------------------
+    # Key/value
+    # ------------------------------------------------------------------
+
+    def get_value(self, key: str, default: Any = None) -> Any:
+        rows = self._query("SELECT value FROM meta WHERE key = ?", (key,))
+        return codec.decode(rows[0]['value']) if rows else default
+
+    def set_value(self, key: str, value: Any) -> None:
+        with self.transaction() as db:
+            db.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, codec.dumps(value)))
+
+    # ------------------------------------------------------------------
+    # Feedback
+    # ------------------------------------------------------------------
+
+    def add_rating(self, script_id: str, rating: int, comment: str, timestamp: str) -> None:
+        """Record one rating and update the script's running average"""
+        with self.transaction() as db:
+            self._insert_rating(db, script_id, rating, comment, timestamp)
+
+    @staticmethod
+    def _insert_rating(db, script_id, rating, comment, timestamp) -> None:
+        db.execute(
+            "INSERT INTO ratings (script_id, rating, comment, timestamp) VALUES (?, ?, ?, ?)",
+            (script_id, rating, comment or '', timestamp)
+        )
+        db.execute(
+            "INSERT INTO scripts VALUES (?, 1, ?) ON CONFLICT (script_id) DO UPDATE "
+            "SET ratings = ratings + 1, total = total + excluded.total",
+            (script_id, rating)
+        )
+
+    def script_feedback(self, script_id: str) -> Optional[Dict]:
+        """A script's ratings and average, in the legacy feedback.json shape"""
+        average = self.script_rating(script_id)
+        if average is None:
+            return None
+        rows = self._query(
+            "SELECT rating, timestamp, comment FROM ratings WHERE script_id = ? ORDER BY id",
+            (script_id,)
+        )
+        return {'ratings': [dict(row) for row in rows], 'comments': [], 'average_rating': average}
+
+    def script_rating(self, script_id: str) -> Optional[float]:
+        rows = self._query("SELECT ratings, total FROM scripts WHERE script_id = ?", (script_id,))
+        if not rows:
+            return None
+        return rows[0]['total'] / rows[0]['ratings']
+
+    def rating_averages(self) -> Dict[str, Dict]:
+        """Average and number of ratings per script"""
+        return {
+            row['script_id']: {'average_rating': row['total'] / row['ratings'],
+                               'num_ratings': row['ratings']}
+            for row in self._query("SELECT script_id, ratings, total FROM scripts")
+        }
+
+    def all_feedback(self) -> Dict[str, Dict]:
+        """Every script's feedback, in the legacy feedback.json shape"""
+        feedback = {
+            script_id: {'ratings': [], 'comments': [], 'average_rating': stats['average_rating']}
+            for script_id, stats in self.rating_averages().items()
+        }
+        for row in self._query("SELECT script_id, rating, timestamp, comment FROM ratings ORDER BY id"):
+            feedback[row['script_id']]['ratings'].append(
+                {'rating': row['rating'], 'timestamp': row['timestamp'], 'comment': row['comment']}
+            )
+        return feedback
+
+    # ------------------------------------------------------------------
+    # Self-improvements
+    # ------------------------------------------------------------------
+
+    def add_improvement(self, improvement: Dict) -> None:
+        with self.transaction() as db:
+            self._insert_improvement(db, improvement)
+
+    @staticmethod
+    def _insert_improvement(db, improvement: Dict) -> None:
+        db.execute(
+            "INSERT INTO improvements (id, status, risk_level, command, created_at, data) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (improvement['id'], improvement.get('status', 'pending'), improvement.get('risk_level'),
+             (improvement.get('pattern') or {}).get('command'), improvement.get('created_at'),
+             codec.dumps(improvement))
+        )
+
+    def improvements(self, status: Optional[str] = None) -> List[Dict]:
+        """Improvements in creation order, optionally filtered by status"""
+        if status:
+            rows = self._query("SELECT data, status FROM improvements WHERE status = ? ORDER BY seq",
+                               (status,))
+        else:
+            rows = self._query("SELECT data, status FROM improvements ORDER BY seq")
+        return [{**codec.decode(row['data']), 'status': row['status']} for row in rows]
+
+    def is_pattern_processed(self, command: str) -> bool:
+        return bool(self._query("SELECT 1 FROM processed_patterns WHERE command = ?", (command,)))
+
+    def mark_pattern_processed(self, command: str, processed_at: str) -> None:
+        with self.transaction() as db:
+            db.execute("INSERT OR IGNORE INTO processed_patterns VALUES (?, ?)",
+                       (command, processed_at))
+
+    # ------------------------------------------------------------------
+    # Notifications and context
+    # ------------------------------------------------------------------
+
+    def queue_notification(self, message: str, priority: str, queued_at: str) -> None:
+        with self.transaction() as db:
+            db.execute(
+                "INSERT INTO notification_queue (message, priority, queued_at) VALUES (?, ?, ?)",
+                (message, priority, queued_at)
+            )
+
+    def queued_notifications(self) -> List[Dict]:
+        return [dict(row) for row in self._query(
+            "SELECT message, priority, queued_at FROM notification_queue ORDER BY id"
+        )]
+
+    def append_context(self, entry: Dict, keep: int = CONTEXT_HISTORY_LIMIT) -> None:
+        """Append a context history entry, keeping only the newest `keep`"""
+        with self.transaction() as db:
+            cursor = db.execute("INSERT INTO context_history (timestamp, data) VALUES (?, ?)",
+                                (entry.get('timestamp', ''), codec.dumps(entry)))
+            db.execute("DELETE FROM context_history WHERE id <= ?", (cursor.lastrowid - keep,))
+
+    def context_history(self, limit: int = CONTEXT_HISTORY_LIMIT) -> List[Dict]:
+        """Newest context history entries, oldest first"""
+        rows = self._query("SELECT data FROM context_history ORDER BY id DESC LIMIT ?", (limit,))
+        return [codec.decode(row['data']) for row in reversed(rows)]
+
+    # ------------------------------------------------------------------
+    # Migration
+    # ------------------------------------------------------------------
+
+    def migrate_legacy(self, legacy_dir) -> List[str]:
+        """
+        Import legacy JSON state files from a directory, once
+
+        Returns:
+            Names of the files imported by this call
+        """
+        importers = {
+            'feedback.json': self._import_feedback,
+            'improvements.json': self._import_improvements,
+            'patterns.json': self._import_patterns,
+            'notification_queue.json': self._import_queue,
+            'context_history.json': self._import_context,
+            'last_notification.json': self._import_last_notification,
+        }
+        imported = []
+        for name, importer in importers.items():
+            source = Path(legacy_dir) / name
+            if not source.exists():
+                continue
+            try:
+                with open(source) as f:
+                    data = codec.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Skipping unreadable {source}: {e}")
+                continue
+
+            key = f"migrated:{name}"
+            with self.transaction() as db:
+                # Another process may have imported it while we were reading
+                if db.execute("SELECT 1 FROM meta WHERE key = ?", (key,)).fetchone():
+                    continue
+                importer(db, data)
+                db.execute("INSERT INTO meta VALUES (?, ?)", (key, codec.dumps(str(source))))
+            imported.append(name)
+
+            try:
+                source.rename(source.with_name(name + '.migrated'))
+            except OSError as e:
+                logger.warning(f"Imported {source} but could not rename it: {e}")
+            logger.info(f"Migrated {source} into {self.path}")
+        return imported
+
+    def _import_feedback(self, db, data: Dict) -> None:
+        for script_id, entry in data.items():
+            for rating in entry.get('ratings', []):
+                self._insert_rating(db, script_id, rating['rating'], rating.get('comment', ''),
+                                    rating.get('timestamp', ''))
+
+    def _import_improvements(self, db, data: List[Dict]) -> None:
+        for improvement in data:
+            self._insert_improvement(db, improvement)
+
+    def _import_patterns(self, db, data: List[Dict]) -> None:
+        db.executemany("INSERT OR IGNORE INTO processed_patterns VALUES (?, ?)",
+                       [(p['command'], p.get('processed_at', '')) for p in data])
+
+    def _import_queue(self, db, data: List[Dict]) -> None:
+        db.executemany(
+            "INSERT INTO notification_queue (message, priority, queued_at) VALUES (?, ?, ?)",
+            [(n['message'], n.get('priority', 'normal'), n.get('queued_at', '')) for n in data]
+        )
+
+    def _import_context(self, db, data: List[Dict]) -> None:
+        db.executemany("INSERT INTO context_history (timestamp, data) VALUES (?, ?)",
+                       [(e.get('timestamp', ''), codec.dumps(e)) for e in data[-CONTEXT_HISTORY_LIMIT:]])
+
+    def _import_last_notification(self, db, data: Dict) -> None:
+        db.execute("INSERT OR REPLACE INTO meta VALUES ('last_notification', ?)",
+                   (codec.dumps(data.get('timestamp')),))
+
+
+def open_state(data_dir="data", migrate: bool = True) -> StateStore:
+    """Open the state store for a data directory"""
+    return StateStore(Path(data_dir) / STATE_DB, migrate=migrate)
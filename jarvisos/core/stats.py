@@ -0,0 +1,325 @@
+"""
+Stats - Shared observation statistics, computed once per data version
+
+Analyzer, UserDNA and Observer.get_summary used to load the observations
+separately and each pass scanned them again. compute() derives every
+statistic they read from one ObservationFrame load:
+
+- tick count, time range, tick-weighted and time-weighted CPU/memory means
+- top apps and the number of distinct apps
+- per-hour activity (apps running, summed and averaged per tick)
+- the hours with busy ticks, top apps per period of the day
+- average apps per tick and the app-set switch rate
+
+The totals behind them are mergeable (StatsAccumulator), so the whole
+history is never re-read: a checkpoint keeps the totals up to a
+high-water mark and each run folds in only what came after it (`--full`
+on `jarvis analyze` and `jarvis dna` starts over).
+
+shared_stats() caches the result in ``stats_cache.json`` keyed by the time
+window and data_version(), a digest of the observation manifest, the
+segments still being written, the legacy file and the rollup watermark.
+As long as no tick was written in between, `jarvis analyze` followed by
+`jarvis dna` reads the observations once.
+"""
+
+import hashlib
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from ..utils.logger import get_logger
+from .frame import ObservationFrame
+from .json_files import read_json, update_json, write_json
+from .observation_log import TimeLike, open_observations, parse_time
+from .rollups import ROLLUP_DB, RollupStore, load_frame
+
+logger = get_logger("jarvisos.stats")
+
+STATS_CACHE = "stats_cache.json"
+STATS_CHECKPOINT = "stats_checkpoint.json"
+CACHE_ENTRIES = 8  # time windows remembered
+STATS_VERSION = 3  # bump when compute() output or the checkpoint layout changes
+
+WORK_APPS = 5  # a tick with more apps than this counts as active work
+PERIODS = {
+    'morning_routine': (6, 12),
+    'work_routine': (12, 18),
+    'evening_routine': (18, 24),
+}
+
+
+class StatsAccumulator:
+    """
+    Mergeable running totals behind compute()
+
+    Everything is kept as exact sums (CPU and memory in thousandths of a
+    percent, weights in milliseconds) so folding frames one after another
+    gives bit-for-bit the result of folding them all at once. App counters
+    keep first-seen order, which breaks ties the way frame.top_apps does.
+    """
+
+    def __init__(self):
+        self.ticks = 0
+        self.start_time: Optional[str] = None
+        self.end_time: Optional[str] = None
+        self.sums = dict.fromkeys(('cpu', 'cpu_ticks', 'cpu_weighted', 'cpu_weight',
+                                   'memory', 'memory_ticks', 'memory_weighted', 'memory_weight',
+                                   'activity', 'switches'), 0)
+        self.apps: Dict[str, int] = {}
+        self.period_apps: Dict[str, Dict[str, int]] = {key: {} for key in PERIODS}
+        self.hour_ticks = [0] * 24
+        self.hour_activity = [0] * 24
+        self.work_hours: Optional[List[int]] = None
+        # App names of the last raw tick, to count a switch across frames
+        self.last_apps: Optional[List[str]] = None
+
+    def add(self, frame: ObservationFrame) -> 'StatsAccumulator':
+        """Fold in a frame that follows everything added so far"""
+        if not len(frame):
+            return self
+        counts = frame.tick_counts
+        self.ticks += frame.tick_count
+        self.start_time = self.start_time or frame.start_time
+        self.end_time = frame.end_time or self.end_time
+
+        weights = np.round(frame.weights * 1000).astype(np.int64)
+        for name, values in (('cpu', frame.cpu), ('memory', frame.memory)):
+            valid = ~np.isnan(values)
+            milli = np.round(values[valid] * 1000).astype(np.int64)
+            self.sums[name] += int((milli * counts[valid]).sum())
+            self.sums[f'{name}_ticks'] += int(counts[valid].sum())
+            self.sums[f'{name}_weighted'] += int((milli * weights[valid]).sum())
+            self.sums[f'{name}_weight'] += int(weights[valid].sum())
+
+        activity = frame.app_counts
+        self.sums['activity'] += int(activity.sum())
+        self.sums['switches'] += int(frame.switch_flags.sum())
+        if frame.switches is None:
+            if self.last_apps is not None and _tick_apps(frame, 0) != self.last_apps:
+                self.sums['switches'] += 1
+            self.last_apps = _tick_apps(frame, len(frame) - 1)
+        else:
+            self.last_apps = None
+
+        _merge(self.apps, frame.app_names, frame.app_frequency())
+        hours = frame.hours
+        for key, (start, end) in PERIODS.items():
+            _merge(self.period_apps[key], frame.app_names,
+                   frame.app_frequency((hours >= start) & (hours < end)))
+
+        hour_ticks = np.bincount(hours, weights=counts, minlength=24)
+        hour_activity = np.bincount(hours, weights=activity, minlength=24)
+        for hour in range(24):
+            self.hour_ticks[hour] += int(hour_ticks[hour])
+            self.hour_activity[hour] += int(hour_activity[hour])
+
+        work = hours[frame.peak_app_counts > WORK_APPS]
+        if len(work):
+            low, high = int(work.min()), int(work.max())
+            if self.work_hours:
+                low, high = min(low, self.work_hours[0]), max(high, self.work_hours[1])
+            self.work_hours = [low, high]
+        return self
+
+    def _top(self, counter: Dict[str, int], n: int) -> List[List]:
+        """Most frequent apps, ties in first-seen order"""
+        order = {name: i for i, name in enumerate(self.apps)}
+        ranked = sorted(counter.items(), key=lambda item: (-item[1], order[item[0]]))
+        return [[name, count] for name, count in ranked[:n] if count]
+
+    def _mean(self, total: str, count: str) -> float:
+        return round(self.sums[total] / self.sums[count] / 1000, 2) if self.sums[count] else 0.0
+
+    def result(self) -> Dict:
+        """The statistics, as a JSON-ready dict"""
+        hours = [h for h in range(24) if self.hour_ticks[h]]
+        period_apps = {}
+        for key, counter in self.period_apps.items():
+            top = self._top(counter, 5)
+            if top:
+                period_apps[key] = [app for app, _ in top]
+        ticks = self.ticks
+        return {
+            'version': STATS_VERSION,
+            'ticks': ticks,
+            'start_time': self.start_time,
+            'end_time': self.end_time,
+            'cpu_mean': self._mean('cpu', 'cpu_ticks'),
+            'memory_mean': self._mean('memory', 'memory_ticks'),
+            'cpu_weighted_mean': self._mean('cpu_weighted', 'cpu_weight'),
+            'memory_weighted_mean': self._mean('memory_weighted', 'memory_weight'),
+            'top_apps': self._top(self.apps, 10),
+            'unique_apps': sum(1 for count in self.apps.values() if count),
+            'hours': hours,
+            'hour_activity': [float(self.hour_activity[h]) for h in hours],
+            'hour_activity_mean': [self.hour_activity[h] / self.hour_ticks[h] for h in hours],
+            'work_hours': self.work_hours,
+            'period_apps': period_apps,
+            'avg_apps': self.sums['activity'] / ticks if ticks else 0.0,
+            'switch_rate': self.sums['switches'] / ticks if ticks else 0.0,
+        }
+
+    def to_dict(self) -> Dict:
+        return {
+            'ticks': self.ticks, 'start_time': self.start_time, 'end_time': self.end_time,
+            'sums': self.sums, 'apps': list(self.apps.items()),
+            'period_apps': {key: list(counter.items()) for key, counter in self.period_apps.items()},
+            'hour_ticks': self.hour_ticks, 'hour_activity': self.hour_activity,
+            'work_hours': self.work_hours, 'last_apps': self.last_apps,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'StatsAccumulator':
+        acc = cls()
+        acc.ticks, acc.start_time, acc.end_time = data['ticks'], data['start_time'], data['end_time']
+        acc.sums = dict(data['sums'])
+        acc.apps = dict(data['apps'])
+        acc.period_apps = {key: dict(pairs) for key, pairs in data['period_apps'].items()}
+        acc.hour_ticks, acc.hour_activity = list(data['hour_ticks']), list(data['hour_activity'])
+        acc.work_hours, acc.last_apps = data['work_hours'], data['last_apps']
+        return acc
+
+
+def _merge(counter: Dict[str, int], names: List[str], frequency: np.ndarray) -> None:
+    """Add per-app-id counts to a name counter, new names in app id order"""
+    for i in np.flatnonzero(frequency):
+        name = names[i]
+        counter[name] = counter.get(name, 0) + int(frequency[i])
+
+
+def _tick_apps(frame: ObservationFrame, row: int) -> List[str]:
+    """Sorted app names of one raw tick"""
+    ids = frame.indices[frame.indptr[row]:frame.indptr[row + 1]]
+    return sorted({frame.app_names[i] for i in ids})
+
+
+def compute(frame: ObservationFrame) -> Dict:
+    """
+    Every shared statistic of a frame, as a JSON-ready dict
+
+    Raw frames and rollup frames (see rollups.load_frame) give the same
+    result as long as rollups are no coarser than an hour.
+    """
+    return StatsAccumulator().add(frame).result()
+
+
+def data_version(data_dir="data") -> str:
+    """
+    Digest that changes whenever stored observations (or their rollups) do
+
+    Computed from file metadata only: the log manifest, the size of every
+    segment still being written, the legacy files and the rollup watermark.
+    """
+    data_dir = Path(data_dir)
+    parts: List[str] = [open_observations(data_dir).version()]
+    if (data_dir / ROLLUP_DB).exists():
+        store = RollupStore(data_dir / ROLLUP_DB)
+        compacted = store.compacted_until()
+        store.close()
+        parts.append(compacted.isoformat() if compacted else '')
+    return hashlib.sha1('|'.join(parts).encode()).hexdigest()[:16]
+
+
+def _window(since: TimeLike, until: TimeLike) -> List[Optional[str]]:
+    since, until = parse_time(since), parse_time(until)
+    return [since.isoformat() if since else None, until.isoformat() if until else None]
+
+
+def _checkpoint_mark(data_dir: Path) -> Optional[datetime]:
+    """
+    Start of the hour the history is final up to (None without observations)
+
+    That is the hour the rollups are final up to or, before the first
+    compaction, the hour of the newest tick in the log manifest: ticks are
+    appended in time order, so no earlier hour can still change.
+    """
+    final = None
+    if (data_dir / ROLLUP_DB).exists():
+        store = RollupStore(data_dir / ROLLUP_DB)
+        final = store.compacted_until()
+        store.close()
+    if final is None:
+        ends = [part['end_time'] for part in open_observations(data_dir).partitions() if part['end_time']]
+        final = parse_time(max(ends)) if ends else None
+    return final.replace(minute=0, second=0, microsecond=0) if final else None
+
+
+def history_stats(data_dir="data", full: bool = False) -> Dict:
+    """
+    compute() over the whole history, folding in only what is new
+
+    A checkpoint in ``stats_checkpoint.json`` holds the running totals of
+    everything before a high-water mark (see _checkpoint_mark): hourly
+    rollups once compaction runs, raw ticks before that. Each call folds
+    the rows between the old and the new mark into it, then adds the rows
+    after the new mark (recent minutes and raw ticks) without saving them.
+    The result is identical to a full recomputation, which `full` forces.
+    The first compaction usually moves the mark back (rollups trail the
+    log), which costs one full pass.
+    """
+    data_dir = Path(data_dir)
+    checkpoint_file = data_dir / STATS_CHECKPOINT
+    mark = _checkpoint_mark(data_dir)
+
+    acc, since = StatsAccumulator(), None
+    checkpoint = None if full else read_json(checkpoint_file)
+    if checkpoint and checkpoint.get('version') == STATS_VERSION:
+        previous = datetime.fromisoformat(checkpoint['mark'])
+        if mark is not None and previous <= mark:
+            acc, since = StatsAccumulator.from_dict(checkpoint['stats']), previous
+
+    if mark is not None and (since is None or since < mark):
+        acc.add(load_frame(data_dir, since, mark, resolution='1h'))
+        write_json(checkpoint_file, {'version': STATS_VERSION, 'mark': mark.isoformat(),
+                                     'stats': acc.to_dict()})
+        logger.info(f"Observation stats checkpoint advanced to {mark.isoformat()} "
+                    f"({'full' if since is None else 'from ' + since.isoformat()})")
+    return StatsAccumulator.from_dict(acc.to_dict()).add(
+        load_frame(data_dir, mark, None, resolution='1h')).result()
+
+
+def shared_stats(data_dir="data", since: TimeLike = None, until: TimeLike = None,
+                 refresh: bool = False, full: bool = False) -> Dict:
+    """
+    compute() over [since, until), from the cache when the data is unchanged
+
+    The whole history (no `since` or `until`) is computed incrementally from
+    a checkpoint (see history_stats).
+
+    Args:
+        data_dir: Directory holding the observations
+        since: Inclusive lower bound, or None
+        until: Exclusive upper bound, or None
+        refresh: Recompute even if a cached result is current
+        full: Recompute from scratch, ignoring the cache and the checkpoint
+    """
+    data_dir = Path(data_dir)
+    cache_file = data_dir / STATS_CACHE
+    window = _window(since, until)
+    # Taken before reading, so a tick written meanwhile invalidates the result
+    version = data_version(data_dir)
+
+    if not (refresh or full):
+        for entry in (read_json(cache_file) or {}).get('entries', []):
+            if (entry['window'] == window and entry['data_version'] == version
+                    and entry['stats'].get('version') == STATS_VERSION):
+                logger.debug(f"Observation stats for {window} served from cache")
+                return entry['stats']
+
+    if window == [None, None]:
+        stats = history_stats(data_dir, full)
+    else:
+        stats = compute(load_frame(data_dir, since, until, resolution='1h'))
+
+    def store(cache):
+        entries = [e for e in cache.get('entries', []) if e['window'] != window]
+        entries.append({'window': window, 'data_version': version, 'stats': stats})
+        return {'entries': entries[-CACHE_ENTRIES:]}
+    try:
+        update_json(cache_file, store, {})
+    except OSError as e:
+        logger.warning(f"Failed to cache observation stats: {e}")
+    return stats
@@ -0,0 +1,158 @@
+"""
+Streaming - Helpers for token streams from the AI backends
+
+Both backends can yield a completion as it is generated
+(`generate_stream()`). These helpers are shared by the backends, the CLI
+and the voice pipeline:
+
+- TokenTimer records time to first token and total latency
+- TimedStream wraps a token iterator with a TokenTimer
+- aiter_in_thread() turns a blocking token iterator into an async one by
+  running it on a worker thread, so `agenerate_stream()` needs no async
+  HTTP client
+- sentences() regroups tokens into whole sentences, for speech
+"""
+
+import asyncio
+import concurrent.futures
+import re
+import threading
+import time
+from typing import AsyncIterator, Callable, Iterable, Iterator, Optional
+
+SENTENCE_END = re.compile(r'(?<=[.!?])\s+|\n+')
+
+
+class TokenTimer:
+    """
+    Time to first token and total latency of one generation
+
+    Call on_token() for every chunk (it can be used directly as a token
+    listener) and finish() when the stream ends.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.first_token: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.tokens = 0
+
+    def on_token(self, chunk: str):
+        if self.first_token is None:
+            self.first_token = time.perf_counter()
+        self.tokens += 1
+
+    def finish(self):
+        if self.finished is None:
+            self.finished = time.perf_counter()
+
+    @property
+    def ttft(self) -> Optional[float]:
+        """Seconds until the first token, None if none arrived"""
+        return None if self.first_token is None else self.first_token - self.started
+
+    @property
+    def total(self) -> float:
+        """Seconds from the start to the end of the stream (or until now)"""
+        end = self.finished if self.finished is not None else time.perf_counter()
+        return end - self.started
+
+    def summary(self) -> str:
+        """One-line latency report, e.g. 'first token 0.41s · total 3.20s'"""
+        first = f"{self.ttft:.2f}s" if self.ttft is not None else "-"
+        return f"first token {first} · total {self.total:.2f}s"
+
+
+class TimedStream:
+    """
+    Iterate a token stream while timing it
+
+    The text received so far is kept in `text`; `timer` holds the latency.
+    """
+
+    def __init__(self, chunks: Iterable[str], timer: Optional[TokenTimer] = None):
+        self._chunks = chunks
+        self.timer = timer or TokenTimer()
+        self.text = ''
+
+    def __iter__(self) -> Iterator[str]:
+        try:
+            for chunk in self._chunks:
+                if not chunk:
+                    continue
+                self.timer.on_token(chunk)
+                self.text += chunk
+                yield chunk
+        finally:
+            self.timer.finish()
+
+
+async def aiter_in_thread(stream: Callable[..., Iterable[str]], *args,
+                          executor: Optional[concurrent.futures.Executor] = None,
+                          **kwargs) -> AsyncIterator[str]:
+    """
+    Run a blocking token iterator on a worker thread and yield its chunks
+
+    The iterator is created and consumed on the thread (one of `executor`'s,
+    default the loop's); chunks are handed to the event loop as they
+    arrive. Leaving the async loop early (break, cancellation) stops the
+    worker at its next chunk and closes the iterator, which closes the
+    underlying connection or process; a worker that had not started yet
+    never opens the stream.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    stop = threading.Event()
+    done = object()
+
+    def put(item):
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, item)
+        except RuntimeError:  # the loop has closed; nobody is listening
+            stop.set()
+
+    def produce():
+        if stop.is_set():
+            return
+        iterator = None
+        try:
+            iterator = iter(stream(*args, **kwargs))
+            for chunk in iterator:
+                if stop.is_set():
+                    break
+                put(chunk)
+        except BaseException as e:
+            put(e)
+        finally:
+            close = getattr(iterator, 'close', None)
+            if close is not None:
+                close()
+            put(done)
+
+    worker = loop.run_in_executor(executor, produce)
+    try:
+        while True:
+            item = await queue.get()
+            if item is done:
+                break
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        if not worker.done():
+            worker.add_done_callback(lambda future: future.exception())
+
+
+def sentences(chunks: Iterable[str]) -> Iterator[str]:
+    """Regroup a token stream into sentences (or lines) as each one completes"""
+    pending = ''
+    for chunk in chunks:
+        pending += chunk
+        parts = SENTENCE_END.split(pending)
+        pending = parts.pop()
+        for part in parts:
+            if part.strip():
+                yield part.strip()
+    if pending.strip():
+        yield pending.strip()
@@ -7,7 +7,6 @@ The first experience when booting JarvisOS
 import os
 import sys
 import time
-import json
 from pathlib import Path
 from typing import Optional
 
@@ -30,6 +29,8 @@ from rich.progress import Progress, SpinnerColumn, TextColumn
 from rich.align import Align
 from rich.text import Text
 
+from ..core.json_files import read_json, write_json
+
 
 console = Console()
 
@@ -242,9 +243,7 @@ class JarvisOnboarding:
             "first_boot": time.time()
         }
         
-        self.config_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(self.config_path, 'w') as f:
-            json.dump(profile, f, indent=2)
+        write_json(self.config_path, profile)
     
     def final_message(self):
         """Final message"""
@@ -273,12 +272,10 @@ class JarvisOnboarding:
         """Run full onboarding"""
         try:
             # Check if already onboarded
-            if self.config_path.exists():
-                with open(self.config_path) as f:
-                    profile = json.load(f)
-                    if profile.get('onboarding_completed'):
-                        console.print("[dim]Onboarding already completed. Use --force to run again.[/dim]")
-                        return
+            profile = read_json(self.config_path)
+            if profile and profile.get('onboarding_completed'):
+                console.print("[dim]Onboarding already completed. Use --force to run again.[/dim]")
+                return
             
             # Full onboarding flow
             self.boot_sequence()
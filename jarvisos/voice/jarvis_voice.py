@@ -5,11 +5,12 @@ Main voice interaction system with personality
 
 import threading
 import time
-from typing import Optional, Callable
+from typing import Optional, Callable, Iterable
 from datetime import datetime
 
 from .tts import TextToSpeech, get_jarvis_voice
 from .stt import SpeechToText
+from ..core.streaming import TimedStream, sentences
 from ..utils.logger import get_logger
 
 logger = get_logger("jarvisos.voice")
@@ -47,6 +48,26 @@ class JarvisVoice:
         logger.info(f"Jarvis speaking: {text[:50]}...")
         self.tts.speak(text, voice=self.voice, rate=rate)
     
+    def speak_stream(self, chunks: Iterable[str], rate: int = 175) -> str:
+        """
+        Speak a streamed AI response sentence by sentence
+        
+        Each sentence is spoken as soon as it is complete, so speech starts
+        after the first sentence rather than the whole response.
+        
+        Args:
+            chunks: Text chunks, e.g. from an AI brain's generate_stream()
+            rate: Speech rate
+        
+        Returns:
+            The full text spoken
+        """
+        stream = TimedStream(chunks)
+        for sentence in sentences(stream):
+            self.speak(sentence, rate=rate)
+        logger.info(f"Streamed response spoken ({stream.timer.summary()})")
+        return stream.text
+    
     def listen(self, timeout: int = 5) -> Optional[str]:
         """
         Listen for user speech
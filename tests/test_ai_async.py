@@ -0,0 +1,144 @@
+"""
+Tests for the asyncio AI brain façade
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+from jarvisos.core.ai_async import AsyncAIBrain, run_sync
+
+
+class SlowBrain:
+    """A brain whose calls block for `delay` seconds and record concurrency"""
+
+    def __init__(self, active='ollama', delay=0.1):
+        self.active = active
+        self.delay = delay
+        self.running = 0
+        self.peak = 0
+        self.started = []
+        self._lock = threading.Lock()
+
+    def generate(self, prompt):
+        with self._lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+            self.started.append(prompt)
+        time.sleep(self.delay)
+        with self._lock:
+            self.running -= 1
+        return f"answer: {prompt}"
+
+    def generate_stream(self, prompt):
+        for word in prompt.split():
+            time.sleep(self.delay)
+            yield word
+
+
+class TestAsyncAIBrain:
+    """Test concurrency, timeouts and cancellation"""
+
+    def test_fan_out(self):
+        """Test independent calls overlap instead of adding up"""
+        brain = SlowBrain(delay=0.2)
+        ai = AsyncAIBrain(brain, concurrency={'ollama': 4})
+
+        async def main():
+            return await ai.gather(*(ai.generate(str(i)) for i in range(4)))
+
+        start = time.perf_counter()
+        assert run_sync(main()) == [f"answer: {i}" for i in range(4)]
+        assert time.perf_counter() - start < 0.6  # not 4 x 0.2s
+        assert brain.peak == 4
+
+    def test_semaphore_per_backend(self):
+        """Test each backend's limit is enforced separately"""
+        brain = SlowBrain(delay=0.05)
+        other = SlowBrain(delay=0.05)
+        ai = AsyncAIBrain(brain, concurrency={'ollama': 2, 'claude': 3})
+
+        async def main():
+            await ai.gather(*(ai.generate(str(i)) for i in range(6)),
+                            *(ai.run(other.generate, str(i), backend='claude') for i in range(6)))
+
+        run_sync(main())
+        assert brain.peak == 2
+        assert other.peak == 3
+
+    def test_timeout_keeps_slot(self):
+        """Test a timed-out call raises, and its slot frees only when it really ends"""
+        brain = SlowBrain(delay=0.3)
+        ai = AsyncAIBrain(brain, concurrency={'ollama': 1})
+
+        async def main():
+            with pytest.raises(asyncio.TimeoutError):
+                await ai.generate('slow', timeout=0.05)
+            start = time.perf_counter()
+            assert await ai.generate('next') == 'answer: next'
+            return time.perf_counter() - start
+
+        waited = run_sync(main())
+        assert waited >= 0.45  # the rest of 'slow', then 'next'
+        assert brain.peak == 1
+
+    def test_cancel_queued_call(self):
+        """Test cancelling a call still waiting for a slot means it never runs"""
+        brain = SlowBrain(delay=0.2)
+        ai = AsyncAIBrain(brain, concurrency={'ollama': 1})
+
+        async def main():
+            first = asyncio.create_task(ai.generate('first'))
+            queued = asyncio.create_task(ai.generate('queued'))
+            await asyncio.sleep(0.05)
+            queued.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await queued
+            assert await first == 'answer: first'
+            assert await ai.generate('after') == 'answer: after'
+
+        run_sync(main())
+        assert brain.started == ['first', 'after']
+
+    def test_generate_stream(self):
+        """Test streamed chunks, with the timeout bounding each chunk"""
+        ai = AsyncAIBrain(SlowBrain(delay=0.01))
+
+        async def main():
+            chunks = [c async for c in ai.generate_stream('a b c')]
+            with pytest.raises(asyncio.TimeoutError):
+                async for _ in AsyncAIBrain(SlowBrain(delay=0.3)).generate_stream('x', timeout=0.05):
+                    pass
+            return chunks
+
+        assert run_sync(main()) == ['a', 'b', 'c']
+
+    def test_loop_reuse(self):
+        """Test one instance serves successive event loops"""
+        ai = AsyncAIBrain(SlowBrain(delay=0))
+        for i in range(3):
+            assert run_sync(ai.generate(str(i))) == f"answer: {i}"
+
+    def test_limit_across_event_loops(self):
+        """Test run_sync calls from several threads share one limit"""
+        brain = SlowBrain(delay=0.1)
+        ai = AsyncAIBrain(brain, concurrency={'ollama': 1})
+        threads = [threading.Thread(target=run_sync, args=(ai.generate(str(i)),)) for i in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sorted(brain.started) == ['0', '1', '2']
+        assert brain.peak == 1
+
+    def test_run_sync_inside_loop(self):
+        """Test run_sync refuses to block a running loop"""
+        ai = AsyncAIBrain(SlowBrain(delay=0))
+
+        async def main():
+            with pytest.raises(RuntimeError):
+                run_sync(ai.generate('x'))
+
+        asyncio.run(main())
@@ -0,0 +1,75 @@
+"""
+Tests for the shared JSON codec
+"""
+import json
+
+import numpy as np
+import pytest
+from jarvisos.core import codec
+from jarvisos.core.json_files import read_json, write_json
+
+DOCUMENT = {
+    'timestamp': '2025-10-17T08:00:00',
+    'apps': [{'name': 'café', 'pid': 1, 'cpu_percent': 0.1}],
+    'system': {'cpu_percent': 12.5, 'memory_percent': None},
+    'flags': [True, False],
+}
+
+
+@pytest.fixture(params=['native', 'json'])
+def backend(request, monkeypatch):
+    """Run once on the installed fast backend and once on the stdlib fallback"""
+    if request.param == 'json':
+        monkeypatch.setattr(codec, 'orjson', None)
+        monkeypatch.setattr(codec, 'msgspec', None)
+    monkeypatch.setattr(codec, 'PRETTY', False)
+    return request.param
+
+
+class TestCodec:
+    """Test codec functionality"""
+
+    def test_roundtrip_is_compact(self, backend):
+        """Test documents round-trip and are written without whitespace"""
+        raw = codec.encode(DOCUMENT)
+        assert isinstance(raw, bytes)
+        assert b'\n' not in raw and b', ' not in raw and b': ' not in raw
+        assert codec.decode(raw) == DOCUMENT
+        assert codec.decode(raw.decode()) == DOCUMENT
+        assert json.loads(raw) == DOCUMENT
+
+    def test_pretty_flag(self, backend):
+        """Test the debug flag and the per-call override indent output"""
+        codec.set_pretty(True)
+        assert codec.dumps(DOCUMENT).startswith('{\n  "')
+        assert '\n' not in codec.dumps(DOCUMENT, pretty=False)
+
+    def test_non_string_keys(self, backend):
+        """Test integer keys become strings, as with the stdlib"""
+        assert codec.decode(codec.encode({9: 'a'})) == {'9': 'a'}
+
+    def test_default_hook(self, backend):
+        """Test unknown objects go through `default`"""
+        assert codec.dumps({'s': {1}}, default=sorted) == '{"s":[1]}'
+        with pytest.raises(TypeError):
+            codec.encode({'s': {1}})
+
+    def test_stdlib_literals_and_errors(self, backend):
+        """Test NaN from old files decodes and bad input raises JSONDecodeError"""
+        assert np.isnan(codec.decode('{"cpu": NaN}')['cpu'])
+        with pytest.raises(json.JSONDecodeError):
+            codec.decode(b'{"a": ')
+
+    def test_numpy_values(self, backend):
+        """Test NumPy scalars from frame analytics serialize"""
+        if backend == 'json':
+            pytest.skip('the stdlib has no NumPy support')
+        assert codec.decode(codec.encode({'mean': np.float64(1.5)})) == {'mean': 1.5}
+
+    def test_json_files_follow_flag(self, backend, tmp_path):
+        """Test persisted files are compact unless asked otherwise"""
+        write_json(tmp_path / "a.json", DOCUMENT)
+        write_json(tmp_path / "b.json", DOCUMENT, pretty=True)
+        assert (tmp_path / "a.json").read_bytes().count(b'\n') == 0
+        assert (tmp_path / "b.json").read_bytes().count(b'\n') > 5
+        assert read_json(tmp_path / "b.json") == DOCUMENT
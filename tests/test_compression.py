@@ -0,0 +1,188 @@
+"""
+Tests for the compressed observation archive
+"""
+import json
+import random
+
+import pytest
+from jarvisos.core import compression
+from jarvisos.core.compression import Dictionaries, compress_file, resolve, stream_lines
+from jarvisos.core.lazy_records import iter_array, map_lines
+from jarvisos.core.observation_log import ObservationLog, open_observations
+from jarvisos.core.rollups import Compactor
+
+NAMES = ['code', 'chrome', 'zsh', 'slack', 'python3', 'systemd', 'dockerd', 'firefox']
+
+
+def make_observation(i, rng):
+    """An observation with a slowly changing process list"""
+    apps = [{'name': NAMES[(i // 50 + j) % len(NAMES)], 'pid': 1000 + j, 'username': 'user',
+             'cpu_percent': round(rng.random() * 5, 1), 'memory_percent': 1.0} for j in range(12)]
+    return {
+        'iteration': i,
+        'timestamp': f'2025-10-17T{9 + i // 3600:02d}:{i // 60 % 60:02d}:{i % 60:02d}',
+        'apps': apps,
+        'system': {'cpu_percent': round(rng.random() * 100, 1), 'memory_percent': 50.0},
+    }
+
+
+def write_log(log_dir, n=3000, segment_bytes=64 * 1024):
+    rng = random.Random(5)
+    log = ObservationLog(log_dir, max_segment_bytes=segment_bytes)
+    for i in range(n):
+        log.append(make_observation(i, rng))
+    log.close()
+    return log
+
+
+class TestStreams:
+    """Test compressed files read like raw ones"""
+
+    @pytest.mark.parametrize('offset', [0, 8, 16, 100])
+    def test_stream_lines_matches_map_lines(self, tmp_path, offset):
+        """Test lines and decompressed offsets equal those of the raw file"""
+        path = tmp_path / "segment.jsonl"
+        path.write_bytes(b'{"a":1}\n{"a":2}\n' + b'{"b":"x"}\n' * 5 + b'{"a":')
+        expected = list(map_lines(path, offset))
+
+        compress_file(path, backend='gzip')
+        assert not path.exists()
+        assert resolve(path) == tmp_path / "segment.jsonl.gz"
+        assert list(stream_lines(resolve(path), offset)) == expected
+        assert list(map_lines(resolve(path), offset)) == expected
+
+    def test_stream_lines_chunk_edges(self, tmp_path, monkeypatch):
+        """Test lines split across decompression chunks"""
+        monkeypatch.setattr(compression, 'CHUNK_SIZE', 7)
+        path = tmp_path / "segment.jsonl"
+        lines = [json.dumps({'i': i, 'pad': 'x' * i}).encode() + b'\n' for i in range(30)]
+        path.write_bytes(b''.join(lines))
+        compress_file(path, backend='gzip')
+        assert [line for line, _ in stream_lines(resolve(path))] == lines
+
+    def test_iter_array_compressed(self, tmp_path):
+        """Test the legacy document streams from its archive"""
+        rng = random.Random(1)
+        observations = [make_observation(i, rng) for i in range(50)]
+        path = tmp_path / "observations.json"
+        path.write_text(json.dumps({'metadata': {}, 'observations': observations}, indent=2))
+        compress_file(path, backend='gzip')
+        assert list(iter_array(resolve(path), chunk_size=64)) == observations
+
+    def test_compress_file_result(self, tmp_path):
+        """Test sizes are reported and the archive is smaller"""
+        path = tmp_path / "data.jsonl"
+        path.write_bytes(b'{"name":"chrome","user":"user"}\n' * 1000)
+        result = compress_file(path, backend='gzip')
+        assert result['file'] == tmp_path / "data.jsonl.gz"
+        assert result['raw_bytes'] == 32000
+        assert result['stored_bytes'] == result['file'].stat().st_size < 1000
+        assert result['decompress_seconds'] >= 0
+
+
+class TestLogArchive:
+    """Test archiving sealed segments of the observation log"""
+
+    def test_reads_unchanged(self, tmp_path):
+        """Test records, counts, latest and tail positions survive archiving"""
+        log = write_log(tmp_path / "observations")
+        before = list(log.iter_range())
+        positions = list(log.tail())
+        middle = log.iter_range('2025-10-17T09:20:00', '2025-10-17T09:30:00')
+        middle = list(middle)
+
+        results = log.archive(backend='gzip')
+        assert len(results) == len(log.segments) > 1
+        assert all(log.segment_path(e).suffix == '.gz' for e in log.segments)
+
+        reader = ObservationLog(tmp_path / "observations")
+        assert list(reader.iter_range()) == before
+        assert list(reader.iter_range('2025-10-17T09:20:00', '2025-10-17T09:30:00')) == middle
+        assert reader.latest(3) == before[-3:]
+        assert reader.count() == len(before)
+        assert list(reader.tail()) == positions
+        seq_offset = positions[len(positions) // 2][1]
+        assert list(reader.tail(seq_offset)) == positions[len(positions) // 2 + 1:]
+        assert log.archive(backend='gzip') == []  # nothing left to archive
+
+    def test_writer_keeps_archived_segments(self, tmp_path):
+        """Test a live writer's manifest refresh does not forget archived segments"""
+        writer = ObservationLog(tmp_path / "observations", max_segment_bytes=4096)
+        rng = random.Random(2)
+        for i in range(50):
+            writer.append(make_observation(i, rng))
+        ObservationLog(tmp_path / "observations").archive(backend='gzip')
+        for i in range(50, 60):
+            writer.append(make_observation(i, rng))
+        writer.close()
+
+        records = list(ObservationLog(tmp_path / "observations").iter_range())
+        assert [r['iteration'] for r in records] == list(range(60))
+
+    def test_drop_before_archived(self, tmp_path):
+        """Test retention deletes archived segments too"""
+        log = write_log(tmp_path / "observations")
+        log.archive(backend='gzip')
+        dropped = log.drop_before('2025-10-17T09:30:00')
+        assert dropped > 0
+        first = next(iter(ObservationLog(tmp_path / "observations")))
+        assert first['timestamp'] >= '2025-10-17T09:29:00'
+
+    def test_stats(self, tmp_path):
+        """Test ratio and throughput totals for jarvis status"""
+        log = write_log(tmp_path / "observations")
+        assert log.archive_stats() is None
+        results = log.archive(backend='gzip')
+        stats = log.archive_stats()
+        assert stats['backend'] == 'gzip'
+        assert stats['files'] == len(results)
+        assert stats['raw_bytes'] == sum(e['bytes'] for e in log.segments)
+        assert stats['ratio'] > 3
+        assert stats['decompress_mb_s'] > 0
+
+    def test_legacy_and_compactor(self, tmp_path):
+        """Test the compactor archives the log and the legacy file once"""
+        rng = random.Random(3)
+        legacy = [make_observation(i, rng) for i in range(20)]
+        (tmp_path / "observations.json").write_text(json.dumps({'observations': legacy}))
+        write_log(tmp_path / "observations", n=200)
+        before = list(open_observations(tmp_path))
+
+        result = Compactor(tmp_path, retention={'raw': None}).run()
+        assert result['archived'] > 1
+        assert not (tmp_path / "observations.json").exists()
+        assert list(open_observations(tmp_path)) == before
+
+        # A raw legacy file written afterwards is read after the archived one
+        (tmp_path / "observations.json").write_text(json.dumps({'observations': legacy[:2]}))
+        assert open_observations(tmp_path).archive() == []
+        assert list(open_observations(tmp_path))[:22] == legacy + legacy[:2]
+
+
+class TestZstd:
+    """Test zstd archives with trained dictionaries"""
+
+    def test_dictionary_round_trip(self, tmp_path):
+        """Test a trained dictionary is stored, used and found again by id"""
+        zstandard = pytest.importorskip('zstandard')
+        log = write_log(tmp_path / "observations", n=6000)
+        before = list(log.iter_range())
+
+        results = log.archive(backend='zstd')
+        assert all(r['file'].suffix == '.zst' for r in results)
+        dicts = list((tmp_path / "observations" / "dicts").glob("*.zdict"))
+        assert len(dicts) == 1
+        header = results[0]['file'].read_bytes()[:18]
+        assert zstandard.get_frame_parameters(header).dict_id == int(dicts[0].stem)
+
+        assert list(ObservationLog(tmp_path / "observations").iter_range()) == before
+
+    def test_missing_dictionary(self, tmp_path):
+        """Test a missing dictionary is reported rather than misread"""
+        pytest.importorskip('zstandard')
+        log = write_log(tmp_path / "observations", n=6000)
+        results = log.archive(backend='zstd')
+        for path in (tmp_path / "observations" / "dicts").glob("*.zdict"):
+            path.unlink()
+        with pytest.raises(OSError):
+            list(stream_lines(results[0]['file'], dictionaries=Dictionaries(tmp_path / "none")))
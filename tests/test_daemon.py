@@ -0,0 +1,151 @@
+"""
+Tests for the observer daemon
+"""
+
+import json
+import os
+import signal
+import socket
+import pytest
+from jarvisos.core.daemon import ObserverDaemon, SystemdNotifier
+from jarvisos.core.observer import Observer
+
+
+class RecordingNotifier(SystemdNotifier):
+    """Notifier that records messages instead of sending them"""
+
+    def __init__(self, watchdog_interval=None):
+        super().__init__(environ={})
+        self.watchdog_interval = watchdog_interval
+        self.messages = []
+
+    def notify(self, state):
+        self.messages.append(state)
+        return True
+
+
+class TestSystemdNotifier:
+    """Test the sd_notify client"""
+
+    def test_disabled_without_socket(self):
+        """Test every call is a no-op outside systemd"""
+        notifier = SystemdNotifier(environ={})
+        assert not notifier.enabled
+        assert notifier.ready() is False
+        assert notifier.watchdog_interval is None
+
+    def test_sends_datagrams(self, tmp_path):
+        """Test messages reach NOTIFY_SOCKET"""
+        path = str(tmp_path / "notify.sock")
+        with socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM) as server:
+            server.bind(path)
+            notifier = SystemdNotifier(environ={'NOTIFY_SOCKET': path})
+
+            assert notifier.ready("warming up")
+            assert server.recv(1024) == b"READY=1\nSTATUS=warming up"
+            assert notifier.watchdog()
+            assert server.recv(1024) == b"WATCHDOG=1"
+
+    def test_environment_parsing(self):
+        """Test abstract sockets and watchdog timeouts"""
+        notifier = SystemdNotifier(environ={
+            'NOTIFY_SOCKET': '@/org/freedesktop/systemd1/notify',
+            'WATCHDOG_USEC': '60000000',
+            'WATCHDOG_PID': str(os.getpid()),
+        })
+        assert notifier.address == '\0/org/freedesktop/systemd1/notify'
+        assert notifier.watchdog_interval == 30.0
+
+        other = SystemdNotifier(environ={'WATCHDOG_USEC': '60000000', 'WATCHDOG_PID': '1'})
+        assert other.watchdog_interval is None
+
+
+class TestObserverDaemon:
+    """Test the long-running observer loop"""
+
+    @pytest.fixture
+    def observer(self, tmp_path):
+        return Observer(output_dir=str(tmp_path))
+
+    def run_until(self, daemon, ticks, on_tick=None):
+        """Run the daemon, delivering SIGTERM after `ticks` observations"""
+        collect = daemon.observer.collect
+
+        def collect_then_signal(tick):
+            observation = collect(tick)
+            if on_tick:
+                on_tick(daemon.observer.observation_count)
+            if daemon.observer.observation_count >= ticks:
+                os.kill(os.getpid(), signal.SIGTERM)
+            return observation
+
+        daemon.observer.collect = collect_then_signal
+        previous = {sig: signal.getsignal(sig) for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP)}
+        daemon.install_signal_handlers()
+        try:
+            return daemon.run()
+        finally:
+            for sig, handler in previous.items():
+                signal.signal(sig, handler)
+
+    def test_sigterm_flushes_and_seals(self, observer):
+        """Test SIGTERM stops the loop and seals the active segment"""
+        notifier = RecordingNotifier()
+        daemon = ObserverDaemon(observer, interval=0.01, notifier=notifier)
+
+        assert self.run_until(daemon, 3) == 3
+        assert observer.log.count() == 3
+        assert all(entry['closed'] for entry in observer.log.segments)
+        assert notifier.messages[0].startswith("READY=1")
+        assert notifier.messages[-1] == "STOPPING=1"
+
+    def test_sighup_reloads_config(self, observer, tmp_path):
+        """Test SIGHUP re-reads the config file"""
+        config_file = tmp_path / "observer.json"
+        config_file.write_text(json.dumps({'interval': 0.01}))
+        notifier = RecordingNotifier()
+        daemon = ObserverDaemon(observer, interval=5, config_file=config_file,
+                                notifier=notifier)
+        assert daemon.interval == 0.01
+
+        def on_tick(count):
+            if count == 1:
+                config_file.write_text(json.dumps({'interval': 0.02, 'collector': 'psutil'}))
+                os.kill(os.getpid(), signal.SIGHUP)
+
+        self.run_until(daemon, 3, on_tick)
+
+        assert daemon.interval == 0.02
+        assert daemon.scheduler.interval == 0.02
+        assert observer.procfs is None
+        assert "RELOADING=1" in notifier.messages
+
+    def test_invalid_config_is_ignored(self, observer, tmp_path):
+        """Test bad values keep the current settings"""
+        config_file = tmp_path / "observer.json"
+        config_file.write_text(json.dumps({'interval': -1, 'collector': 'bogus'}))
+        daemon = ObserverDaemon(observer, interval=7, config_file=config_file,
+                                notifier=RecordingNotifier())
+        assert daemon.interval == 7
+        assert observer.collector == 'auto'
+
+    def test_watchdog_pings_during_long_sleeps(self, observer):
+        """Test the watchdog is fed while waiting for a slow tick"""
+        notifier = RecordingNotifier(watchdog_interval=0.01)
+        daemon = ObserverDaemon(observer, interval=0.05, notifier=notifier)
+
+        self.run_until(daemon, 2)
+
+        assert notifier.messages.count("WATCHDOG=1") >= 3
+
+    def test_adaptive_bounds_from_config(self, observer, tmp_path):
+        """Test min/max interval in the config enable adaptive sampling"""
+        config_file = tmp_path / "observer.json"
+        config_file.write_text(json.dumps({'min_interval': 0.01, 'max_interval': 0.04}))
+        daemon = ObserverDaemon(observer, interval=1, config_file=config_file,
+                                notifier=RecordingNotifier())
+
+        assert observer.adaptive is not None
+        assert daemon.interval == 0.04
+        self.run_until(daemon, 2)
+        assert all(obs['tick']['max_interval'] == 0.04 for obs in observer.stream())
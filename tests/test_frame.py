@@ -0,0 +1,135 @@
+"""
+Tests for the columnar observation frame
+"""
+import random
+from collections import Counter
+from datetime import datetime
+
+import numpy as np
+import pytest
+from jarvisos.core.frame import ObservationFrame
+
+
+def make_observation(minute, apps, cpu=10.0, interval=None):
+    """Build an observation `minute` minutes after 2025-10-17T08:00"""
+    obs = {
+        'timestamp': f'2025-10-17T{8 + minute // 60:02d}:{minute % 60:02d}:00',
+        'apps': [{'name': name, 'pid': i} for i, name in enumerate(apps)],
+        'system': {'cpu_percent': cpu, 'memory_percent': 50.0}
+    }
+    if interval:
+        obs['tick'] = {'interval': interval}
+    return obs
+
+
+@pytest.fixture
+def random_observations():
+    """Observations with random, often repeating, app lists"""
+    rng = random.Random(7)
+    names = ['code', 'chrome', 'zsh', 'slack', 'python3']
+    observations = []
+    for minute in range(0, 600, 5):
+        apps = rng.choices(names, k=rng.randint(0, 4)) if rng.random() < 0.7 else ['code', 'zsh']
+        observations.append(make_observation(minute, apps, cpu=rng.uniform(0, 100)))
+    return observations
+
+
+class TestObservationFrame:
+    """Test ObservationFrame functionality"""
+
+    def test_columns(self):
+        """Test observations load into aligned columns"""
+        frame = ObservationFrame.from_observations([
+            make_observation(0, ['code', 'zsh', 'code']),
+            make_observation(70, [], cpu=30.0),
+        ])
+
+        assert len(frame) == 2
+        assert frame.timestamps[1] - frame.timestamps[0] == 70 * 60
+        assert list(frame.hours) == [8, 9]
+        assert list(frame.app_counts) == [3, 0]
+        assert frame.app_names == ['code', 'zsh']
+        assert frame.start_time == '2025-10-17T08:00:00'
+        assert frame.end_time == '2025-10-17T09:10:00'
+
+    def test_epoch_matches_wall_clock(self):
+        """Test timestamps are the recorded wall-clock time as epoch seconds"""
+        frame = ObservationFrame.from_observations([make_observation(0, [])])
+        expected = (datetime(2025, 10, 17, 8) - datetime(1970, 1, 1)).total_seconds()
+        assert frame.timestamps[0] == expected
+
+    def test_offset_aware_timestamps(self):
+        """Test timestamps with a UTC offset keep their local wall-clock time"""
+        obs = make_observation(0, [])
+        obs['timestamp'] = '2025-10-17T08:00:00+02:00'
+        frame = ObservationFrame.from_observations([obs])
+        assert list(frame.hours) == [8]
+
+    def test_missing_system_stats(self):
+        """Test legacy records without system stats become NaN"""
+        frame = ObservationFrame.from_observations([{'timestamp': '2025-10-17T08:00:00'}])
+        assert np.isnan(frame.cpu[0])
+        assert frame.weighted_mean(frame.cpu) == 0.0
+
+    def test_empty(self):
+        """Test a frame with no observations"""
+        frame = ObservationFrame.from_observations([])
+        assert len(frame) == 0
+        assert frame.top_apps() == []
+        assert len(frame.groupby_hour(frame.app_counts)[0]) == 0
+        assert len(frame.app_set_changed()) == 0
+
+    def test_top_apps_matches_counter(self, random_observations):
+        """Test app frequency counts processes exactly like Counter.most_common"""
+        counter = Counter(app['name'] for obs in random_observations for app in obs['apps'])
+        frame = ObservationFrame.from_observations(random_observations)
+        assert frame.top_apps(3) == counter.most_common(3)
+
+    def test_top_apps_with_mask(self, random_observations):
+        """Test app frequency restricted to some ticks"""
+        frame = ObservationFrame.from_observations(random_observations)
+        mask = frame.hours < 10
+        counter = Counter(
+            app['name'] for obs in random_observations
+            if datetime.fromisoformat(obs['timestamp']).hour < 10 for app in obs['apps']
+        )
+        assert dict(frame.top_apps(10, mask)) == dict(counter)
+
+    def test_groupby_hour(self):
+        """Test per-hour sums and means cover only hours with data"""
+        frame = ObservationFrame.from_observations([
+            make_observation(0, ['a']), make_observation(30, ['a', 'b', 'c']),
+            make_observation(180, ['a', 'b']),
+        ])
+
+        hours, sums = frame.groupby_hour(frame.app_counts)
+        assert list(hours) == [8, 11]
+        assert list(sums) == [4, 2]
+        assert list(frame.groupby_hour(frame.app_counts, how='mean')[1]) == [2, 2]
+        with pytest.raises(ValueError):
+            frame.groupby_hour(frame.app_counts, how='median')
+
+    def test_rolling_mean(self):
+        """Test trailing means, with partial windows at the start"""
+        frame = ObservationFrame.from_observations([])
+        result = frame.rolling_mean(np.array([1.0, 2.0, 3.0, 4.0]), window=2)
+        assert list(result) == [1.0, 1.5, 2.5, 3.5]
+
+    def test_weighted_mean(self):
+        """Test adaptive ticks weigh by the interval they stand for"""
+        frame = ObservationFrame.from_observations([
+            make_observation(0, [], cpu=10.0, interval=1),
+            make_observation(1, [], cpu=40.0, interval=2),
+        ])
+        assert frame.weighted_mean(frame.cpu) == 30.0
+
+    def test_app_set_changed_matches_loop(self, random_observations):
+        """Test vectorized app-set switches against comparing Python sets"""
+        expected, previous = [], None
+        for obs in random_observations:
+            current = set(app['name'] for app in obs['apps'])
+            expected.append(previous is not None and previous != current)
+            previous = current
+
+        frame = ObservationFrame.from_observations(random_observations)
+        assert list(frame.app_set_changed()) == expected
@@ -171,3 +171,34 @@ class TestGeneratorIntegration:
         
         assert loaded_insights is not None
         assert "patterns" in loaded_insights
+    
+    @patch.dict(os.environ, {"ANTHROPIC_API_KEY": "test_key"})
+    def test_generate_all_tasks_concurrently(self, temp_dirs):
+        """Test --all generates every task's script at once"""
+        import threading
+        import time
+        data_dir, scripts_dir = temp_dirs
+        tasks = [{"id": f"task_{i}", "name": f"Task {i}", "description": "d",
+                  "value": "v", "complexity": "simple"} for i in range(3)]
+        (Path(data_dir) / "insights.json").write_text(json.dumps({"automation_opportunities": []}))
+        
+        generator = Generator(data_dir=data_dir, scripts_dir=scripts_dir)
+        running, peak, lock = [0], [0], threading.Lock()
+        
+        def slow_generate(prompt, **kwargs):
+            if "Suggest 3" in prompt:
+                return json.dumps({"tasks": tasks})
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.1)
+            with lock:
+                running[0] -= 1
+            return "print('ok')"
+        
+        generator.ai = Mock(active="claude", generate=slow_generate)
+        result = generator.generate(all_tasks=True)
+        
+        assert len(result['scripts']) == 3
+        assert peak[0] == 3
+        assert all(Path(s['script_path']).exists() for s in result['scripts'])
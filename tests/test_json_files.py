@@ -0,0 +1,152 @@
+"""
+Tests for atomic JSON persistence and the concurrent data directory
+"""
+import json
+import multiprocessing
+import os
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+from jarvisos.core.json_files import generation, read_json, update_json, write_json
+
+STRESS_SECONDS = float(os.environ.get("JARVIS_STRESS_SECONDS", "2"))
+
+
+class TestJsonFiles:
+    """Test json_files functionality"""
+
+    def test_roundtrip_and_generation(self, tmp_path):
+        """Test writes replace the file and bump its generation"""
+        path = tmp_path / "state.json"
+        assert generation(path) == 0
+        assert write_json(path, {'a': 1}) == 1
+        assert write_json(path, {'a': 2}) == 2
+        assert read_json(path) == {'a': 2}
+        assert generation(path) == 2
+        assert [p.name for p in tmp_path.iterdir() if p.suffix == '.tmp'] == []
+
+    def test_cache_is_validated(self, tmp_path):
+        """Test unchanged files are served from cache and changed ones re-read"""
+        path = tmp_path / "state.json"
+        write_json(path, {'a': 1})
+        first = read_json(path)
+        assert read_json(path) is first
+
+        write_json(path, {'a': 2})
+        assert read_json(path) == {'a': 2}
+
+    def test_mutable_copy(self, tmp_path):
+        """Test mutable reads never alter the cached document"""
+        path = tmp_path / "state.json"
+        write_json(path, {'items': []})
+        copy = read_json(path, mutable=True)
+        copy['items'].append(1)
+        assert read_json(path) == {'items': []}
+
+    def test_missing_and_invalid(self, tmp_path):
+        """Test unreadable files fall back to the default"""
+        assert read_json(tmp_path / "missing.json", default={}) == {}
+        (tmp_path / "bad.json").write_text('{"a": ')
+        assert read_json(tmp_path / "bad.json") is None
+
+    def test_update_from_many_processes(self, tmp_path):
+        """Test concurrent read-modify-writes lose no update"""
+        path = tmp_path / "counter.json"
+        workers = [multiprocessing.Process(target=increment, args=(path, 50)) for _ in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        assert read_json(path) == {'count': 200}
+        assert generation(path) == 200
+
+
+def increment(path, times):
+    for _ in range(times):
+        update_json(path, lambda doc: {'count': doc['count'] + 1}, default={'count': 0})
+
+
+# ----------------------------------------------------------------------
+# Stress: observer, analyzer and notifier loops sharing one data directory
+# ----------------------------------------------------------------------
+
+def observer_loop(data_dir, deadline):
+    from jarvisos.core.context import ContextAnalyzer
+    from jarvisos.core.self_metrics import SelfMetrics
+
+    metrics = SelfMetrics(data_dir)
+    analyzer = ContextAnalyzer(data_dir=str(data_dir))
+    i = 0
+    while time.time() < deadline:
+        i += 1
+        metrics.scanned.add(i)
+        metrics.save()
+        analyzer.save_current_context('focus' if i % 2 else 'browsing', {'tick': i, 'pad': 'x' * (i % 4096)})
+
+
+def analyzer_loop(data_dir, deadline):
+    from jarvisos.core.analyzer import Analyzer
+
+    owner = SimpleNamespace(insights_file=data_dir / "insights.json")
+    i = 0
+    while time.time() < deadline:
+        i += 1
+        insights = {
+            'timestamp': datetime.now().isoformat(),
+            'insights': {'usage_patterns': ['pattern'] * (i % 500)}
+        }
+        Analyzer.save_insights(owner, insights)
+
+
+def notifier_loop(data_dir, deadline, failures, reads):
+    from jarvisos.core.context import ContextAnalyzer
+    from jarvisos.core.notifier import ProactiveNotifier
+    from jarvisos.core.self_metrics import load_metrics
+
+    notifier = ProactiveNotifier(data_dir=str(data_dir), use_voice=False)
+    analyzer = ContextAnalyzer(data_dir=str(data_dir))
+    names = ("insights.json", "current_context.json", "observer_metrics.json")
+    while time.time() < deadline:
+        # Plain readers outside the helpers must never see a torn file either
+        for name in names:
+            try:
+                with open(data_dir / name) as f:
+                    json.load(f)
+            except FileNotFoundError:
+                continue
+            except ValueError:
+                failures.value += 1
+        if (data_dir / "insights.json").exists() and not notifier.check_for_insights():
+            failures.value += 1
+        if (data_dir / "current_context.json").exists() and analyzer.get_current_context() is None:
+            failures.value += 1
+        if (data_dir / "observer_metrics.json").exists() and load_metrics(data_dir) is None:
+            failures.value += 1
+        reads.value += 1
+
+
+class TestConcurrentDataDir:
+    """Stress test readers against writers (JARVIS_STRESS_SECONDS to lengthen)"""
+
+    def test_no_torn_reads(self, tmp_path):
+        """Test readers never see a half-written file while writers run"""
+        failures = multiprocessing.Value('i', 0)
+        reads = multiprocessing.Value('i', 0)
+        deadline = time.time() + STRESS_SECONDS
+        processes = [
+            multiprocessing.Process(target=observer_loop, args=(tmp_path, deadline)),
+            multiprocessing.Process(target=analyzer_loop, args=(tmp_path, deadline)),
+            multiprocessing.Process(target=notifier_loop, args=(tmp_path, deadline, failures, reads)),
+            multiprocessing.Process(target=notifier_loop, args=(tmp_path, deadline, failures, reads)),
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join(timeout=STRESS_SECONDS + 60)
+            assert process.exitcode == 0
+
+        assert reads.value > 0
+        assert failures.value == 0
+        assert generation(tmp_path / "insights.json") > 0
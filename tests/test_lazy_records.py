@@ -0,0 +1,138 @@
+"""
+Tests for memory-mapped, field-projected record readers
+"""
+import json
+import tracemalloc
+
+import pytest
+from jarvisos.core.frame import ObservationFrame
+from jarvisos.core.lazy_records import compile_fields, iter_array, map_lines, project
+from jarvisos.core.observation_log import ObservationLog, open_observations
+
+
+def make_observation(i, apps=3):
+    """Build an observation with `apps` processes"""
+    return {
+        'iteration': i,
+        'timestamp': f'2025-10-17T09:{i // 60 % 60:02d}:{i % 60:02d}',
+        'apps': [{'name': f'app{j}', 'pid': j, 'username': 'user', 'cpu_percent': 0.5,
+                  'memory_percent': 1.0} for j in range(apps)],
+        'system': {'cpu_percent': float(i % 100), 'memory_percent': 50.0},
+        'tick': {'interval': 5},
+    }
+
+
+class TestProjection:
+    """Test field projection"""
+
+    def test_compile_fields(self):
+        """Test dotted paths become a tree and whole fields win"""
+        assert compile_fields(['timestamp', 'system.cpu_percent', 'system.memory_percent']) == {
+            'timestamp': None, 'system': {'cpu_percent': None, 'memory_percent': None}
+        }
+        assert compile_fields(['system', 'system.cpu_percent']) == {'system': None}
+
+    def test_project(self):
+        """Test nested dicts and lists are pruned to the requested fields"""
+        obs = make_observation(7)
+        spec = compile_fields(['timestamp', 'system.cpu_percent', 'apps.name', 'missing.field'])
+        assert project(obs, spec) == {
+            'timestamp': obs['timestamp'],
+            'system': {'cpu_percent': 7.0},
+            'apps': [{'name': 'app0'}, {'name': 'app1'}, {'name': 'app2'}],
+        }
+        assert project(obs, None) is obs
+
+
+class TestReaders:
+    """Test map_lines and iter_array"""
+
+    def test_map_lines(self, tmp_path):
+        """Test complete lines and offsets; a torn tail is skipped"""
+        path = tmp_path / "segment.jsonl"
+        path.write_bytes(b'{"a":1}\n{"a":2}\n{"a":')
+        lines = list(map_lines(path))
+        assert lines == [(b'{"a":1}\n', 8), (b'{"a":2}\n', 16)]
+        assert list(map_lines(path, 8)) == [(b'{"a":2}\n', 16)]
+        assert list(map_lines(path, 100)) == []
+        (tmp_path / "empty.jsonl").write_bytes(b'')
+        assert list(map_lines(tmp_path / "empty.jsonl")) == []
+
+    @pytest.mark.parametrize('chunk_size', [1, 7, 64, 1 << 20])
+    def test_iter_array_matches_json_load(self, tmp_path, chunk_size):
+        """Test streaming equals a full load whatever the chunk boundaries"""
+        observations = [make_observation(i) for i in range(20)]
+        observations[3]['apps'][0]['name'] = 'café ☕'  # multi-byte text across chunks
+        observations[4]['system']['cpu_percent'] = 12345.678
+        path = tmp_path / "observations.json"
+        path.write_text(json.dumps({'metadata': {'nested': [1, {'observations': []}]},
+                                    'observations': observations}, indent=2, ensure_ascii=False))
+
+        assert list(iter_array(path, chunk_size=chunk_size)) == observations
+
+    def test_iter_array_top_level_list(self, tmp_path):
+        """Test a bare array streams too"""
+        path = tmp_path / "list.json"
+        path.write_text('[1, 2.5, "x", {"a": [3]}]')
+        assert list(iter_array(path, chunk_size=2)) == [1, 2.5, "x", {"a": [3]}]
+
+    def test_iter_array_errors(self, tmp_path):
+        """Test malformed documents raise JSONDecodeError"""
+        path = tmp_path / "bad.json"
+        path.write_text('{"observations": [{"a": 1}, {"a": ')
+        with pytest.raises(json.JSONDecodeError):
+            list(iter_array(path))
+        path.write_text('{"other": [1]}')
+        assert list(iter_array(path)) == []
+
+    def test_legacy_memory_is_per_record(self, tmp_path):
+        """Test streaming a large legacy file never holds the document"""
+        path = tmp_path / "observations.json"
+        with open(path, 'w') as f:
+            f.write('{"observations": [')
+            f.write(','.join(json.dumps(make_observation(i, apps=40)) for i in range(6000)))
+            f.write(']}')
+        size = path.stat().st_size
+        assert size > 20_000_000
+
+        tracemalloc.start()
+        try:
+            count = sum(1 for _ in open_observations(tmp_path, fields=('timestamp', 'system.cpu_percent')))
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        assert count == 6000
+        assert peak < size / 5
+
+
+class TestProjectedStream:
+    """Test fields on ObservationLog and ObservationStream"""
+
+    def test_stream_fields(self, tmp_path):
+        """Test legacy and log records are projected alike"""
+        (tmp_path / "observations.json").write_text(json.dumps({'observations': [make_observation(0)]}))
+        log = ObservationLog(tmp_path / "observations")
+        for i in range(1, 4):
+            log.append(make_observation(i))
+        log.close()
+
+        stream = open_observations(tmp_path, fields=('iteration', 'system.cpu_percent'))
+        assert list(stream) == [{'iteration': i, 'system': {'cpu_percent': float(i)}} for i in range(4)]
+        assert len(stream.latest(2)) == 2
+        assert stream.count() == 4
+
+    def test_frame_fields(self, tmp_path):
+        """Test a frame loaded from projected records equals a full load"""
+        log = ObservationLog(tmp_path / "observations")
+        for i in range(50):
+            log.append(make_observation(i, apps=1 + i % 4))
+        log.close()
+
+        full = ObservationFrame.from_observations(open_observations(tmp_path))
+        projected = ObservationFrame.from_observations(
+            open_observations(tmp_path, fields=ObservationFrame.FIELDS))
+        assert projected.app_names == full.app_names
+        assert (projected.indices == full.indices).all()
+        assert (projected.cpu == full.cpu).all()
+        assert (projected.weights == full.weights).all()
@@ -0,0 +1,226 @@
+"""
+Tests for the content-addressed AI response cache
+"""
+
+import pytest
+from jarvisos.core import llm_cache
+from jarvisos.core.ai_brain_ollama import OllamaConfig
+from jarvisos.core.ai_brain_unified import UnifiedAIBrain
+from jarvisos.core.llm_cache import LLMCache, cache_key, normalize_prompt
+
+
+class CountingOllama:
+    """Stands in for OllamaAIBrain, counting generations"""
+
+    def __init__(self, response="Open the terminal."):
+        self.config = OllamaConfig()
+        self.response = response
+        self.calls = 0
+
+    def generate(self, prompt):
+        self.calls += 1
+        return self.response
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = LLMCache(tmp_path)
+    yield cache
+    cache.close()
+
+
+@pytest.fixture(autouse=True)
+def no_bypass(monkeypatch):
+    monkeypatch.setattr(llm_cache, 'BYPASS', False)
+
+
+class TestCacheKey:
+    """Test what identifies a response"""
+
+    def test_normalize_prompt(self):
+        """Whitespace differences do not matter"""
+        assert normalize_prompt("  Hello   world \r\n\n\n\n\tBye\t ") == "Hello world\n\nBye"
+
+    def test_key_ignores_insignificant_whitespace(self):
+        """Re-indented prompts share a key"""
+        assert cache_key('ollama', 'llama3.2', "a  b\n c") == cache_key('ollama', 'llama3.2', "a b\nc")
+
+    def test_key_depends_on_backend_model_and_options(self):
+        """Any change in how a prompt is asked is a different key"""
+        base = cache_key('ollama', 'llama3.2', "prompt", {'temperature': 0.7})
+        assert base == cache_key('ollama', 'llama3.2', "prompt", {'temperature': 0.7})
+        assert base != cache_key('claude', 'llama3.2', "prompt", {'temperature': 0.7})
+        assert base != cache_key('ollama', 'mistral', "prompt", {'temperature': 0.7})
+        assert base != cache_key('ollama', 'llama3.2', "prompt", {'temperature': 0.2})
+        assert base != cache_key('ollama', 'llama3.2', "other", {'temperature': 0.7})
+
+
+class TestLLMCache:
+    """Test the SQLite response cache"""
+
+    def cached(self, store, prompt="prompt", site='analyze', response="answer", **kwargs):
+        calls = []
+
+        def compute():
+            calls.append(prompt)
+            return response
+        result = store.cached(site, 'ollama', 'llama3.2', prompt, {}, compute, **kwargs)
+        return result, len(calls)
+
+    def test_hit_after_miss(self, cache):
+        """The second identical request is answered from the cache"""
+        assert self.cached(cache) == ("answer", 1)
+        assert self.cached(cache) == ("answer", 0)
+
+        stats = cache.stats()
+        assert stats['entries'] == 1
+        assert stats['hits'] == 1 and stats['misses'] == 1
+        assert stats['hit_rate'] == 0.5
+        assert stats['sites'] == {'analyze': {'hits': 1, 'misses': 1}}
+
+    def test_persists_across_instances(self, tmp_path):
+        """Entries and counters outlive the process that wrote them"""
+        first = LLMCache(tmp_path)
+        self.cached(first)
+        first.close()
+
+        second = LLMCache(tmp_path)
+        assert self.cached(second) == ("answer", 0)
+        assert second.stats()['sites']['analyze'] == {'hits': 1, 'misses': 1}
+        second.close()
+
+    def test_entries_expire(self, cache, monkeypatch):
+        """Responses older than the site's TTL are computed again"""
+        now = [1_000_000.0]
+        monkeypatch.setattr(llm_cache.time, 'time', lambda: now[0])
+        self.cached(cache, site='understand_intent')
+
+        now[0] += llm_cache.TTLS['understand_intent'] - 1
+        assert self.cached(cache, site='understand_intent')[1] == 0
+        now[0] += 2
+        assert self.cached(cache, site='understand_intent')[1] == 1
+
+    def test_lru_eviction_by_bytes(self, tmp_path, monkeypatch):
+        """Over the byte bound, the least recently used entries go first"""
+        now = [1_000_000.0]
+        monkeypatch.setattr(llm_cache.time, 'time', lambda: now[0])
+        cache = LLMCache(tmp_path, max_bytes=250)
+
+        for prompt in ("a", "b"):
+            now[0] += 1
+            self.cached(cache, prompt, response="x" * 100)
+        now[0] += 1
+        self.cached(cache, "a")  # "a" is now more recent than "b"
+        now[0] += 1
+        self.cached(cache, "c", response="x" * 100)
+
+        assert cache.stats()['bytes'] <= 250
+        assert self.cached(cache, "a")[1] == 0
+        assert self.cached(cache, "b", response="x" * 100)[1] == 1
+        cache.close()
+
+    def test_failures_are_not_stored(self, cache):
+        """A None response is returned but not cached"""
+        assert self.cached(cache, response=None) == (None, 1)
+        assert self.cached(cache, response=None) == (None, 1)
+        assert cache.stats()['entries'] == 0
+
+    def test_sites_without_ttl_are_not_cached(self, cache):
+        """Only call sites listed in TTLS are cached"""
+        self.cached(cache, site='chat')
+        assert self.cached(cache, site='chat')[1] == 1
+        assert cache.stats()['entries'] == 0
+
+    def test_bypass(self, cache):
+        """cache=False and set_bypass() skip reads and writes"""
+        self.cached(cache)
+        assert self.cached(cache, cache=False)[1] == 1
+
+        llm_cache.set_bypass(True)
+        assert self.cached(cache)[1] == 1
+        assert cache.stats()['hits'] == 0
+
+    def test_clear(self, cache):
+        """clear() drops entries and counters"""
+        self.cached(cache)
+        cache.clear()
+        stats = cache.stats()
+        assert stats['entries'] == 0 and stats['sites'] == {}
+        assert stats['hit_rate'] is None
+
+
+class TestUnifiedAIBrainCache:
+    """Test the cache in front of UnifiedAIBrain.generate"""
+
+    @pytest.fixture
+    def brain(self, tmp_path):
+        brain = UnifiedAIBrain(data_dir=tmp_path)
+        brain.active = 'ollama'
+        brain.ollama_brain = CountingOllama()
+        yield brain
+        brain.cache.close()
+
+    def test_repeat_is_not_sent_to_backend(self, brain):
+        """A repeated request at a cached call site reuses the response"""
+        assert brain.generate("Suggest tasks", site='suggest_tasks') == "Open the terminal."
+        assert brain.generate("Suggest tasks", site='suggest_tasks') == "Open the terminal."
+        assert brain.ollama_brain.calls == 1
+
+    def test_uncached_calls(self, brain):
+        """No site, or cache=False, always asks the backend"""
+        brain.generate("Hello")
+        brain.generate("Hello")
+        brain.generate("Hello", site='suggest_tasks', cache=False)
+        assert brain.ollama_brain.calls == 3
+
+    def test_model_change_misses(self, brain):
+        """Switching models does not reuse another model's answer"""
+        brain.generate("Suggest tasks", site='suggest_tasks')
+        brain.ollama_brain.config.model = 'mistral'
+        brain.generate("Suggest tasks", site='suggest_tasks')
+        assert brain.ollama_brain.calls == 2
+
+
+class FakeClaude:
+    """Stands in for anthropic.Anthropic, counting messages.create calls"""
+
+    def __init__(self):
+        self.messages = self
+        self.calls = 0
+
+    def create(self, **kwargs):
+        self.calls += 1
+        text = '{"message": "Starting a coding session"}'
+        return type('Message', (), {'content': [type('Block', (), {'text': text})()]})()
+
+
+class TestAIBrainThinkCache:
+    """Test the cache in front of AIBrain.think"""
+
+    @pytest.fixture
+    def brain(self, tmp_path):
+        pytest.importorskip("anthropic")
+        from jarvisos.core.ai_brain import AIBrain
+        brain = AIBrain(tmp_path, api_key="test")
+        brain.client = FakeClaude()
+        yield brain
+        brain.cache.close()
+
+    def test_repeat_ignores_live_context_and_history(self, brain, monkeypatch):
+        """A repeated action is answered from the cache though CPU and history changed"""
+        import psutil
+        monkeypatch.setattr(psutil, 'cpu_percent', lambda *args, **kwargs: 12.0)
+        first = brain.understand_intent("opened VSCode")
+        monkeypatch.setattr(psutil, 'cpu_percent', lambda *args, **kwargs: 87.0)
+        second = brain.understand_intent("opened VSCode")
+
+        assert second == first == {"message": "Starting a coding session"}
+        assert brain.client.calls == 1
+        assert brain.cache_hits == 1
+        assert len(brain.conversation_history) == 2
+
+    def test_other_actions_miss(self, brain):
+        """A different action is a different question"""
+        brain.understand_intent("opened VSCode")
+        brain.understand_intent("opened Slack")
+        assert brain.client.calls == 2
@@ -0,0 +1,98 @@
+"""
+Tests for the network collector
+"""
+
+import pytest
+from jarvisos.core.netstat import NetworkCollector
+
+TCP_HEADER = "  sl  local_address rem_address   st tx_queue rx_queue tr tm->when retrnsmt   uid  timeout inode\n"
+
+
+def tcp_line(n, state):
+    return f"   {n}: 0100007F:BC8F 00000000:0000 {state} 00000000:00000000 00:00000000 00000000  1000        0 {900 + n} 1\n"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 10.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestNetworkCollector:
+    """Test NetworkCollector functionality"""
+
+    @pytest.fixture
+    def proc_root(self, tmp_path):
+        """Synthetic /proc/net tree"""
+        net = tmp_path / "net"
+        net.mkdir()
+        (net / "sockstat").write_text(
+            "sockets: used 120\n"
+            "TCP: inuse 5 orphan 0 tw 2 alloc 7 mem 1\n"
+            "UDP: inuse 3 mem 0\n"
+        )
+        (net / "sockstat6").write_text("TCP6: inuse 1\nUDP6: inuse 0\n")
+        (net / "tcp").write_text(
+            TCP_HEADER + tcp_line(0, "0A") + tcp_line(1, "01") + tcp_line(2, "01") + tcp_line(3, "06")
+        )
+        (net / "tcp6").write_text(TCP_HEADER + tcp_line(0, "0A"))
+        (net / "udp").write_text(TCP_HEADER + tcp_line(0, "07") + tcp_line(1, "07"))
+        (net / "udp6").write_text(TCP_HEADER)
+        self.write_snmp(tmp_path, 100, 50)
+        return tmp_path
+
+    def write_snmp(self, root, active, passive):
+        (root / "net" / "snmp").write_text(
+            "Tcp: RtoAlgorithm RtoMin RtoMax MaxConn ActiveOpens PassiveOpens CurrEstab\n"
+            f"Tcp: 1 200 120000 -1 {active} {passive} 2\n"
+        )
+
+    def test_counts_from_proc(self, proc_root):
+        """Test socket and connection counts come from /proc/net"""
+        stats = NetworkCollector(proc_root=str(proc_root), use_procfs=True).sample()
+
+        assert stats['sockets_used'] == 120
+        assert stats['tcp_inuse'] == 5
+        assert stats['tcp6_inuse'] == 1
+        assert stats['udp_inuse'] == 3
+        assert stats['tcp_tw'] == 2
+        assert stats['connections'] == 7
+        assert stats['tcp_established'] == 2
+        assert stats['tcp_listen'] == 2
+        assert stats['tcp_time_wait'] == 1
+
+    def test_rates_between_samples(self, proc_root):
+        """Test counters are reported as per-second rates"""
+        clock = FakeClock()
+        collector = NetworkCollector(proc_root=str(proc_root), use_procfs=True, clock=clock)
+
+        first = collector.sample()
+        assert first['tcp_opens_per_s'] is None
+        assert first['bytes_recv_per_s'] is None
+
+        clock.now += 5
+        self.write_snmp(proc_root, 110, 60)
+        second = collector.sample()
+        assert second['tcp_opens_per_s'] == 4.0
+        assert second['bytes_recv_per_s'] >= 0
+
+    def test_psutil_fallback(self):
+        """Test the psutil path reports the same keys for connections"""
+        stats = NetworkCollector(use_procfs=False).sample()
+
+        assert stats['connections'] >= 0
+        assert {'tcp_established', 'tcp_listen', 'tcp_time_wait'} <= set(stats)
+        assert 'sockets_used' not in stats
+
+    @pytest.mark.skipif(not NetworkCollector.available(), reason="needs /proc/net")
+    def test_matches_psutil_on_this_host(self):
+        """Test the /proc count agrees with psutil.net_connections"""
+        import psutil
+        try:
+            expected = len(psutil.net_connections(kind='inet'))
+        except psutil.AccessDenied:
+            pytest.skip("net_connections needs privileges here")
+        stats = NetworkCollector().sample()
+        assert abs(stats['connections'] - expected) <= 2
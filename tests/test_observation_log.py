@@ -0,0 +1,242 @@
+"""
+Tests for the segmented observation log
+"""
+import json
+import os
+import pytest
+from pathlib import Path
+from datetime import datetime
+from jarvisos.core.observation_log import (ObservationLog, WriterLockedError, open_observations,
+                                          resolve_time)
+
+
+def make_observation(i):
+    """Build a minimal observation record"""
+    return {
+        'iteration': i,
+        'timestamp': f'2025-10-17T09:{i // 60:02d}:{i % 60:02d}',
+        'apps': [{'name': 'app1', 'pid': 1, 'username': 'user', 'cpu_percent': 0, 'memory_percent': 0}],
+        'system': {'cpu_percent': 10.0, 'memory_percent': 50.0}
+    }
+
+
+class TestObservationLog:
+    """Test ObservationLog functionality"""
+    
+    @pytest.fixture
+    def log(self, tmp_path):
+        """Create log in a temporary directory"""
+        return ObservationLog(tmp_path / "observations")
+    
+    def test_append_and_iterate(self, log):
+        """Test records round-trip in order"""
+        for i in range(5):
+            log.append(make_observation(i))
+        log.close()
+        
+        records = list(log)
+        assert [r['iteration'] for r in records] == [0, 1, 2, 3, 4]
+        assert log.count() == 5
+    
+    def test_one_compact_line_per_record(self, log):
+        """Test each tick is a single compact line"""
+        size = log.append(make_observation(1))
+        log.close()
+        
+        segment = log.log_dir / log.segments[0]['file']
+        content = segment.read_bytes()
+        assert content.count(b'\n') == 1
+        assert len(content) == size
+        assert b', ' not in content
+    
+    def test_size_rotation(self, tmp_path):
+        """Test segments rotate once they exceed the size limit"""
+        log = ObservationLog(tmp_path / "observations", max_segment_bytes=400)
+        for i in range(10):
+            log.append(make_observation(i))
+        log.close()
+        
+        assert len(log.segments) > 1
+        assert all(entry['closed'] for entry in log.segments)
+        assert sum(entry['count'] for entry in log.segments) == 10
+        assert [r['iteration'] for r in log] == list(range(10))
+    
+    def test_manifest_readable_by_new_instance(self, log):
+        """Test a fresh reader sees the manifest written by the writer"""
+        for i in range(3):
+            log.append(make_observation(i))
+        log.flush()
+        
+        reader = ObservationLog(log.log_dir)
+        assert reader.count() == 3
+        assert len(list(reader)) == 3
+    
+    def test_crash_recovery_drops_torn_line(self, log):
+        """Test a torn trailing write is dropped on reopen"""
+        for i in range(3):
+            log.append(make_observation(i))
+        segment = log.log_dir / log.segments[0]['file']
+        # The process dies: its file handle and writer lock go away
+        log._fh.close()
+        log._fh = None
+        os.close(log._writer_fd)
+        log._writer_fd = None
+        with open(segment, 'a') as f:
+            f.write('{"iteration": 99, "timest')
+        
+        reopened = ObservationLog(log.log_dir)
+        reopened.append(make_observation(3))
+        reopened.close()
+        
+        assert [r['iteration'] for r in reopened] == [0, 1, 2, 3]
+        assert reopened.segments[0]['count'] == 3
+
+    def test_second_writer_is_refused(self, log):
+        """Test a live writer's active segment is not sealed by another writer"""
+        log.append(make_observation(0))
+        
+        other = ObservationLog(log.log_dir)
+        with pytest.raises(WriterLockedError):
+            other.append(make_observation(1))
+        assert [r['iteration'] for r in other] == [0]  # reading is unaffected
+        
+        log.append(make_observation(2))
+        log.close()
+        other.append(make_observation(3))
+        other.close()
+        assert [r['iteration'] for r in ObservationLog(log.log_dir)] == [0, 2, 3]
+        assert not list(log.log_dir.glob('*.tmp'))
+
+
+def hourly_observation(hour, minute, cpu=10.0):
+    """Build an observation at a given hour of 2025-10-17"""
+    obs = make_observation(hour * 60 + minute)
+    obs['timestamp'] = f'2025-10-17T{hour:02d}:{minute:02d}:00'
+    obs['system'] = {'cpu_percent': cpu, 'memory_percent': 50.0}
+    return obs
+
+
+class TestTimePartitions:
+    """Test hourly partitions and range queries"""
+    
+    @pytest.fixture
+    def log(self, tmp_path):
+        """Log with three records in each of 09:00, 10:00 and 11:00"""
+        log = ObservationLog(tmp_path / "observations")
+        for hour in (9, 10, 11):
+            for minute, cpu in ((0, 5.0), (20, 40.0), (40, 15.0)):
+                log.append(hourly_observation(hour, minute, cpu))
+        log.close()
+        return log
+    
+    def test_segments_live_in_hour_directories(self, log):
+        """Test crossing an hour boundary opens a segment in a new partition"""
+        files = [entry['file'] for entry in log.segments]
+        assert len(files) == 3
+        assert files[0].startswith('2025-10-17/09/')
+        assert files[2].startswith('2025-10-17/11/')
+        assert all((log.log_dir / f).exists() for f in files)
+    
+    def test_manifest_stats(self, log):
+        """Test per-partition counts and min/max come from the manifest"""
+        parts = log.partitions()
+        assert [p['partition'] for p in parts] == ['2025-10-17T09', '2025-10-17T10', '2025-10-17T11']
+        assert parts[0]['count'] == 3
+        assert parts[0]['stats']['cpu_percent'] == [5.0, 40.0]
+        assert parts[0]['stats']['apps'] == [1, 1]
+    
+    def test_count_does_not_read_segments(self, log):
+        """Test count() is answered from the manifest alone"""
+        for entry in log.segments:
+            (log.log_dir / entry['file']).unlink()
+        assert ObservationLog(log.log_dir).count() == 9
+    
+    def test_range_opens_only_overlapping_partitions(self, log):
+        """Test iter_range skips segments outside the window"""
+        # Remove the 09:00 and 11:00 data: a range inside 10:00 must not notice
+        for entry in (log.segments[0], log.segments[2]):
+            (log.log_dir / entry['file']).unlink()
+        
+        reader = ObservationLog(log.log_dir)
+        records = list(reader.iter_range('2025-10-17T10:00:00', '2025-10-17T10:30:00'))
+        assert [r['timestamp'] for r in records] == ['2025-10-17T10:00:00', '2025-10-17T10:20:00']
+        assert records[0]['apps'][0]['name'] == 'app1'
+    
+    def test_range_bounds(self, log):
+        """Test since is inclusive, until exclusive, and both optional"""
+        assert len(list(log.iter_range(since='2025-10-17T10:40:00'))) == 4
+        assert len(list(log.iter_range(until='2025-10-17T09:40:00'))) == 2
+        assert len(list(log.iter_range())) == 9
+    
+    def test_range_without_apps(self, log):
+        """Test process lists can be skipped entirely"""
+        record = next(log.iter_range(apps=False))
+        assert 'apps' not in record and 'ps' not in record
+        assert record['system']['cpu_percent'] == 5.0
+    
+    def test_latest(self, log):
+        """Test latest(n) returns the newest records, oldest first"""
+        latest = log.latest(4)
+        assert [r['timestamp'] for r in latest] == [
+            '2025-10-17T10:40:00', '2025-10-17T11:00:00',
+            '2025-10-17T11:20:00', '2025-10-17T11:40:00'
+        ]
+    
+    def test_stream_window(self, log, tmp_path):
+        """Test open_observations applies a window to plain iteration"""
+        stream = open_observations(tmp_path, since='2025-10-17T11:00:00')
+        assert len(list(stream)) == 3
+        assert len(list(stream)) == 3  # re-iterable
+    
+    def test_resolve_time(self):
+        """Test CLI time bounds"""
+        now = datetime(2025, 10, 17, 12, 30)
+        assert resolve_time('2h', now) == datetime(2025, 10, 17, 10, 30)
+        assert resolve_time('today', now) == datetime(2025, 10, 17)
+        assert resolve_time('2025-10-16T08:00', now) == datetime(2025, 10, 16, 8)
+        assert resolve_time(None, now) is None
+        with pytest.raises(ValueError):
+            resolve_time('soon', now)
+
+
+class TestObservationStream:
+    """Test streaming across legacy and segmented storage"""
+    
+    def test_stream_includes_legacy_file(self, tmp_path):
+        """Test the legacy observations.json is streamed before the log"""
+        legacy = {'observations': [make_observation(0)]}
+        with open(tmp_path / "observations.json", 'w') as f:
+            json.dump(legacy, f)
+        
+        log = ObservationLog(tmp_path / "observations")
+        log.append(make_observation(1))
+        log.close()
+        
+        stream = open_observations(tmp_path)
+        assert stream.exists()
+        assert [r['iteration'] for r in stream] == [0, 1]
+        assert stream.count() == 2
+        assert stream.metadata()['start_time'] == make_observation(0)['timestamp']
+    
+    def test_empty_stream(self, tmp_path):
+        """Test a data dir with no observations"""
+        stream = open_observations(tmp_path)
+        assert not stream.exists()
+        assert not stream
+        assert list(stream) == []
+
+    def test_legacy_count_is_recorded(self, tmp_path, monkeypatch):
+        """Test the legacy file is counted once, and its archive not at all"""
+        from jarvisos.core import observation_log
+        with open(tmp_path / "observations.json", 'w') as f:
+            json.dump({'observations': [make_observation(i) for i in range(3)]}, f)
+
+        stream = open_observations(tmp_path)
+        assert stream.count() == 3
+
+        def no_reads(*args, **kwargs):
+            raise AssertionError("legacy records were read")
+        monkeypatch.setattr(observation_log, 'iter_array', no_reads)
+        assert open_observations(tmp_path).count() == 3
+        stream.archive(backend='gzip')
+        assert open_observations(tmp_path).count() == 3
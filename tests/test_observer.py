@@ -19,8 +19,7 @@ class TestObserver:
     def test_observer_init(self, observer, tmp_path):
         """Test observer initialization"""
         assert observer.output_dir == tmp_path
-        assert observer.observations_file == tmp_path / "observations.json"
-        assert observer.observations == []
+        assert observer.shell_history is None  # shell history is opt-in
     
     def test_get_running_apps(self, observer):
         """Test getting running apps"""
@@ -52,28 +51,53 @@ class TestObserver:
         for field in required_fields:
             assert field in stats
     
+    def test_system_stats_collectors_agree(self, tmp_path):
+        """Test the procfs and psutil collectors report the same disk figures"""
+        procfs = Observer(output_dir=str(tmp_path / "procfs"), collector="procfs")
+        if procfs.procfs is None:
+            pytest.skip("procfs collector is Linux only")
+        fast = procfs.get_system_stats()
+        slow = Observer(output_dir=str(tmp_path / "psutil"), collector="psutil").get_system_stats()
+        
+        assert fast['disk_total_gb'] == slow['disk_total_gb']
+        assert fast['disk_percent'] == pytest.approx(slow['disk_percent'], abs=0.1)
+    
     def test_observe_short_duration(self, observer):
         """Test short observation"""
         observer.observe(duration=4, interval=2)
         
-        assert len(observer.observations) == 2
-        assert observer.observations_file.exists()
+        assert observer.observation_count == 2
+        assert observer.log.count() == 2
+    
+    def test_observe_adaptive_records_bounds(self, observer):
+        """Test adaptive runs record the interval and bounds in every sample"""
+        observer.observe(duration=1, interval=1, min_interval=0.1, max_interval=0.4)
+        
+        ticks = [obs['tick'] for obs in observer.stream()]
+        assert len(ticks) >= 3
+        for tick in ticks:
+            assert tick['min_interval'] == 0.1
+            assert tick['max_interval'] == 0.4
+            assert 0.1 <= tick['interval'] <= 0.4
     
+    def record(self, observer, observations):
+        """Append observations to the observer's log, as ticks do"""
+        for obs in observations:
+            observer.log.append(obs)
+        observer.log.flush()
+
     def test_save_and_load_observations(self, observer):
         """Test saving and loading observations"""
-        # Create mock observations
-        observer.observations = [
+        # Save mock observations
+        self.record(observer, [
             {
                 'iteration': 1,
                 'timestamp': '2025-10-17T00:00:00',
                 'apps': [{'name': 'test', 'pid': 1, 'username': 'user', 'cpu_percent': 0, 'memory_percent': 0}],
                 'system': {'cpu_percent': 10, 'memory_percent': 50, 'disk_percent': 30, 'timestamp': '2025-10-17T00:00:00'}
             }
-        ]
-        
-        # Save
-        observer.save_observations()
-        assert observer.observations_file.exists()
+        ])
+        assert observer.log.exists()
         
         # Load
         data = observer.load_observations()
@@ -84,7 +108,7 @@ class TestObserver:
     def test_get_summary(self, observer):
         """Test getting summary"""
         # Create and save mock observations
-        observer.observations = [
+        self.record(observer, [
             {
                 'iteration': 1,
                 'timestamp': '2025-10-17T00:00:00',
@@ -102,8 +126,7 @@ class TestObserver:
                 ],
                 'system': {'cpu_percent': 30, 'memory_percent': 70, 'disk_percent': 30, 'timestamp': '2025-10-17T00:00:05'}
             }
-        ]
-        observer.save_observations()
+        ])
         
         # Get summary
         summary = observer.get_summary()
@@ -115,3 +138,72 @@ class TestObserver:
         assert len(summary['top_apps']) == 2
         assert summary['top_apps'][0][0] == 'app1'  # Most frequent
         assert summary['top_apps'][0][1] == 2  # Appeared 2 times
+
+
+class TestProcessTable:
+    """Test the persistent process table"""
+    
+    @pytest.fixture
+    def busy_child(self):
+        """Spawn a CPU-bound child process"""
+        import subprocess
+        import sys
+        child = subprocess.Popen([sys.executable, '-c', 'while True: pass'])
+        yield child
+        child.kill()
+        child.wait()
+    
+    def test_cpu_is_measured_from_first_tick(self, busy_child):
+        """Test a busy process does not report 0% on its first sample"""
+        import time
+        from jarvisos.core.process_table import ProcessTable
+        
+        time.sleep(0.3)
+        table = ProcessTable()
+        apps = {app['pid']: app for app in table.snapshot()}
+        assert apps[busy_child.pid]['cpu_percent'] > 10
+        
+        time.sleep(0.3)
+        apps = {app['pid']: app for app in table.snapshot()}
+        assert apps[busy_child.pid]['cpu_percent'] > 50
+    
+    def test_handles_are_reused_and_evicted(self, busy_child):
+        """Test entries persist across ticks and are evicted on exit"""
+        from jarvisos.core.process_table import ProcessTable
+        
+        table = ProcessTable()
+        table.snapshot()
+        key = table._by_pid[busy_child.pid]
+        entry = table._entries[key]
+        
+        table.snapshot()
+        assert table._entries[key] is entry
+        
+        busy_child.kill()
+        busy_child.wait()
+        table.snapshot()
+        assert busy_child.pid not in table._by_pid
+        assert key not in table._entries
+    
+    def test_access_denied_pids_are_not_retried(self, monkeypatch):
+        """Test a pid raising AccessDenied is skipped on later ticks"""
+        import os
+        import psutil
+        from jarvisos.core.process_table import ProcessTable
+        
+        calls = []
+        real_name = psutil.Process.name
+        
+        def fake_name(proc):
+            if proc.pid == os.getpid():
+                calls.append(proc.pid)
+                raise psutil.AccessDenied(proc.pid)
+            return real_name(proc)
+        
+        monkeypatch.setattr(psutil.Process, 'name', fake_name)
+        table = ProcessTable()
+        table.snapshot()
+        table.snapshot()
+        
+        assert calls == [os.getpid()]
+        assert os.getpid() in table.denied
@@ -0,0 +1,342 @@
+"""
+Tests for the Ollama HTTP client, against a local stub server
+"""
+
+import asyncio
+import json
+import os
+import stat
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from jarvisos.core import ai_brain_ollama
+from jarvisos.core.ai_brain_ollama import OllamaAIBrain, OllamaConfig
+from jarvisos.core.ai_brain_unified import UnifiedAIBrain
+from jarvisos.core.ollama_client import OllamaClient, OllamaError, parse_host
+from jarvisos.core.streaming import TimedStream
+
+
+class StubOllama(BaseHTTPRequestHandler):
+    """Answers the Ollama API endpoints the client uses"""
+
+    protocol_version = 'HTTP/1.1'  # keep-alive
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    def _send(self, status, document):
+        body = json.dumps(document).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        if self.server.close_next:
+            self.server.close_next = False
+            self.send_header('Connection', 'close')
+            self.close_connection = True
+        self.end_headers()
+        self.wfile.write(body)
+        if self.server.drop_next:  # hang up without telling the client, like an idle timeout
+            self.server.drop_next = False
+            self.close_connection = True
+
+    def _stream(self, documents, separator):
+        """Chunked NDJSON, one document per word, `delay` seconds apart"""
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        lines = []
+        for i, document in enumerate(documents):
+            lines += [document] if i == 0 else [separator, document]
+        lines.append({'done': True, **({'error': self.server.stream_error}
+                                       if self.server.stream_error else {})})
+        for document in lines:
+            time.sleep(self.server.delay)
+            data = json.dumps({'done': False, **document}).encode() + b'\n'
+            self.wfile.write(b'%x\r\n%s\r\n' % (len(data), data))
+        self.wfile.write(b'0\r\n\r\n')
+
+    def do_GET(self):
+        self.server.requests.append((self.path, None))
+        if self.path == '/api/version':
+            self._send(200, {'version': '0.5.0'})
+        elif self.path == '/api/tags':
+            self._send(200, {'models': [{'name': name} for name in self.server.models]})
+        else:
+            self._send(404, {'error': 'not found'})
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        self.server.requests.append((self.path, body))
+        model = body.get('model', '')
+        known = model in self.server.models or f"{model}:latest" in self.server.models
+        if not known and self.path != '/api/pull':
+            self._send(404, {'error': f"model '{body.get('model')}' not found"})
+        elif self.path == '/api/generate' and body['stream']:
+            self._stream([{'response': word} for word in f"echo: {body['prompt']}".split(' ')],
+                         separator={'response': ' '})
+        elif self.path == '/api/generate':
+            self._send(200, {'model': body['model'], 'response': f" echo: {body['prompt']} ",
+                             'done': True})
+        elif self.path == '/api/chat' and body['stream']:
+            last = body['messages'][-1]['content']
+            self._stream([{'message': {'role': 'assistant', 'content': word}}
+                          for word in f"echo: {last}".split(' ')],
+                         separator={'message': {'role': 'assistant', 'content': ' '}})
+        elif self.path == '/api/chat':
+            last = body['messages'][-1]['content']
+            self._send(200, {'model': body['model'], 'done': True,
+                             'message': {'role': 'assistant', 'content': f"echo: {last}"}})
+        elif self.path == '/api/pull':
+            self.server.models.append(f"{body['model']}:latest")
+            self._send(200, {'status': 'success'})
+        else:
+            self._send(404, {'error': 'not found'})
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), StubOllama)
+    httpd.daemon_threads = True
+    httpd.requests, httpd.connections = [], 0
+    httpd.close_next = httpd.drop_next = False
+    httpd.delay, httpd.stream_error = 0, None
+    httpd.models = ['llama3.2:latest']
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    httpd.host = f"127.0.0.1:{httpd.server_address[1]}"
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def fake_cli(tmp_path, monkeypatch):
+    """An `ollama` executable on PATH that echoes its stdin"""
+    script = tmp_path / "bin" / "ollama"
+    script.parent.mkdir()
+    script.write_text('#!/bin/sh\n'
+                      'case "$1" in\n'
+                      '  --version) echo "ollama version 0.5.0" ;;\n'
+                      '  list) echo "llama3.2:latest" ;;\n'
+                      '  run) printf "cli: "; cat ;;\n'
+                      'esac\n')
+    script.chmod(script.stat().st_mode | stat.S_IXUSR)
+    monkeypatch.setenv('PATH', f"{script.parent}{os.pathsep}{os.environ['PATH']}")
+    return script
+
+
+def unused_host():
+    """An address nothing listens on"""
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), StubOllama)
+    port = httpd.server_address[1]
+    httpd.server_close()
+    return f"127.0.0.1:{port}"
+
+
+class TestOllamaClient:
+    """Test the pooled HTTP client"""
+
+    def test_parse_host(self, monkeypatch):
+        """Test OLLAMA_HOST forms and default ports"""
+        monkeypatch.delenv('OLLAMA_HOST', raising=False)
+        assert parse_host() == ('http', '127.0.0.1', 11434)
+        assert parse_host('0.0.0.0') == ('http', '0.0.0.0', 11434)
+        assert parse_host('gpu-box:8080') == ('http', 'gpu-box', 8080)
+        assert parse_host('https://ollama.lan') == ('https', 'ollama.lan', 443)
+        monkeypatch.setenv('OLLAMA_HOST', 'http://10.0.0.2:11434')
+        assert parse_host() == ('http', '10.0.0.2', 11434)
+
+    def test_generate_reuses_connection(self, server):
+        """Test requests share one keep-alive connection"""
+        client = OllamaClient(server.host)
+        for i in range(5):
+            response = client.generate('llama3.2', f'hi {i}', system='be brief',
+                                       options={'temperature': 0.1}, keep_alive='10m')
+            assert response['response'] == f' echo: hi {i} '
+        assert server.connections == 1 == client.connections_opened
+        path, body = server.requests[-1]
+        assert path == '/api/generate'
+        assert body == {'model': 'llama3.2', 'prompt': 'hi 4', 'stream': False,
+                        'system': 'be brief', 'options': {'temperature': 0.1}, 'keep_alive': '10m'}
+
+    def test_chat(self, server):
+        """Test /api/chat sends the messages"""
+        client = OllamaClient(server.host)
+        messages = [{'role': 'system', 'content': 'terse'}, {'role': 'user', 'content': 'hello'}]
+        response = client.chat('llama3.2', messages, keep_alive='5m')
+        assert response['message']['content'] == 'echo: hello'
+        assert server.requests[-1] == ('/api/chat', {'model': 'llama3.2', 'messages': messages,
+                                                     'stream': False, 'keep_alive': '5m'})
+
+    def test_reconnects_after_server_close(self, server):
+        """Test a pooled connection closed by the server is replaced"""
+        client = OllamaClient(server.host)
+        server.drop_next = True
+        assert client.version() == '0.5.0'
+        assert len(client._idle) == 1  # pooled, but the server has hung up
+        assert client.generate('llama3.2', 'again')['response'] == ' echo: again '
+        assert client.connections_opened == 2
+
+        server.close_next = True  # "Connection: close" is honoured, not pooled
+        client.version()
+        assert client._idle == []
+        client.version()
+        assert client.connections_opened == 3
+
+    def test_errors(self, server):
+        """Test HTTP errors carry the server's message; unreachable servers raise OSError"""
+        client = OllamaClient(server.host)
+        with pytest.raises(OllamaError, match="model 'missing' not found") as excinfo:
+            client.generate('missing', 'hi')
+        assert excinfo.value.status == 404
+        assert client.version() == '0.5.0'  # the connection survives an error status
+
+        with pytest.raises(OSError):
+            OllamaClient(unused_host(), timeout=2).version()
+
+    def test_concurrent_requests(self, server):
+        """Test threads each get a connection and the pool stays bounded"""
+        client = OllamaClient(server.host, pool_size=2)
+        results = []
+        threads = [threading.Thread(target=lambda i=i: results.append(
+            client.generate('llama3.2', str(i))['response'])) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert sorted(results) == sorted(f' echo: {i} ' for i in range(8))
+        assert len(client._idle) <= 2
+
+
+class TestOllamaBrain:
+    """Test OllamaAIBrain over HTTP and its CLI fallback"""
+
+    def test_generate_over_http(self, server):
+        """Test configured options and keep_alive reach the server"""
+        brain = OllamaAIBrain(OllamaConfig(host=server.host, temperature=0.2, max_tokens=64,
+                                           num_ctx=4096, keep_alive='1h'))
+        assert brain.available and brain.transport == 'http'
+        assert brain.generate('ping', system='sys') == 'echo: ping'
+        _, body = server.requests[-1]
+        assert body['options'] == {'temperature': 0.2, 'num_predict': 64, 'num_ctx': 4096}
+        assert body['keep_alive'] == '1h' and body['system'] == 'sys'
+
+        brain.generate('ping', options={'temperature': 0})
+        assert server.requests[-1][1]['options']['temperature'] == 0
+        assert brain.chat([{'role': 'user', 'content': 'hey'}]) == 'echo: hey'
+
+    def test_pulls_missing_model(self, server):
+        """Test a model the server lacks is pulled over HTTP"""
+        OllamaAIBrain(OllamaConfig(host=server.host, model='phi3'))
+        assert ('/api/pull', {'model': 'phi3', 'stream': False}) in server.requests
+        assert 'phi3:latest' in server.models
+
+    def test_cli_when_server_down(self, fake_cli):
+        """Test the CLI is used, with the prompt on stdin, when the API is unreachable"""
+        brain = OllamaAIBrain(OllamaConfig(host=unused_host()))
+        assert brain.available and brain.transport == 'cli'
+        long_prompt = 'x' * 300000  # more than fits in one argv string
+        assert brain.generate(long_prompt, system='sys') == f'cli: sys\n\n{long_prompt}'
+
+    def test_falls_back_to_cli(self, server, fake_cli):
+        """Test a failing API call falls back to ollama run"""
+        brain = OllamaAIBrain(OllamaConfig(host=server.host))
+        server.models.clear()  # the server now rejects every generation
+        assert brain.generate('hello') == 'cli: hello'
+        assert brain.transport == 'http'
+
+    def test_unavailable(self, monkeypatch, tmp_path):
+        """Test no server and no CLI leaves the brain unavailable"""
+        monkeypatch.setenv('PATH', str(tmp_path))
+        brain = OllamaAIBrain(OllamaConfig(host=unused_host()))
+        assert not brain.available
+        assert brain.generate('hello') is None
+
+
+class TestStreaming:
+    """Test streamed generations"""
+
+    def test_client_stream(self, server):
+        """Test NDJSON lines arrive as documents and the connection is reused"""
+        client = OllamaClient(server.host)
+        documents = list(client.generate_stream('llama3.2', 'a b', keep_alive='1m'))
+        assert ''.join(d.get('response', '') for d in documents) == 'echo: a b'
+        assert documents[-1]['done'] is True
+        assert server.requests[-1][1]['stream'] is True
+        assert client.version() and client.connections_opened == 1
+
+    def test_closing_early_drops_connection(self, server):
+        """Test a stream abandoned mid-response is not pooled"""
+        client = OllamaClient(server.host)
+        stream = client.generate_stream('llama3.2', 'a b c d')
+        next(stream)
+        stream.close()
+        assert client._idle == []
+        assert client.version() == '0.5.0'
+
+    def test_error_mid_stream(self, server):
+        """Test an error line raises OllamaError"""
+        server.stream_error = 'out of memory'
+        with pytest.raises(OllamaError, match='out of memory'):
+            list(OllamaClient(server.host).generate_stream('llama3.2', 'hi'))
+
+    def test_brain_generate_stream(self, server):
+        """Test the brain yields text chunks and the first one arrives early"""
+        server.delay = 0.05
+        brain = OllamaAIBrain(OllamaConfig(host=server.host, max_tokens=32))
+        stream = TimedStream(brain.generate_stream('one two three four'))
+        chunks = list(stream)
+        assert ''.join(chunks) == 'echo: one two three four'
+        assert len(chunks) == 9
+        assert stream.timer.ttft < stream.timer.total / 3
+        assert server.requests[-1][1]['options']['num_predict'] == 32
+        assert ''.join(brain.chat_stream([{'role': 'user', 'content': 'x y'}])) == 'echo: x y'
+
+    def test_brain_async_stream(self, server):
+        """Test the async variant yields the same chunks"""
+        brain = OllamaAIBrain(OllamaConfig(host=server.host))
+
+        async def collect():
+            return [chunk async for chunk in brain.agenerate_stream('p q')]
+
+        assert asyncio.run(collect()) == ['echo:', ' ', 'p', ' ', 'q']
+
+    def test_stream_falls_back_to_cli(self, server, fake_cli):
+        """Test a stream that fails before its first token is served by ollama run"""
+        brain = OllamaAIBrain(OllamaConfig(host=server.host))
+        server.models.clear()
+        assert ''.join(brain.generate_stream('hello', system='sys')) == 'cli: sys\n\nhello'
+
+    def test_stream_cli_with_chatty_stderr(self, server, fake_cli):
+        """Test progress output beyond a pipe's capacity does not stall the CLI stream"""
+        fake_cli.write_text('#!/bin/sh\n'
+                            'case "$1" in\n'
+                            '  run) head -c 200000 /dev/zero >&2; printf "cli: "; cat ;;\n'
+                            'esac\n')
+        brain = OllamaAIBrain(OllamaConfig(host=server.host, timeout=10))
+        brain.transport = 'cli'
+        started = time.monotonic()
+        assert ''.join(brain.generate_stream('hello')) == 'cli: hello'
+        assert time.monotonic() - started < 5
+
+    def test_stream_error_after_first_token(self, server, fake_cli):
+        """Test a failure mid-stream ends it without starting over on the CLI"""
+        server.stream_error = 'lost'
+        brain = OllamaAIBrain(OllamaConfig(host=server.host))
+        assert ''.join(brain.generate_stream('a b')) == 'echo: a b'
+
+    def test_unified_stream(self, server, monkeypatch):
+        """Test UnifiedAIBrain streams from Ollama"""
+        monkeypatch.setattr(ai_brain_ollama, '_ollama_brain',
+                            OllamaAIBrain(OllamaConfig(host=server.host)))
+        brain = UnifiedAIBrain()
+        assert brain.active == 'ollama'
+        assert ''.join(brain.generate_stream('hi there')) == 'echo: hi there'
@@ -0,0 +1,91 @@
+"""
+Tests for the /proc fast-path collector
+"""
+import os
+import sys
+import pytest
+import psutil
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+
+from bench_procfs import build_proc_tree
+from jarvisos.core.process_table import ProcessTable
+from jarvisos.core.procfs import ProcfsCollector, disk_usage
+
+pytestmark = pytest.mark.skipif(
+    not ProcfsCollector.available(), reason="procfs collector is Linux only"
+)
+
+
+class TestProcfsCollector:
+    """Test ProcfsCollector against psutil"""
+    
+    @pytest.fixture
+    def proc_root(self, tmp_path):
+        """Synthetic procfs tree shared with the benchmark"""
+        build_proc_tree(tmp_path, 50)
+        return tmp_path
+    
+    @pytest.fixture
+    def psutil_on(self, proc_root):
+        """Point psutil at the synthetic tree"""
+        original = psutil.PROCFS_PATH
+        psutil.PROCFS_PATH = str(proc_root)
+        yield
+        psutil.PROCFS_PATH = original
+    
+    def test_matches_psutil_process_table(self, proc_root, psutil_on):
+        """Test output is identical to the psutil path"""
+        expected = ProcessTable().snapshot()
+        actual = ProcfsCollector(proc_root=str(proc_root)).running_apps()
+        
+        assert len(actual) == len(expected) == 50
+        for got, want in zip(actual, expected):
+            assert got.keys() == want.keys()
+            assert (got['pid'], got['name'], got['username']) == (want['pid'], want['name'], want['username'])
+            assert got['memory_percent'] == want['memory_percent']
+            assert got['cpu_percent'] == pytest.approx(want['cpu_percent'], abs=0.1)
+    
+    def test_memory_matches_psutil(self, proc_root, psutil_on):
+        """Test system memory figures use psutil semantics"""
+        vm = ProcfsCollector(proc_root=str(proc_root)).virtual_memory()
+        expected = psutil.virtual_memory()
+        
+        assert vm.total == expected.total
+        assert vm.used == expected.used
+        assert vm.percent == expected.percent
+    
+    def test_disk_matches_psutil(self, tmp_path):
+        """Test disk figures use psutil semantics"""
+        expected = psutil.disk_usage(str(tmp_path))
+        disk = disk_usage(str(tmp_path))
+        
+        assert disk.total == expected.total
+        assert disk.percent == pytest.approx(expected.percent, abs=0.1)
+    
+    def test_cpu_delta_between_ticks(self, proc_root):
+        """Test CPU% is computed from cpu_times deltas"""
+        collector = ProcfsCollector(proc_root=str(proc_root))
+        collector.running_apps()
+        
+        # Process 7 burns 50 ticks of CPU over the next sample
+        stat = proc_root / "7" / "stat"
+        fields = stat.read_text().split()
+        fields[2 + 11] = str(int(fields[2 + 11]) + 50)
+        stat.write_text(" ".join(fields) + "\n")
+        
+        apps = {app['pid']: app for app in collector.running_apps()}
+        assert apps[7]['cpu_percent'] > 0
+        assert apps[8]['cpu_percent'] == 0.0
+    
+    def test_uid_filter(self, proc_root):
+        """Test processes outside the uid filter are skipped"""
+        collector = ProcfsCollector(proc_root=str(proc_root), uids={os.getuid() + 1})
+        assert collector.running_apps() == []
+        assert collector.running_apps() == []
+    
+    def test_live_proc(self):
+        """Test the collector runs against the real /proc"""
+        apps = ProcfsCollector().running_apps()
+        assert any(app['pid'] == os.getpid() for app in apps)
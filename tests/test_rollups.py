@@ -0,0 +1,191 @@
+"""
+Tests for observation rollups, retention and multi-resolution reads
+"""
+import random
+from datetime import datetime, timedelta
+
+import numpy as np
+import pytest
+from jarvisos.core.dna import UserDNA
+from jarvisos.core.frame import ObservationFrame
+from jarvisos.core.observation_log import ObservationLog, open_observations
+from jarvisos.core.rollups import (
+    Compactor, RollupStore, _tile, load_frame, summarize, to_epoch,
+)
+
+START = datetime(2025, 10, 17, 0, 0)
+NAMES = ['code', 'chrome', 'zsh', 'slack', 'python3', 'firefox', 'vim']
+
+
+def make_observation(when, apps, cpu):
+    """Build an observation at `when` with one process per name in `apps`"""
+    return {
+        'timestamp': when.isoformat(),
+        'apps': [{'name': name, 'pid': 1000 + i, 'username': 'user', 'cpu_percent': 0.5,
+                  'memory_percent': 1.0} for i, name in enumerate(apps)],
+        'system': {'cpu_percent': cpu, 'memory_percent': 40.0 + cpu / 10},
+        'tick': {'interval': 30},
+    }
+
+
+def write_log(data_dir, hours=50, step=30, seed=3):
+    """Write `hours` of ticks every `step` seconds; busier during the day"""
+    rng = random.Random(seed)
+    log = ObservationLog(data_dir / "observations", max_segment_bytes=64 * 1024)
+    for i in range(hours * 3600 // step):
+        when = START + timedelta(seconds=i * step)
+        busy = 9 <= when.hour < 18
+        apps = rng.choices(NAMES, k=rng.randint(4, 9) if busy else rng.randint(0, 3))
+        log.append(make_observation(when, apps, rng.uniform(0, 100)))
+    log.close()
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    write_log(tmp_path)
+    return tmp_path
+
+
+def raw_frame(data_dir, since=None, until=None):
+    return ObservationFrame.from_observations(open_observations(data_dir, since, until))
+
+
+class TestSummarize:
+    """Test bucketing a raw frame"""
+
+    def test_bucket_stats(self):
+        """Test tick counts, CPU stats, app presence and process counts"""
+        observations = [
+            make_observation(START + timedelta(seconds=0), ['code', 'code', 'zsh'], 10.0),
+            make_observation(START + timedelta(seconds=30), ['code'], 30.0),
+            make_observation(START + timedelta(seconds=60), ['chrome'], 50.0),
+        ]
+        frame = ObservationFrame.from_observations(observations)
+        times = [obs['timestamp'] for obs in observations]
+        rows = summarize(frame, times, '1m', to_epoch(START + timedelta(hours=1)))
+
+        assert [row['bucket'] for row in rows] == ['2025-10-17T00:00:00', '2025-10-17T00:01:00']
+        first = rows[0]
+        assert first['ticks'] == 2
+        assert first['seconds'] == 60.0
+        assert (first['cpu_min'], first['cpu_mean'], first['cpu_max']) == (10.0, 20.0, 30.0)
+        assert first['peak_apps'] == 3
+        assert first['switches'] == 1
+        assert first['apps'] == '{"code":[2,3],"zsh":[1,1]}'
+        assert rows[1]['switches'] == 1  # code -> chrome across the bucket edge
+
+    def test_open_buckets_skipped(self):
+        """Test buckets not yet closed are left for a later run"""
+        observations = [make_observation(START + timedelta(seconds=s), ['code'], 1.0)
+                        for s in (0, 30, 60, 90)]
+        frame = ObservationFrame.from_observations(observations)
+        times = [obs['timestamp'] for obs in observations]
+        rows = summarize(frame, times, '1m', to_epoch(START + timedelta(seconds=90)))
+        assert [row['ticks'] for row in rows] == [2]
+        assert summarize(frame, times, '1h', to_epoch(START + timedelta(minutes=30))) == []
+
+
+class TestCompactor:
+    """Test incremental compaction and retention"""
+
+    def test_idempotent_and_incremental(self, data_dir):
+        """Test one run equals several, and reruns change nothing"""
+        end = START + timedelta(hours=50)
+        Compactor(data_dir, retention={'raw': None}).run(end)
+        once = {res: RollupStore(data_dir).rows(res) for res in ('1m', '1h', '1d')}
+
+        other = data_dir / "other"
+        write_log(other)
+        compactor = Compactor(other, retention={'raw': None})
+        for hours in (5, 23, 31, 50, 50):
+            compactor.run(START + timedelta(hours=hours, seconds=17))
+        compactor.run(end)
+        again = {res: RollupStore(other).rows(res) for res in ('1m', '1h', '1d')}
+
+        assert once == again
+        assert len(once['1m']) == 50 * 60
+        assert len(once['1h']) == 50
+        assert len(once['1d']) == 2  # the third day is still open
+        assert sum(row['ticks'] for row in once['1h']) == 50 * 120
+
+    def test_retention(self, data_dir):
+        """Test raw segments and minute buckets expire; hours stay"""
+        now = START + timedelta(hours=50)
+        result = Compactor(data_dir, retention={'raw': timedelta(hours=12),
+                                                '1m': timedelta(hours=24)}).run(now)
+
+        assert result['expired']['raw'] > 0
+        assert result['expired']['1m'] == 26 * 60
+        first_raw = next(iter(open_observations(data_dir)))['timestamp']
+        # Raw ticks of the still-open day are kept for the next run
+        assert first_raw >= (START + timedelta(days=1)).isoformat()
+        assert first_raw < (START + timedelta(days=2)).isoformat()
+
+        store = RollupStore(data_dir)
+        assert store.rows('1m')[0]['bucket'] == (now - timedelta(hours=24)).isoformat()
+        assert len(store.rows('1h')) == 50
+        assert store.compacted_until() == now
+
+
+class TestLoadFrame:
+    """Test reading ranges across rollups and raw ticks"""
+
+    def test_tile(self):
+        """Test coarse buckets in the middle, finer ones at the edges"""
+        h, d = 3600, 86400
+        assert _tile(1.5 * h, 2 * d + 90, ['1d', '1h', '1m']) == [
+            ('1m', 5400, 2 * h), ('1h', 2 * h, d), ('1d', d, 2 * d), ('1m', 2 * d, 2 * d + 60),
+            (None, 2 * d + 60, 2 * d + 90),
+        ]
+        assert _tile(None, 90, ['1m']) == [('1m', None, 60), (None, 60, 90)]
+        assert _tile(10, 20, ['1h', '1m']) == [(None, 10, 20)]
+
+    def test_without_rollups(self, data_dir):
+        """Test raw ticks are read before the first compaction"""
+        frame = load_frame(data_dir, resolution='1d')
+        assert len(frame) == frame.tick_count == 50 * 120
+
+    @pytest.mark.parametrize('resolution', ['1h', '1d'])
+    def test_matches_raw(self, data_dir, resolution):
+        """Test totals, means and top apps equal those of the raw ticks"""
+        now = START + timedelta(hours=50, minutes=7, seconds=12)
+        Compactor(data_dir, retention={'raw': None}).run(now)
+        since = START + timedelta(hours=1, minutes=30, seconds=15)
+
+        for since_, until in ((None, None), (since, None), (since, START + timedelta(hours=40))):
+            rolled = load_frame(data_dir, since_, until, resolution)
+            raw = raw_frame(data_dir, since_, until)
+            assert len(rolled) < len(raw)
+            assert rolled.tick_count == raw.tick_count
+            assert rolled.top_apps(10) == raw.top_apps(10)
+            assert rolled.mean(rolled.cpu) == pytest.approx(raw.mean(raw.cpu), abs=1e-3)
+            assert rolled.app_counts.sum() == raw.app_counts.sum()
+
+    def test_hourly_matches_raw(self, data_dir):
+        """Test per-hour aggregates survive hourly rollups"""
+        Compactor(data_dir, retention={'raw': None}).run(START + timedelta(hours=50))
+        rolled = load_frame(data_dir, resolution='1h')
+        raw = raw_frame(data_dir)
+
+        for how in ('sum', 'mean'):
+            rolled_hours, rolled_values = rolled.groupby_hour(rolled.app_counts, how=how)
+            raw_hours, raw_values = raw.groupby_hour(raw.app_counts, how=how)
+            assert (rolled_hours == raw_hours).all()
+            assert np.allclose(rolled_values, raw_values)
+        # Day buckets are compacted separately: a switch at midnight may be missed
+        assert abs(int(rolled.switch_flags.sum()) - int(raw.switch_flags.sum())) <= 2
+
+    def test_dna_history(self, data_dir):
+        """Test the DNA profile from rollups equals the one from raw ticks"""
+        from_raw = UserDNA(data_dir=str(data_dir / "raw_profile"))
+        from_raw.analyze_observations(raw_frame(data_dir))
+
+        Compactor(data_dir, retention={'raw': timedelta(hours=1)}).run(START + timedelta(hours=50))
+        from_rollups = UserDNA(data_dir=str(data_dir))
+        from_rollups.analyze_history()
+
+        for section in ('chronotype', 'work_patterns', 'tool_preferences',
+                        'workflow_signatures', 'productivity_rhythms'):
+            assert from_rollups.profile[section] == from_raw.profile[section]
+        assert from_rollups.profile['traits']['multitasker'] == from_raw.profile['traits']['multitasker']
+        assert from_rollups.profile['traits']['deep_focus'] == from_raw.profile['traits']['deep_focus']
@@ -0,0 +1,115 @@
+"""
+Tests for the drift-corrected tick scheduler
+"""
+import pytest
+from jarvisos.core.scheduler import AdaptiveInterval, TickScheduler
+
+
+class FakeClock:
+    """Deterministic monotonic clock"""
+    
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+    
+    def __call__(self):
+        return self.now
+    
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestTickScheduler:
+    """Test TickScheduler functionality"""
+    
+    @pytest.fixture
+    def clock(self):
+        return FakeClock()
+    
+    def test_first_tick_fires_immediately(self, clock):
+        """Test the first tick does not sleep"""
+        scheduler = TickScheduler(5, clock=clock, sleep=clock.sleep)
+        tick = scheduler.wait()
+        
+        assert tick.index == 0
+        assert tick.missed == 0
+        assert clock.sleeps == []
+    
+    def test_work_time_does_not_drift(self, clock):
+        """Test collection time is absorbed into the interval"""
+        scheduler = TickScheduler(5, clock=clock, sleep=clock.sleep)
+        scheduler.wait()
+        clock.now += 1.5  # collection work
+        tick = scheduler.wait()
+        
+        assert clock.sleeps == [3.5]
+        assert tick.scheduled == 105.0
+        assert tick.jitter == 0.0
+    
+    def test_missed_ticks_are_skipped(self, clock):
+        """Test overrunning by whole intervals skips ticks"""
+        scheduler = TickScheduler(5, clock=clock, sleep=clock.sleep)
+        scheduler.wait()
+        clock.now += 12  # stalled for more than two intervals
+        tick = scheduler.wait()
+        
+        assert tick.index == 2
+        assert tick.missed == 1
+        assert tick.jitter == pytest.approx(2.0)
+        assert scheduler.stats()['missed_ticks'] == 1
+    
+    def test_jitter_metrics(self, clock):
+        """Test jitter statistics are reported in milliseconds"""
+        scheduler = TickScheduler(5, clock=clock, sleep=clock.sleep)
+        scheduler.wait()
+        clock.now += 5.25
+        scheduler.wait()
+        
+        stats = scheduler.stats()
+        assert stats['ticks'] == 2
+        assert stats['jitter_last_ms'] == pytest.approx(250.0)
+        assert stats['jitter_max_ms'] == pytest.approx(250.0)
+        assert stats['jitter_avg_ms'] == pytest.approx(125.0)
+
+
+def make_obs(cpu, names):
+    """Minimal observation for the adaptive policy"""
+    return {'system': {'cpu_percent': cpu}, 'apps': [{'name': n} for n in names]}
+
+
+class TestAdaptiveInterval:
+    """Test AdaptiveInterval functionality"""
+    
+    def test_backs_off_when_stable(self):
+        """Test the interval doubles after each stable run, up to the max"""
+        adaptive = AdaptiveInterval(1, 5, stable_ticks=2)
+        intervals = [adaptive.update(make_obs(10, ['zsh'])) for _ in range(8)]
+        
+        assert intervals == [1, 2, 2, 4, 4, 5, 5, 5]
+    
+    def test_bursts_on_new_process_or_cpu_spike(self):
+        """Test activity snaps back to the min interval"""
+        adaptive = AdaptiveInterval(1, 60, stable_ticks=1, initial=30)
+        adaptive.update(make_obs(10, ['zsh']))
+        assert adaptive.update(make_obs(10, ['zsh', 'code'])) == 1
+        
+        adaptive.update(make_obs(10, ['zsh', 'code']))
+        assert adaptive.interval == 2
+        assert adaptive.update(make_obs(50, ['zsh'])) == 1
+    
+    def test_invalid_bounds(self):
+        """Test bounds are validated"""
+        with pytest.raises(ValueError):
+            AdaptiveInterval(10, 5)
+    
+    def test_set_interval_reanchors_schedule(self):
+        """Test a new interval applies from the last tick"""
+        clock = FakeClock()
+        scheduler = TickScheduler(5, clock=clock, sleep=clock.sleep)
+        scheduler.wait()
+        scheduler.set_interval(20)
+        tick = scheduler.wait()
+        
+        assert tick.scheduled == 120.0
+        assert clock.sleeps == [20.0]
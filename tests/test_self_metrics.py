@@ -0,0 +1,105 @@
+"""
+Tests for observer self-overhead accounting
+"""
+
+import pytest
+from jarvisos.core.observer import Observer, BUDGET_WINDOW_TICKS
+from jarvisos.core.self_metrics import RollingWindow, SelfMetrics, load_metrics
+
+
+class TestRollingWindow:
+    """Test RollingWindow functionality"""
+
+    def test_percentiles(self):
+        """Test nearest-rank percentiles over the window"""
+        window = RollingWindow(size=100)
+        for value in range(1, 101):
+            window.add(value)
+
+        assert window.percentiles() == {'p50': 50, 'p95': 95, 'p99': 99}
+        assert window.mean(last=10) == 95.5
+
+    def test_window_is_bounded(self):
+        """Test old values fall out of the window"""
+        window = RollingWindow(size=3)
+        for value in (100, 1, 2, 3):
+            window.add(value)
+
+        assert len(window) == 3
+        assert window.percentiles((100,)) == {'p100': 3}
+
+    def test_empty(self):
+        """Test an empty window has no percentiles"""
+        assert RollingWindow().percentiles() == {}
+
+
+class TestSelfMetrics:
+    """Test SelfMetrics functionality"""
+
+    def test_summary_roundtrip(self, tmp_path):
+        """Test the summary file written for jarvis status"""
+        metrics = SelfMetrics(tmp_path)
+        metrics.timed('procfs', 0.0)
+        metrics.record_tick(42)
+        metrics.record_write(512)
+        metrics.save()
+
+        summary = load_metrics(tmp_path)
+        assert summary['ticks'] == 1
+        assert summary['bytes_written'] == 512
+        assert summary['processes_scanned']['p50'] == 42
+        assert 'procfs' in summary['latency_ms']
+
+    def test_over_budget_ratio(self, tmp_path):
+        """Test recent CPU is compared with the budget"""
+        metrics = SelfMetrics(tmp_path, cpu_budget=2.0)
+        assert metrics.over_budget() is None
+
+        for value in (1.0, 3.0, 5.0):
+            metrics.cpu.add(value)
+        assert metrics.over_budget(last=2) == 2.0
+
+    def test_missing_file(self, tmp_path):
+        """Test status copes with an observer that never ran"""
+        assert load_metrics(tmp_path) is None
+
+
+class TestObserverBudget:
+    """Test the observer's CPU budget throttling"""
+
+    @pytest.fixture
+    def observer(self, tmp_path):
+        observer = Observer(output_dir=str(tmp_path), cpu_budget=1.0)
+        observer.start_schedule(5, clock=lambda: 0.0, sleep=lambda s: None)
+        return observer
+
+    def feed(self, observer, cpu):
+        for _ in range(BUDGET_WINDOW_TICKS):
+            observer.metrics.cpu.add(cpu)
+            observer.metrics.ticks += 1
+            observer._reschedule({'system': {'cpu_percent': 0}, 'apps': []})
+
+    def test_throttles_when_over_budget(self, observer):
+        """Test the interval stretches in proportion to the overshoot"""
+        self.feed(observer, 4.0)
+
+        assert observer.scheduler.interval == 20.0
+        assert observer.metrics.throttled_ticks > 0
+
+    def test_recovers_when_under_budget(self, observer):
+        """Test the interval returns to the requested rate once cheap again"""
+        self.feed(observer, 4.0)
+        self.feed(observer, 0.1)
+        self.feed(observer, 0.1)
+
+        assert observer.budget_floor == 0.0
+        assert observer.scheduler.interval == 5
+
+    def test_collect_records_self_metrics(self, observer):
+        """Test each sample carries its own collection cost"""
+        observation = observer.collect(observer.scheduler.wait())
+
+        assert observation['self']['scanned'] == len(observation['apps'])
+        assert observation['self']['apps_ms'] > 0
+        assert observer.metrics.bytes_written > 0
+        assert set(observer.metrics.latency) >= {'system', 'write'}
@@ -0,0 +1,203 @@
+"""
+Tests for the incremental shell-history collector
+"""
+
+import os
+import pytest
+from pathlib import Path
+from jarvisos.core.shell_history import ShellHistoryCollector, is_private, parse_history, unmetafy
+
+
+def commands(events):
+    return [event['command'] for event in events]
+
+
+class TestParseHistory:
+    """Test history format parsing"""
+
+    def test_bash_timestamps(self):
+        """Test '#epoch' lines timestamp the following command"""
+        events = parse_history(b"#1700000000\ngit status\nls -la\n", 'bash')
+
+        assert commands(events) == ['git status', 'ls -la']
+        assert events[0]['timestamp'].startswith('2023-11-1')
+        assert events[1]['timestamp'] is None
+
+    def test_zsh_extended_history(self):
+        """Test ': epoch:duration;command' and multi-line commands"""
+        data = b": 1700000000:0;git status\n: 1700000060:3;for f in *; do\\\necho $f\\\ndone\nmake test\n"
+        events = parse_history(data, 'zsh')
+
+        assert commands(events) == ['git status', 'for f in *; do\necho $f\ndone', 'make test']
+        assert events[1]['timestamp'] is not None
+        assert events[2]['timestamp'] is None
+        assert all(event['shell'] == 'zsh' for event in events)
+
+    def test_zsh_metafied_bytes(self):
+        """Test zsh's meta-escaped bytes are restored"""
+        encoded = 'é'.encode()
+        metafied = bytes([encoded[0], 0x83, encoded[1] ^ 32])
+        assert unmetafy(metafied) == encoded
+
+
+class TestPrivateCommands:
+    """Test commands that must not be recorded"""
+
+    @pytest.mark.parametrize('line', [
+        ' git push',
+        'export GITHUB_TOKEN=ghp_abc',
+        'API_KEY=abc ./deploy.sh',
+        'mysql -u root -phunter2 db',
+        'curl -H "Authorization: Bearer abc" https://api',
+        'gh auth login --token abc',
+        'make && PASSWORD=x make release',
+    ])
+    def test_private(self, line):
+        assert is_private(line)
+
+    @pytest.mark.parametrize('line', [
+        'git status', 'mkdir -p build', 'mysql -u root -p db', 'export PATH',
+        'grep token src/',
+    ])
+    def test_recorded(self, line):
+        assert not is_private(line)
+
+    def test_histignore_globs(self):
+        """Test HISTIGNORE-style patterns match the whole command"""
+        assert is_private('ls -la', ['ls*', 'cd'])
+        assert not is_private('git ls-files', ['ls*'])
+
+    def test_parse_skips_private_lines(self):
+        """Test space-prefixed commands are dropped, in both formats"""
+        assert commands(parse_history(b"ls\n secret\n", 'bash', is_private)) == ['ls']
+        data = b": 1700000000:0; secret\n: 1700000001:0;ls\n"
+        assert commands(parse_history(data, 'zsh', is_private)) == ['ls']
+
+
+class TestShellHistoryCollector:
+    """Test ShellHistoryCollector functionality"""
+
+    @pytest.fixture
+    def history(self, tmp_path):
+        path = tmp_path / ".bash_history"
+        path.write_bytes(b"old command\n")
+        return path
+
+    def make(self, tmp_path, history, **kwargs):
+        return ShellHistoryCollector(tmp_path / "state.json", sources=[history], **kwargs)
+
+    def test_starts_at_end_and_persists_offset(self, tmp_path, history):
+        """Test only new lines are emitted, across restarts"""
+        assert self.make(tmp_path, history).poll() == []
+
+        with open(history, 'ab') as f:
+            f.write(b"git pull\n")
+        assert commands(self.make(tmp_path, history).poll()) == ['git pull']
+        assert self.make(tmp_path, history).poll() == []
+
+    def test_backfill(self, tmp_path, history):
+        """Test backfill reads existing history on first sight"""
+        assert commands(self.make(tmp_path, history, backfill=True).poll()) == ['old command']
+
+    def test_partial_line_waits(self, tmp_path, history):
+        """Test a line still being written is read once complete"""
+        collector = self.make(tmp_path, history)
+        collector.poll()
+
+        with open(history, 'ab') as f:
+            f.write(b"make bu")
+        assert collector.poll() == []
+        with open(history, 'ab') as f:
+            f.write(b"ild\n")
+        assert commands(collector.poll()) == ['make build']
+
+    def test_truncation(self, tmp_path, history):
+        """Test a cleared history is read from the start"""
+        collector = self.make(tmp_path, history)
+        collector.poll()
+
+        history.write_bytes(b"ls\n")
+        assert commands(collector.poll()) == ['ls']
+
+    def test_rewrite_trimming_old_lines(self, tmp_path, history):
+        """Test bash rewriting the file (HISTFILESIZE) resumes after the last read"""
+        history.write_bytes(b"".join(f"cmd {i}\n".encode() for i in range(20)))
+        collector = self.make(tmp_path, history)
+        collector.poll()
+
+        # bash writes a trimmed copy and renames it over the original
+        rewritten = tmp_path / "history.tmp"
+        rewritten.write_bytes(b"".join(f"cmd {i}\n".encode() for i in range(10, 20)) + b"cmd new\n")
+        os.replace(rewritten, history)
+
+        assert commands(collector.poll()) == ['cmd new']
+
+    def test_rotation(self, tmp_path, history):
+        """Test a rotated-away file is followed from the start of the new one"""
+        collector = self.make(tmp_path, history)
+        collector.poll()
+
+        history.rename(tmp_path / ".bash_history.1")
+        history.write_bytes(b"fresh\n")
+        assert commands(collector.poll()) == ['fresh']
+
+    def test_ignored_commands(self, tmp_path, history, monkeypatch):
+        """Test $HISTIGNORE and credential-like commands are not emitted"""
+        monkeypatch.setenv('HISTIGNORE', 'ls:&:exit')
+        collector = self.make(tmp_path, history)
+        collector.poll()
+
+        with open(history, 'ab') as f:
+            f.write(b"ls\nexport AWS_SECRET_ACCESS_KEY=x\ngit pull\nexit\n")
+        assert commands(collector.poll()) == ['git pull']
+
+    def test_missing_file(self, tmp_path):
+        """Test absent history files are ignored"""
+        assert self.make(tmp_path, tmp_path / "nope").poll() == []
+
+
+class TestSelfImproverFeed:
+    """Test command events reach SelfImprover.detect_patterns incrementally"""
+
+    @pytest.fixture
+    def setup(self, tmp_path, monkeypatch):
+        from jarvisos.core.observer import Observer
+        from jarvisos.core.self_improver import SelfImprover
+
+        monkeypatch.setattr(Path, 'home', lambda: tmp_path / "home")
+        (tmp_path / "home").mkdir()
+        history = tmp_path / ".zsh_history"
+        history.write_bytes(b"")
+
+        observer = Observer(output_dir=str(tmp_path / "data"), history=False)
+        observer.shell_history = ShellHistoryCollector(tmp_path / "state.json", sources=[history])
+        observer.shell_history.poll()
+        observer.start_schedule(60, clock=lambda: 0.0, sleep=lambda s: None)
+        improver = SelfImprover(observations_dir=str(tmp_path / "data"))
+        return observer, improver, history
+
+    def type_commands(self, observer, history, cmds):
+        with open(history, 'ab') as f:
+            for cmd in cmds:
+                f.write(f": 1700000000:0;{cmd}\n".encode())
+        return observer.collect(observer.scheduler.wait())
+
+    def test_commands_in_observations(self, setup):
+        """Test new commands are attached to the next tick"""
+        observer, _, history = setup
+        observation = self.type_commands(observer, history, ['git status', 'ls'])
+
+        assert commands(observation['commands']) == ['git status', 'ls']
+
+    def test_detect_patterns_only_reads_new_records(self, setup):
+        """Test counts accumulate across runs without re-reading old ticks"""
+        observer, improver, history = setup
+        self.type_commands(observer, history, ['git status'] * 3)
+        assert improver.detect_patterns() == []
+
+        self.type_commands(observer, history, ['git status'] * 2)
+        patterns = improver.detect_patterns()
+        assert [(p['command'], p['count']) for p in patterns] == [('git status', 5)]
+
+        # Nothing new: the saved position means nothing is recounted
+        assert improver.detect_patterns()[0]['count'] == 5
@@ -0,0 +1,183 @@
+"""
+Tests for single-flight coalescing of identical AI requests
+"""
+
+import threading
+import time
+
+import pytest
+from jarvisos.core import llm_cache
+from jarvisos.core.ai_async import AsyncAIBrain, run_sync
+from jarvisos.core.ai_brain_ollama import OllamaConfig
+from jarvisos.core.ai_brain_unified import UnifiedAIBrain
+from jarvisos.core.single_flight import SingleFlight
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def in_threads(n, target):
+    """Run target() on n threads; their results in thread order"""
+    results = [None] * n
+
+    def run(i):
+        try:
+            results[i] = target()
+        except Exception as e:
+            results[i] = e
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(n)]
+    for thread in threads:
+        thread.start()
+    return threads, results
+
+
+class GatedOllama:
+    """Stands in for OllamaAIBrain; generations block until `gate` is set"""
+
+    def __init__(self):
+        self.config = OllamaConfig()
+        self.gate = threading.Event()
+        self.prompts = []
+        self._lock = threading.Lock()
+
+    def generate(self, prompt):
+        with self._lock:
+            self.prompts.append(prompt)
+        self.gate.wait(5)
+        return f"answer: {prompt}"
+
+    def plan_task(self, goal, context):
+        return self.generate(f"plan {goal}")
+
+
+class TestSingleFlight:
+    """Test the coalescing primitive"""
+
+    def test_concurrent_calls_share_one_execution(self):
+        """Callers with the same key get the leader's result"""
+        flights = SingleFlight()
+        gate = threading.Event()
+        runs = []
+
+        def work():
+            runs.append(1)
+            gate.wait(5)
+            return "result"
+
+        threads, results = in_threads(4, lambda: flights.do('key', work, name='ask'))
+        wait_for(lambda: flights.stats()['calls'] == 4)
+        gate.set()
+        for thread in threads:
+            thread.join()
+
+        assert results == ["result"] * 4
+        assert len(runs) == 1
+        stats = flights.stats()
+        assert stats['executed'] == 1 and stats['coalesced'] == 3
+        assert stats['requests'] == {'ask': {'calls': 4, 'executed': 1, 'coalesced': 3}}
+        assert stats['in_flight'] == 0
+
+    def test_exception_reaches_every_waiter(self):
+        """A failing call raises in the leader and all coalesced callers"""
+        flights = SingleFlight()
+        gate = threading.Event()
+
+        def work():
+            gate.wait(5)
+            raise ValueError("backend down")
+
+        threads, results = in_threads(3, lambda: flights.do('key', work))
+        wait_for(lambda: flights.stats()['calls'] == 3)
+        gate.set()
+        for thread in threads:
+            thread.join()
+
+        assert all(isinstance(r, ValueError) for r in results)
+        assert flights.in_flight() == 0
+
+    def test_sequential_calls_are_not_shared(self):
+        """Nothing is cached: once a call ends, the next one runs again"""
+        flights = SingleFlight()
+        runs = []
+        for _ in range(2):
+            flights.do('key', lambda: runs.append(1))
+        assert len(runs) == 2
+        assert flights.stats()['coalesced'] == 0
+
+
+class TestUnifiedAIBrainCoalescing:
+    """Test coalescing in UnifiedAIBrain"""
+
+    @pytest.fixture
+    def brain(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(llm_cache, 'BYPASS', False)
+        brain = UnifiedAIBrain(data_dir=tmp_path)
+        brain.active = 'ollama'
+        brain.ollama_brain = GatedOllama()
+        yield brain
+        brain.ollama_brain.gate.set()
+        if brain._cache is not None:
+            brain.cache.close()
+
+    def test_identical_generations_share_a_backend_call(self, brain):
+        """The voice loop, notifier and CLI asking at once cost one generation"""
+        threads, results = in_threads(5, lambda: brain.generate("Summarize my context"))
+        wait_for(lambda: brain.coalescing_stats()['calls'] == 5)
+        brain.ollama_brain.gate.set()
+        for thread in threads:
+            thread.join()
+
+        assert results == ["answer: Summarize my context"] * 5
+        assert brain.ollama_brain.prompts == ["Summarize my context"]
+        stats = brain.coalescing_stats()
+        assert stats['requests']['generate'] == {'calls': 5, 'executed': 1, 'coalesced': 4}
+
+    def test_cached_sites_coalesce_on_a_miss(self, brain):
+        """Concurrent misses at a cached site share the backend call, then hit"""
+        threads, results = in_threads(3, lambda: brain.generate("Suggest tasks", site='suggest_tasks'))
+        wait_for(lambda: brain.coalescing_stats()['calls'] == 3)
+        brain.ollama_brain.gate.set()
+        for thread in threads:
+            thread.join()
+
+        assert len(brain.ollama_brain.prompts) == 1
+        assert brain.generate("Suggest tasks", site='suggest_tasks') == results[0]
+        assert brain.coalescing_stats()['calls'] == 3
+
+    def test_different_requests_run_separately(self, brain):
+        """Only identical requests are coalesced"""
+        prompts = iter(["first", "second"])
+        threads, results = in_threads(2, lambda: brain.generate(next(prompts)))
+        wait_for(lambda: len(brain.ollama_brain.prompts) == 2)
+        brain.ollama_brain.gate.set()
+        for thread in threads:
+            thread.join()
+
+        assert sorted(results) == ["answer: first", "answer: second"]
+        assert brain.coalescing_stats()['coalesced'] == 0
+
+    def test_other_requests_coalesce(self, brain):
+        """Structured requests (here plan_task) are keyed by their arguments"""
+        threads, results = in_threads(2, lambda: brain.plan_task("ship", {'deadline': 'friday'}))
+        wait_for(lambda: brain.coalescing_stats()['calls'] == 2)
+        brain.ollama_brain.gate.set()
+        for thread in threads:
+            thread.join()
+
+        assert results == ["answer: plan ship"] * 2
+        assert brain.coalescing_stats()['requests']['plan_task']['coalesced'] == 1
+
+    def test_generate_many_sends_each_prompt_once(self, brain):
+        """A batch sends distinct prompts once and keeps the input order"""
+        brain.ollama_brain.gate.set()
+        async_brain = AsyncAIBrain(brain)
+        results = run_sync(async_brain.generate_many(["a", "b", "a", "a"]))
+        async_brain.shutdown()
+
+        assert results == ["answer: a", "answer: b", "answer: a", "answer: a"]
+        assert sorted(brain.ollama_brain.prompts) == ["a", "b"]
+        assert brain.coalescing_stats()['requests']['generate']['coalesced'] == 2
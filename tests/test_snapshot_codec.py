@@ -0,0 +1,89 @@
+"""
+Tests for delta-encoded process snapshots
+"""
+import json
+import pytest
+from jarvisos.core.snapshot_codec import (SnapshotDecoder, SnapshotEncoder,
+                                          decode_observation, encode_observation)
+
+
+def app(pid, name, cpu=0.0, mem=1.0, user='user'):
+    """Build one get_running_apps entry"""
+    return {'name': name, 'pid': pid, 'username': user, 'cpu_percent': cpu, 'memory_percent': mem}
+
+
+SNAPSHOTS = [
+    [app(1, 'systemd', user='root'), app(10, 'code', 5.0), app(11, 'chrome', 2.0)],
+    [app(1, 'systemd', user='root'), app(10, 'code', 7.5), app(11, 'chrome', 2.0)],
+    [app(1, 'systemd', user='root'), app(10, 'code', 7.5), app(12, 'zsh')],
+    [app(1, 'systemd', user='root'), app(10, 'firefox', 3.0), app(12, 'zsh', 0.5)],
+]
+
+
+class TestSnapshotCodec:
+    """Test SnapshotEncoder / SnapshotDecoder"""
+    
+    def test_lossless_replay(self):
+        """Test decoded snapshots equal the originals"""
+        encoder, decoder = SnapshotEncoder(), SnapshotDecoder()
+        for snapshot in SNAPSHOTS:
+            assert decoder.decode(encoder.encode(snapshot)) == snapshot
+    
+    def test_delta_only_carries_changes(self):
+        """Test deltas contain spawn/exit events and changed metrics only"""
+        encoder = SnapshotEncoder()
+        keyframe = encoder.encode(SNAPSHOTS[0])
+        assert keyframe['k'] == 1
+        assert keyframe['strings'] == ['systemd', 'root', 'code', 'user', 'chrome']
+        
+        assert encoder.encode(SNAPSHOTS[1]) == {'upd': [[10, 7.5, 1.0]]}
+        assert encoder.encode(SNAPSHOTS[2]) == {
+            'strings': ['zsh'],
+            'spawn': [[12, 5, 3, 0.0, 1.0]],
+            'exit': [11]
+        }
+    
+    def test_pid_reuse_is_a_spawn(self):
+        """Test a pid taken over by another process is re-spawned"""
+        encoder = SnapshotEncoder()
+        for snapshot in SNAPSHOTS[:3]:
+            encoder.encode(snapshot)
+        delta = encoder.encode(SNAPSHOTS[3])
+        assert [row[0] for row in delta['spawn']] == [10]
+    
+    def test_periodic_keyframes(self):
+        """Test a keyframe is emitted every keyframe_interval snapshots"""
+        encoder = SnapshotEncoder(keyframe_interval=2)
+        frames = [encoder.encode(SNAPSHOTS[0]) for _ in range(5)]
+        assert [bool(f.get('k')) for f in frames] == [True, False, False, True, False]
+    
+    def test_decode_starts_at_any_keyframe(self):
+        """Test a decoder joining mid-stream waits for a keyframe"""
+        encoder = SnapshotEncoder(keyframe_interval=2)
+        encoded = [encoder.encode(s) for s in SNAPSHOTS]
+        
+        decoder = SnapshotDecoder()
+        assert decoder.decode(encoded[1]) is None
+        assert decoder.decode(encoded[3]) == SNAPSHOTS[3]
+    
+    def test_threshold_suppresses_small_changes(self):
+        """Test changes within the threshold are not recorded"""
+        encoder = SnapshotEncoder(cpu_threshold=5.0)
+        encoder.encode(SNAPSHOTS[0])
+        assert encoder.encode(SNAPSHOTS[1]) == {}
+    
+    def test_observation_roundtrip_is_smaller(self):
+        """Test encoded observations shrink and decode back exactly"""
+        encoder, decoder = SnapshotEncoder(), SnapshotDecoder()
+        apps = [app(pid, f'process-{pid}', mem=0.5) for pid in range(100)]
+        observations = [
+            {'iteration': i, 'timestamp': f'2025-10-17T09:00:{i:02d}', 'apps': apps, 'system': {}}
+            for i in range(20)
+        ]
+        
+        encoded = [encode_observation(encoder, o) for o in observations]
+        raw_size = sum(len(json.dumps(o)) for o in observations)
+        encoded_size = sum(len(json.dumps(e)) for e in encoded)
+        
+        assert raw_size / encoded_size > 10
+        assert [decode_observation(decoder, e) for e in encoded] == observations
@@ -0,0 +1,148 @@
+"""
+Tests for the SQLite state store and its callers
+"""
+import json
+import threading
+from pathlib import Path
+
+import pytest
+from jarvisos.core.context import ContextAnalyzer, SmartInterruptionManager
+from jarvisos.core.feedback import FeedbackManager
+from jarvisos.core.notifier import ProactiveNotifier
+from jarvisos.core.state_store import StateStore, open_state
+
+
+def write_json(path, data):
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2)
+
+
+class TestMigration:
+    """Test the one-shot import of legacy JSON files"""
+
+    @pytest.fixture
+    def legacy_dir(self, tmp_path):
+        write_json(tmp_path / "feedback.json", {
+            'script-a': {'ratings': [{'rating': 5, 'timestamp': 't1', 'comment': 'great'},
+                                     {'rating': 2, 'timestamp': 't2', 'comment': ''}],
+                         'comments': [], 'average_rating': 3.5}
+        })
+        write_json(tmp_path / "improvements.json", [
+            {'id': '1', 'status': 'pending', 'risk_level': 'low', 'pattern': {'command': 'git status'}},
+            {'id': '2', 'status': 'approved', 'risk_level': 'high', 'pattern': {'command': 'rm -rf x'}},
+        ])
+        write_json(tmp_path / "patterns.json", [{'command': 'git status', 'processed_at': 't'}])
+        write_json(tmp_path / "notification_queue.json",
+                   [{'message': 'hi', 'priority': 'normal', 'queued_at': 't'}])
+        write_json(tmp_path / "context_history.json", [{'timestamp': 't', 'dominant_context': 'focus'}])
+        write_json(tmp_path / "last_notification.json", {'timestamp': '2025-10-17T09:00:00'})
+        return tmp_path
+
+    def test_imports_every_file(self, legacy_dir):
+        """Test each legacy file lands in its table"""
+        store = open_state(legacy_dir)
+
+        assert store.script_rating('script-a') == 3.5
+        assert store.all_feedback()['script-a']['ratings'][0]['comment'] == 'great'
+        assert [i['id'] for i in store.improvements('pending')] == ['1']
+        assert store.is_pattern_processed('git status')
+        assert store.queued_notifications()[0]['message'] == 'hi'
+        assert store.context_history()[0]['dominant_context'] == 'focus'
+        assert store.get_value('last_notification') == '2025-10-17T09:00:00'
+
+    def test_runs_once(self, legacy_dir):
+        """Test files are renamed and never imported twice"""
+        open_state(legacy_dir).close()
+        assert not (legacy_dir / "feedback.json").exists()
+        assert (legacy_dir / "feedback.json.migrated").exists()
+
+        # A stale copy reappearing must not double the ratings
+        (legacy_dir / "feedback.json.migrated").rename(legacy_dir / "feedback.json")
+        store = open_state(legacy_dir)
+        assert store.rating_averages()['script-a']['num_ratings'] == 2
+
+    def test_unreadable_file_is_left_alone(self, tmp_path):
+        """Test a corrupt legacy file is skipped, not lost"""
+        (tmp_path / "feedback.json").write_text("{not json")
+        store = open_state(tmp_path)
+        assert store.all_feedback() == {}
+        assert (tmp_path / "feedback.json").exists()
+
+
+class TestFeedbackManager:
+    """Test FeedbackManager on the state store"""
+
+    def test_rate_and_summarize(self, tmp_path):
+        """Test ratings, averages and the top-rated list"""
+        manager = FeedbackManager(data_dir=str(tmp_path))
+        manager.rate_script('a', 5)
+        result = manager.rate_script('a', 3, 'ok')
+        manager.thumbs_down('b')
+
+        assert result['average_rating'] == 4.0
+        assert len(result['ratings']) == 2
+        assert manager.get_script_rating('missing') is None
+        assert manager.get_top_rated_scripts(1) == [{'script_id': 'a', 'rating': 4.0, 'num_ratings': 2}]
+        assert manager.get_feedback_summary() == {
+            'total_scripts': 2, 'total_ratings': 3, 'average_rating': 3.0
+        }
+
+    def test_invalid_rating(self, tmp_path):
+        """Test out-of-range ratings are rejected before touching the store"""
+        with pytest.raises(ValueError):
+            FeedbackManager(data_dir=str(tmp_path)).rate_script('a', 6)
+
+    def test_concurrent_writers_lose_nothing(self, tmp_path):
+        """Test overlapping writers on separate connections keep every rating"""
+        open_state(tmp_path).close()
+
+        def rate(worker):
+            manager = FeedbackManager(data_dir=str(tmp_path))
+            for i in range(25):
+                manager.rate_script(f'script-{i % 3}', 1 + (worker + i) % 5)
+
+        threads = [threading.Thread(target=rate, args=(w,)) for w in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        averages = open_state(tmp_path).rating_averages()
+        assert sum(a['num_ratings'] for a in averages.values()) == 100
+
+
+class TestContextState:
+    """Test context history and the notification queue"""
+
+    def test_history_keeps_newest(self, tmp_path):
+        """Test appends trim the history to the newest entries"""
+        store = StateStore(tmp_path / "state.db")
+        for i in range(5):
+            store.append_context({'timestamp': str(i)}, keep=3)
+        assert [e['timestamp'] for e in store.context_history()] == ['2', '3', '4']
+
+    def test_save_context_history(self, tmp_path):
+        """Test ContextAnalyzer appends session analyses"""
+        analyzer = ContextAnalyzer(data_dir=str(tmp_path))
+        analyzer.save_context_history({'dominant_context': 'focus'})
+        analyzer.save_context_history({'dominant_context': 'browsing'})
+        history = analyzer.store.context_history()
+        assert [e['dominant_context'] for e in history] == ['focus', 'browsing']
+
+    def test_queue_when_in_focus(self, tmp_path, monkeypatch):
+        """Test notifications are queued while the user is focused"""
+        monkeypatch.chdir(tmp_path)
+        manager = SmartInterruptionManager()
+        manager.context_analyzer.save_current_context('focus')
+
+        assert manager.queue_notification('later', 'normal') is False
+        assert manager.queue_notification('now', 'high') is True
+        queued = manager.context_analyzer.store.queued_notifications()
+        assert [n['message'] for n in queued] == ['later']
+
+    def test_notifier_rate_limit(self, tmp_path):
+        """Test the last-notification time round-trips through the store"""
+        notifier = ProactiveNotifier(data_dir=str(tmp_path), use_voice=False)
+        assert notifier.should_notify()
+        notifier.mark_notified()
+        assert not ProactiveNotifier(data_dir=str(tmp_path), use_voice=False).should_notify()
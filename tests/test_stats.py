@@ -0,0 +1,190 @@
+"""
+Tests for the shared observation statistics
+"""
+import random
+from datetime import datetime, timedelta
+
+import pytest
+from jarvisos.core import stats as stats_module
+from jarvisos.core.analyzer import Analyzer
+from jarvisos.core.dna import UserDNA
+from jarvisos.core.frame import ObservationFrame
+from jarvisos.core.observation_log import ObservationLog, open_observations
+from jarvisos.core.rollups import Compactor
+from jarvisos.core.stats import compute, data_version, shared_stats
+
+NAMES = ['code', 'chrome', 'zsh', 'slack', 'python3', 'firefox', 'vim']
+
+
+def make_observation(minute, apps, cpu):
+    return {
+        'timestamp': f'2025-10-17T{minute // 60:02d}:{minute % 60:02d}:00',
+        'apps': [{'name': name, 'pid': 1000 + i, 'username': 'user', 'cpu_percent': 0.5,
+                  'memory_percent': 1.0} for i, name in enumerate(apps)],
+        'system': {'cpu_percent': cpu, 'memory_percent': 50.0},
+    }
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    """A day of ticks every 5 minutes, busier during working hours"""
+    rng = random.Random(11)
+    log = ObservationLog(tmp_path / "observations")
+    for minute in range(0, 24 * 60, 5):
+        busy = 9 * 60 <= minute < 18 * 60
+        apps = rng.choices(NAMES, k=rng.randint(5, 9) if busy else rng.randint(0, 3))
+        log.append(make_observation(minute, apps, rng.uniform(0, 100)))
+    log.close()
+    return tmp_path
+
+
+class TestSharedStats:
+    """Test the single-pass statistics and their cache"""
+
+    def test_compute(self, data_dir):
+        """Test the statistics match direct frame queries"""
+        frame = ObservationFrame.from_observations(open_observations(data_dir))
+        stats = compute(frame)
+        assert stats['ticks'] == 288
+        assert stats['start_time'] == '2025-10-17T00:00:00'
+        assert stats['top_apps'] == [list(pair) for pair in frame.top_apps(10)]
+        assert stats['hours'] == list(range(24))
+        assert stats['work_hours'] == [9, 17]
+        assert set(stats['period_apps']) == {'morning_routine', 'work_routine', 'evening_routine'}
+        assert stats['avg_apps'] == pytest.approx(frame.app_counts.sum() / 288)
+
+    def test_compute_empty(self):
+        """Test an empty frame yields zeros"""
+        stats = compute(ObservationFrame.from_observations([]))
+        assert stats['ticks'] == 0
+        assert stats['top_apps'] == [] and stats['work_hours'] is None
+
+    def test_cache_by_data_version(self, data_dir, monkeypatch):
+        """Test observations are loaded once until new ticks are written"""
+        loads = []
+        real_load = stats_module.load_frame
+        monkeypatch.setattr(stats_module, 'load_frame',
+                            lambda *args, **kwargs: loads.append(args[1:3]) or real_load(*args, **kwargs))
+
+        # The history is read once: up to the checkpoint mark, then the open hour
+        mark = datetime(2025, 10, 17, 23)
+        first = shared_stats(data_dir)
+        assert shared_stats(data_dir) == first
+        assert loads == [(None, mark), (mark, None)]
+        shared_stats(data_dir, since='2025-10-17T12:00:00')
+        assert len(loads) == 3
+
+        version = data_version(data_dir)
+        log = ObservationLog(data_dir / "observations")
+        log.append(make_observation(24 * 60 - 1, ['code'], 1.0))
+        assert data_version(data_dir) != version  # active segment grew
+        log.close()
+        assert shared_stats(data_dir)['ticks'] == first['ticks'] + 1
+        assert loads[3:] == [(mark, None)]
+
+    def test_analyze_then_dna_reads_once(self, data_dir, monkeypatch):
+        """Test the analyzer and DNA share one load of the observations"""
+        loads = []
+        real_load = stats_module.load_frame
+        monkeypatch.setattr(stats_module, 'load_frame',
+                            lambda *args, **kwargs: loads.append(args[1:3]) or real_load(*args, **kwargs))
+
+        summary = Analyzer.summarize_stats(shared_stats(data_dir))
+        dna = UserDNA(data_dir=str(data_dir))
+        dna.analyze_history()
+        mark = datetime(2025, 10, 17, 23)
+        assert loads == [(None, mark), (mark, None)]
+
+        # Same results as analyzing the observations directly
+        expected = UserDNA(data_dir=str(data_dir / "direct"))
+        expected.analyze_observations(open_observations(data_dir))
+        for section in ('chronotype', 'work_patterns', 'tool_preferences',
+                        'workflow_signatures', 'productivity_rhythms', 'traits'):
+            assert dna.profile[section] == expected.profile[section]
+        assert summary['total_observations'] == 288
+
+
+class TestCheckpoint:
+    """Test incremental statistics from a checkpoint"""
+
+    def test_incremental_equals_full(self, tmp_path, monkeypatch):
+        """Test folding new observations into the checkpoint matches a full recompute"""
+        rng = random.Random(4)
+        start = datetime(2025, 10, 17)
+        log = ObservationLog(tmp_path / "observations")
+
+        def observe(first, last):
+            for i in range(first, last):
+                when = start + timedelta(seconds=30 * i)
+                busy = 9 <= when.hour < 18
+                apps = rng.choices(NAMES, k=rng.randint(4, 9) if busy else rng.randint(0, 3))
+                obs = make_observation(0, apps, round(rng.uniform(0, 100), 1))
+                obs['timestamp'] = when.isoformat()
+                obs['tick'] = {'interval': rng.choice([15, 30, 60])}
+                log.append(obs)
+
+        loads = []
+        real_load = stats_module.load_frame
+        monkeypatch.setattr(stats_module, 'load_frame',
+                            lambda *args, **kwargs: loads.append(args[1:3]) or real_load(*args, **kwargs))
+
+        # Day one, compacted, then the first checkpoint
+        observe(0, 2880)
+        Compactor(tmp_path, retention={'raw': None}).run(start + timedelta(days=1, minutes=40))
+        first = shared_stats(tmp_path)
+        assert (tmp_path / "stats_checkpoint.json").exists()
+
+        # More observations arrive and are compacted; only they are read
+        observe(2880, 5000)
+        log.flush()
+        Compactor(tmp_path, retention={'raw': None}).run(start + timedelta(hours=40, minutes=20))
+        observe(5000, 5100)
+        log.flush()
+        loads.clear()
+        incremental = shared_stats(tmp_path)
+        assert loads == [(datetime(2025, 10, 18, 0, 0), datetime(2025, 10, 18, 16, 0)),
+                         (datetime(2025, 10, 18, 16, 0), None)]
+
+        full = shared_stats(tmp_path, full=True)
+        assert incremental == full
+        assert full == compute(real_load(tmp_path, None, None, resolution='1h'))
+        assert full['ticks'] == 5100 != first['ticks']
+
+    def test_incremental_without_rollups(self, tmp_path, monkeypatch):
+        """Test the checkpoint advances from the raw log before any compaction"""
+        rng = random.Random(9)
+        log = ObservationLog(tmp_path / "observations")
+
+        def observe(first, last):
+            for minute in range(first, last, 5):
+                log.append(make_observation(minute, rng.choices(NAMES, k=rng.randint(0, 6)),
+                                            round(rng.uniform(0, 100), 1)))
+            log.flush()
+
+        loads = []
+        real_load = stats_module.load_frame
+        monkeypatch.setattr(stats_module, 'load_frame',
+                            lambda *args, **kwargs: loads.append(args[1:3]) or real_load(*args, **kwargs))
+
+        observe(0, 10 * 60)
+        shared_stats(tmp_path)
+        observe(10 * 60, 14 * 60 + 30)
+        loads.clear()
+        incremental = shared_stats(tmp_path)
+        assert loads == [(datetime(2025, 10, 17, 9), datetime(2025, 10, 17, 14)),
+                         (datetime(2025, 10, 17, 14), None)]
+
+        assert incremental == shared_stats(tmp_path, full=True)
+        assert incremental == compute(real_load(tmp_path, None, None))
+        assert incremental['ticks'] == 174
+
+    def test_checkpoint_reset(self, tmp_path):
+        """Test a checkpoint ahead of the rollups is ignored"""
+        (tmp_path / "stats_checkpoint.json").write_text(
+            '{"version": %d, "mark": "2099-01-01T00:00:00", "stats": {}}' % stats_module.STATS_VERSION)
+        log = ObservationLog(tmp_path / "observations")
+        for minute in range(0, 180, 5):
+            log.append(make_observation(minute, ['code'], 10.0))
+        log.close()
+        Compactor(tmp_path).run(datetime(2025, 10, 17, 3, 30))
+        assert shared_stats(tmp_path)['ticks'] == 36
@@ -0,0 +1,114 @@
+"""
+Tests for the token streaming helpers
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+from jarvisos.core.streaming import TimedStream, TokenTimer, aiter_in_thread, sentences
+
+
+def slow_tokens(tokens, delay=0.0, closed=None):
+    try:
+        for token in tokens:
+            time.sleep(delay)
+            yield token
+    finally:
+        if closed is not None:
+            closed.set()
+
+
+class TestTiming:
+    """Test time to first token and total latency"""
+
+    def test_timed_stream(self):
+        """Test the first token is timed separately from the whole stream"""
+        stream = TimedStream(slow_tokens(['a', '', 'b', 'c'], delay=0.02))
+        assert list(stream) == ['a', 'b', 'c']
+        assert stream.text == 'abc'
+        assert stream.timer.tokens == 3
+        assert 0.01 < stream.timer.ttft < stream.timer.total
+        assert stream.timer.summary().startswith('first token 0.0')
+
+    def test_no_tokens(self):
+        """Test an empty stream reports no first token"""
+        stream = TimedStream(iter([]))
+        assert list(stream) == []
+        assert stream.timer.ttft is None
+        assert 'first token -' in stream.timer.summary()
+
+    def test_listener(self):
+        """Test TokenTimer.on_token works as a token listener"""
+        timer = TokenTimer()
+        for chunk in ('x', 'y'):
+            timer.on_token(chunk)
+        timer.finish()
+        assert timer.tokens == 2 and timer.ttft <= timer.total
+
+
+class TestAsync:
+    """Test blocking streams bridged to asyncio"""
+
+    def test_yields_in_order(self):
+        """Test chunks arrive in order while the loop stays free"""
+        ticks = []
+
+        async def main():
+            async def ticker():
+                while True:
+                    ticks.append(1)
+                    await asyncio.sleep(0.005)
+            task = asyncio.create_task(ticker())
+            chunks = [c async for c in aiter_in_thread(slow_tokens, list('abcd'), 0.02)]
+            task.cancel()
+            return chunks
+
+        assert asyncio.run(main()) == list('abcd')
+        assert len(ticks) > 4  # the loop ran while the worker blocked
+
+    def test_errors_propagate(self):
+        """Test an exception in the stream reaches the consumer"""
+        def failing():
+            yield 'a'
+            raise OSError('connection lost')
+
+        async def main():
+            return [c async for c in aiter_in_thread(failing)]
+
+        with pytest.raises(OSError, match='connection lost'):
+            asyncio.run(main())
+
+    def test_cancellation_closes_stream(self):
+        """Test cancelling the consumer closes the underlying iterator"""
+        closed = threading.Event()
+
+        async def main():
+            async def consume():
+                async for _ in aiter_in_thread(slow_tokens, range(1000), 0.01, closed):
+                    pass
+            task = asyncio.create_task(consume())
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(main())
+        assert closed.wait(1)
+
+
+class TestSentences:
+    """Test regrouping tokens into sentences"""
+
+    def test_sentences(self):
+        """Test sentences are emitted as soon as they end"""
+        tokens = ['Good', ' morn', 'ing. How', ' are you?', ' Fine', '!\nNext', ' line']
+        assert list(sentences(tokens)) == ['Good morning.', 'How are you?', 'Fine!', 'Next line']
+
+    def test_incremental(self):
+        """Test a sentence is available before the stream ends"""
+        seen = []
+        stream = (seen.append(t) or t for t in ['One. ', 'Two', ' three'])
+        first = next(sentences(stream))
+        assert first == 'One.' and seen == ['One. ']
@@ -94,6 +94,16 @@ class TestJarvisVoice:
         # Verify TTS was called
         assert mock_speak.called
     
+    @patch.object(TextToSpeech, 'speak')
+    def test_jarvis_speak_stream(self, mock_speak):
+        """Test a streamed response is spoken sentence by sentence"""
+        jarvis = JarvisVoice()
+        text = jarvis.speak_stream(iter(['Hello', ' there. Your', ' build', ' passed.']))
+        
+        assert text == 'Hello there. Your build passed.'
+        spoken = [call.args[0] for call in mock_speak.call_args_list]
+        assert spoken == ['Hello there.', 'Your build passed.']
+    
     @patch.object(TextToSpeech, 'speak')
     def test_jarvis_greet(self, mock_speak):
         """Test Jarvis greeting"""